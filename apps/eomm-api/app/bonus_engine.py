@@ -0,0 +1,269 @@
+# app/bonus_engine.py
+from __future__ import annotations
+import heapq
+import json
+import os
+import sqlite3
+import threading
+from datetime import date as _date, timedelta as _td
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from . import storage
+
+# Weekly featured-bonus engine.
+#
+# Featured queue files and payout gic files are ingested incrementally into a
+# SQLite index (each file is read from the byte offset the last run stopped
+# at), so a bonus run never rereads a whole file. Candidates are streamed out
+# of the index by (date, len) and ranked with a bounded top-N heap. For every
+# full Monday-Sunday week inside a window the (eligible count, top-N) result
+# is kept as a rollup, so recomputing long historical windows costs one
+# rollup read per week plus the candidates of the partial weeks at the edges.
+
+BONUS_REASON = "featured_bonus"
+FETCH_ROWS = 512  # candidate rows pulled from SQLite per lock hold
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS ingested_files (
+        path TEXT PRIMARY KEY,
+        offset INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        size INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS candidates (
+        day TEXT NOT NULL,           -- queue file date
+        seq INTEGER NOT NULL,        -- line order within the day
+        date TEXT,                   -- record's own date field
+        user TEXT,
+        hash TEXT,
+        len INTEGER NOT NULL,
+        votes INTEGER NOT NULL,
+        ts TEXT,
+        PRIMARY KEY (day, seq)
+    );
+    CREATE INDEX IF NOT EXISTS idx_candidates_len ON candidates (day, len);
+    CREATE TABLE IF NOT EXISTS paid (
+        payout_day TEXT NOT NULL,
+        user TEXT NOT NULL,
+        hash TEXT NOT NULL,
+        PRIMARY KEY (payout_day, user, hash)
+    );
+    CREATE TABLE IF NOT EXISTS rollups (
+        week_start TEXT NOT NULL,
+        min_len INTEGER NOT NULL,
+        top_n INTEGER NOT NULL,
+        eligible INTEGER NOT NULL,
+        top TEXT NOT NULL,
+        PRIMARY KEY (week_start, min_len, top_n)
+    );
+"""
+
+
+def score(c: Dict[str, Any]) -> int:
+    return int(c.get("len", 0) or 0) + 10 * int(c.get("votes", 0) or 0)
+
+
+def top_n(cands: Iterable[Dict[str, Any]], n: int) -> List[Dict[str, Any]]:
+    """Highest scores first; ties keep their input order (same as a stable full sort)."""
+    ranked = heapq.nlargest(n, cands, key=score)
+    return [dict(c, score=score(c)) for c in ranked]
+
+
+def _counted_top_n(cands: Iterable[Dict[str, Any]], n: int) -> Tuple[int, List[Dict[str, Any]]]:
+    """(number of candidates, top_n of them) in one streaming pass."""
+    count = 0
+
+    def counted():
+        nonlocal count
+        for c in cands:
+            count += 1
+            yield c
+    top = top_n(counted(), n)
+    return count, top
+
+
+def _week_start(d: _date) -> _date:
+    return d - _td(days=d.weekday())
+
+
+class BonusIndex:
+    """Persistent candidate, paid-key and rollup index for /bonus/run."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    # ---------- incremental ingest ----------
+    def _new_lines(self, path: Path) -> Tuple[int, Iterator[Tuple[int, dict]], bool]:
+        """
+        Lines appended to ``path`` since the last ingest, as (line_no, record).
+
+        Returns (first line number, lines, rescan). ``rescan`` is True when the
+        file shrank or was replaced and everything derived from it must be
+        dropped first.
+        """
+        try:
+            st = path.stat()
+        except OSError:
+            return 0, iter(()), False
+        row = self._conn.execute(
+            "SELECT offset, mtime_ns, size FROM ingested_files WHERE path = ?", (str(path),)
+        ).fetchone()
+        if row and row[1] == st.st_mtime_ns and row[2] == st.st_size:
+            return 0, iter(()), False
+        rescan = bool(row) and st.st_size < row[0]
+        offset = 0 if (rescan or not row) else row[0]
+
+        with path.open("rb") as f:
+            f.seek(offset)
+            data = f.read()
+        # Only consume complete lines; a writer may still be finishing the last
+        end = data.rfind(b"\n") + 1
+        self._conn.execute(
+            "INSERT INTO ingested_files (path, offset, mtime_ns, size) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET offset = excluded.offset, mtime_ns = excluded.mtime_ns, "
+            "size = excluded.size",
+            (str(path), offset + end, st.st_mtime_ns, st.st_size),
+        )
+
+        def records():
+            for raw in data[:end].split(b"\n"):
+                raw = raw.strip()
+                if not raw:
+                    continue
+                try:
+                    yield json.loads(raw)
+                except ValueError:
+                    continue
+        return offset, records(), rescan
+
+    def sync_queue(self, day: str, path: Path) -> None:
+        """Ingest new featured_queue lines for one day."""
+        with self._lock, self._conn:
+            offset, records, rescan = self._new_lines(path)
+            if rescan:
+                self._conn.execute("DELETE FROM candidates WHERE day = ?", (day,))
+            seq = self._conn.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM candidates WHERE day = ?", (day,)
+            ).fetchone()[0]
+            rows = []
+            for r in records:
+                rows.append((day, seq, r.get("date", day), r.get("user", "anon"), r.get("hash"),
+                             int(r.get("len", 0) or 0), int(r.get("votes", 0) or 0), r.get("ts")))
+                seq += 1
+            if rows or rescan:
+                self._conn.executemany("INSERT INTO candidates VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                week = _week_start(_date.fromisoformat(day)).isoformat()
+                self._conn.execute("DELETE FROM rollups WHERE week_start = ?", (week,))
+
+    def sync_paid(self, payout_day: str, path: Path) -> None:
+        """Ingest new bonus payouts from a payout day's gic file."""
+        with self._lock, self._conn:
+            _, records, rescan = self._new_lines(path)
+            if rescan:
+                self._conn.execute("DELETE FROM paid WHERE payout_day = ?", (payout_day,))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO paid (payout_day, user, hash) VALUES (?, ?, ?)",
+                [(payout_day, str(tx.get("user")), str(tx.get("hash")))
+                 for tx in records if tx.get("type") == "gic_tx" and tx.get("reason") == BONUS_REASON],
+            )
+
+    # ---------- reads ----------
+    def paid_keys(self, payout_day: str) -> Set[Tuple[str, str, str]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT user, hash FROM paid WHERE payout_day = ?", (payout_day,))
+            return {(user, h, BONUS_REASON) for user, h in rows}
+
+    def mark_paid(self, payout_day: str, user: str, h: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO paid (payout_day, user, hash) VALUES (?, ?, ?)",
+                               (payout_day, str(user), str(h)))
+
+    def iter_eligible(self, start: _date, end: _date, min_len: int) -> Iterator[Dict[str, Any]]:
+        """Eligible candidates in queue order (day, then line), FETCH_ROWS at a time."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT day, seq, date, user, hash, len, votes, ts FROM candidates "
+                "WHERE day BETWEEN ? AND ? AND len >= ? ORDER BY day, seq",
+                (start.isoformat(), end.isoformat(), min_len),
+            )
+        try:
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(FETCH_ROWS)
+                if not rows:
+                    return
+                for day, seq, d, user, h, length, votes, ts in rows:
+                    yield {"date": d, "user": user, "hash": h, "len": length, "votes": votes, "ts": ts,
+                           "_order": (day, seq)}
+        finally:
+            cursor.close()
+
+    def _week(self, week_start: _date, min_len: int, n: int) -> Tuple[int, List[Dict[str, Any]]]:
+        key = (week_start.isoformat(), min_len, n)
+        row = self._conn.execute(
+            "SELECT eligible, top FROM rollups WHERE week_start = ? AND min_len = ? AND top_n = ?", key
+        ).fetchone()
+        if row:
+            return row[0], [dict(c, _order=tuple(c["_order"])) for c in json.loads(row[1])]
+
+        eligible, top = _counted_top_n(self.iter_eligible(week_start, week_start + _td(days=6), min_len), n)
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO rollups (week_start, min_len, top_n, eligible, top) VALUES (?, ?, ?, ?, ?)",
+                key + (eligible, json.dumps(top)),
+            )
+        return eligible, top
+
+    def rank(self, start: _date, end: _date, min_len: int, n: int) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        (eligible count, top-n winners) for a window.
+
+        Full weeks come from rollups, the partial weeks at either edge are
+        streamed from the candidate index; since the top-n of a union lies in
+        the union of the parts' top-n, merging those pools is exact.
+        """
+        with self._lock:
+            eligible = 0
+            pool: List[Dict[str, Any]] = []
+            cur = start
+            while cur <= end:
+                week_end = _week_start(cur) + _td(days=6)
+                if cur.weekday() == 0 and week_end <= end:
+                    count, top = self._week(cur, min_len, n)
+                else:
+                    count, top = _counted_top_n(self.iter_eligible(cur, min(week_end, end), min_len), n)
+                eligible += count
+                pool.extend(top)
+                cur = week_end + _td(days=1)
+
+        # Restore queue order so score ties resolve exactly as a full sort would
+        pool.sort(key=lambda c: c["_order"])
+        winners = top_n(pool, n)
+        for w in winners:
+            w.pop("_order", None)
+        return eligible, winners
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_index: Optional[BonusIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_bonus_index() -> BonusIndex:
+    """Process-wide index stored in DATA_DIR (BONUS_DB overrides the path)."""
+    global _index
+    db_path = Path(os.environ.get("BONUS_DB") or storage.DATA_DIR / "bonus.db")
+    with _index_lock:
+        if _index is None or _index.db_path != db_path:
+            _index = BonusIndex(db_path)
+        return _index
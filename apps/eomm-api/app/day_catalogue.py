@@ -0,0 +1,217 @@
+# app/day_catalogue.py
+from __future__ import annotations
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from . import storage
+
+# Per-day summary catalogue behind /index and /verify/{date}.
+#
+# For every day file we keep (mtime_ns, size) and what it contributed to the
+# summary. A lookup only stats the candidate paths: unchanged files are served
+# from the catalogue, small JSON files that changed are re-read, and JSONL
+# files that grew are parsed from the last consumed offset onwards, so an
+# append costs O(appended lines) rather than O(day).
+
+_JSONL = ("echo", "gic")
+
+
+def _day_dir(date_str: str) -> Path:
+    base = os.environ.get("LEDGER_PATH", "data")
+    return Path(base) / date_str
+
+
+def day_paths(date_str: str) -> Dict[str, Path]:
+    """Resolve each day file, preferring DATA_DIR over the day directory (same rules as before)."""
+    root = storage.DATA_DIR
+    day = _day_dir(date_str)
+
+    def pick(name: str) -> Path:
+        return root / name if (root / name).exists() else day / name
+
+    echo_l = pick(f"{date_str}.echo.jsonl")
+    echo_j = pick(f"{date_str}.echo.json")
+    return {
+        "seed": pick(f"{date_str}.seed.json"),
+        "echo": echo_l if echo_l.exists() or not echo_j.exists() else echo_j,
+        "seal": pick(f"{date_str}.seal.json"),
+        "ledger": pick(f"{date_str}.ledger.json"),
+        "gic": pick(f"{date_str}.gic.jsonl"),
+    }
+
+
+def _stat(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_json(path: Path) -> Any:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _scan_jsonl(kind: str, path: Path, offset: int) -> Tuple[int, Dict[str, int], Dict[str, int]]:
+    """
+    Parse complete lines from ``offset``; returns the new offset, the totals of
+    those lines and the totals of a trailing line without a newline (counted
+    but not consumed, since a writer may still be finishing it).
+    """
+    done = {"count": 0, "sum": 0}
+    tail = {"count": 0, "sum": 0}
+    with path.open("rb") as f:
+        f.seek(offset)
+        for raw in f:
+            complete = raw.endswith(b"\n")
+            target = done if complete else tail
+            if complete:
+                offset += len(raw)
+            line = raw.strip()
+            if not line:
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                continue
+            target["count"] += 1
+            if kind == "gic":
+                target["sum"] += int(obj.get("amount", 0) or 0)
+    return offset, done, tail
+
+
+def _refresh_file(kind: str, path: Path, stat: Optional[Tuple[int, int]], entry: Optional[dict]) -> dict:
+    """Bring one file's catalogue entry up to date with the file on disk."""
+    if stat is None:
+        return {"path": str(path), "stat": None}
+    if entry and entry.get("path") == str(path) and entry.get("stat") == list(stat):
+        return entry
+
+    if kind in _JSONL and path.suffix == ".jsonl":
+        # Append-only: continue from the consumed offset unless the file shrank
+        resumable = entry and entry.get("path") == str(path) and entry.get("stat") and stat[1] >= entry["offset"]
+        offset = entry["offset"] if resumable else 0
+        count = entry["count"] if resumable else 0
+        total = entry["sum"] if resumable else 0
+        offset, done, tail = _scan_jsonl(kind, path, offset)
+        return {
+            "path": str(path), "stat": list(stat), "offset": offset,
+            "count": count + done["count"], "sum": total + done["sum"],
+            "tail_count": tail["count"], "tail_sum": tail["sum"],
+        }
+
+    obj = _read_json(path)
+    if kind == "echo":  # legacy JSON array
+        return {"path": str(path), "stat": list(stat), "count": len(obj) if isinstance(obj, list) else 0}
+    out = {"path": str(path), "stat": list(stat), "present": obj is not None}
+    if kind == "ledger":
+        out["day_root"] = (obj or {}).get("day_root") if isinstance(obj, dict) else None
+    return out
+
+
+def _summary(date_str: str, entries: Dict[str, dict]) -> dict:
+    seed, echo, seal, ledger, gic = (entries[k] for k in ("seed", "echo", "seal", "ledger", "gic"))
+
+    def exists(e: dict) -> bool:
+        return e["stat"] is not None
+
+    def lines(e: dict, field: str) -> int:
+        return e.get(field, 0) + e.get(f"tail_{field}", 0) if exists(e) else 0
+
+    seed_ok = exists(seed) and seed["present"]
+    seal_ok = exists(seal) and seal["present"]
+    ledger_ok = exists(ledger) and ledger["present"]
+    return {
+        "date": date_str,
+        "present": {
+            "seed": seed_ok,
+            "echo": exists(echo),
+            "seal": seal_ok,
+            "ledger": ledger_ok,
+            "gic": exists(gic),
+        },
+        "counts": {
+            "seeds": 1 if seed_ok else 0,
+            "sweeps": lines(echo, "count"),
+            "seals": 1 if seal_ok else 0,
+            "gic_txs": lines(gic, "count"),
+        },
+        "gic": {
+            "sum": lines(gic, "sum"),
+            "file": gic["path"] if exists(gic) else None,
+        },
+        "day_root": ledger.get("day_root") if ledger_ok else None,
+        "links": {
+            "seed":   seed["path"] if seed_ok else None,
+            "echo":   echo["path"] if exists(echo) else None,
+            "seal":   seal["path"] if seal_ok else None,
+            "ledger": ledger["path"] if ledger_ok else None,
+        },
+    }
+
+
+class DayCatalogue:
+    """SQLite-backed per-day summaries, revalidated against file mtimes/sizes on every read."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS day_summaries (date TEXT PRIMARY KEY, files TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, date_str: str) -> dict:
+        """Summary for one day in the /verify shape; touches only files that changed."""
+        paths = day_paths(date_str)
+        stats = {kind: _stat(path) for kind, path in paths.items()}
+        with self._lock:
+            row = self._conn.execute("SELECT files FROM day_summaries WHERE date = ?", (date_str,)).fetchone()
+            cached = json.loads(row[0]) if row else {}
+            entries = {kind: _refresh_file(kind, paths[kind], stats[kind], cached.get(kind)) for kind in paths}
+            if entries != cached:
+                self._conn.execute(
+                    "INSERT INTO day_summaries (date, files) VALUES (?, ?) "
+                    "ON CONFLICT(date) DO UPDATE SET files = excluded.files",
+                    (date_str, json.dumps(entries)),
+                )
+                self._conn.commit()
+        return _summary(date_str, entries)
+
+    # Writers call refresh right after touching a day's files, so the catalogue
+    # absorbs the change while it is one line (or one small file) big.
+    refresh = get
+
+    def forget(self, date_str: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM day_summaries WHERE date = ?", (date_str,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_catalogue: Optional[DayCatalogue] = None
+_catalogue_lock = threading.Lock()
+
+
+def get_catalogue() -> DayCatalogue:
+    """Process-wide catalogue stored in DATA_DIR (CATALOGUE_DB overrides the path)."""
+    global _catalogue
+    db_path = Path(os.environ.get("CATALOGUE_DB") or storage.DATA_DIR / "catalogue.db")
+    with _catalogue_lock:
+        if _catalogue is None or _catalogue.db_path != db_path:
+            _catalogue = DayCatalogue(db_path)
+        return _catalogue
@@ -0,0 +1,103 @@
+# app/dedupe.py
+from __future__ import annotations
+import os
+import sqlite3
+import threading
+from datetime import date as _date, timedelta as _td
+from pathlib import Path
+from typing import Optional
+
+from . import storage
+
+# Durable (user, date, content_hash) dedupe for GIC rewards.
+#
+# SQLite (WAL) is the source of truth and claim() is a single
+# INSERT OR IGNORE, so two workers racing on the same content cannot both
+# win. A date expires by deleting its rows.
+
+
+class GicDedupeStore:
+    """Persistent, bounded set of rewarded (user, date, content_hash) claims."""
+
+    def __init__(self, directory: Path, retention_days: int = 30):
+        """
+        directory: holds seen.db
+        retention_days: dates older than this are expired and can no longer be claimed
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.retention_days = max(1, retention_days)
+        self._lock = threading.Lock()
+        self._expired_through: Optional[str] = None
+
+        self._conn = sqlite3.connect(str(self.directory / "seen.db"), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS gic_seen (
+                date TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                PRIMARY KEY (date, user_id, content_hash)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def _cutoff(self) -> str:
+        return (_date.today() - _td(days=self.retention_days)).isoformat()
+
+    def seen(self, user_id: str, date_str: str, h: str) -> bool:
+        """Has this content already been rewarded? Expired dates count as seen."""
+        if date_str < self._cutoff():
+            return True
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM gic_seen WHERE date = ? AND user_id = ? AND content_hash = ?",
+                (date_str, user_id, h),
+            ).fetchone()
+        return row is not None
+
+    def claim(self, user_id: str, date_str: str, h: str) -> bool:
+        """Atomically record a reward claim; True only for the first claim of this content."""
+        cutoff = self._cutoff()
+        if date_str < cutoff:
+            return False
+        with self._lock:
+            if self._expired_through != cutoff:
+                self._expire(cutoff)
+            with self._conn:
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO gic_seen (date, user_id, content_hash) VALUES (?, ?, ?)",
+                    (date_str, user_id, h),
+                )
+        return cur.rowcount == 1
+
+    def expire(self) -> int:
+        """Drop claims for dates past the retention window; returns rows removed."""
+        with self._lock:
+            return self._expire(self._cutoff())
+
+    def _expire(self, cutoff: str) -> int:
+        with self._conn:
+            removed = self._conn.execute("DELETE FROM gic_seen WHERE date < ?", (cutoff,)).rowcount
+        self._expired_through = cutoff
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[GicDedupeStore] = None
+_store_lock = threading.Lock()
+
+
+def get_dedupe_store() -> GicDedupeStore:
+    """Process-wide store under DATA_DIR/dedupe (GIC_DEDUPE_DIR overrides the path)."""
+    global _store
+    directory = Path(os.environ.get("GIC_DEDUPE_DIR") or storage.DATA_DIR / "dedupe")
+    with _store_lock:
+        if _store is None or _store.directory != directory:
+            retention = int(os.environ.get("GIC_DEDUPE_RETENTION_DAYS", "30") or 30)
+            _store = GicDedupeStore(directory, retention_days=retention)
+        return _store
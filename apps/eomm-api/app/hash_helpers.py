@@ -1,24 +1,20 @@
 # app/hash_helpers.py
 from __future__ import annotations
-import json, hashlib
+import json
 from pathlib import Path
 from datetime import datetime
 from typing import Iterable, List, Dict, Any, Optional
 
-# ---------- Canonical JSON ----------
-def canonical_json(obj: Any) -> str:
-    # stable keys, no extra spaces, unicode kept
-    return json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+from civic_sdk import merkle
+from civic_sdk.merkle import MODE_DUPLICATE_HEX
 
-def sha256_bytes(data: bytes) -> str:
-    return hashlib.sha256(data).hexdigest()
+# ---------- Canonical JSON ----------
+# stable keys, no extra spaces, unicode kept (shared with app.hashing)
+from .hashing import canonical_json, sha256_bytes, sha256_json
 
 def sha256_text(text: str) -> str:
     return sha256_bytes(text.encode("utf-8"))
 
-def sha256_json(obj: Any) -> str:
-    return sha256_text(canonical_json(obj))
-
 # ---------- Echo line hashing ----------
 def hash_echo_line(line_text: str) -> Optional[str]:
     """
@@ -47,6 +43,9 @@ def hash_echo_file(jsonl_path: Path) -> List[str]:
     return hashes
 
 # ---------- Merkle (pairwise hex-concat then sha256) ----------
+# merkle_root is shared with app.hashing; the empty set hashes the empty string
+from .hashing import merkle_root  # noqa: E402
+
 def merkle_once(hex_hashes: List[str]) -> List[str]:
     if not hex_hashes:
         return []
@@ -55,36 +54,29 @@ def merkle_once(hex_hashes: List[str]) -> List[str]:
     out: List[str] = []
     it = iter(hex_hashes)
     for a in it:
-        try:
-            b = next(it)
-        except StopIteration:
-            b = a  # duplicate last if odd count
-        out.append(sha256_text(a + b))
+        b = next(it, a)  # duplicate last if odd count
+        out.append(merkle.node_hash(a, b, MODE_DUPLICATE_HEX).hex())
     return out
 
-def merkle_root(hex_hashes: List[str]) -> str:
-    if not hex_hashes:
-        # empty set root (define policy; here we hash the empty string)
-        return sha256_text("")
-    layer = hex_hashes[:]
-    while len(layer) > 1:
-        layer = merkle_once(layer)
-    return layer[0]
-
 # ---------- Day root builder ----------
-def build_day_root(date_str: str, data_dir: Path) -> Dict[str, Any]:
+def build_day_root(date_str: str, data_dir: Path, accumulator: Any = None) -> Dict[str, Any]:
     """
     Reads:
       data/{DATE}.seed.json
-      data/{DATE}.echo.json
+      data/{DATE}.echo.jsonl (or a legacy data/{DATE}.echo.json array)
       data/{DATE}.seal.json
     Computes:
       Hseed, [Hecho...], Hseal, Hroot
     Writes:
       data/{DATE}.root.json
+
+    With the day's MerkleAccumulator the echo hashes are streamed from its
+    leaf file and Hroot comes from its frontier, so no sweep is re-read or
+    rehashed.
     """
     seed_p = data_dir / f"{date_str}.seed.json"
-    echo_p = data_dir / f"{date_str}.echo.json"
+    echo_p = data_dir / f"{date_str}.echo.jsonl"
+    legacy_echo_p = data_dir / f"{date_str}.echo.json"
     seal_p = data_dir / f"{date_str}.seal.json"
     root_p = data_dir / f"{date_str}.root.json"
 
@@ -101,21 +93,29 @@ def build_day_root(date_str: str, data_dir: Path) -> Dict[str, Any]:
     seal_obj = read_json(seal_p)
 
     Hseed = sha256_json(seed_obj)
-    
-    # Handle echo file (JSON array format)
-    if echo_p.exists():
-        echo_data = read_json(echo_p)
+    Hseal = sha256_json(seal_obj)
+
+    if accumulator is not None:
+        leaves = accumulator.leaves()
+        next(leaves, None)  # leaf 0 is the seed
+        Hechos = list(leaves)
+        Hroot = accumulator.root([Hseal])
+    elif echo_p.exists():
+        # Streams line by line
+        Hechos = hash_echo_file(echo_p)
+    # Handle legacy echo file (JSON array format)
+    elif legacy_echo_p.exists():
+        echo_data = read_json(legacy_echo_p)
         if isinstance(echo_data, list):
             Hechos = [sha256_json(item) for item in echo_data]
         else:
             Hechos = [sha256_json(echo_data)]
     else:
         Hechos = []
-    
-    Hseal = sha256_json(seal_obj)
 
     inputs = {"seed": Hseed, "echo": Hechos, "seal": Hseal}
-    Hroot = merkle_root([Hseed] + Hechos + [Hseal])
+    if accumulator is None:
+        Hroot = merkle_root([Hseed] + Hechos + [Hseal])
 
     root_obj = {
         "type": "day_root",
@@ -5,7 +5,7 @@ from fastapi.responses import StreamingResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Set, Tuple, Optional
+from typing import Any, Dict, List, Optional
 import os
 import json
 import re
@@ -33,9 +33,16 @@ except Exception as e:
     os.environ.setdefault("VERSION", "0.1.0")
 
 # Import your modules
-from app.hashing import sha256_json, merkle_root
-from app.storage import today_files, read_json, write_json, load_day, build_ledger_obj, DATA_DIR, get_node_metadata
+from app.hashing import sha256_json, merkle_root, freeze
+from app.storage import (
+    today_files, read_json, write_json, DATA_DIR, get_node_metadata,
+    day_accumulator, append_sweep, build_ledger_obj_from_accumulator, iter_sweeps, echo_path,
+)
 from app.hash_helpers import build_day_root
+from app.merkle_accumulator import verify_proof
+from app.day_catalogue import get_catalogue
+from app.dedupe import get_dedupe_store
+from app.bonus_engine import get_bonus_index, BONUS_REASON
 from app.models import BonusRun
 
 # Create FastAPI app
@@ -148,22 +155,10 @@ else:
 FEATURE_INTENT = "publish_feature"
 FEATURE_QUEUE_FILENAME = "{}.featured_queue.jsonl"
 
-# in-memory dedupe: (user_id, date) -> {content_hash, ...}
-_gic_seen: Dict[Tuple[str, str], Set[str]] = {}
-
 def _gic_file(date_str: str) -> str:
     """daily GIC transactions file"""
     return f"{date_str}/{date_str}.gic.jsonl"
 
-def _mark_seen(user_id: str, date_str: str, h: str) -> None:
-    key = (user_id, date_str)
-    s = _gic_seen.setdefault(key, set())
-    s.add(h)
-
-def _already_seen(user_id: str, date_str: str, h: str) -> bool:
-    key = (user_id, date_str)
-    return h in _gic_seen.get(key, set())
-
 def append_jsonl(file_path: str, record: dict) -> str:
     """Append a record to a JSONL file and return the hash"""
     full_path = DATA_DIR / file_path
@@ -193,59 +188,18 @@ def _humanize_seconds(s: int) -> str:
     if m:  return f"{m}m {sec}s"
     return f"{sec}s"
 
-# VERIFY HELPERS
-def _day_dir(date_str: str) -> Path:
-    base = os.environ.get("LEDGER_PATH", "data")
-    return Path(base) / date_str
-
-def _read_json_file(p: Path) -> dict | None:
-    if not p.exists():
-        return None
-    with p.open("r", encoding="utf-8") as f:
-        return json.load(f)
-
-def _read_jsonl_file(p: Path) -> list[dict]:
-    if not p.exists():
-        return []
-    rows = []
-    with p.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rows.append(json.loads(line))
-            except Exception:
-                pass
-    return rows
-
 # BONUS HELPERS
 _BONUS_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 _TOP_N = 10
 _MIN_LEN_ELIGIBLE = 200
 _BONUS_MIN = 50
 _BONUS_MAX = 100
-_BONUS_REASON = "featured_bonus"
+_BONUS_REASON = BONUS_REASON
 
 def _day_path(dstr: str) -> Path:
     base = Path(os.environ.get("LEDGER_PATH", "data"))
     return base / dstr
 
-def _read_jsonl(p: Path) -> list[dict]:
-    if not p.exists():
-        return []
-    rows = []
-    with p.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rows.append(json.loads(line))
-            except Exception:
-                pass
-    return rows
-
 def _append_jsonl(p: Path, obj: dict):
     p.parent.mkdir(parents=True, exist_ok=True)
     with p.open("a", encoding="utf-8") as f:
@@ -260,26 +214,6 @@ def _latest_full_week() -> tuple[_date, _date]:
     start = end - _td(days=6)
     return start, end
 
-def _bonus_rank(cands: list[dict]) -> list[dict]:
-    ranked = []
-    for c in cands:
-        length = int(c.get("len", 0) or 0)
-        votes  = int(c.get("votes", 0) or 0)
-        score  = length + 10 * votes
-        cc = dict(c)
-        cc["score"] = score
-        ranked.append(cc)
-    ranked.sort(key=lambda x: x["score"], reverse=True)
-    return ranked
-
-def _already_paid_keys(payout_day: str) -> set[tuple[str, str, str]]:
-    gic_p = _day_path(payout_day) / f"{payout_day}.gic.jsonl"
-    seen = set()
-    for tx in _read_jsonl(gic_p):
-        if tx.get("type") == "gic_tx" and tx.get("reason") == _BONUS_REASON:
-            seen.add((str(tx.get("user")), str(tx.get("hash")), _BONUS_REASON))
-    return seen
-
 # INDEX HELPERS
 _DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 
@@ -295,58 +229,8 @@ def _list_date_dirs() -> list[str]:
     return dates
 
 def _safe_counts_for(date_str: str) -> dict:
-    day = _day_dir(date_str)
-    root = DATA_DIR
-    
-    seed_p   = root / f"{date_str}.seed.json" if (root / f"{date_str}.seed.json").exists() else day / f"{date_str}.seed.json"
-    echo_p_l = root / f"{date_str}.echo.jsonl" if (root / f"{date_str}.echo.jsonl").exists() else day / f"{date_str}.echo.jsonl"
-    echo_p_j = root / f"{date_str}.echo.json" if (root / f"{date_str}.echo.json").exists() else day / f"{date_str}.echo.json"
-    seal_p   = root / f"{date_str}.seal.json" if (root / f"{date_str}.seal.json").exists() else day / f"{date_str}.seal.json"
-    ledger_p = root / f"{date_str}.ledger.json" if (root / f"{date_str}.ledger.json").exists() else day / f"{date_str}.ledger.json"
-    gic_p    = root / f"{date_str}.gic.jsonl" if (root / f"{date_str}.gic.jsonl").exists() else day / f"{date_str}.gic.jsonl"
-
-    seed   = _read_json_file(seed_p)
-    seal   = _read_json_file(seal_p)
-    ledger = _read_json_file(ledger_p)
-
-    if echo_p_l.exists():
-        sweeps = _read_jsonl_file(echo_p_l)
-    elif echo_p_j.exists():
-        arr = _read_json_file(echo_p_j) or []
-        sweeps = arr if isinstance(arr, list) else []
-    else:
-        sweeps = []
-
-    gic_txs = _read_jsonl_file(gic_p)
-    gic_sum = sum(int(tx.get("amount", 0) or 0) for tx in gic_txs)
-
-    return {
-        "date": date_str,
-        "present": {
-            "seed": seed is not None,
-            "echo": echo_p_l.exists() or echo_p_j.exists(),
-            "seal": seal is not None,
-            "ledger": ledger is not None,
-            "gic": gic_p.exists(),
-        },
-        "counts": {
-            "seeds": 1 if seed else 0,
-            "sweeps": len(sweeps),
-            "seals": 1 if seal else 0,
-            "gic_txs": len(gic_txs),
-        },
-        "gic": {
-            "sum": gic_sum,
-            "file": str(gic_p) if gic_p.exists() else None,
-        },
-        "day_root": (ledger or {}).get("day_root"),
-        "links": {
-            "seed":   str(seed_p)   if seed   else None,
-            "echo":   str(echo_p_l) if echo_p_l.exists() else (str(echo_p_j) if echo_p_j.exists() else None),
-            "seal":   str(seal_p)   if seal   else None,
-            "ledger": str(ledger_p) if ledger else None,
-        },
-    }
+    """Per-day counts, gic sum and day_root, served from the day catalogue."""
+    return get_catalogue().get(date_str)
 
 # MODELS
 from pydantic import BaseModel, Field
@@ -497,6 +381,7 @@ def post_seed(payload: Seed):
         "ts": datetime.utcnow().isoformat() + "Z",
     }
     write_json(files["seed"], record)
+    get_catalogue().refresh(payload.date)
     return {"seed_hash": sha256_json(record), "file": files["seed"]}
 
 @app.post("/sweep")
@@ -505,11 +390,6 @@ def post_sweep(payload: Sweep):
     files = today_files(date_str)
     node_meta = get_node_metadata()
     
-    # Load existing sweeps or start with empty list
-    sweeps = read_json(files["echo"]) if (DATA_DIR / files["echo"]).exists() else []
-    if isinstance(sweeps, dict):
-        sweeps = [sweeps]
-    
     record = {
         "type": "sweep",
         "date": date_str,
@@ -518,9 +398,11 @@ def post_sweep(payload: Sweep):
         "meta": {**payload.meta, **node_meta},
         "ts": datetime.utcnow().isoformat() + "Z",
     }
-    sweeps.append(record)
-    write_json(files["echo"], sweeps)
-    attestation = sha256_json(record)
+    # Appends to the echo file and folds the sweep into the day's Merkle frontier;
+    # the frozen copy carries its canonical hash, so the leaf and the attestation share one encoding
+    sealed = freeze(record)
+    leaf_index = append_sweep(date_str, sealed)
+    attestation = sha256_json(sealed)
 
     # GIC REWARD LOGIC
     meta = payload.meta or {}
@@ -542,12 +424,9 @@ def post_sweep(payload: Sweep):
     if tier in ("publish", FEATURE_INTENT) and len(note_text) < REWARD_MIN_LEN:
         gic = GIC_PER_PRIVATE
 
-    # Duplicate guard per user/day by content hash
-    if content_hash:
-        if _already_seen(user_id, date_str, content_hash):
-            gic = 0
-        else:
-            _mark_seen(user_id, date_str, content_hash)
+    # Duplicate guard per user/day by content hash (persistent, shared by all workers)
+    if content_hash and not get_dedupe_store().claim(user_id, date_str, content_hash):
+        gic = 0
 
     # Append GIC transaction
     gic_tx = {
@@ -574,9 +453,12 @@ def post_sweep(payload: Sweep):
         }
         append_jsonl(f"{date_str}/{FEATURE_QUEUE_FILENAME.format(date_str)}", feature_item)
 
+    get_catalogue().refresh(date_str)
+
     return {
         "attestation": attestation,
         "sweep_file": files["echo"],
+        "leaf_index": leaf_index,
         "gic": gic,
         "gic_file": gic_file,
         "gic_attestation": gic_att,
@@ -588,8 +470,9 @@ def seal(payload: Dict[str, Any]):
     files = today_files(date)
     node_meta = get_node_metadata()
     
-    # Load
-    seed, sweeps, seal_obj = load_day(date)
+    # Load seed/seal only; the sweeps are already folded into the day's accumulator
+    seed = read_json(files["seed"]) if (DATA_DIR / files["seed"]).exists() else None
+    seal_obj = read_json(files["seal"]) if (DATA_DIR / files["seal"]).exists() else None
     
     # If caller provided the seal body now, use it & persist
     if payload.get("wins") or payload.get("blocks") or payload.get("tomorrow_intent"):
@@ -607,12 +490,14 @@ def seal(payload: Dict[str, Any]):
     if not seed or not seal_obj:
         raise HTTPException(status_code=400, detail="Seed and Seal are required to build ledger")
 
-    ledger = build_ledger_obj(date, seed, sweeps, seal_obj)
+    acc = day_accumulator(date)
+    ledger = build_ledger_obj_from_accumulator(date, acc, seal_obj)
     write_json(files["ledger"], ledger)
+    get_catalogue().refresh(date)
 
     # Build and write day root
     try:
-        root_obj = build_day_root(date, DATA_DIR)
+        root_obj = build_day_root(date, DATA_DIR, accumulator=acc)
         root_file = f"data/{date}/{date}.root.json"
         return {
             "ok": True, 
@@ -653,20 +538,60 @@ def verify_day(date: str):
     """Verifies the day's presence of seed/echo/seal files, returns counts, and includes GIC totals."""
     return _safe_counts_for(date)
 
+@app.get("/proof/{date}/{sweep_index}")
+def sweep_proof(date: str, sweep_index: int):
+    """Merkle inclusion proof for one sweep (0-based) against the day root, or the running root before /seal."""
+    acc = day_accumulator(date)
+    if acc is None:
+        raise HTTPException(status_code=404, detail="No seed for this date")
+    if not 0 <= sweep_index < acc.count - 1:
+        raise HTTPException(status_code=404, detail="No such sweep")
+
+    files = today_files(date)
+    extra = [sha256_json(read_json(files["seal"]))] if (DATA_DIR / files["seal"]).exists() else []
+    leaf = acc.leaf(sweep_index + 1)  # leaf 0 is the seed
+    path = acc.proof(sweep_index + 1, extra)
+    root = acc.root(extra)
+    return {
+        "date": date,
+        "sweep_index": sweep_index,
+        "leaf": leaf,
+        "path": path,
+        "root": root,
+        "sealed": bool(extra),
+        "valid": verify_proof(leaf, path, root),
+    }
+
 @app.get("/export/{date}")
 def export_day(date: str):
+    """Streams the day's files as one JSON document; the echo file is written out sweep by sweep."""
     files = today_files(date)
-    out = {"date": date, "files": {}}
+    rels = []
     for key, rel in files.items():
-        if not (DATA_DIR / rel).exists():
-            continue
-        out["files"][rel] = read_json(rel)
-    return out
+        path = echo_path(date) if key == "echo" else DATA_DIR / rel
+        if path.exists():
+            rels.append((key, path.name))
+
+    def body():
+        yield '{"date": ' + json.dumps(date) + ', "files": {'
+        for i, (key, rel) in enumerate(rels):
+            yield (", " if i else "") + json.dumps(rel) + ": "
+            if key != "echo":
+                yield json.dumps(read_json(rel), ensure_ascii=False)
+                continue
+            yield "["
+            for j, sweep in enumerate(iter_sweeps(date)):
+                yield (", " if j else "") + json.dumps(sweep, ensure_ascii=False)
+            yield "]"
+        yield "}}"
+
+    return StreamingResponse(body(), media_type="application/json")
 
 @app.get("/index")
 def index_all(order: str = "desc", limit: int = 100):
     """Lists days in the ledger with counts, gic.sum, and day_root."""
-    dates = _list_date_dirs()
+    all_dates = _list_date_dirs()
+    dates = all_dates
     if order.lower() == "desc":
         dates = list(reversed(dates))
     if limit and limit > 0:
@@ -674,7 +599,7 @@ def index_all(order: str = "desc", limit: int = 100):
 
     rows = [_safe_counts_for(d) for d in dates]
     return {
-        "total_days": len(_list_date_dirs()),
+        "total_days": len(all_dates),
         "returned": len(rows),
         "order": order.lower(),
         "items": rows,
@@ -715,34 +640,22 @@ def bonus_run(req: BonusRun, x_admin_key: str = Header(default="")):
     BMIN    = max(1, req.bonus_min or _BONUS_MIN)
     BMAX    = max(BMIN, req.bonus_max or _BONUS_MAX)
 
-    # collect candidates
-    cands = []
+    # index any new featured_queue lines, then rank from the index
+    index = get_bonus_index()
     cur = start_d
     while cur <= end_d:
         dstr = cur.strftime("%Y-%m-%d")
-        qpath = _day_path(dstr) / f"{dstr}.featured_queue.jsonl"
-        for r in _read_jsonl(qpath):
-            L = int(r.get("len", 0) or 0)
-            if L < MIN_LEN: 
-                continue
-            cands.append({
-                "date": r.get("date", dstr),
-                "user": r.get("user", "anon"),
-                "hash": r.get("hash"),
-                "len": L,
-                "votes": int(r.get("votes", 0) or 0),
-                "ts": r.get("ts"),
-            })
+        index.sync_queue(dstr, _day_path(dstr) / f"{dstr}.featured_queue.jsonl")
         cur += _td(days=1)
 
-    if not cands:
+    eligible, winners = index.rank(start_d, end_d, MIN_LEN, TOP_N)
+    if not eligible:
         return {"ok": True, "message": "No eligible candidates", "window": [start_d.isoformat(), end_d.isoformat()]}
 
-    ranked = _bonus_rank(cands)
-    winners = ranked[:TOP_N]
-
     # idempotency
-    already = _already_paid_keys(payout_str)
+    payout_file = _day_path(payout_str) / f"{payout_str}.gic.jsonl"
+    index.sync_paid(payout_str, payout_file)
+    already = index.paid_keys(payout_str)
 
     # payout schedule (linear spread high->low)
     span = max(1, len(winners) - 1)
@@ -753,7 +666,6 @@ def bonus_run(req: BonusRun, x_admin_key: str = Header(default="")):
         return int(round(BMIN + frac * (BMAX - BMIN)))
 
     # write gic txs
-    payout_file = _day_path(payout_str) / f"{payout_str}.gic.jsonl"
     wrote = 0
     dry_dumps = []
 
@@ -777,13 +689,17 @@ def bonus_run(req: BonusRun, x_admin_key: str = Header(default="")):
             dry_dumps.append(tx)
         else:
             _append_jsonl(payout_file, tx)
+            index.mark_paid(payout_str, w["user"], w["hash"])
             wrote += 1
 
+    if wrote:
+        get_catalogue().refresh(payout_str)
+
     return {
         "ok": True,
         "window": [start_d.isoformat(), end_d.isoformat()],
         "payout_day": payout_str,
-        "eligible": len(cands),
+        "eligible": eligible,
         "winners": len(winners),
         "written": wrote,
         "dry": req.dry,
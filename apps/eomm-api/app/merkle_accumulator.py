@@ -0,0 +1,206 @@
+# app/merkle_accumulator.py
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from civic_sdk import merkle
+from civic_sdk.merkle import MODE_DUPLICATE_HEX
+
+# Every node is stored as a fixed-width hex digest line so node i of a level
+# is one seek away.
+_HASH_LEN = 64
+_LINE_LEN = _HASH_LEN + 1
+
+
+def _node(left: str, right: str) -> str:
+    return merkle.node_hash(left, right, MODE_DUPLICATE_HEX).hex()
+
+
+def verify_proof(leaf: str, path: List[Dict[str, str]], root: str) -> bool:
+    """Fold an inclusion path (as returned by MerkleAccumulator.proof) onto a leaf and compare to root."""
+    try:
+        steps = [(step["side"], step["hash"]) for step in path]
+        return merkle.verify_proof(root, leaf, steps, MODE_DUPLICATE_HEX)
+    except (KeyError, TypeError, ValueError):
+        return False
+
+
+class MerkleAccumulator:
+    """
+    Append-only Merkle accumulator persisted in a directory.
+
+    Produces the same roots as hashing.merkle_root (civic_sdk.merkle in
+    duplicate-hex mode) without rehashing the leaves:
+
+      state.json      leaf count, frontier and caller metadata
+      level-{i}.hex   every completed node of level i (level 0 = leaves)
+
+    The frontier holds the pending left subtree root for each set bit of the
+    leaf count, so append and root are O(log n) and only append to files.
+    Inclusion proofs read one sibling per level.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.count = 0
+        self.frontier: List[Optional[str]] = []
+        self.meta: Dict[str, Any] = {}
+        self._load()
+
+    # ---------- persistence ----------
+    def _state_path(self) -> Path:
+        return self.directory / "state.json"
+
+    def _level_path(self, level: int) -> Path:
+        return self.directory / f"level-{level}.hex"
+
+    def _load(self) -> None:
+        state_p = self._state_path()
+        if not state_p.exists():
+            return
+        try:
+            with state_p.open("r", encoding="utf-8") as f:
+                state = json.load(f)
+            count = int(state["count"])
+            frontier = list(state["frontier"])
+            meta = dict(state.get("meta", {}))
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+
+        # Level files may run ahead of the state after an interrupted append;
+        # cut them back. A level that is short cannot be trusted at all.
+        level = 0
+        while count >> level:
+            level_p = self._level_path(level)
+            expected = (count >> level) * _LINE_LEN
+            size = level_p.stat().st_size if level_p.exists() else 0
+            if size < expected:
+                return
+            if size > expected:
+                with level_p.open("r+b") as f:
+                    f.truncate(expected)
+            level += 1
+
+        self.count = count
+        self.frontier = frontier
+        self.meta = meta
+
+    def save(self) -> None:
+        """Atomically persist count, frontier and meta."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / "state.json.tmp"
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"count": self.count, "frontier": self.frontier, "meta": self.meta}, f)
+        os.replace(tmp, self._state_path())
+
+    def reset(self) -> None:
+        """Drop every leaf (files included)."""
+        if self.directory.exists():
+            for child in self.directory.iterdir():
+                if child.name.startswith("level-") or child.name.startswith("state.json"):
+                    child.unlink()
+        self.count = 0
+        self.frontier = []
+        self.meta = {}
+
+    # ---------- writes ----------
+    def extend(self, leaves: Iterable[str]) -> int:
+        """Append leaf digests in order and persist; returns the new leaf count."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        handles: Dict[int, Any] = {}
+        try:
+            for leaf in leaves:
+                h = leaf.lower()
+                level = 0
+                while True:
+                    if level not in handles:
+                        handles[level] = self._level_path(level).open("a", encoding="ascii")
+                    handles[level].write(h + "\n")
+                    if level == len(self.frontier):
+                        self.frontier.append(None)
+                    left = self.frontier[level]
+                    if left is None:
+                        self.frontier[level] = h
+                        break
+                    # Completed a pair: carry the parent up a level
+                    self.frontier[level] = None
+                    h = _node(left, h)
+                    level += 1
+                self.count += 1
+        finally:
+            for fh in handles.values():
+                fh.close()
+        self.save()
+        return self.count
+
+    def append(self, leaf: str) -> int:
+        """Append one leaf digest; returns its index."""
+        self.extend([leaf])
+        return self.count - 1
+
+    # ---------- reads ----------
+    def root(self, extra: Iterable[str] = ()) -> str:
+        """Root over the stored leaves followed by ``extra`` (which are not stored)."""
+        frontier = [None if h is None else bytes.fromhex(h) for h in self.frontier]
+        for leaf in extra:
+            merkle.frontier_push(frontier, leaf, MODE_DUPLICATE_HEX)
+        return merkle.frontier_root(frontier, MODE_DUPLICATE_HEX).hex()
+
+    def _stored(self, level: int, index: int) -> str:
+        with self._level_path(level).open("rb") as f:
+            f.seek(index * _LINE_LEN)
+            return f.read(_HASH_LEN).decode("ascii")
+
+    def leaf(self, index: int) -> str:
+        if not 0 <= index < self.count:
+            raise IndexError(f"leaf {index} out of range (count={self.count})")
+        return self._stored(0, index)
+
+    def leaves(self) -> Iterator[str]:
+        """Stream the stored leaf digests in order."""
+        if self.count == 0:
+            return
+        with self._level_path(0).open("r", encoding="ascii") as f:
+            for _, line in zip(range(self.count), f):
+                yield line.rstrip("\n")
+
+    def proof(self, index: int, extra: Iterable[str] = ()) -> List[Dict[str, str]]:
+        """
+        Inclusion path for leaf ``index`` against root(extra).
+
+        Each step is {"side": "left"|"right", "hash": sibling}. Nodes inside
+        completed subtrees are read from the level files; only the handful on
+        the right edge (those touching the odd tail or ``extra``) are hashed.
+        """
+        if not 0 <= index < self.count:
+            raise IndexError(f"leaf {index} out of range (count={self.count})")
+        extra = [x.lower() for x in extra]
+        total = self.count + len(extra)
+        memo: Dict[tuple, str] = {}
+
+        def width(level: int) -> int:
+            return -(-total // (1 << level))
+
+        def node(level: int, i: int) -> str:
+            if i < self.count >> level:
+                return self._stored(level, i)
+            if level == 0:
+                return extra[i - self.count]
+            key = (level, i)
+            if key not in memo:
+                left = node(level - 1, 2 * i)
+                right = node(level - 1, 2 * i + 1) if 2 * i + 1 < width(level - 1) else left
+                memo[key] = _node(left, right)
+            return memo[key]
+
+        path: List[Dict[str, str]] = []
+        level, i = 0, index
+        while width(level) > 1:
+            sibling = i ^ 1
+            if sibling >= width(level):
+                sibling = i  # odd node is paired with itself
+            path.append({"side": "left" if sibling < i else "right", "hash": node(level, sibling)})
+            level, i = level + 1, i // 2
+        return path
@@ -2,7 +2,16 @@ from __future__ import annotations
 from pathlib import Path
 import json
 import os
-from typing import Dict, List, Tuple, Any, Optional
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple, Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows dev boxes: single-process locking only
+    fcntl = None
+
+from .merkle_accumulator import MerkleAccumulator
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 
@@ -20,11 +29,15 @@ def today_files(date_str: str) -> Dict[str, str]:
     base = f"{date_str}"
     return {
         "seed":   f"{base}.seed.json",
-        "echo":   f"{base}.echo.json",
+        "echo":   f"{base}.echo.jsonl",
         "seal":   f"{base}.seal.json",
         "ledger": f"{base}.ledger.json",
     }
 
+def legacy_echo_file(date_str: str) -> str:
+    """Pre-JSONL echo file: one JSON array rewritten on every sweep."""
+    return f"{date_str}.echo.json"
+
 def p(path_rel: str) -> Path:
     """Absolute path under DATA_DIR."""
     DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -39,26 +52,143 @@ def write_json(path_rel: str, obj: Any) -> None:
     with open(p(path_rel), "w", encoding="utf-8") as f:
         json.dump(obj, f, ensure_ascii=False, indent=2)
 
-def load_day(date_str: str) -> Tuple[Optional[dict], List[dict], Optional[dict]]:
-    """Load seed (dict or None), sweeps (list), seal (dict or None). Missing files => None/[]"""
+# ---------- Echo (sweeps) ----------
+# Sweeps are appended one JSON object per line to {DATE}.echo.jsonl. Days
+# written before the switch still have {DATE}.echo.json; readers fall back to
+# it and the first new sweep migrates it.
+def echo_path(date_str: str) -> Path:
+    """The echo file holding a day's sweeps (JSONL, or the legacy array if not migrated)."""
+    jsonl = p(today_files(date_str)["echo"])
+    if jsonl.exists():
+        return jsonl
+    legacy = p(legacy_echo_file(date_str))
+    return legacy if legacy.exists() else jsonl
+
+def iter_jsonl(path: Path) -> Iterator[dict]:
+    """Stream records from a JSONL file, skipping blank and torn lines."""
+    if not path.exists():
+        return
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+def iter_sweeps(date_str: str) -> Iterator[dict]:
+    """Stream a day's sweeps in order from whichever echo format is on disk."""
+    path = echo_path(date_str)
+    if path.suffix == ".jsonl":
+        yield from iter_jsonl(path)
+    elif path.exists():
+        with path.open("r", encoding="utf-8") as f:
+            sweeps = json.load(f)
+        # tolerate old format accidentally saved as dict
+        yield from ([sweeps] if isinstance(sweeps, dict) else sweeps)
+
+def migrate_echo(date_str: str) -> bool:
+    """Convert a legacy {DATE}.echo.json array to JSONL; returns True if a file was migrated."""
+    legacy = p(legacy_echo_file(date_str))
+    jsonl = p(today_files(date_str)["echo"])
+    if jsonl.exists() or not legacy.exists():
+        return False
+    tmp = jsonl.with_name(jsonl.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        for record in iter_sweeps(date_str):
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp, jsonl)
+    legacy.unlink()
+    return True
+
+def _append_line(path: Path, record: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a+b") as f:
+        # A torn last line (crash mid-write) must not swallow this record
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        f.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+
+def load_day(date_str: str) -> Tuple[Optional[dict], Iterator[dict], Optional[dict]]:
+    """Load seed (dict or None), sweeps (streamed iterator), seal (dict or None). Missing files => None/empty"""
     files = today_files(date_str)
     seed = read_json(files["seed"]) if p(files["seed"]).exists() else None
-    sweeps = read_json(files["echo"]) if p(files["echo"]).exists() else []
-    if isinstance(sweeps, dict):
-        # tolerate old format accidentally saved as dict
-        sweeps = [sweeps]
+    sweeps = iter_sweeps(date_str)
     seal = read_json(files["seal"]) if p(files["seal"]).exists() else None
     return seed, sweeps, seal
 
-def build_ledger_obj(date_str: str, seed: dict, sweeps: List[dict], seal: dict) -> dict:
-    from .hashing import sha256_json, merkle_root
-    leaves = [sha256_json(seed)] + [sha256_json(s) for s in sweeps] + [sha256_json(seal)]
-    root = merkle_root(leaves)
+# ---------- Day Merkle accumulator ----------
+# Guards the echo file + accumulator pair so concurrent sweeps stay in step:
+# a thread lock within the process, plus an flock on {DATE}.lock across
+# uvicorn workers.
+_thread_lock = threading.Lock()
+
+def accumulator_dir(date_str: str) -> Path:
+    return p(f"{date_str}.merkle")
+
+@contextmanager
+def _day_lock(date_str: str) -> Iterator[None]:
+    with _thread_lock:
+        if fcntl is None:
+            yield
+            return
+        with p(f"{date_str}.lock").open("a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def _day_accumulator(date_str: str) -> Optional[MerkleAccumulator]:
+    from .hashing import sha256_json
+    files = today_files(date_str)
+    if not p(files["seed"]).exists():
+        return None
+    seed_hash = sha256_json(read_json(files["seed"]))
+    echo_p = echo_path(date_str)
+    echo_size = echo_p.stat().st_size if echo_p.exists() else 0
+
+    acc = MerkleAccumulator(accumulator_dir(date_str))
+    if acc.count and acc.meta.get("seed") == seed_hash and acc.meta.get("echo_size") == echo_size:
+        return acc
+
+    # Missing, or the seed / echo file changed behind our back: rebuild once
+    _, sweeps, _ = load_day(date_str)
+    acc.reset()
+    acc.meta = {"seed": seed_hash, "echo_size": echo_size}
+    acc.extend([seed_hash] + [sha256_json(s) for s in sweeps])
+    return acc
+
+def day_accumulator(date_str: str) -> Optional[MerkleAccumulator]:
+    """Accumulator over [seed] + sweeps for a day, in sync with the files; None until a seed exists."""
+    with _day_lock(date_str):
+        return _day_accumulator(date_str)
+
+def append_sweep(date_str: str, record: dict) -> Optional[int]:
+    """Append a sweep to the day's echo file and accumulator; returns its leaf index (None without a seed)."""
+    from .hashing import sha256_json
+    files = today_files(date_str)
+    with _day_lock(date_str):
+        migrate_echo(date_str)
+        acc = _day_accumulator(date_str)
+
+        _append_line(p(files["echo"]), record)
+
+        if acc is None:
+            return None
+        acc.meta["echo_size"] = p(files["echo"]).stat().st_size
+        return acc.append(sha256_json(record))
+
+def _ledger_obj(date_str: str, root: str, counts: Dict[str, int]) -> dict:
     files = today_files(date_str)
     return {
         "date": date_str,
         "day_root": root,
-        "counts": {"seeds": 1 if seed else 0, "sweeps": len(sweeps), "seals": 1 if seal else 0},
+        "counts": counts,
         "links": {
             "seed": files["seed"],
             "echo": files["echo"],
@@ -68,3 +198,17 @@ def build_ledger_obj(date_str: str, seed: dict, sweeps: List[dict], seal: dict)
         "ts": __import__("datetime").datetime.now(__import__("datetime").timezone.utc).isoformat().replace("+00:00", "Z"),
     }
 
+def build_ledger_obj(date_str: str, seed: dict, sweeps: List[dict], seal: dict) -> dict:
+    from .hashing import sha256_json, merkle_root
+    leaves = [sha256_json(seed)] + [sha256_json(s) for s in sweeps] + [sha256_json(seal)]
+    root = merkle_root(leaves)
+    counts = {"seeds": 1 if seed else 0, "sweeps": len(sweeps), "seals": 1 if seal else 0}
+    return _ledger_obj(date_str, root, counts)
+
+def build_ledger_obj_from_accumulator(date_str: str, acc: MerkleAccumulator, seal: dict) -> dict:
+    """Same result as build_ledger_obj, reading the day's frontier instead of rehashing every sweep."""
+    from .hashing import sha256_json
+    root = acc.root([sha256_json(seal)])
+    counts = {"seeds": 1, "sweeps": acc.count - 1, "seals": 1 if seal else 0}
+    return _ledger_obj(date_str, root, counts)
+
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Sweep latency as a day grows.
+
+Appends sweeps to one day through storage.append_sweep (JSONL echo file +
+Merkle accumulator) and prints latency percentiles per window, so a flat
+profile up to --sweeps entries shows each sweep costs the same regardless of
+day size. --legacy also times the old read/append/rewrite of a JSON array for
+the first --legacy-sweeps entries for comparison.
+
+Usage:
+    python benchmarks/sweep_latency.py --sweeps 100000 --window 10000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import app.storage as storage  # noqa: E402
+
+DATE = "2025-01-01"
+
+
+def _record(i: int) -> dict:
+    return {
+        "type": "sweep",
+        "date": DATE,
+        "chamber": "Bench",
+        "note": f"sweep {i} " + "x" * 200,
+        "meta": {"user": f"u{i % 50}"},
+        "ts": "2025-01-01T00:00:00Z",
+    }
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _report(label, n, samples):
+    print(f"{label:<8} {n:>8,}  p50={_percentile(samples, 0.50) * 1e6:>9.1f}us"
+          f"  p99={_percentile(samples, 0.99) * 1e6:>9.1f}us")
+
+
+def bench_jsonl(total: int, window: int):
+    storage.write_json(storage.today_files(DATE)["seed"], {"type": "seed", "date": DATE})
+    samples = []
+    for i in range(total):
+        start = time.perf_counter()
+        storage.append_sweep(DATE, _record(i))
+        samples.append(time.perf_counter() - start)
+        if (i + 1) % window == 0:
+            _report("jsonl", i + 1, samples)
+            samples = []
+
+
+def bench_legacy(total: int, window: int):
+    path = storage.legacy_echo_file("legacy-" + DATE)
+    samples = []
+    for i in range(total):
+        start = time.perf_counter()
+        sweeps = storage.read_json(path) if storage.p(path).exists() else []
+        sweeps.append(_record(i))
+        storage.write_json(path, sweeps)
+        samples.append(time.perf_counter() - start)
+        if (i + 1) % window == 0:
+            _report("legacy", i + 1, samples)
+            samples = []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sweeps", type=int, default=100000)
+    parser.add_argument("--window", type=int, default=10000)
+    parser.add_argument("--legacy", action="store_true", help="also time the old JSON array rewrite")
+    parser.add_argument("--legacy-sweeps", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage.DATA_DIR = Path(tmp)
+        bench_jsonl(args.sweeps, args.window)
+        if args.legacy:
+            bench_legacy(args.legacy_sweeps, max(1, args.legacy_sweeps // 5))
+
+
+if __name__ == "__main__":
+    main()
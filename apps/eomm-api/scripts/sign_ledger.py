@@ -64,7 +64,7 @@ def main():
     base = Path(args.data_dir)
     name_map = {
         "seed":   f"{date}.seed.json",
-        "echo":   f"{date}.echo.json",
+        "echo":   f"{date}.echo.jsonl" if (base / f"{date}.echo.jsonl").exists() else f"{date}.echo.json",
         "seal":   f"{date}.seal.json",
         "ledger": f"{date}.ledger.json",
     }
@@ -1,7 +1,8 @@
 from setuptools import setup, find_packages
 
 with open("requirements.txt", "r") as f:
-    requirements = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    # Local path requirements (the monorepo's civic_sdk) are installed by requirements.txt itself
+    requirements = [line.strip() for line in f if line.strip() and not line.startswith(("#", "."))]
 
 setup(
     name="lab4-proof-api",
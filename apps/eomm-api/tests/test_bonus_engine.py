@@ -0,0 +1,97 @@
+# tests/test_bonus_engine.py
+import json
+import random
+from datetime import date, timedelta
+from app import bonus_engine
+from app.bonus_engine import BonusIndex, BONUS_REASON
+
+START = date(2025, 9, 3)  # a Wednesday, so windows have partial edge weeks
+
+def write_lines(path, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        for r in rows:
+            f.write(json.dumps(r) + "\n")
+
+def queue_path(tmp_path, d):
+    return tmp_path / d / f"{d}.featured_queue.jsonl"
+
+def naive(all_rows, start, end, min_len, n):
+    cands = [dict(r) for d, r in all_rows if start.isoformat() <= d <= end.isoformat() and r["len"] >= min_len]
+    for c in cands:
+        c["score"] = c["len"] + 10 * c["votes"]
+    cands.sort(key=lambda c: c["score"], reverse=True)
+    return len(cands), [(c["user"], c["hash"], c["score"]) for c in cands[:n]]
+
+def populate(tmp_path, index, days, rng, all_rows):
+    for i in range(days):
+        d = (START + timedelta(days=i)).isoformat()
+        rows = [{"date": d, "user": f"u{rng.randrange(20)}", "hash": f"h{d}-{j}",
+                 "len": rng.choice([150, 200, 250, 300]), "votes": rng.randrange(3), "ts": "T"}
+                for j in range(rng.randrange(0, 6))]
+        write_lines(queue_path(tmp_path, d), rows)
+        all_rows.extend((d, r) for r in rows)
+        index.sync_queue(d, queue_path(tmp_path, d))
+
+def test_rank_matches_full_sort_with_rollups(tmp_path):
+    rng = random.Random(7)
+    index = BonusIndex(tmp_path / "bonus.db")
+    all_rows = []
+    populate(tmp_path, index, 40, rng, all_rows)
+
+    end = START + timedelta(days=38)
+    for _ in range(2):  # second pass is served from rollups
+        eligible, winners = index.rank(START, end, 200, 10)
+        assert (eligible, [(w["user"], w["hash"], w["score"]) for w in winners]) == naive(all_rows, START, end, 200, 10)
+    assert index._conn.execute("SELECT COUNT(*) FROM rollups").fetchone()[0] == 4
+
+    # appending to a day drops that week's rollup
+    d = (START + timedelta(days=12)).isoformat()
+    extra = [{"date": d, "user": "late", "hash": "late", "len": 999, "votes": 0, "ts": "T"}]
+    write_lines(queue_path(tmp_path, d), extra)
+    all_rows.extend((d, r) for r in extra)
+    index.sync_queue(d, queue_path(tmp_path, d))
+    eligible, winners = index.rank(START, end, 200, 10)
+    assert winners[0]["hash"] == "late"
+    assert (eligible, [(w["user"], w["hash"], w["score"]) for w in winners]) == naive(all_rows, START, end, 200, 10)
+    index.close()
+
+def test_paid_keys_are_ingested_incrementally(tmp_path):
+    index = BonusIndex(tmp_path / "bonus.db")
+    gic = tmp_path / "2025-09-30.gic.jsonl"
+    write_lines(gic, [
+        {"type": "gic_tx", "user": "u1", "hash": "a", "reason": BONUS_REASON},
+        {"type": "gic_tx", "user": "u2", "hash": "b", "reason": "reflection:private"},
+    ])
+    index.sync_paid("2025-09-30", gic)
+    assert index.paid_keys("2025-09-30") == {("u1", "a", BONUS_REASON)}
+
+    write_lines(gic, [{"type": "gic_tx", "user": "u3", "hash": "c", "reason": BONUS_REASON}])
+    index.sync_paid("2025-09-30", gic)
+    assert index.paid_keys("2025-09-30") == {("u1", "a", BONUS_REASON), ("u3", "c", BONUS_REASON)}
+
+    # a rewritten file is rescanned from scratch
+    gic.write_text(json.dumps({"type": "gic_tx", "user": "u9", "hash": "z", "reason": BONUS_REASON}) + "\n")
+    index.sync_paid("2025-09-30", gic)
+    assert index.paid_keys("2025-09-30") == {("u9", "z", BONUS_REASON)}
+    index.close()
+
+def test_candidates_stream_in_small_fetches(tmp_path, monkeypatch):
+    monkeypatch.setattr(bonus_engine, "FETCH_ROWS", 2)
+    rng = random.Random(11)
+    index = BonusIndex(tmp_path / "bonus.db")
+    all_rows = []
+    populate(tmp_path, index, 20, rng, all_rows)
+
+    end = START + timedelta(days=18)
+    streamed = [(c["date"], c["hash"]) for c in index.iter_eligible(START, end, 200)]
+    assert streamed == [(d, r["hash"]) for d, r in all_rows if d <= end.isoformat() and r["len"] >= 200]
+
+    # Abandoning the stream part-way leaves the index usable
+    partial = index.iter_eligible(START, end, 200)
+    assert next(partial)["hash"] == streamed[0][1]
+    partial.close()
+    for first, last in [(START, end), (START + timedelta(days=2), START + timedelta(days=16))]:
+        eligible, winners = index.rank(first, last, 200, 5)
+        assert (eligible, [(w["user"], w["hash"], w["score"]) for w in winners]) == naive(all_rows, first, last, 200, 5)
+    index.close()
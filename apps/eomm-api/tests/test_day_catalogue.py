@@ -0,0 +1,76 @@
+# tests/test_day_catalogue.py
+import json
+import pytest
+import app.storage
+from app.day_catalogue import DayCatalogue
+from app.storage import today_files, write_json, append_sweep
+
+DATE = "2025-10-03"
+
+@pytest.fixture
+def catalogue(tmp_path, monkeypatch):
+    monkeypatch.setattr(app.storage, "DATA_DIR", tmp_path)
+    monkeypatch.setenv("LEDGER_PATH", str(tmp_path))
+    cat = DayCatalogue(tmp_path / "catalogue.db")
+    yield cat
+    cat.close()
+
+def gic_tx(amount):
+    return {"type": "gic_tx", "date": DATE, "user": "u1", "amount": amount}
+
+def append_gic(tmp_path, *txs):
+    p = tmp_path / DATE / f"{DATE}.gic.jsonl"
+    p.parent.mkdir(parents=True, exist_ok=True)
+    with p.open("a", encoding="utf-8") as f:
+        for tx in txs:
+            f.write(json.dumps(tx) + "\n")
+
+def test_empty_day(catalogue):
+    s = catalogue.get(DATE)
+    assert s["present"] == {"seed": False, "echo": False, "seal": False, "ledger": False, "gic": False}
+    assert s["counts"] == {"seeds": 0, "sweeps": 0, "seals": 0, "gic_txs": 0}
+    assert s["day_root"] is None
+
+def test_appends_are_absorbed_incrementally(catalogue, tmp_path):
+    files = today_files(DATE)
+    write_json(files["seed"], {"type": "seed"})
+    for i in range(3):
+        append_sweep(DATE, {"type": "sweep", "note": str(i)})
+    append_gic(tmp_path, gic_tx(10), gic_tx(25))
+    s = catalogue.get(DATE)
+    assert s["counts"] == {"seeds": 1, "sweeps": 3, "seals": 0, "gic_txs": 2}
+    assert s["gic"]["sum"] == 35
+
+    append_sweep(DATE, {"type": "sweep", "note": "3"})
+    append_gic(tmp_path, gic_tx(5))
+    s = catalogue.get(DATE)
+    assert s["counts"]["sweeps"] == 4
+    assert s["counts"]["gic_txs"] == 3
+    assert s["gic"]["sum"] == 40
+
+    write_json(files["seal"], {"type": "seal"})
+    write_json(files["ledger"], {"day_root": "ab" * 32})
+    s = catalogue.get(DATE)
+    assert s["present"]["seal"] and s["present"]["ledger"]
+    assert s["day_root"] == "ab" * 32
+
+def test_rewritten_file_is_rescanned(catalogue, tmp_path):
+    append_gic(tmp_path, gic_tx(10), gic_tx(20))
+    assert catalogue.get(DATE)["gic"]["sum"] == 30
+    p = tmp_path / DATE / f"{DATE}.gic.jsonl"
+    p.write_text(json.dumps(gic_tx(7)) + "\n", encoding="utf-8")
+    s = catalogue.get(DATE)
+    assert s["counts"]["gic_txs"] == 1
+    assert s["gic"]["sum"] == 7
+
+def test_partial_last_line_is_not_consumed(catalogue, tmp_path):
+    append_gic(tmp_path, gic_tx(10))
+    p = tmp_path / DATE / f"{DATE}.gic.jsonl"
+    with p.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(gic_tx(1)))
+    assert catalogue.get(DATE)["gic"]["sum"] == 11
+    with p.open("a", encoding="utf-8") as f:
+        f.write("\n" + json.dumps(gic_tx(100)) + "\n")
+    s = catalogue.get(DATE)
+    assert s["counts"]["gic_txs"] == 3
+    assert s["gic"]["sum"] == 111
@@ -0,0 +1,50 @@
+# tests/test_dedupe.py
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from app.dedupe import GicDedupeStore
+
+TODAY = date.today().isoformat()
+
+def test_first_claim_wins(tmp_path):
+    store = GicDedupeStore(tmp_path)
+    assert not store.seen("u1", TODAY, "h1")
+    assert store.claim("u1", TODAY, "h1")
+    assert not store.claim("u1", TODAY, "h1")
+    assert store.seen("u1", TODAY, "h1")
+    # other user / other content are independent
+    assert store.claim("u2", TODAY, "h1")
+    assert store.claim("u1", TODAY, "h2")
+    store.close()
+
+def test_claims_survive_restart(tmp_path):
+    store = GicDedupeStore(tmp_path)
+    store.claim("u1", TODAY, "h1")
+    store.close()
+
+    reopened = GicDedupeStore(tmp_path)
+    assert reopened.seen("u1", TODAY, "h1")
+    assert not reopened.claim("u1", TODAY, "h1")
+    reopened.close()
+
+def test_old_dates_expire(tmp_path):
+    store = GicDedupeStore(tmp_path, retention_days=7)
+    old = (date.today() - timedelta(days=3)).isoformat()
+    store.claim("u1", old, "h1")
+    store.retention_days = 2
+    assert store.expire() == 1
+    # expired dates cannot be claimed again
+    assert not store.claim("u1", old, "h1")
+    store.close()
+
+def _claim(args):
+    directory, i = args
+    store = GicDedupeStore(directory)
+    won = store.claim("racer", TODAY, f"h{i % 10}")
+    store.close()
+    return won
+
+def test_workers_share_one_claim(tmp_path):
+    GicDedupeStore(tmp_path).close()
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        wins = list(pool.map(_claim, [(tmp_path, i) for i in range(40)]))
+    assert sum(wins) == 10
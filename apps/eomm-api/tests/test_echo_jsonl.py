@@ -0,0 +1,86 @@
+# tests/test_echo_jsonl.py
+import json
+import multiprocessing
+
+import pytest
+
+import app.storage
+from app.hashing import sha256_json
+from app.hash_helpers import build_day_root
+from app.storage import (
+    today_files, legacy_echo_file, write_json, append_sweep, iter_sweeps, load_day,
+    migrate_echo, day_accumulator, build_ledger_obj, build_ledger_obj_from_accumulator,
+)
+
+DATE = "2025-10-02"
+
+def sweep(i):
+    return {"type": "sweep", "date": DATE, "chamber": "LAB", "note": f"n{i}", "meta": {}, "ts": "T"}
+
+def test_sweeps_append_one_line_each(tmp_path, monkeypatch):
+    monkeypatch.setattr(app.storage, "DATA_DIR", tmp_path)
+    for i in range(3):
+        append_sweep(DATE, sweep(i))
+    lines = (tmp_path / today_files(DATE)["echo"]).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(l) for l in lines] == [sweep(i) for i in range(3)]
+
+def test_legacy_array_is_read_then_migrated(tmp_path, monkeypatch):
+    monkeypatch.setattr(app.storage, "DATA_DIR", tmp_path)
+    write_json(legacy_echo_file(DATE), [sweep(0), sweep(1)])
+    _, sweeps, _ = load_day(DATE)
+    assert list(sweeps) == [sweep(0), sweep(1)]
+
+    append_sweep(DATE, sweep(2))
+    assert not (tmp_path / legacy_echo_file(DATE)).exists()
+    assert list(iter_sweeps(DATE)) == [sweep(i) for i in range(3)]
+    assert migrate_echo(DATE) is False
+
+def test_torn_line_is_skipped_and_not_glued(tmp_path, monkeypatch):
+    monkeypatch.setattr(app.storage, "DATA_DIR", tmp_path)
+    append_sweep(DATE, sweep(0))
+    with (tmp_path / today_files(DATE)["echo"]).open("a", encoding="utf-8") as f:
+        f.write('{"type": "sweep", "no')
+    append_sweep(DATE, sweep(1))
+    assert list(iter_sweeps(DATE)) == [sweep(0), sweep(1)]
+
+def test_day_root_matches_across_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(app.storage, "DATA_DIR", tmp_path)
+    files = today_files(DATE)
+    seed = {"type": "seed", "date": DATE}
+    seal = {"type": "seal", "date": DATE}
+    write_json(files["seed"], seed)
+    for i in range(5):
+        append_sweep(DATE, sweep(i))
+    write_json(files["seal"], seal)
+
+    expected = build_ledger_obj(DATE, seed, [sweep(i) for i in range(5)], seal)["day_root"]
+    acc = day_accumulator(DATE)
+    assert build_ledger_obj_from_accumulator(DATE, acc, seal)["day_root"] == expected
+    assert build_day_root(DATE, tmp_path)["root"] == expected
+    assert build_day_root(DATE, tmp_path, accumulator=acc)["inputs"]["echo"] == [sha256_json(sweep(i)) for i in range(5)]
+
+def _append_from_worker(data_dir, worker, count):
+    app.storage.DATA_DIR = data_dir
+    for i in range(count):
+        append_sweep(DATE, {**sweep(i), "worker": worker})
+
+@pytest.mark.skipif(app.storage.fcntl is None, reason="cross-process day lock needs fcntl")
+def test_sweeps_from_several_workers_stay_in_step(tmp_path, monkeypatch):
+    monkeypatch.setattr(app.storage, "DATA_DIR", tmp_path)
+    write_json(today_files(DATE)["seed"], {"type": "seed", "date": DATE})
+    day_accumulator(DATE)
+
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_append_from_worker, args=(tmp_path, w, 50)) for w in range(4)]
+    for proc in workers:
+        proc.start()
+    for proc in workers:
+        proc.join()
+    assert all(proc.exitcode == 0 for proc in workers)
+
+    sweeps = list(iter_sweeps(DATE))
+    assert len(sweeps) == 200
+    acc = app.storage.MerkleAccumulator(app.storage.accumulator_dir(DATE))
+    # In step with the echo file as written, so no rebuild was needed
+    assert acc.meta["echo_size"] == (tmp_path / today_files(DATE)["echo"]).stat().st_size
+    assert list(acc.leaves())[1:] == [sha256_json(s) for s in sweeps]
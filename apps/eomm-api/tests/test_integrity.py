@@ -1,4 +1,5 @@
 from pathlib import Path
+import hashlib
 import json
 from app.storage import today_files, write_json, read_json, load_day, build_ledger_obj, DATA_DIR
 from app.hashing import sha256_json
@@ -76,3 +77,8 @@ def test_count_consistency():
     assert ledger["counts"]["sweeps"] == 2
     assert ledger["counts"]["seals"] == 1
 
+def test_sha256_json_keeps_the_original_encoding():
+    """Hashes must not change with the shared canonical encoder"""
+    record = {"type": "sweep", "note": "café ☕", "meta": {"b": 1, "a": [1.5, None]}}
+    blob = json.dumps(record, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    assert sha256_json(record) == hashlib.sha256(blob).hexdigest()
@@ -0,0 +1,62 @@
+# tests/test_merkle_accumulator.py
+import app.storage
+from app.hashing import sha256_json, merkle_root
+from app.merkle_accumulator import MerkleAccumulator, verify_proof
+from app.storage import today_files, write_json, append_sweep, day_accumulator, build_ledger_obj, build_ledger_obj_from_accumulator
+
+def leaf(i):
+    return sha256_json({"n": i})
+
+def test_roots_match_full_rebuild(tmp_path):
+    acc = MerkleAccumulator(tmp_path / "acc")
+    leaves = []
+    for i in range(40):
+        leaves.append(leaf(i))
+        acc.append(leaves[-1])
+        assert acc.root() == merkle_root(leaves)
+        assert acc.root([leaf(-1)]) == merkle_root(leaves + [leaf(-1)])
+
+def test_proofs_verify_and_reject_tamper(tmp_path):
+    acc = MerkleAccumulator(tmp_path / "acc")
+    leaves = [leaf(i) for i in range(23)]
+    acc.extend(leaves)
+    seal = leaf("seal")
+    root = acc.root([seal])
+    for i, h in enumerate(leaves):
+        path = acc.proof(i, [seal])
+        assert len(path) == 5
+        assert verify_proof(h, path, root)
+    assert not verify_proof(leaf("other"), acc.proof(3, [seal]), root)
+
+def test_reload_truncates_interrupted_append(tmp_path):
+    acc = MerkleAccumulator(tmp_path / "acc")
+    acc.extend([leaf(i) for i in range(9)])
+    # a leaf reached the level file but the state was never saved
+    with (tmp_path / "acc" / "level-0.hex").open("a") as f:
+        f.write(leaf(99) + "\n")
+    reloaded = MerkleAccumulator(tmp_path / "acc")
+    assert reloaded.count == 9
+    assert reloaded.root() == acc.root()
+    reloaded.append(leaf(9))
+    assert reloaded.root() == merkle_root([leaf(i) for i in range(10)])
+
+def test_day_accumulator_tracks_sweeps_and_seed(tmp_path, monkeypatch):
+    monkeypatch.setattr(app.storage, "DATA_DIR", tmp_path)
+    date = "2025-10-01"
+    files = today_files(date)
+    seed = {"type": "seed", "date": date, "intent": "iterate"}
+    write_json(files["seed"], seed)
+    sweeps = [{"type": "sweep", "date": date, "note": f"n{i}"} for i in range(6)]
+    for i, s in enumerate(sweeps):
+        assert append_sweep(date, s) == i + 1
+    seal = {"type": "seal", "date": date, "wins": "ok"}
+
+    acc = day_accumulator(date)
+    assert build_ledger_obj_from_accumulator(date, acc, seal)["day_root"] == build_ledger_obj(date, seed, sweeps, seal)["day_root"]
+
+    # Rewriting the seed invalidates the frontier; it is rebuilt from the files
+    seed = dict(seed, intent="polish")
+    write_json(files["seed"], seed)
+    acc = day_accumulator(date)
+    assert acc.meta["seed"] == sha256_json(seed)
+    assert build_ledger_obj_from_accumulator(date, acc, seal)["day_root"] == build_ledger_obj(date, seed, sweeps, seal)["day_root"]
@@ -73,11 +73,11 @@ def test_sweep_includes_node_metadata():
     assert response.status_code == 200
     
     # Check the generated file
-    echo_file = TEST_DATA_DIR / f"{TEST_DATE}.echo.json"
+    echo_file = TEST_DATA_DIR / f"{TEST_DATE}.echo.jsonl"
     assert echo_file.exists()
     
     with open(echo_file, 'r') as f:
-        echo_data = json.load(f)
+        echo_data = [json.loads(line) for line in f if line.strip()]
     
     # Find the sweep record we just created
     sweep_record = None
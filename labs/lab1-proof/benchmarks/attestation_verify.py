@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Attestation verification benchmark
+
+Signs one payload with a pool of signers, then verifies the signatures
+one verify() call at a time and through verify_batch(), reporting
+signatures/second for each.
+
+Usage:
+    python benchmarks/attestation_verify.py --signatures 10000 --signers 500 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from crypto_attestation import CryptoAttestationEngine  # noqa: E402
+
+
+def _payload():
+    return {
+        "delib_id": "delib_bench",
+        "question": "Should we deploy Lab3?",
+        "decision": "APPROVED",
+        "votes": [{"model": f"model_{i}", "confidence": 0.9} for i in range(50)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark ED25519 attestation verification",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--signatures", type=int, default=10_000, help="Signatures to verify")
+    parser.add_argument("--signers", type=int, default=500, help="Distinct signing keys")
+    parser.add_argument("--workers", type=int, default=1, help="verify_batch threads (1: no pool)")
+    args = parser.parse_args()
+
+    engine = CryptoAttestationEngine(max_workers=args.workers)
+    data = _payload()
+    signers = [f"signer_{i}@civic.os" for i in range(args.signers)]
+    for signer in signers:
+        engine.generate_keypair(signer)
+    signed = engine.sign_batch(signers, data)
+    signatures = [signed[i % len(signed)] for i in range(args.signatures)]
+
+    start = time.perf_counter()
+    single = [engine.verify(sig, data) for sig in signatures]
+    single_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = engine.verify_batch(signatures, data)
+    batch_elapsed = time.perf_counter() - start
+
+    assert all(single) and all(batch)
+    engine.close()
+
+    print(f"{args.signatures:,} signatures, {args.signers} keys, {engine.max_workers} workers")
+    print(f"verify()        {args.signatures / single_elapsed:>10,.0f} sig/s  ({single_elapsed:.2f}s)")
+    print(f"verify_batch()  {args.signatures / batch_elapsed:>10,.0f} sig/s  ({batch_elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,15 @@ Lab1: Civic Ledger Core - Proof-of-Integrity Blockchain
 Immutable ledger for all Kaizen-OS operations
 """
 
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 import hashlib
+import heapq
 import json
+import math
 import asyncio
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 
 
 @dataclass
@@ -113,6 +115,174 @@ class Block:
         return hashlib.sha256(block_string.encode()).hexdigest()
 
 
+@dataclass
+class MempoolEntry:
+    """A pending transaction with its ordering key and expiry"""
+    tx: Transaction
+    key: float  # Lower is served first
+    seq: int
+    size: int
+    arrival: float
+    expires_at: float
+
+
+class Mempool:
+    """
+    Pending transactions ordered by GI score and age
+
+    A transaction's priority is its GI score plus the time it has waited,
+    with one GI point worth ``gi_weight`` seconds of waiting. Since every
+    transaction ages at the same rate the order never changes, so the pool
+    is a heap keyed by ``arrival - gi_score * gi_weight``: O(log n) insert
+    and pop, and low-GI transactions cannot starve. Removals are lazy (heap
+    items whose entry is gone are dropped when they surface) and the heap is
+    rebuilt once stale items outnumber live ones.
+
+    Each sender may have at most ``max_per_sender`` transactions pending.
+    Expiry uses a timer wheel of ``resolution``-second slots spanning the TTL,
+    so evicting stale transactions costs O(1) amortized per transaction; a
+    transaction is evicted at most one slot after it expires.
+
+    Times are whatever clock the caller passes in (CivicLedger uses the
+    event loop's).
+    """
+
+    def __init__(self, ttl: float = 300.0, max_per_sender: int = 1000,
+                 gi_weight: float = 60.0, resolution: float = 1.0):
+        self.ttl = ttl
+        self.max_per_sender = max(1, max_per_sender)
+        self.gi_weight = gi_weight
+        self.resolution = resolution
+        self.bytes = 0
+        self._entries: "OrderedDict[str, MempoolEntry]" = OrderedDict()  # arrival order
+        self._heap: List[Tuple[float, int, str]] = []
+        self._by_sender: Dict[str, int] = defaultdict(int)
+        self._wheel: List[List[Tuple[str, int]]] = [[] for _ in range(int(math.ceil(ttl / resolution)) + 2)]
+        self._tick: Optional[int] = None  # Last wheel slot that has been swept
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, tx_id: str) -> bool:
+        return tx_id in self._entries
+
+    def __iter__(self) -> Iterator[Transaction]:
+        """Pending transactions in arrival order"""
+        return (entry.tx for entry in self._entries.values())
+
+    def get(self, tx_id: str) -> Optional[Transaction]:
+        entry = self._entries.get(tx_id)
+        return entry.tx if entry is not None else None
+
+    def oldest_arrival(self) -> Optional[float]:
+        """Arrival time of the longest-waiting transaction"""
+        for entry in self._entries.values():
+            return entry.arrival
+        return None
+
+    def sender_count(self, sender: str) -> int:
+        return self._by_sender.get(sender, 0)
+
+    def add(self, tx: Transaction, gi_score: float, size: int, now: float,
+            expires_at: Optional[float] = None) -> bool:
+        """Add a transaction; False if it is a duplicate or its sender is at its limit"""
+        if tx.tx_id in self._entries or self._by_sender.get(tx.from_address, 0) >= self.max_per_sender:
+            return False
+        expires_at = min(now + self.ttl, expires_at if expires_at is not None else now + self.ttl)
+        self._seq += 1
+        entry = MempoolEntry(tx=tx, key=now - gi_score * self.gi_weight, seq=self._seq,
+                             size=size, arrival=now, expires_at=expires_at)
+        self._entries[tx.tx_id] = entry
+        self._by_sender[tx.from_address] += 1
+        self.bytes += size
+        heapq.heappush(self._heap, (entry.key, entry.seq, tx.tx_id))
+        if self._tick is None:
+            self._tick = self._slot(now) - 1
+        slot = max(self._slot(expires_at), self._tick + 1)
+        self._wheel[slot % len(self._wheel)].append((tx.tx_id, entry.seq))
+        return True
+
+    def remove(self, tx_id: str) -> Optional[Transaction]:
+        entry = self._entries.pop(tx_id, None)
+        if entry is None:
+            return None
+        sender = entry.tx.from_address
+        self._by_sender[sender] -= 1
+        if not self._by_sender[sender]:
+            del self._by_sender[sender]
+        self.bytes -= entry.size
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(e.key, e.seq, e.tx.tx_id) for e in self._entries.values()]
+            heapq.heapify(self._heap)
+        return entry.tx
+
+    def select(self, max_txs: int, max_bytes: int, max_per_sender: int) -> List[Transaction]:
+        """
+        Highest-priority transactions for the next block, left in the pool
+
+        At most ``max_per_sender`` come from one sender while others are
+        waiting; if the pool runs out first, the block is topped up from the
+        transactions passed over. The block stops at the first transaction
+        that would exceed ``max_bytes`` (the first one is always taken).
+        """
+        chosen: List[Transaction] = []
+        passed_over: List[MempoolEntry] = []
+        popped = []
+        per_sender: Dict[str, int] = defaultdict(int)
+        size = 0
+        full = False
+        while self._heap and len(chosen) < max_txs:
+            item = heapq.heappop(self._heap)
+            entry = self._entries.get(item[2])
+            if entry is None or entry.seq != item[1]:
+                continue  # Removed since it was pushed
+            popped.append(item)
+            if per_sender[entry.tx.from_address] >= max_per_sender:
+                passed_over.append(entry)
+                continue
+            if chosen and size + entry.size > max_bytes:
+                full = True
+                break
+            chosen.append(entry.tx)
+            per_sender[entry.tx.from_address] += 1
+            size += entry.size
+        if not full:
+            for entry in passed_over:
+                if len(chosen) >= max_txs or (chosen and size + entry.size > max_bytes):
+                    break
+                chosen.append(entry.tx)
+                size += entry.size
+        for item in popped:
+            heapq.heappush(self._heap, item)
+        return chosen
+
+    def expire(self, now: float) -> List[Transaction]:
+        """Evict transactions whose expiry fell in a wheel slot that has fully elapsed"""
+        if self._tick is None:
+            return []
+        current = self._slot(now)
+        start = max(self._tick + 1, current - len(self._wheel))
+        expired = []
+        for tick in range(start, current):
+            slot = self._wheel[tick % len(self._wheel)]
+            later = []
+            for tx_id, seq in slot:
+                entry = self._entries.get(tx_id)
+                if entry is None or entry.seq != seq:
+                    continue
+                if self._slot(entry.expires_at) < current:
+                    expired.append(self.remove(tx_id))
+                else:
+                    later.append((tx_id, seq))  # Due on a later turn of the wheel
+            self._wheel[tick % len(self._wheel)] = later
+        self._tick = max(self._tick, current - 1)
+        return expired
+
+    def _slot(self, t: float) -> int:
+        return int(t // self.resolution)
+
+
 class CivicLedger:
     """
     Civic Ledger - Proof-of-Integrity Blockchain
@@ -126,6 +296,23 @@ class CivicLedger:
     - No gas fees (free transactions)
     - Constitutional validation on every block
     - Immutable audit trail
+    - Priority mempool (GI score and age) with per-sender limits and expiry
+
+    Confirmed transactions are indexed as blocks are added: tx_id ->
+    (block_number, index), plus secondary indexes by validator and by
+    transaction type, so lookups never scan the chain. Chain statistics are
+    running counters, and a new block that does not extend the chain (wrong
+    number, previous hash or Merkle root) is rejected before the chain or
+    the indexes change; verify_chain() still re-checks the whole chain.
+
+    Blocks are produced by a background task (start()/stop()) that seals the
+    highest-priority pending transactions as soon as the mempool holds
+    max_block_txs transactions or max_block_bytes of them, or BLOCK_TIME after
+    the oldest pending transaction arrived, whichever comes first. Submitters can await a future
+    for their transaction's inclusion, and are held back while the pending
+    pool is at its high-water mark (or refused at once if no validator could
+    seal a block to drain it). Without a running producer, blocks are
+    mined inline once the size threshold is reached.
     """
 
     # Minimum GI score required to be a validator
@@ -137,20 +324,51 @@ class CivicLedger:
     # Block confirmation time (seconds)
     BLOCK_TIME = 1.0
 
-    def __init__(self, gi_engine=None):
+    # Transactions older than this (seconds) are rejected or evicted
+    TX_TTL = 300
+
+    def __init__(self, gi_engine=None, max_block_txs: int = 10,
+                 max_block_bytes: int = 1_000_000, high_water_mark: int = 10_000,
+                 max_sender_pending: int = 1000, max_sender_block_txs: Optional[int] = None):
         """
         Initialize Civic Ledger
 
         Args:
             gi_engine: GI scoring engine for validator verification
+            max_block_txs: Transactions per block; a full block is sealed immediately
+            max_block_bytes: Serialized transaction bytes per block
+            high_water_mark: Pending transactions at which submitters wait for space
+            max_sender_pending: Pending transactions allowed per sender
+            max_sender_block_txs: Transactions one sender may place in a block while
+                others are waiting (default: half a block)
         """
         self.gi_engine = gi_engine
         self.chain: List[Block] = []
-        self.pending_transactions: List[Transaction] = []
         self.validators: Dict[str, float] = {}  # address -> GI score
-        self.transaction_pool: Dict[str, Transaction] = {}
         self.block_height = 0
 
+        # Indexes over confirmed transactions, maintained by _append_block
+        self.tx_index: Dict[str, Tuple[int, int]] = {}  # tx_id -> (block_number, index)
+        self.blocks_by_validator: Dict[str, List[int]] = defaultdict(list)
+        self.txs_by_type: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+
+        # Running statistics
+        self.total_transactions = 0
+        self._validator_gi_total = 0.0
+        self._chain_valid = True
+        self._last_block_hash = ""
+
+        # Block production
+        self.max_block_txs = max(1, max_block_txs)
+        self.max_block_bytes = max_block_bytes
+        self.high_water_mark = max(self.max_block_txs, high_water_mark)
+        self.max_sender_block_txs = max_sender_block_txs or max(1, (self.max_block_txs + 1) // 2)
+        self.mempool = Mempool(ttl=self.TX_TTL, max_per_sender=max_sender_pending)
+        self._inclusion: Dict[str, asyncio.Future] = {}
+        self._wake = asyncio.Event()
+        self._space = asyncio.Event()
+        self._producer: Optional[asyncio.Task] = None
+
         # Create genesis block
         self._create_genesis_block()
 
@@ -170,35 +388,184 @@ class CivicLedger:
             )
         )
 
-        self.chain.append(genesis)
+        self._append_block(genesis)
         self.block_height = 0
 
-    async def submit_transaction(self, transaction: Transaction) -> str:
+    def _append_block(self, block: Block) -> bool:
+        """
+        Verify a block against its predecessor, then add it to the chain and index it
+
+        A block that does not extend the chain is rejected before anything
+        is changed.
+
+        Returns:
+            True if the block was added
+        """
+        if self.chain:
+            if block.block_number != len(self.chain):
+                print(f"❌ Invalid block number {block.block_number}, expected {len(self.chain)}")
+                return False
+            if block.previous_hash != self._last_block_hash:
+                print(f"❌ Invalid previous hash at block {block.block_number}")
+                return False
+            if block.merkle_root != block.calculate_merkle_root():
+                print(f"❌ Invalid Merkle root at block {block.block_number}")
+                return False
+
+        self.chain.append(block)
+        self._last_block_hash = block.hash()
+
+        number = block.block_number
+        self.blocks_by_validator[block.validator].append(number)
+        for index, tx in enumerate(block.transactions):
+            position = (number, index)
+            self.tx_index[tx.tx_id] = position
+            self.txs_by_type[tx.type].append(position)
+        self.total_transactions += len(block.transactions)
+        return True
+
+    async def submit_transaction(self, transaction: Transaction,
+                                 timeout: Optional[float] = None) -> str:
         """
         Submit transaction to the ledger
 
         Args:
             transaction: Transaction to submit
+            timeout: Longest wait (seconds) for space in the pending pool
 
         Returns:
             Transaction ID
 
         Raises:
             ValueError: If transaction is invalid
+            RuntimeError: If the pending pool is full and no validator can seal
+            asyncio.TimeoutError: If no space opened up within timeout
+        """
+        await self.submit(transaction, timeout)
+        return transaction.tx_id
+
+    async def submit(self, transaction: Transaction,
+                     timeout: Optional[float] = None) -> asyncio.Future:
+        """
+        Submit transaction to the ledger and get its inclusion future
+
+        Waits while the pending pool is at the high-water mark, for at most
+        timeout seconds if one is given; if no validator could seal a block
+        to drain the pool, fails at once instead. The returned future
+        resolves to the transaction's (block_number, index) once a block
+        containing it is added to the chain, or to None if it expires from
+        the mempool first.
+
+        Raises:
+            ValueError: If transaction is invalid
+            RuntimeError: If the pending pool is full and no validator can seal
+            asyncio.TimeoutError: If no space opened up within timeout
         """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        self._expire_pending(loop.time())
+        while len(self.mempool) >= self.high_water_mark:
+            if not self._can_seal():
+                raise RuntimeError("Pending pool is full and no validator can seal a block")
+            self._space.clear()
+            await asyncio.wait_for(self._space.wait(),
+                                   None if deadline is None else deadline - loop.time())
+
         # Validate transaction
         if not await self._validate_transaction(transaction):
             raise ValueError("Invalid transaction")
 
-        # Add to pending pool
-        self.pending_transactions.append(transaction)
-        self.transaction_pool[transaction.tx_id] = transaction
-
-        # Auto-mine block if we have enough transactions
-        if len(self.pending_transactions) >= 10:
+        # Add to the mempool, expiring TX_TTL after the transaction's timestamp
+        now = loop.time()
+        age_seconds = (datetime.utcnow() - transaction.timestamp).total_seconds()
+        if not self.mempool.add(transaction, self._transaction_gi(transaction),
+                                self._tx_size(transaction), now,
+                                expires_at=now + self.TX_TTL - max(0.0, age_seconds)):
+            raise ValueError("Invalid transaction")
+        future = self._inclusion[transaction.tx_id] = loop.create_future()
+
+        if self._producer is not None:
+            # Wake the producer to start the block deadline or seal a full block
+            if len(self.mempool) == 1 or self._block_ready():
+                self._wake.set()
+        elif self._block_ready():
+            # No producer running: mine inline once a block is full
             await self._mine_block()
 
-        return transaction.tx_id
+        return future
+
+    @staticmethod
+    def _tx_size(tx: Transaction) -> int:
+        return len(json.dumps(tx.to_dict(), sort_keys=True))
+
+    @staticmethod
+    def _transaction_gi(tx: Transaction) -> float:
+        """GI score a transaction is signed with, clamped to [0, 1]"""
+        try:
+            gi_score = float(tx.data.get("gi_score", 0.0))
+        except (TypeError, ValueError):
+            return 0.0
+        return min(max(gi_score, 0.0), 1.0)
+
+    @property
+    def pending_transactions(self) -> List[Transaction]:
+        """Copy of the pending transactions in arrival order (len(self.mempool) counts them)"""
+        return list(self.mempool)
+
+    def _block_ready(self) -> bool:
+        """Whether the mempool holds a full block"""
+        return len(self.mempool) >= self.max_block_txs or self.mempool.bytes >= self.max_block_bytes
+
+    def _can_seal(self) -> bool:
+        """Whether a registered validator has the GI to seal a block"""
+        return any(gi >= self.MIN_VALIDATOR_GI for gi in self.validators.values())
+
+    def _expire_pending(self, now: float):
+        """Evict expired transactions, resolving their inclusion futures to None"""
+        for tx in self.mempool.expire(now):
+            future = self._inclusion.pop(tx.tx_id, None)
+            if future is not None and not future.done():
+                future.set_result(None)
+        if len(self.mempool) < self.high_water_mark:
+            self._space.set()
+
+    async def start(self):
+        """Start the background block producer"""
+        if self._producer is None:
+            self._producer = asyncio.create_task(self._produce_blocks())
+
+    async def stop(self):
+        """Stop the block producer, sealing what is still pending if a validator is available"""
+        if self._producer is None:
+            return
+        producer, self._producer = self._producer, None
+        self._wake.set()
+        await producer
+        while len(self.mempool) and await self._mine_block():
+            pass
+
+    async def _produce_blocks(self):
+        """Seal a block whenever one is full or the oldest pending transaction is BLOCK_TIME old"""
+        loop = asyncio.get_running_loop()
+        while self._producer is not None:
+            self._expire_pending(loop.time())
+            if not len(self.mempool):
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+
+            remaining = self.mempool.oldest_arrival() + self.BLOCK_TIME - loop.time()
+            if remaining > 0 and not self._block_ready():
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            if not await self._mine_block():
+                # No validator or no consensus: retry after a block interval
+                await asyncio.sleep(self.BLOCK_TIME)
 
     async def _validate_transaction(self, tx: Transaction) -> bool:
         """
@@ -210,8 +577,16 @@ class CivicLedger:
         - GI signature is valid
         - Not a duplicate
         """
-        # Check for duplicate
-        if tx.tx_id in self.transaction_pool:
+        # Check for duplicate (pending or already confirmed)
+        if tx.tx_id in self.mempool or tx.tx_id in self.tx_index:
+            return False
+
+        # Per-sender pending limit
+        if self.mempool.sender_count(tx.from_address) >= self.mempool.max_per_sender:
+            return False
+
+        # A transaction must fit in a block on its own
+        if self._tx_size(tx) > self.max_block_bytes:
             return False
 
         # Verify signature (simplified - in production use cryptographic verification)
@@ -222,44 +597,47 @@ class CivicLedger:
         if not tx.data or not isinstance(tx.data, dict):
             return False
 
-        # Verify timestamp is recent (within 5 minutes)
+        # Verify timestamp is recent (within TX_TTL, 5 minutes)
         age_seconds = (datetime.utcnow() - tx.timestamp).total_seconds()
-        if age_seconds > 300:  # 5 minutes
+        if age_seconds > self.TX_TTL:
             return False
 
         return True
 
-    async def _mine_block(self):
+    async def _mine_block(self) -> bool:
         """
         Mine a new block (Proof-of-Integrity consensus)
 
         Steps:
         1. Select validator with highest GI score
-        2. Create block with pending transactions
+        2. Create block with the highest-priority pending transactions that fit
         3. Get consensus from other validators
         4. Add block to chain
+
+        Returns:
+            True if a block was added
         """
-        if not self.pending_transactions:
-            return
+        if not len(self.mempool):
+            return False
 
         # Select validator
         validator = await self._select_validator()
         if not validator:
             # No valid validators, wait
-            return
+            return False
 
         # Get validator GI score
         validator_gi = self.validators.get(validator, 0.0)
         if validator_gi < self.MIN_VALIDATOR_GI:
-            return
+            return False
 
         # Create block
-        previous_block = self.chain[-1]
         block = Block(
             block_number=self.block_height + 1,
             timestamp=datetime.utcnow(),
-            previous_hash=previous_block.hash(),
-            transactions=self.pending_transactions[:],
+            previous_hash=self._last_block_hash,
+            transactions=self.mempool.select(self.max_block_txs, self.max_block_bytes,
+                                             self.max_sender_block_txs),
             validator=validator,
             consensus_proof=ConsensusProof(
                 type="proof_of_integrity",
@@ -272,18 +650,22 @@ class CivicLedger:
         # Get consensus from other validators
         consensus_reached = await self._get_consensus(block)
 
-        if consensus_reached:
-            # Add block to chain
-            self.chain.append(block)
+        if consensus_reached and self._append_block(block):
             self.block_height += 1
 
-            # Clear pending transactions
-            for tx in self.pending_transactions:
-                if tx.tx_id in self.transaction_pool:
-                    del self.transaction_pool[tx.tx_id]
-            self.pending_transactions = []
+            # Remove the included transactions from the mempool
+            for tx in block.transactions:
+                self.mempool.remove(tx.tx_id)
+                future = self._inclusion.pop(tx.tx_id, None)
+                if future is not None and not future.done():
+                    future.set_result(self.tx_index[tx.tx_id])
+            if len(self.mempool) < self.high_water_mark:
+                self._space.set()
 
             print(f"✅ Block {block.block_number} mined by {validator} (GI: {validator_gi:.3f})")
+            return True
+
+        return False
 
     async def _select_validator(self) -> Optional[str]:
         """
@@ -350,6 +732,7 @@ class CivicLedger:
             gi_score: Current GI score (must be >= 0.95)
         """
         if gi_score >= self.MIN_VALIDATOR_GI:
+            self._validator_gi_total += gi_score - self.validators.get(address, 0.0)
             self.validators[address] = gi_score
             print(f"✅ Validator registered: {address} (GI: {gi_score:.3f})")
         else:
@@ -368,16 +751,32 @@ class CivicLedger:
     def get_transaction(self, tx_id: str) -> Optional[Transaction]:
         """Get transaction by ID"""
         # Check pending pool first
-        if tx_id in self.transaction_pool:
-            return self.transaction_pool[tx_id]
-
-        # Search confirmed transactions
-        for block in self.chain:
-            for tx in block.transactions:
-                if tx.tx_id == tx_id:
-                    return tx
+        pending = self.mempool.get(tx_id)
+        if pending is not None:
+            return pending
 
-        return None
+        position = self.tx_index.get(tx_id)
+        if position is None:
+            return None
+        block_number, index = position
+        return self.chain[block_number].transactions[index]
+
+    def get_transaction_location(self, tx_id: str) -> Optional[Tuple[int, int]]:
+        """Get (block_number, index) of a confirmed transaction"""
+        return self.tx_index.get(tx_id)
+
+    def get_transactions_by_type(self, tx_type: str, limit: int = 100) -> List[Transaction]:
+        """Get the most recent confirmed transactions of a type, newest first"""
+        positions = self.txs_by_type.get(tx_type, [])
+        return [
+            self.chain[block_number].transactions[index]
+            for block_number, index in reversed(positions[-limit:])
+        ] if limit > 0 else []
+
+    def get_blocks_by_validator(self, validator: str, limit: int = 100) -> List[Block]:
+        """Get the most recent blocks produced by a validator, newest first"""
+        numbers = self.blocks_by_validator.get(validator, [])
+        return [self.chain[n] for n in reversed(numbers[-limit:])] if limit > 0 else []
 
     def verify_chain(self) -> bool:
         """
@@ -395,28 +794,35 @@ class CivicLedger:
             # Verify previous hash
             if current_block.previous_hash != previous_block.hash():
                 print(f"❌ Invalid previous hash at block {i}")
+                self._chain_valid = False
                 return False
 
             # Verify Merkle root
             calculated_merkle = current_block.calculate_merkle_root()
             if current_block.merkle_root != calculated_merkle:
                 print(f"❌ Invalid Merkle root at block {i}")
+                self._chain_valid = False
                 return False
 
+        self._chain_valid = True
         return True
 
     def get_chain_stats(self) -> Dict:
-        """Get blockchain statistics"""
-        total_transactions = sum(len(block.transactions) for block in self.chain)
+        """
+        Get blockchain statistics
 
+        O(1): counts are kept as blocks are added, and chain_valid is the
+        result of the last full verify_chain() (bad blocks are never
+        appended).
+        """
         return {
             "block_height": self.block_height,
             "total_blocks": len(self.chain),
-            "total_transactions": total_transactions,
-            "pending_transactions": len(self.pending_transactions),
+            "total_transactions": self.total_transactions,
+            "pending_transactions": len(self.mempool),
             "validators": len(self.validators),
-            "average_gi": sum(self.validators.values()) / len(self.validators) if self.validators else 0,
-            "chain_valid": self.verify_chain()
+            "average_gi": self._validator_gi_total / len(self.validators) if self.validators else 0,
+            "chain_valid": self._chain_valid
         }
 
 
@@ -425,8 +831,9 @@ if __name__ == "__main__":
     async def demo():
         print("🏛️ Civic Ledger Demo - Proof-of-Integrity Blockchain\n")
 
-        # Create ledger
+        # Create ledger and start producing blocks
         ledger = CivicLedger()
+        await ledger.start()
 
         # Register validators
         ledger.register_validator("atlas@civic.os", 0.994)
@@ -452,8 +859,9 @@ if __name__ == "__main__":
             # Small delay to simulate real-world timing
             await asyncio.sleep(0.1)
 
-        # Wait for final block to mine
-        await asyncio.sleep(1)
+        # The last 5 transactions are sealed once BLOCK_TIME has passed
+        await asyncio.sleep(ledger.BLOCK_TIME + 0.5)
+        await ledger.stop()
 
         # Display stats
         print("\n📊 Blockchain Statistics:")
@@ -3,12 +3,15 @@ Lab1: Cryptographic Attestation Module
 ED25519-based signing and verification for Kaizen-OS Civic Ledger
 """
 
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass, asdict
 from datetime import datetime
-import hashlib
-import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import base64
+import threading
+
+from civic_sdk.canonical import CanonicalEncoder
 
 try:
     from cryptography.hazmat.primitives.asymmetric import ed25519
@@ -18,6 +21,9 @@ except ImportError:
     print("Warning: cryptography library not installed. Install with: pip install cryptography")
     ed25519 = None
 
+# Attested hashes are over sorted-key, compact, ASCII-escaped JSON
+_HASH_ENCODER = CanonicalEncoder(ensure_ascii=True)
+
 
 @dataclass
 class Signature:
@@ -45,20 +51,44 @@ class CryptoAttestationEngine:
     Features:
     - Generate ED25519 keypairs
     - Sign arbitrary data (transactions, blocks, GI scores)
-    - Verify signatures
+    - Verify signatures, singly or in batches
     - Create attestation records
+
+    Batch signing and verification hash the payload once for all signers,
+    and parsed public keys are kept in a bounded LRU. With ``max_workers``
+    above 1, large verification batches are split across a thread pool; it
+    is off by default, since on a single core the pool measured slower than
+    a plain loop.
     """
 
     ALGORITHM = "ED25519"
     HASH_ALGORITHM = "SHA-256"
 
-    def __init__(self):
-        """Initialize the attestation engine"""
+    # Batches smaller than this are verified on the calling thread
+    PARALLEL_THRESHOLD = 256
+
+    def __init__(self, key_cache_size: int = 4096, max_workers: int = 1):
+        """
+        Initialize the attestation engine
+
+        Args:
+            key_cache_size: Parsed public keys kept for verification
+            max_workers: Threads used by verify_batch; 1 verifies on the
+                calling thread
+        """
         if ed25519 is None:
             raise ImportError("cryptography library required. Install with: pip install cryptography")
 
         # In-memory key storage (in production, use HSM or encrypted storage)
         self.keypairs: Dict[str, Tuple[ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey]] = {}
+        self._public_keys_b64: Dict[str, str] = {}
+
+        # Verification: base64 public key -> parsed key (LRU)
+        self.key_cache_size = max(1, key_cache_size)
+        self._key_cache: "OrderedDict[str, ed25519.Ed25519PublicKey]" = OrderedDict()
+        self._key_cache_lock = threading.Lock()
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
 
     def generate_keypair(self, entity_id: str) -> Dict[str, str]:
         """
@@ -89,9 +119,11 @@ class CryptoAttestationEngine:
             format=serialization.PublicFormat.Raw
         )
 
+        self._public_keys_b64[entity_id] = base64.b64encode(public_bytes).decode('utf-8')
+
         return {
             "entity_id": entity_id,
-            "public_key": base64.b64encode(public_bytes).decode('utf-8'),
+            "public_key": self._public_keys_b64[entity_id],
             "private_key": base64.b64encode(private_bytes).decode('utf-8'),  # Keep secure!
             "algorithm": self.ALGORITHM,
             "created_at": datetime.utcnow().isoformat()
@@ -124,9 +156,11 @@ class CryptoAttestationEngine:
             format=serialization.PublicFormat.Raw
         )
 
+        self._public_keys_b64[entity_id] = base64.b64encode(public_bytes).decode('utf-8')
+
         return {
             "entity_id": entity_id,
-            "public_key": base64.b64encode(public_bytes).decode('utf-8'),
+            "public_key": self._public_keys_b64[entity_id],
             "algorithm": self.ALGORITHM
         }
 
@@ -135,18 +169,12 @@ class CryptoAttestationEngine:
         Create SHA-256 hash of data
 
         Args:
-            data: Dictionary to hash
+            data: Dictionary to hash (a freeze()d payload caches its hash)
 
         Returns:
             Hex-encoded SHA-256 hash
         """
-        # Serialize data deterministically
-        canonical = json.dumps(data, sort_keys=True, separators=(',', ':'))
-
-        # Hash
-        hash_obj = hashlib.sha256(canonical.encode('utf-8'))
-
-        return hash_obj.hexdigest()
+        return _HASH_ENCODER.sha256(data)
 
     def sign(self, entity_id: str, data: Dict) -> Signature:
         """
@@ -159,27 +187,43 @@ class CryptoAttestationEngine:
         Returns:
             Signature object
         """
+        return self._sign_message(entity_id, self.hash_data(data).encode('utf-8'))
+
+    def sign_batch(self, entity_ids: Sequence[str], data: Dict) -> List[Signature]:
+        """
+        Sign the same data with several entities' keys, hashing it once
+
+        Args:
+            entity_ids: Signer identifiers
+            data: Data to sign
+
+        Returns:
+            One Signature per entity, in order
+        """
+        message = self.hash_data(data).encode('utf-8')
+        return [self._sign_message(entity_id, message) for entity_id in entity_ids]
+
+    def _sign_message(self, entity_id: str, message: bytes) -> Signature:
         if entity_id not in self.keypairs:
             raise ValueError(f"No keypair found for entity: {entity_id}")
 
         private_key, public_key = self.keypairs[entity_id]
 
-        # Hash the data
-        data_hash = self.hash_data(data)
-        message = data_hash.encode('utf-8')
-
         # Sign
         signature_bytes = private_key.sign(message)
 
-        # Serialize public key
-        public_bytes = public_key.public_bytes(
-            encoding=serialization.Encoding.Raw,
-            format=serialization.PublicFormat.Raw
-        )
+        # Serialize public key (once per entity)
+        public_key_b64 = self._public_keys_b64.get(entity_id)
+        if public_key_b64 is None:
+            public_bytes = public_key.public_bytes(
+                encoding=serialization.Encoding.Raw,
+                format=serialization.PublicFormat.Raw
+            )
+            public_key_b64 = self._public_keys_b64[entity_id] = base64.b64encode(public_bytes).decode('utf-8')
 
         return Signature(
             signature=base64.b64encode(signature_bytes).decode('utf-8'),
-            public_key=base64.b64encode(public_bytes).decode('utf-8'),
+            public_key=public_key_b64,
             algorithm=self.ALGORITHM,
             timestamp=datetime.utcnow().isoformat(),
             signer=entity_id
@@ -197,27 +241,102 @@ class CryptoAttestationEngine:
             True if signature is valid, False otherwise
         """
         try:
-            # Decode signature and public key
-            signature_bytes = base64.b64decode(signature.signature)
-            public_bytes = base64.b64decode(signature.public_key)
+            return self._verify_message(signature.signature, signature.public_key,
+                                        self.hash_data(data).encode('utf-8'))
+        except Exception as e:
+            print(f"Verification error: {e}")
+            return False
 
-            # Reconstruct public key
-            public_key = ed25519.Ed25519PublicKey.from_public_bytes(public_bytes)
+    def verify_batch(
+        self,
+        signatures: Sequence[Union[Signature, Tuple[str, str]]],
+        data: Dict
+    ) -> List[bool]:
+        """
+        Verify many signatures over the same data in one call
 
-            # Hash the data
-            data_hash = self.hash_data(data)
-            message = data_hash.encode('utf-8')
+        The data is canonicalized and hashed once for the whole batch. With
+        max_workers > 1, batches of at least PARALLEL_THRESHOLD signatures
+        are split across the thread pool.
 
-            # Verify
-            public_key.verify(signature_bytes, message)
+        Args:
+            signatures: Signature objects or (signature_b64, public_key_b64) pairs
+            data: Original data that was signed
 
-            return True
+        Returns:
+            One result per signature, in order (malformed entries are False)
+        """
+        return self._verify_message_batch(signatures, self.hash_data(data).encode('utf-8'))
 
+    def _verify_message_batch(
+        self,
+        signatures: Sequence[Union[Signature, Tuple[str, str]]],
+        message: bytes
+    ) -> List[bool]:
+        if len(signatures) < self.PARALLEL_THRESHOLD or self.max_workers == 1:
+            return self._verify_chunk(signatures, message)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="attestation-verify")
+        chunk_size = -(-len(signatures) // self.max_workers)
+        futures = [
+            self._executor.submit(self._verify_chunk, signatures[i:i + chunk_size], message)
+            for i in range(0, len(signatures), chunk_size)
+        ]
+        results: List[bool] = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def _verify_chunk(
+        self,
+        signatures: Sequence[Union[Signature, Tuple[str, str]]],
+        message: bytes
+    ) -> List[bool]:
+        results = []
+        for sig in signatures:
+            try:
+                signature_b64, public_key_b64 = (
+                    (sig.signature, sig.public_key) if isinstance(sig, Signature) else sig
+                )
+                results.append(self._verify_message(signature_b64, public_key_b64, message))
+            except Exception:
+                results.append(False)
+        return results
+
+    def _verify_message(self, signature_b64: str, public_key_b64: str, message: bytes) -> bool:
+        """Verify one signature over an already-hashed message; raises on malformed input"""
+        public_key = self._public_key(public_key_b64)
+        try:
+            public_key.verify(base64.b64decode(signature_b64), message)
+            return True
         except InvalidSignature:
             return False
-        except Exception as e:
-            print(f"Verification error: {e}")
-            return False
+
+    def _public_key(self, public_key_b64: str) -> "ed25519.Ed25519PublicKey":
+        """Parsed public key, from the LRU cache when possible"""
+        # The engine may be shared across threads: a lookup and its
+        # move_to_end must not interleave with another thread's eviction
+        with self._key_cache_lock:
+            public_key = self._key_cache.get(public_key_b64)
+            if public_key is not None:
+                self._key_cache.move_to_end(public_key_b64)
+                return public_key
+
+        public_key = ed25519.Ed25519PublicKey.from_public_bytes(base64.b64decode(public_key_b64))
+
+        with self._key_cache_lock:
+            self._key_cache[public_key_b64] = public_key
+            if len(self._key_cache) > self.key_cache_size:
+                self._key_cache.popitem(last=False)
+        return public_key
+
+    def close(self):
+        """Shut down the verification thread pool, if one was started"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
 
     def create_attestation(
         self,
@@ -238,11 +357,9 @@ class CryptoAttestationEngine:
         Returns:
             Attestation object
         """
-        # Hash the data
+        # Hash the data once; the signature is over the same hash
         data_hash = self.hash_data(data)
-
-        # Sign the data
-        signature = self.sign(entity_id, data)
+        signature = self._sign_message(entity_id, data_hash.encode('utf-8'))
 
         # Create attestation
         return Attestation(
@@ -268,8 +385,8 @@ class CryptoAttestationEngine:
         if attestation.data_hash != expected_hash:
             return False
 
-        # Verify signature
-        return self.verify(attestation.signature, original_data)
+        # Verify signature over the hash computed above
+        return self._verify_message_batch([attestation.signature], expected_hash.encode('utf-8'))[0]
 
     def create_multisig_attestation(
         self,
@@ -292,15 +409,14 @@ class CryptoAttestationEngine:
         Returns:
             Multi-signature attestation dict
         """
-        # Hash the data
+        # Hash the data once and sign that hash with each known key
         data_hash = self.hash_data(data)
-
-        # Collect signatures
-        signatures = []
-        for entity_id in entity_ids:
-            if entity_id in self.keypairs:
-                sig = self.sign(entity_id, data)
-                signatures.append(asdict(sig))
+        message = data_hash.encode('utf-8')
+        signatures = [
+            asdict(self._sign_message(entity_id, message))
+            for entity_id in entity_ids
+            if entity_id in self.keypairs
+        ]
 
         return {
             "data_hash": data_hash,
@@ -335,16 +451,14 @@ class CryptoAttestationEngine:
         if multisig["data_hash"] != expected_hash:
             return False
 
-        # Count valid signatures
+        # Count valid signatures (the data was hashed above; verify them all in one batch)
         threshold = min_threshold or multisig["threshold"]
-        valid_signatures = 0
-
-        for sig_dict in multisig["signatures"]:
-            sig = Signature(**sig_dict)
-            if self.verify(sig, original_data):
-                valid_signatures += 1
+        results = self._verify_message_batch(
+            [(sig["signature"], sig["public_key"]) for sig in multisig["signatures"]],
+            expected_hash.encode('utf-8')
+        )
 
-        return valid_signatures >= threshold
+        return sum(results) >= threshold
 
 
 # --- Convenience Functions ---
@@ -0,0 +1,174 @@
+# tests/test_civic_ledger.py
+"""CivicLedger indexes confirmed transactions, never appends a bad block and seals on size or time."""
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from civic_ledger import Block, CivicLedger, ConsensusProof, Transaction  # noqa: E402
+
+
+def make_tx(tx_id, tx_type="civic.reflection", sender="atlas@civic.os", gi_score=0.99):
+    return Transaction(tx_id=tx_id, type=tx_type, from_address=sender,
+                       data={"content": tx_id, "gi_score": gi_score},
+                       gi_signature=f"sig_{tx_id}", timestamp=datetime.utcnow())
+
+
+def submit_all(ledger, txs):
+    async def run():
+        for tx in txs:
+            await ledger.submit(tx)
+    asyncio.run(run())
+
+
+def filled_ledger():
+    """Six blocks of two from alternating validators, plus one transaction left pending"""
+    ledger = CivicLedger(max_block_txs=2)
+    ledger.register_validator("atlas@civic.os", 0.99)
+    types = ["civic.reflection", "delib_proof", "eomm_capsule"]
+    txs = [make_tx(f"tx_{i:02d}", types[i % 3], gi_score=0.5) for i in range(13)]
+    for start in range(0, 12, 2):
+        # The higher-GI validator seals each block
+        ledger.register_validator("jade@civic.os", 0.999 if start % 4 else 0.95)
+        submit_all(ledger, txs[start:start + 2])
+    submit_all(ledger, txs[12:])
+    return ledger, txs
+
+
+def test_get_transaction_uses_the_index():
+    ledger, txs = filled_ledger()
+    assert ledger.block_height == 6 and len(ledger.mempool) == 1
+    for tx in txs[:12]:
+        block_number, index = ledger.get_transaction_location(tx.tx_id)
+        assert ledger.chain[block_number].transactions[index] is tx
+        assert ledger.get_transaction(tx.tx_id) is tx
+
+    # Pending transactions come from the mempool and have no location yet
+    assert ledger.get_transaction("tx_12") is txs[12]
+    assert ledger.get_transaction_location("tx_12") is None
+    assert ledger.get_transaction("missing") is None
+
+    # Lookups never touch the chain beyond the indexed position
+    ledger.chain[1].transactions = []
+    assert ledger.get_transaction("tx_02") is txs[2]
+
+
+def test_secondary_indexes():
+    ledger, txs = filled_ledger()
+    reflections = ledger.get_transactions_by_type("civic.reflection")
+    assert [tx.tx_id for tx in reflections] == ["tx_09", "tx_06", "tx_03", "tx_00"]
+    assert [tx.tx_id for tx in ledger.get_transactions_by_type("delib_proof", limit=2)] == ["tx_10", "tx_07"]
+    assert ledger.get_transactions_by_type("civic.reflection", limit=0) == []
+    assert ledger.get_transactions_by_type("unknown") == []
+
+    by_jade = ledger.get_blocks_by_validator("jade@civic.os")
+    by_atlas = ledger.get_blocks_by_validator("atlas@civic.os")
+    assert [block.block_number for block in by_jade] == [6, 4, 2]
+    assert [block.block_number for block in by_atlas] == [5, 3, 1]
+    assert [block.block_number for block in ledger.get_blocks_by_validator("genesis@civic.os")] == [0]
+    assert ledger.get_blocks_by_validator("nobody") == []
+
+
+def test_running_stats_match_a_full_scan():
+    ledger, _ = filled_ledger()
+    stats = ledger.get_chain_stats()
+    assert stats["total_transactions"] == sum(len(block.transactions) for block in ledger.chain) == 12
+    assert stats["total_blocks"] == len(ledger.chain) == 7
+    assert stats["pending_transactions"] == 1
+    assert stats["validators"] == 2
+    assert abs(stats["average_gi"] - (0.99 + 0.999) / 2) < 1e-12  # jade re-registered five times
+    assert stats["chain_valid"] and ledger.verify_chain()
+
+
+def test_bad_blocks_are_rejected_without_changes():
+    ledger, _ = filled_ledger()
+    before = (len(ledger.chain), dict(ledger.tx_index), ledger.total_transactions,
+              ledger.get_chain_stats(), ledger._last_block_hash)
+
+    def block(**overrides):
+        fields = dict(block_number=len(ledger.chain), timestamp=datetime.utcnow(),
+                      previous_hash=ledger._last_block_hash, transactions=[make_tx("late")],
+                      validator="rogue@civic.os", consensus_proof=ConsensusProof())
+        fields.update(overrides)
+        return Block(**fields)
+
+    tampered = block()
+    tampered.transactions[0].data["content"] = "changed"
+    for bad in (block(previous_hash="0" * 64), block(block_number=3), tampered):
+        assert not ledger._append_block(bad)
+        assert (len(ledger.chain), dict(ledger.tx_index), ledger.total_transactions,
+                ledger.get_chain_stats(), ledger._last_block_hash) == before
+        assert "late" not in ledger.tx_index
+        assert ledger.get_blocks_by_validator("rogue@civic.os") == []
+        assert ledger.get_transactions_by_type("civic.reflection")[0].tx_id == "tx_09"
+
+    assert ledger._append_block(block())
+    assert ledger.get_transaction_location("late") == (7, 0)
+    assert ledger.verify_chain()
+
+
+def producer_ledger(block_time=10.0, **kwargs):
+    ledger = CivicLedger(**kwargs)
+    ledger.BLOCK_TIME = block_time
+    ledger.register_validator("atlas@civic.os", 0.99)
+    return ledger
+
+
+def test_a_full_block_is_sealed_without_waiting_for_block_time():
+    async def run():
+        ledger = producer_ledger(max_block_txs=3)
+        await ledger.start()
+        futures = [await ledger.submit(make_tx(f"tx_{i}")) for i in range(4)]
+        locations = await asyncio.wait_for(asyncio.gather(*futures[:3]), 1.0)
+        assert sorted(locations) == [(1, 0), (1, 1), (1, 2)]
+        assert not futures[3].done() and len(ledger.mempool) == 1
+        await ledger.stop()
+        assert await futures[3] == (2, 0)
+    asyncio.run(run())
+
+
+def test_a_lone_transaction_is_sealed_after_block_time():
+    async def run():
+        loop = asyncio.get_running_loop()
+        ledger = producer_ledger(block_time=0.2, max_block_txs=10)
+        await ledger.start()
+        started = loop.time()
+        future = await ledger.submit(make_tx("lone"))
+        await asyncio.sleep(0.1)
+        assert not future.done()
+        assert await asyncio.wait_for(future, 1.0) == (1, 0)
+        assert loop.time() - started >= 0.2
+        await ledger.stop()
+        assert ledger.block_height == 1
+    asyncio.run(run())
+
+
+def test_submitters_wait_at_the_high_water_mark():
+    async def run():
+        # Without a validator nothing is sealed, so the pool fills up
+        ledger = CivicLedger(max_block_txs=2, high_water_mark=4)
+        for i in range(4):
+            await ledger.submit(make_tx(f"tx_{i}"))
+        assert len(ledger.mempool) == 4 and ledger.block_height == 0
+        with pytest.raises(RuntimeError, match="no validator"):
+            await ledger.submit(make_tx("refused"))
+
+        ledger.register_validator("atlas@civic.os", 0.99)
+        with pytest.raises(asyncio.TimeoutError):
+            await ledger.submit(make_tx("impatient"), timeout=0.05)
+        waiting = asyncio.ensure_future(ledger.submit(make_tx("patient")))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+
+        ledger.BLOCK_TIME = 10.0
+        await ledger.start()
+        inclusion = await asyncio.wait_for(waiting, 1.0)
+        assert ledger.block_height >= 1 and len(ledger.mempool) < 4
+        await ledger.stop()
+        assert await inclusion is not None
+        assert "refused" not in ledger.tx_index and "impatient" not in ledger.tx_index
+    asyncio.run(run())
@@ -0,0 +1,149 @@
+# tests/test_crypto_attestation.py
+"""verify_batch keeps order, pooled or not, and rejects malformed entries; keys are LRU-cached; multisig counts to its threshold."""
+import base64
+import os
+import sys
+import threading
+from dataclasses import replace
+
+import pytest
+
+pytest.importorskip("cryptography")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from crypto_attestation import CryptoAttestationEngine  # noqa: E402
+
+DATA = {"delib_id": "delib_001", "decision": "APPROVED", "votes": [1, 2, 3]}
+OTHER = {"delib_id": "delib_001", "decision": "REJECTED", "votes": [1, 2, 3]}
+
+
+@pytest.fixture
+def engine():
+    engine = CryptoAttestationEngine()
+    for name in ("atlas", "aurea", "zenith", "jade"):
+        engine.generate_keypair(name)
+    return engine
+
+
+def test_verify_batch_results_follow_the_input_order(engine):
+    good = engine.sign_batch(["atlas", "aurea", "zenith", "jade"], DATA)
+    bad = engine.sign_batch(["atlas", "aurea", "zenith", "jade"], OTHER)
+    batch = [good[0], bad[1], (good[2].signature, good[2].public_key), bad[3], good[3],
+             (bad[0].signature, bad[0].public_key), good[1]]
+    assert engine.verify_batch(batch, DATA) == [True, False, True, False, True, False, True]
+    assert engine.verify_batch(batch, OTHER) == [False, True, False, True, False, True, False]
+    assert [engine.verify(sig, DATA) for sig in good] == [True] * 4
+    assert engine.verify_batch([], DATA) == []
+
+
+def test_malformed_entries_are_false(engine):
+    good = engine.sign("atlas", DATA)
+    short_key = base64.b64encode(b"\x01" * 16).decode()
+    batch = [
+        good,
+        replace(good, signature="!!not base64!!"),
+        replace(good, public_key=short_key),
+        (good.signature,),
+        (good.signature, good.public_key, "extra"),
+        None,
+        (None, good.public_key),
+        (good.signature, good.public_key),
+    ]
+    assert engine.verify_batch(batch, DATA) == [True, False, False, False, False, False, False, True]
+    assert not engine.verify(replace(good, public_key=short_key), DATA)
+
+
+def test_parsed_keys_are_evicted_least_recently_used_first(engine):
+    engine = CryptoAttestationEngine(key_cache_size=2)
+    signatures = {}
+    for name in ("a", "b", "c"):
+        engine.generate_keypair(name)
+        signatures[name] = engine.sign(name, DATA)
+    keys = {name: sig.public_key for name, sig in signatures.items()}
+
+    assert engine.verify_batch([signatures["a"], signatures["b"], signatures["a"]], DATA) == [True] * 3
+    assert list(engine._key_cache) == [keys["b"], keys["a"]]
+    cached_a = engine._key_cache[keys["a"]]
+
+    assert engine.verify(signatures["c"], DATA)
+    assert list(engine._key_cache) == [keys["a"], keys["c"]]  # b was least recently used
+    assert engine._key_cache[keys["a"]] is cached_a
+
+    # An evicted key is parsed again and still verifies
+    assert engine.verify(signatures["b"], DATA)
+    assert list(engine._key_cache) == [keys["c"], keys["b"]]
+
+
+def test_pooled_batches_match_serial(engine):
+    pooled = CryptoAttestationEngine(max_workers=3)
+    good = engine.sign_batch(["atlas", "aurea", "zenith", "jade"], DATA)
+    bad = engine.sign("atlas", OTHER)
+    batch = []
+    for i in range(pooled.PARALLEL_THRESHOLD + 37):
+        batch.append(bad if i % 7 == 0 else None if i % 31 == 0 else good[i % 4])
+
+    serial = engine.verify_batch(batch, DATA)
+    assert serial.count(True) and serial.count(False)
+    assert pooled.verify_batch(batch, DATA) == serial
+    assert pooled._executor is not None
+    assert pooled.verify_batch(batch[:10], DATA) == serial[:10]  # small batches stay inline
+    pooled.close()
+    assert pooled._executor is None
+    assert engine._executor is None  # the default engine never starts a pool
+
+
+def test_shared_engine_with_a_tiny_cache_verifies_from_many_threads():
+    engine = CryptoAttestationEngine(key_cache_size=2)
+    signatures = []
+    for i in range(8):
+        engine.generate_keypair(f"signer_{i}")
+        signatures.append(engine.sign(f"signer_{i}", DATA))
+    failures = []
+
+    def check(offset):
+        for round_ in range(150):
+            sig = signatures[(offset + round_) % len(signatures)]
+            if not engine.verify(sig, DATA):
+                failures.append(sig.signer)
+
+    threads = [threading.Thread(target=check, args=(i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert failures == []
+    assert len(engine._key_cache) <= 2
+
+
+def test_multisig_threshold(engine):
+    multisig = engine.create_multisig_attestation(["atlas", "aurea", "zenith", "unknown"], DATA,
+                                                  "consensus", threshold=2)
+    assert multisig["valid"] and multisig["total_signers"] == 4
+    assert [sig["signer"] for sig in multisig["signatures"]] == ["atlas", "aurea", "zenith"]
+    assert engine.verify_multisig_attestation(multisig, DATA)
+    assert engine.verify_multisig_attestation(multisig, DATA, min_threshold=3)
+    assert not engine.verify_multisig_attestation(multisig, DATA, min_threshold=4)
+    assert not engine.verify_multisig_attestation(multisig, OTHER)
+
+    # Forged signatures do not count towards the threshold
+    forged = engine.sign("jade", OTHER)
+    multisig["signatures"][0]["signature"] = forged.signature
+    assert engine.verify_multisig_attestation(multisig, DATA)
+    assert not engine.verify_multisig_attestation(multisig, DATA, min_threshold=3)
+    multisig["signatures"][1]["public_key"] = "garbage"
+    assert not engine.verify_multisig_attestation(multisig, DATA)
+
+    short = engine.create_multisig_attestation(["atlas", "nobody"], DATA, "consensus", threshold=2)
+    assert not short["valid"] and not engine.verify_multisig_attestation(short, DATA)
+
+
+def test_attestation_detects_tampering(engine):
+    attestation = engine.create_attestation("atlas", DATA, "delib_proof")
+    assert attestation.data_hash == engine.hash_data(dict(DATA))
+    assert engine.verify_attestation(attestation, DATA)
+    assert not engine.verify_attestation(attestation, OTHER)
+
+    # The hash still matches, but the signature is over other data
+    attestation.signature = engine.sign("atlas", OTHER)
+    assert not engine.verify_attestation(attestation, DATA)
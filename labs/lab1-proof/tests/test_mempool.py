@@ -0,0 +1,127 @@
+# tests/test_mempool.py
+"""Mempool serves by GI and age, caps noisy senders, expires within a slot and drops stale heap items."""
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from civic_ledger import Mempool, Transaction  # noqa: E402
+
+UNLIMITED = 10**9
+
+
+def make_tx(tx_id, sender="atlas@civic.os"):
+    return Transaction(tx_id=tx_id, type="civic.reflection", from_address=sender, data={"n": tx_id},
+                       gi_signature=f"sig_{tx_id}", timestamp=datetime(2025, 1, 1))
+
+
+def ids(txs):
+    return [tx.tx_id for tx in txs]
+
+
+def test_priority_is_gi_plus_waiting_time():
+    pool = Mempool(gi_weight=60.0)
+    pool.add(make_tx("old_low", "a"), 0.0, 10, now=0.0)      # key 0
+    pool.add(make_tx("mid", "c"), 0.5, 10, now=20.0)         # key -10, arrived first
+    pool.add(make_tx("new_high", "b"), 1.0, 10, now=50.0)    # key -10
+    pool.add(make_tx("late_low", "d"), 0.0, 10, now=100.0)   # key 100
+    order = ["mid", "new_high", "old_low", "late_low"]
+    assert ids(pool.select(10, UNLIMITED, UNLIMITED)) == order
+
+    # Selecting leaves the pool as it was
+    assert len(pool) == 4 and ids(pool) == ["old_low", "mid", "new_high", "late_low"]
+    assert ids(pool.select(2, UNLIMITED, UNLIMITED)) == order[:2]
+    assert ids(pool.select(10, UNLIMITED, UNLIMITED)) == order
+
+
+def test_byte_limit_stops_the_block_but_always_takes_one():
+    pool = Mempool()
+    for i, size in enumerate([70, 20, 20, 5]):
+        pool.add(make_tx(f"tx_{i}", f"s{i}"), 0.0, size, now=float(i))
+    assert ids(pool.select(10, 100, UNLIMITED)) == ["tx_0", "tx_1"]  # tx_2 would pass 100
+    assert ids(pool.select(10, 10, UNLIMITED)) == ["tx_0"]
+    assert pool.bytes == 115
+
+
+def test_noisy_sender_is_capped():
+    pool = Mempool(max_per_sender=5)
+    for i in range(5):
+        assert pool.add(make_tx(f"noisy_{i}", "noisy"), 1.0, 10, now=float(i))
+    assert not pool.add(make_tx("noisy_5", "noisy"), 1.0, 10, now=5.0)
+    assert pool.sender_count("noisy") == 5
+    for i in range(2):
+        pool.add(make_tx(f"quiet_{i}", "quiet"), 0.0, 10, now=10.0 + i)
+
+    # Two per sender while others wait, then topped up from what was passed over
+    assert ids(pool.select(4, UNLIMITED, 2)) == ["noisy_0", "noisy_1", "quiet_0", "quiet_1"]
+    assert ids(pool.select(6, UNLIMITED, 2)) == ["noisy_0", "noisy_1", "quiet_0", "quiet_1",
+                                                 "noisy_2", "noisy_3"]
+
+    # A slot frees up once one of its transactions leaves
+    pool.remove("noisy_0")
+    assert pool.sender_count("noisy") == 4
+    assert pool.add(make_tx("noisy_5", "noisy"), 1.0, 10, now=20.0)
+    assert not pool.add(make_tx("quiet_0", "quiet"), 0.0, 10, now=20.0)  # duplicate
+
+
+def test_expiry_lands_within_one_slot():
+    pool = Mempool(ttl=10.0, resolution=1.0)
+    pool.add(make_tx("short"), 0.0, 10, now=0.0, expires_at=2.5)
+    pool.add(make_tx("ttl"), 0.0, 10, now=0.5)  # expires at 10.5
+    pool.add(make_tx("capped"), 0.0, 10, now=0.5, expires_at=99.0)  # never past the TTL
+
+    assert pool.expire(2.99) == []
+    assert ids(pool.expire(3.0)) == ["short"]
+    assert pool.expire(10.99) == []
+    assert sorted(ids(pool.expire(11.0))) == ["capped", "ttl"]
+    assert len(pool) == 0 and pool.bytes == 0
+
+
+def test_expiry_after_the_wheel_has_turned():
+    pool = Mempool(ttl=10.0, resolution=1.0)
+    pool.add(make_tx("first"), 0.0, 10, now=0.0)
+    assert ids(pool.expire(11.0)) == ["first"]
+
+    # Long idle, then a transaction whose slot shares a wheel position with old ones
+    pool.add(make_tx("later"), 0.0, 10, now=95.0, expires_at=98.2)
+    pool.add(make_tx("keeps"), 0.0, 10, now=95.0)
+    assert pool.expire(98.5) == []
+    assert ids(pool.expire(99.0)) == ["later"]
+    assert pool.expire(105.9) == []
+    assert ids(pool.expire(106.0)) == ["keeps"]
+
+    # Re-adding an expired id schedules it afresh
+    pool.add(make_tx("later"), 0.0, 10, now=200.0)
+    assert pool.expire(205.0) == [] and "later" in pool
+
+
+def test_lazy_removal_rebuilds_the_heap():
+    pool = Mempool()
+    for i in range(500):
+        pool.add(make_tx(f"tx_{i:03d}", f"s{i}"), 0.0, 1, now=float(i))
+    for i in range(0, 500, 5):
+        pool.remove(f"tx_{i:03d}")
+    assert len(pool) == 400 and len(pool._heap) == 500  # stale items stay until they outnumber live ones
+
+    for i in range(500):
+        if i % 5:
+            pool.remove(f"tx_{i:03d}")
+        assert len(pool._heap) <= 2 * len(pool) + 64 + 1
+    assert len(pool) == 0 and pool.bytes == 0
+    assert pool.select(10, UNLIMITED, UNLIMITED) == []
+
+
+def test_removed_then_readded_is_served_once_in_its_new_place():
+    pool = Mempool(gi_weight=60.0)
+    for i in range(4):
+        pool.add(make_tx(f"tx_{i}", f"s{i}"), 0.0, 10, now=float(i))
+    pool.remove("tx_0")
+    pool.add(make_tx("tx_0", "s0"), 0.0, 10, now=10.0)
+    assert len(pool._heap) == 5  # the old heap item is still there
+    assert ids(pool.select(10, UNLIMITED, UNLIMITED)) == ["tx_1", "tx_2", "tx_3", "tx_0"]
+    assert len(pool._heap) == 4  # and select dropped it when it surfaced
+
+    # The expiry scheduled for the removed copy does not evict the new one
+    assert pool.expire(301.0) == [] and "tx_0" in pool
+    assert ids(pool.expire(302.0)) == ["tx_1"]
@@ -244,22 +244,17 @@ class DelibProofGenerator:
         proof = self.proofs[delib_id]
         proof_data = self._proof_to_signable_dict(proof)
 
-        # Verify model signatures
-        model_verifications = []
-        for sig in proof.model_signatures:
-            is_valid = self.attestation_engine.verify(sig, proof_data)
-            model_verifications.append({
-                "signer": sig.signer,
-                "valid": is_valid
-            })
-
-        # Verify validator signature
-        validator_valid = False
+        # Verify model and validator signatures in one batch (proof data hashed once)
+        signatures = list(proof.model_signatures)
         if proof.validator_signature:
-            validator_valid = self.attestation_engine.verify(
-                proof.validator_signature,
-                proof_data
-            )
+            signatures.append(proof.validator_signature)
+        results = self.attestation_engine.verify_batch(signatures, proof_data)
+
+        model_verifications = [
+            {"signer": sig.signer, "valid": is_valid}
+            for sig, is_valid in zip(proof.model_signatures, results)
+        ]
+        validator_valid = bool(proof.validator_signature) and results[-1]
 
         # Compute verification summary
         total_models = len(proof.model_signatures)
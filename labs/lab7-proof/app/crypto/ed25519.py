@@ -1,15 +1,14 @@
 # app/crypto/ed25519.py
-import base64, json, hashlib
+import base64, hashlib
 from typing import Any, Dict, Tuple
 from nacl import signing
 from nacl.encoding import RawEncoder
+from civic_sdk.canonical import DEFAULT_ENCODER, canonical_json, freeze
 
 # ---- Canonical JSON & hashing ----
-def canonical_json(obj: Any) -> str:
-    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
-
+# sorted keys, compact separators, unicode kept; cached on freeze()d payloads
 def sha256_hex(obj: Any) -> str:
-    return hashlib.sha256(canonical_json(obj).encode("utf-8")).hexdigest()
+    return DEFAULT_ENCODER.sha256(obj)
 
 # ---- Load keys from env (base64) ----
 def load_signing_key(b64_priv: str) -> signing.SigningKey:
@@ -23,15 +22,15 @@ def load_verify_key(b64_pub: str) -> signing.VerifyKey:
 # ---- Sign / Verify ----
 def ed25519_sign(b64_priv: str, payload: Dict[str, Any]) -> Tuple[str, str]:
     sk = load_signing_key(b64_priv)
-    msg = canonical_json(payload).encode("utf-8")
+    msg = DEFAULT_ENCODER.encode(payload)
     sig = sk.sign(msg, encoder=RawEncoder).signature  # 64 bytes
     sig_b64 = base64.b64encode(sig).decode("ascii")
-    return sha256_hex(payload), sig_b64
+    return hashlib.sha256(msg).hexdigest(), sig_b64
 
 def ed25519_verify(b64_pub: str, payload: Dict[str, Any], sig_b64: str) -> bool:
     vk = load_verify_key(b64_pub)
     sig = base64.b64decode(sig_b64)
-    msg = canonical_json(payload).encode("utf-8")
+    msg = DEFAULT_ENCODER.encode(payload)
     try:
         vk.verify(msg, sig)
         return True
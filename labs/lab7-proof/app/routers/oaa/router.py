@@ -11,7 +11,7 @@ from .store import upsert_source, list_sources, record_vote, summarize_reputatio
 from .keys import keyset
 from .state import build_state, sign_state, anchor_to_ledger
 from .echo_routes import router as echo_router
-from app.crypto.ed25519 import ed25519_sign, ed25519_verify, canonical_json, sha256_hex
+from app.crypto.ed25519 import ed25519_sign, ed25519_verify, sha256_hex, freeze
 
 router = APIRouter(prefix="/oaa", tags=["OAA"])
 
@@ -190,9 +190,9 @@ async def verify_attestation(req: VerifyRequest):
     try:
         att = req.attestation
         
-        # 1) Check hash
-        canon = canonical_json(att["content"])
-        recomputed = sha256_hex(att["content"])
+        # 1) Check hash (the frozen content is canonicalized once for the hash and the signature)
+        signed_content = freeze(att["content"])
+        recomputed = sha256_hex(signed_content)
         got = att.get("content_hash", "").replace("sha256:", "")
         
         if not got or got != recomputed:
@@ -241,7 +241,7 @@ async def verify_attestation(req: VerifyRequest):
         # nonce_ok = not await nonce_seen_async(content.get("voter_id", ""), content.get("nonce", ""))
 
         # 5) Verify Ed25519 signature
-        sig_ok = ed25519_verify(pub_b64, att["content"], sig_b64)
+        sig_ok = ed25519_verify(pub_b64, signed_content, sig_b64)
         
         if not sig_ok:
             return VerifyResponse(
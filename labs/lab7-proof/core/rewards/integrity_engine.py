@@ -15,7 +15,6 @@ Penalties cut through slop:
 - Drift anomaly: behavior shift vs baseline
 """
 
-import hashlib
 import json
 import time
 import re
@@ -23,11 +22,15 @@ from typing import Dict, Any, List, Optional
 from urllib.parse import urlparse
 import uuid
 
+from civic_sdk.canonical import CanonicalEncoder
+
+# Seals have always hashed json.dumps(payload, sort_keys=True): ASCII-escaped, spaced separators
+_SEAL_ENCODER = CanonicalEncoder(ensure_ascii=True, separators=(", ", ": "))
+
 
 def _hash_payload(payload: Dict[str, Any]) -> str:
     """Create deterministic hash of payload for ledger sealing."""
-    data = json.dumps(payload, sort_keys=True).encode("utf-8")
-    return hashlib.sha256(data).hexdigest()
+    return _SEAL_ENCODER.sha256(payload)
 
 
 def _clip(x: float) -> float:
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Committee selection benchmark
+
+Registers --citizens citizens, stakes a random amount for most of them and
+times one epoch's committee selection: the weight index behind
+ProofOfCycle.select_committee against the old path (build a list over all
+citizens, sort it by stake + activity, shuffle the top k). Also reports the
+cost of keeping the index current on stake changes.
+
+Usage:
+    python benchmarks/committee_selection.py --citizens 10000 100000 500000
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "consensus"))
+
+from proof_of_cycle import ProofOfCycle, create_genesis_policy  # noqa: E402
+
+
+def _legacy_select(poc: ProofOfCycle, epoch: int):
+    """select_committee before the weight index"""
+    staked_citizens = [
+        (citizen_id, poc.balances[citizen_id].staked +
+         poc.citizens[citizen_id].activity_score * 100)
+        for citizen_id in poc.citizens.keys()
+        if poc.balances[citizen_id].staked > 0
+    ]
+    if len(staked_citizens) < poc.committee_size:
+        return list(poc.citizens.keys())[:poc.committee_size]
+    staked_citizens.sort(key=lambda x: x[1], reverse=True)
+    committee = [citizen_id for citizen_id, _ in staked_citizens[:poc.committee_size]]
+    vrf_seed = f"epoch_{epoch}_{poc.policy.hash}"
+    random_factor = int(hashlib.sha256(vrf_seed.encode()).hexdigest(), 16)
+    for i in range(len(committee)):
+        j = (i + random_factor) % len(committee)
+        committee[i], committee[j] = committee[j], committee[i]
+    return committee
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for epoch in range(repeat):
+        start = time.perf_counter()
+        fn(epoch)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _run(count: int, repeat: int, committee_size: int):
+    rng = random.Random(count)
+    poc = ProofOfCycle(create_genesis_policy())
+    poc.committee_size = committee_size
+    citizens = [poc.register_citizen(f"0x{i:040x}") for i in range(count)]
+
+    start = time.perf_counter()
+    for citizen_id in citizens:
+        if rng.random() < 0.9:
+            poc.stake(citizen_id, rng.randint(1, 500) * 10**18)
+    per_update = (time.perf_counter() - start) / count
+
+    legacy = _best(lambda epoch: _legacy_select(poc, epoch), repeat)
+    indexed = _best(lambda epoch: poc.select_committee(epoch), repeat)
+    print(f"{count:>9,} citizens  legacy={legacy * 1e3:9.2f} ms  index={indexed * 1e6:8.1f} us"
+          f"  ({legacy / indexed:,.0f}x)  stake update={per_update * 1e6:6.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--citizens", type=int, nargs="+", default=[10000, 100000, 500000])
+    parser.add_argument("--committee-size", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for count in args.citizens:
+        _run(count, args.repeat, args.committee_size)
+
+
+if __name__ == "__main__":
+    main()
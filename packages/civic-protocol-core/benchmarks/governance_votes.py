@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Governance vote-ingest benchmark
+
+Casts votes from a population of staked citizens across several Agora
+proposals, one cast_vote at a time and through cast_votes in batches, and
+reports votes/second together with the rate over the first and last slices
+of the run (they should match: a vote costs the same however many came
+before it). Vote weights come from the voting-power snapshot taken when each
+proposal is activated; the time to take one is reported too.
+
+Usage:
+    python benchmarks/governance_votes.py --voters 100000 --proposals 10 --batch 1000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from governance.agora import AgoraGovernance, ProposalStatus, ProposalType, VoteChoice  # noqa: E402
+from ledger.gic_economics import GICEconomics  # noqa: E402
+
+GIC = 10**18
+CHOICES = [VoteChoice.YES, VoteChoice.YES, VoteChoice.NO, VoteChoice.ABSTAIN]
+
+
+def _setup(voters: int, proposals: int):
+    gic = GICEconomics()
+    rng = random.Random(7)
+    addresses = [f"citizen_{i:07d}" for i in range(voters)]
+    for address in addresses:
+        stake = rng.randint(1, 1000) * GIC
+        gic.create_account(address, stake)
+        gic.stake(address, stake)
+        gic.accounts[address].activity_score = rng.random()
+    gic.create_account("proposer", proposals * 2000 * GIC)
+
+    agora = AgoraGovernance(gic, SimpleNamespace(current_epoch=0))
+    # Never reach quorum early, so every proposal stays open for the whole run
+    agora.quorum_threshold = 2.0
+    proposal_ids = []
+    activation = 0.0
+    for i in range(proposals):
+        proposal = agora.create_proposal("proposer", f"Proposal {i}", "benchmark",
+                                         ProposalType.COMMUNITY_INITIATIVE, {})
+        proposal.voting_starts_at = int(time.time()) - 1
+        start = time.perf_counter()
+        assert agora.activate_proposal(proposal.proposal_id)
+        activation += time.perf_counter() - start
+        proposal_ids.append(proposal.proposal_id)
+    ballots = [(address, rng.choice(CHOICES)) for address in addresses]
+    return agora, proposal_ids, ballots, activation / proposals
+
+
+def _run(voters: int, proposals: int, batch: int, slice_size: int):
+    agora, proposal_ids, ballots, activation = _setup(voters, proposals)
+    total = voters * proposals
+    marks = []
+
+    start = time.perf_counter()
+    cast = 0
+    for proposal_id in proposal_ids:
+        if batch <= 1:
+            for voter, choice in ballots:
+                agora.cast_vote(proposal_id, voter, choice)
+                cast += 1
+                if cast % slice_size == 0:
+                    marks.append(time.perf_counter())
+        else:
+            for i in range(0, len(ballots), batch):
+                agora.cast_votes(proposal_id, ballots[i:i + batch])
+                cast += len(ballots[i:i + batch])
+                if cast % slice_size < batch:
+                    marks.append(time.perf_counter())
+    elapsed = time.perf_counter() - start
+
+    assert len(agora.votes) == total
+    for proposal_id in proposal_ids:
+        assert agora.proposals[proposal_id].status == ProposalStatus.ACTIVE
+        assert len(agora.get_tally(proposal_id).voters) == voters
+
+    first = slice_size / (marks[0] - start) if marks else 0
+    last = slice_size / (marks[-1] - marks[-2]) if len(marks) > 1 else first
+    mode = "cast_vote" if batch <= 1 else f"cast_votes({batch})"
+    print(f"{mode:<18} {total:>10,} votes  {total / elapsed:>10,.0f} votes/s  ({elapsed:.1f}s)  "
+          f"first {first:,.0f}/s  last {last:,.0f}/s  snapshot {activation * 1000:.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark Agora vote ingest",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--voters", type=int, default=100_000, help="Distinct voters per proposal")
+    parser.add_argument("--proposals", type=int, default=10, help="Proposals voted on")
+    parser.add_argument("--batch", type=int, default=1000, help="Ballots per cast_votes call (1 = cast_vote)")
+    parser.add_argument("--slice", type=int, default=50_000, help="Votes per first/last rate sample")
+    args = parser.parse_args()
+
+    print(f"{args.voters:,} voters x {args.proposals} proposals")
+    _run(args.voters, args.proposals, 1, args.slice)
+    if args.batch > 1:
+        _run(args.voters, args.proposals, args.batch, args.slice)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Ledger write-throughput benchmark
+
+Appends synthetic attestation events through LedgerCore on each storage
+engine and reports events/second, both one event per write and in batches.
+
+Usage:
+    python benchmarks/ledger_write_throughput.py --events 20000 --batch 100
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ledger", "app"))
+
+from ledger import LedgerCore  # noqa: E402
+from storage import SQLiteStorage, SegmentStorage  # noqa: E402
+
+
+def _make_events(ledger: LedgerCore, count: int):
+    """Create a correctly chained run of events without writing them"""
+    events = []
+    previous_hash = ledger._get_latest_event_hash()
+    for i in range(count):
+        event = ledger.create_event(
+            event_type="reflection_created",
+            civic_id=f"civic_{i % 500:04d}",
+            lab_source="lab4" if i % 3 else "lab6",
+            payload={"title": f"Reflection {i}", "content": "x" * 200}
+        )
+        event.event_id = f"{event.event_id}_{i}"
+        event.previous_hash = previous_hash
+        event.event_hash = ledger._calculate_event_hash(event)
+        previous_hash = event.event_hash
+        events.append(event)
+    return events
+
+
+def _run(name: str, storage, events_count: int, batch: int):
+    ledger = LedgerCore(storage=storage)
+    events = _make_events(ledger, events_count)
+
+    start = time.perf_counter()
+    if batch <= 1:
+        for event in events:
+            ledger.add_event(event)
+    else:
+        for i in range(0, len(events), batch):
+            ledger.add_events(events[i:i + batch])
+    ledger.storage.flush()
+    elapsed = time.perf_counter() - start
+
+    assert ledger.get_chain_info()["chain_length"] == events_count
+    ledger.close()
+    print(f"{name:<28} batch={batch:<5} {events_count / elapsed:>12,.0f} events/s  ({elapsed:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args()
+
+    for batch in (1, args.batch):
+        with tempfile.TemporaryDirectory() as tmp:
+            _run("SQLiteStorage (WAL)", SQLiteStorage(os.path.join(tmp, "ledger.db")), args.events, batch)
+        with tempfile.TemporaryDirectory() as tmp:
+            _run("SegmentStorage", SegmentStorage(os.path.join(tmp, "segments")), args.events, batch)
+        with tempfile.TemporaryDirectory() as tmp:
+            _run("SegmentStorage (fsync=1)", SegmentStorage(os.path.join(tmp, "segments"), fsync_every=1),
+                 args.events, batch)
+
+
+if __name__ == "__main__":
+    main()
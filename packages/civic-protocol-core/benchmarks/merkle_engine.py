@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Merkle engine benchmark
+
+Times the shared engine (civic_sdk.merkle) at each leaf count: the
+streaming root, building a tree with all levels kept, one batch of proofs and
+verifying that batch. --legacy also times the old list-of-hex-strings
+ProofOfCycle tree (power-of-two padding) up to --legacy-max leaves.
+
+Usage:
+    python benchmarks/merkle_engine.py --leaves 10000 1000000 10000000 --proofs 1000
+"""
+
+import argparse
+import hashlib
+import random
+import time
+
+from civic_sdk import merkle
+
+
+def _packed_leaves(count: int) -> bytes:
+    buf = bytearray()
+    for start in range(0, count, 1 << 16):
+        buf += b"".join([hashlib.sha256(i.to_bytes(8, "big")).digest()
+                         for i in range(start, min(start + (1 << 16), count))])
+    return bytes(buf)
+
+
+def _iter_leaves(buf: bytes):
+    size = merkle.DIGEST_SIZE
+    return (buf[o:o + size] for o in range(0, len(buf), size))
+
+
+def _legacy_root(leaves):
+    """The ProofOfCycle tree before the shared engine"""
+    level = list(leaves)
+    while len(level) & (len(level) - 1):
+        level.append("")
+    while len(level) > 1:
+        level = [hashlib.sha256((level[i] + level[i + 1]).encode()).hexdigest()
+                 for i in range(0, len(level), 2)]
+    return level[0]
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def _run(count: int, proofs: int, mode: str, legacy: bool):
+    buf = _packed_leaves(count)
+    root, t_stream = _timed(lambda: merkle.merkle_root(_iter_leaves(buf), mode))
+    tree, t_build = _timed(lambda: merkle.MerkleTree.from_buffer(buf, mode))
+    assert tree.root() == root
+
+    indices = random.Random(count).sample(range(count), min(proofs, count))
+    paths, t_proofs = _timed(lambda: tree.proofs(indices))
+    items = [(tree.node(0, i), paths[i]) for i in indices]
+    results, t_verify = _timed(lambda: merkle.verify_batch(root, items, mode))
+    assert all(results)
+
+    print(f"{count:>11,} leaves  stream={t_stream:7.2f}s ({count / t_stream:>11,.0f}/s)"
+          f"  build={t_build:7.2f}s  {len(indices)} proofs={t_proofs * 1e3:8.1f}ms"
+          f"  verify={t_verify * 1e3:8.1f}ms")
+
+    if legacy:
+        hex_leaves = [leaf.hex() for leaf in _iter_leaves(buf)]
+        old_root, t_old = _timed(lambda: _legacy_root(hex_leaves))
+        padded, t_padded = _timed(lambda: merkle.MerkleTree.from_buffer(buf, merkle.MODE_PADDED_HEX))
+        assert padded.root_hex() == old_root
+        print(f"{'':>11}         legacy padded tree={t_old:7.2f}s  engine padded-hex={t_padded:7.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leaves", type=int, nargs="+", default=[10000, 1000000, 10000000])
+    parser.add_argument("--proofs", type=int, default=1000)
+    parser.add_argument("--mode", choices=merkle.MODES, default=merkle.MODE_BINARY)
+    parser.add_argument("--legacy", action="store_true", help="also time the old padded hex-string tree")
+    parser.add_argument("--legacy-max", type=int, default=1000000)
+    args = parser.parse_args()
+
+    for count in args.leaves:
+        _run(count, args.proofs, args.mode, args.legacy and count <= args.legacy_max)
+
+
+if __name__ == "__main__":
+    main()
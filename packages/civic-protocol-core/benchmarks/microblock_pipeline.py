@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Microblock pipeline benchmark
+
+Submits --items reflections and attestations (2:1) from one producer thread
+at --rate items per second (0 = as fast as it can, which measures the
+saturated pipeline), with the microblock builder sealing every --interval
+seconds. Reports throughput, acknowledgment latency (submit to receipt) and
+the size of the L1 block that commits the result: one hash per microblock
+instead of one entry per reflection.
+
+Usage:
+    python benchmarks/microblock_pipeline.py --items 100000 --interval 0.25 --rate 10000
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "consensus"))
+
+from proof_of_cycle import ProofOfCycle, Reflection, create_genesis_policy  # noqa: E402
+
+
+def _reflection(i: int, author: str) -> Reflection:
+    return Reflection(
+        ref_id=f"ref_{i}",
+        envelope_hash=f"0x{i:064x}",
+        author=author,
+        companion=None,
+        visibility="private",
+        tags=["bench"],
+        timestamp=1700000000 + i,
+        zk_proof="",
+        rate_limit_proof=""
+    )
+
+
+def _percentile(values, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--interval", type=float, default=0.25)
+    parser.add_argument("--max-items", type=int, default=10000)
+    parser.add_argument("--rate", type=float, default=10000, help="items per second (0 = unpaced)")
+    args = parser.parse_args()
+
+    poc = ProofOfCycle(create_genesis_policy())
+    author = poc.register_citizen("0x" + "11" * 20)
+    poc.start_microblocks(author, args.interval, args.max_items)
+
+    latencies = [0.0] * args.items
+    done = threading.Event()
+    remaining = [args.items]
+    lock = threading.Lock()
+
+    def _acknowledged(index: int, submitted: float):
+        def callback(future):
+            latencies[index] = time.perf_counter() - submitted
+            with lock:
+                remaining[0] -= 1
+                if not remaining[0]:
+                    done.set()
+        return callback
+
+    start = time.perf_counter()
+    for i in range(args.items):
+        if args.rate and i % 100 == 0:
+            delay = start + i / args.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        if i % 3 == 2:
+            item = {"attester": author, "target": f"ref_{i - 1}", "score": i % 5}
+            future = poc.submit_attestation(item)
+        else:
+            future = poc.submit_reflection(_reflection(i, author))
+        future.add_done_callback(_acknowledged(i, time.perf_counter()))
+    done.wait()
+    elapsed = time.perf_counter() - start
+    poc.stop_microblocks()
+
+    microblocks = len(poc.microblocks)
+    block = poc.propose_block(author, [], [], [])
+    assert poc.add_block(block).valid
+    latencies.sort()
+    print(f"{args.items:,} items in {elapsed:.2f}s ({args.items / elapsed:,.0f}/s), {microblocks} microblocks")
+    print(f"ack latency  p50={_percentile(latencies, 0.5) * 1e3:7.1f} ms"
+          f"  p99={_percentile(latencies, 0.99) * 1e3:7.1f} ms  max={latencies[-1] * 1e3:7.1f} ms")
+    print(f"L1 block commits {len(block.microblock_hashes)} microblock hashes for {args.items:,} items")
+
+
+if __name__ == "__main__":
+    main()
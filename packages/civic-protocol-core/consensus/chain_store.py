@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Chain Store
+
+Persistent backend for ProofOfCycle. One SQLite file holds:
+
+    blocks       every accepted L1 block, by height (the chain)
+    microblocks  the body of every microblock a block committed, by hash
+    journal      every state-changing operation since the last snapshot,
+                 written before it is applied (write-ahead); a block entry
+                 points at its row in blocks
+    state        accounts, citizens, companions, cycles, proposals and votes
+                 as of the last snapshot, one JSON row per record
+    meta         snapshot bookkeeping (journal position, state root, height)
+
+Every snapshot_interval blocks the records changed since the previous
+snapshot are written to ``state`` in one transaction and the journal is
+truncated. A restart loads nothing eagerly: it reopens the snapshot and
+replays at most one interval of journal entries.
+
+In memory, StoredMap keeps an LRU cache of clean records (changed records
+stay pinned until the next snapshot writes them) and BlockLog keeps only the
+most recent blocks, so memory stays flat however long the chain grows.
+"""
+
+import json
+import sqlite3
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS blocks (
+        height INTEGER PRIMARY KEY,
+        hash TEXT NOT NULL UNIQUE,
+        data TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS microblocks (
+        hash TEXT PRIMARY KEY,
+        height INTEGER NOT NULL,
+        data TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS journal (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS state (
+        kind TEXT NOT NULL,
+        key TEXT NOT NULL,
+        data TEXT NOT NULL,
+        tag INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_state_key ON state (kind, key);
+    CREATE INDEX IF NOT EXISTS idx_state_tag ON state (kind, tag);
+    CREATE TABLE IF NOT EXISTS meta (
+        name TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+"""
+
+_DELETED = object()
+
+
+class ChainStore:
+    """SQLite block log, operation journal and state snapshot"""
+
+    def __init__(self, path: str, snapshot_interval: int = 100, cache_size: int = 100_000,
+                 recent_blocks: int = 256):
+        """
+        Args:
+            path: SQLite database file
+            snapshot_interval: Blocks between state snapshots (bounds replay on restart)
+            cache_size: Clean records kept in memory per record kind
+            recent_blocks: Blocks kept in memory; older ones are read back from disk
+        """
+        self.path = path
+        self.snapshot_interval = max(1, snapshot_interval)
+        self.cache_size = cache_size
+        self.recent_blocks = recent_blocks
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    # --- Journal and blocks ------------------------------------------------
+
+    def append_op(self, kind: str, payload: Dict[str, Any]) -> int:
+        """Durably journal one operation before it is applied"""
+        with self._lock, self._conn:
+            cur = self._conn.execute("INSERT INTO journal (kind, payload) VALUES (?, ?)",
+                                     (kind, json.dumps(payload)))
+        return cur.lastrowid
+
+    def append_block(self, height: int, block_hash: str, data: Dict[str, Any],
+                     microblocks: Iterable[Tuple[str, Dict[str, Any]]] = ()) -> int:
+        """
+        Durably store a block and the (hash, data) of each microblock it
+        commits, and journal it, in one transaction
+        """
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO blocks (height, hash, data) VALUES (?, ?, ?)",
+                               (height, block_hash, json.dumps(data)))
+            self._conn.executemany("INSERT INTO microblocks (hash, height, data) VALUES (?, ?, ?)",
+                                   [(mb_hash, height, json.dumps(mb)) for mb_hash, mb in microblocks])
+            cur = self._conn.execute("INSERT INTO journal (kind, payload) VALUES (?, ?)",
+                                     ("block", json.dumps({"height": height})))
+        return cur.lastrowid
+
+    def iter_ops(self, after_seq: int) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+        """Journal entries after ``after_seq``, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, kind, payload FROM journal WHERE seq > ? ORDER BY seq", (after_seq,)
+            ).fetchall()
+        for seq, kind, payload in rows:
+            yield seq, kind, json.loads(payload)
+
+    def last_seq(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(seq) FROM journal").fetchone()
+        return max(row[0] or 0, int(self.get_meta("snapshot_seq", 0)))
+
+    def load_block(self, height: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM blocks WHERE height = ?", (height,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load_microblock(self, microblock_hash: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM microblocks WHERE hash = ?",
+                                     (microblock_hash,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def block_count(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COALESCE(MAX(height) + 1, 0) FROM blocks").fetchone()
+        return row[0]
+
+    # --- State records -----------------------------------------------------
+
+    def load_record(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM state WHERE kind = ? AND key = ?",
+                                     (kind, key)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def has_record(self, kind: str, key: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM state WHERE kind = ? AND key = ?",
+                                     (kind, key)).fetchone()
+        return row is not None
+
+    def count_records(self, kind: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM state WHERE kind = ?", (kind,)).fetchone()[0]
+
+    def iter_keys(self, kind: str, page: int = 512) -> Iterator[str]:
+        """Keys of one kind in the order they were first stored"""
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, key FROM state WHERE kind = ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                    (kind, last, page)
+                ).fetchall()
+            if not rows:
+                return
+            for rowid, key in rows:
+                yield key
+            last = rows[-1][0]
+
+    def iter_tagged(self, kind: str, with_kind: str) -> Iterator[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+        """
+        Records of one kind with a non-zero tag, in tag order, each joined
+        with the record of ``with_kind`` under the same key
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT a.key, a.data, b.data FROM state a JOIN state b ON b.kind = ? AND b.key = a.key "
+                "WHERE a.kind = ? AND a.tag > 0 ORDER BY a.tag", (with_kind, kind)
+            ).fetchall()
+        for key, data, other in rows:
+            yield key, json.loads(data), json.loads(other)
+
+    def snapshot(self, records: Dict[str, Dict[str, Optional[Tuple[Dict[str, Any], int]]]],
+                 meta: Dict[str, Any], upto_seq: int):
+        """
+        Write changed records and snapshot metadata, then drop the journal up
+        to ``upto_seq``, all in one transaction
+
+        ``records`` maps kind -> key -> (data, tag), or None to delete.
+        """
+        with self._lock, self._conn:
+            for kind, changes in records.items():
+                upserts = [(kind, key, json.dumps(value[0]), value[1])
+                           for key, value in changes.items() if value is not None]
+                deletes = [(kind, key) for key, value in changes.items() if value is None]
+                self._conn.executemany(
+                    "INSERT INTO state (kind, key, data, tag) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(kind, key) DO UPDATE SET data = excluded.data, tag = excluded.tag",
+                    upserts
+                )
+                self._conn.executemany("DELETE FROM state WHERE kind = ? AND key = ?", deletes)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                [(name, json.dumps(value)) for name, value in dict(meta, snapshot_seq=upto_seq).items()]
+            )
+            self._conn.execute("DELETE FROM journal WHERE seq <= ?", (upto_seq,))
+
+    def get_meta(self, name: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class StoredMap:
+    """
+    Dict-like view of one kind of state record
+
+    Records written, deleted or reported through mark_dirty after an in-place
+    change are pinned in memory until the next snapshot writes them. Clean
+    records are read through an LRU cache that trim() keeps to ``capacity``.
+    ``tag`` computes an integer stored beside each record for iter_tagged.
+    """
+
+    def __init__(self, store: ChainStore, kind: str, encode: Callable[[Any], Dict[str, Any]],
+                 decode: Callable[[Dict[str, Any]], Any], tag: Optional[Callable[[Any], int]] = None,
+                 capacity: int = 100_000):
+        self.store = store
+        self.kind = kind
+        self._encode = encode
+        self._decode = decode
+        self._tag = tag
+        self.capacity = capacity
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()  # clean records, LRU order
+        self._dirty: Dict[str, Any] = {}  # key -> value, or _DELETED
+        self._unsaved: Dict[str, None] = {}  # new keys not yet in the store, in insertion order
+        self._size = store.count_records(kind)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._dirty.get(key)
+        if value is not None:
+            if value is _DELETED:
+                raise KeyError(key)
+            return value
+        value = self._cache.get(key)
+        if value is not None:
+            self._cache.move_to_end(key)
+            return value
+        data = self.store.load_record(self.kind, key)
+        if data is None:
+            raise KeyError(key)
+        value = self._cache[key] = self._decode(data)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: object) -> bool:
+        value = self._dirty.get(key)
+        if value is not None:
+            return value is not _DELETED
+        return key in self._cache or self.store.has_record(self.kind, key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self:
+            self._size += 1
+            if key not in self._dirty:  # a key deleted since the snapshot is still stored
+                self._unsaved[key] = None
+        self._cache.pop(key, None)
+        self._dirty[key] = value
+
+    def __delitem__(self, key: str):
+        if key not in self:
+            raise KeyError(key)
+        self._cache.pop(key, None)
+        self._dirty[key] = _DELETED
+        self._size -= 1
+        if self._unsaved.pop(key, 0) is None:
+            del self._dirty[key]  # never reached the store
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.store.iter_keys(self.kind):
+            if self._dirty.get(key) is not _DELETED:
+                yield key
+        yield from list(self._unsaved)
+
+    def keys(self) -> Iterator[str]:
+        return iter(self)
+
+    def mark_dirty(self, key: str):
+        """Record that a cached value was changed in place"""
+        if key in self._cache:
+            self._dirty[key] = self._cache.pop(key)
+
+    def dirty_records(self) -> Dict[str, Optional[Tuple[Dict[str, Any], int]]]:
+        out: Dict[str, Optional[Tuple[Dict[str, Any], int]]] = {}
+        for key, value in self._dirty.items():
+            if value is _DELETED:
+                out[key] = None
+            else:
+                out[key] = (self._encode(value), self._tag(value) if self._tag else 0)
+        return out
+
+    def clear_dirty(self):
+        """After a snapshot: written records become clean cache entries"""
+        for key, value in self._dirty.items():
+            if value is not _DELETED:
+                self._cache[key] = value
+        self._dirty.clear()
+        self._unsaved.clear()
+
+    def trim(self):
+        """Evict least recently used clean records beyond capacity"""
+        while len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+
+
+class BlockLog:
+    """List-like chain view: the latest blocks in memory, older ones read from the store"""
+
+    def __init__(self, store: ChainStore, decode: Callable[[Dict[str, Any]], Any], recent: int = 256):
+        self.store = store
+        self._decode = decode
+        self._recent: deque = deque(maxlen=max(1, recent))
+        self._count = store.block_count()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("block index out of range")
+        offset = index - (self._count - len(self._recent))
+        if offset >= 0:
+            return self._recent[offset]
+        data = self.store.load_block(index)
+        if data is None:
+            raise IndexError(f"block {index} missing from store")
+        return self._decode(data)
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in range(self._count):
+            yield self[index]
+
+    def append(self, block: Any):
+        """Track a block that is already stored (ChainStore.append_block)"""
+        self._recent.append(block)
+        self._count += 1
+
+    def load_recent(self):
+        """Fill the in-memory window from the store after a restart"""
+        start = max(0, self._count - (self._recent.maxlen or 0))
+        self._recent.clear()
+        for index in range(start, self._count):
+            self._recent.append(self._decode(self.store.load_block(index)))
+
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Committee Weight Index
+
+Proof-of-Cycle committees are drawn with probability proportional to each
+citizen's stake plus activity. WeightIndex keeps those weights in a Fenwick
+(binary indexed) tree: changing one weight and locating the member that owns
+a point in the cumulative weight line are both O(log n), so a committee of k
+is sampled in O(k log n) however many citizens are registered, and no
+per-epoch pass over the whole set is needed.
+
+Samples are a pure function of the seed and the weights, so every node that
+uses the same seed (an epoch VRF output) picks the same committee.
+"""
+
+import hashlib
+from typing import Dict, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+Member = TypeVar("Member", bound=Hashable)
+
+
+class WeightIndex(Generic[Member]):
+    """Fenwick tree over non-negative integer member weights"""
+
+    def __init__(self):
+        self._tree: List[int] = [0]  # 1-based Fenwick array
+        self._weights: List[int] = []
+        self._members: List[Member] = []
+        self._slots: Dict[Member, int] = {}
+        self._total = 0
+        self._positive = 0
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, member: Member) -> bool:
+        return member in self._slots
+
+    @property
+    def total(self) -> int:
+        """Sum of all weights"""
+        return self._total
+
+    @property
+    def positive_count(self) -> int:
+        """Members with a weight above zero (the ones that can be sampled)"""
+        return self._positive
+
+    def weight(self, member: Member) -> int:
+        slot = self._slots.get(member)
+        return 0 if slot is None else self._weights[slot]
+
+    def slot(self, member: Member) -> Optional[int]:
+        """Position of a member in the index (sampling depends on this order)"""
+        return self._slots.get(member)
+
+    def extend(self, items: Iterable[Tuple[Member, int]]):
+        """
+        Append members in the given order, zero weights included
+
+        Used to restore a saved slot order, so a reloaded index samples
+        exactly like the one it was saved from. Filling an empty index is O(n).
+        """
+        if self._members:
+            for member, weight in items:
+                if weight < 0:
+                    raise ValueError("weights must be non-negative")
+                self._append(member, weight)
+            return
+        for member, weight in items:
+            if weight < 0:
+                raise ValueError("weights must be non-negative")
+            self._slots[member] = len(self._members)
+            self._members.append(member)
+            self._weights.append(weight)
+            self._tree.append(weight)
+            self._total += weight
+            self._positive += 1 if weight > 0 else 0
+        # Linear Fenwick build: push each node's sum into its parent
+        size = len(self._tree)
+        for position in range(1, size):
+            parent = position + (position & -position)
+            if parent < size:
+                self._tree[parent] += self._tree[position]
+
+    def set(self, member: Member, weight: int):
+        """Set a member's weight, adding the member on first use"""
+        if weight < 0:
+            raise ValueError("weights must be non-negative")
+        slot = self._slots.get(member)
+        if slot is None:
+            if weight == 0:
+                return
+            self._append(member, weight)
+            return
+        self._add(slot, weight - self._weights[slot])
+
+    def _append(self, member: Member, weight: int):
+        slot = len(self._members)
+        position = slot + 1
+        # tree[i] covers weights (i - lowbit(i), i]; all but the last are already stored
+        covered = self._prefix(position - 1) - self._prefix(position - (position & -position))
+        self._tree.append(covered + weight)
+        self._weights.append(weight)
+        self._members.append(member)
+        self._slots[member] = slot
+        self._total += weight
+        self._positive += 1 if weight > 0 else 0
+
+    def _add(self, slot: int, delta: int):
+        if not delta:
+            return
+        old = self._weights[slot]
+        new = old + delta
+        self._weights[slot] = new
+        self._total += delta
+        self._positive += (new > 0) - (old > 0)
+        position = slot + 1
+        size = len(self._tree)
+        while position < size:
+            self._tree[position] += delta
+            position += position & -position
+
+    def _prefix(self, position: int) -> int:
+        """Sum of the first ``position`` weights"""
+        total = 0
+        while position > 0:
+            total += self._tree[position]
+            position -= position & -position
+        return total
+
+    def _find(self, point: int) -> int:
+        """Slot whose weight interval contains ``point`` (0 <= point < total)"""
+        position = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = position + step
+            if nxt < len(self._tree) and self._tree[nxt] <= point:
+                position = nxt
+                point -= self._tree[nxt]
+            step >>= 1
+        return position
+
+    def sample(self, seed: bytes, k: int) -> List[Member]:
+        """
+        Weighted sample of up to k distinct members, deterministic in ``seed``
+
+        Each draw hashes (seed, draw number) to a point on the remaining
+        weight line; the chosen member's weight is zeroed until the sample is
+        complete, so nobody is drawn twice.
+        """
+        drawn: List[Tuple[int, int]] = []  # (slot, weight) to restore
+        try:
+            for draw in range(min(k, self._positive)):
+                digest = hashlib.sha256(seed + draw.to_bytes(4, "big")).digest()
+                slot = self._find(int.from_bytes(digest, "big") % self._total)
+                drawn.append((slot, self._weights[slot]))
+                self._add(slot, -self._weights[slot])
+        finally:
+            for slot, weight in drawn:
+                self._add(slot, weight)
+        return [self._members[slot] for slot, _ in drawn]
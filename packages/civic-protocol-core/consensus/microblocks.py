@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Microblock Builder
+
+Reflections and attestations arrive far faster than L1 blocks are made.
+MicroblockBuilder queues them and, every ``interval`` seconds (or as soon as
+``max_items`` are waiting), hands the whole batch to a seal callback that
+turns it into one microblock. Each submitter gets a Future that resolves to
+its item's receipt once the batch is sealed, so acknowledgment latency is
+bounded by the interval rather than by the L1 block time.
+
+The builder only batches and times; what a microblock contains and how
+receipts are proven is up to the seal callback (ProofOfCycle.seal_microblock).
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class MicroblockBuilder:
+    """Timer- and size-triggered batching of items into sealed microblocks"""
+
+    def __init__(self, seal: Callable[[List[Any]], List[Any]], interval: float = 0.25,
+                 max_items: int = 10_000):
+        """
+        Args:
+            seal: Callable(items) -> one receipt per item, in order; runs on the builder thread
+            interval: Seconds between seals while items are waiting
+            max_items: Seal early once this many items are queued
+        """
+        self._seal = seal
+        self.interval = interval
+        self.max_items = max(1, max_items)
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[Any, Future]] = []
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def submit(self, item: Any) -> Future:
+        """Queue an item; the Future resolves to its receipt when its microblock is sealed"""
+        future: Future = Future()
+        with self._lock:
+            if self._stopping:
+                raise Exception("Microblock builder is stopped")
+            self._pending.append((item, future))
+            full = len(self._pending) >= self.max_items
+        if full:
+            self._wake.set()
+        return future
+
+    def flush(self) -> int:
+        """Seal everything queued now, on the calling thread; returns the number of items sealed"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        for start in range(0, len(batch), self.max_items):
+            chunk = batch[start:start + self.max_items]
+            try:
+                receipts = self._seal([item for item, _ in chunk])
+            except Exception as e:
+                for _, future in chunk:
+                    future.set_exception(e)
+                continue
+            for (_, future), receipt in zip(chunk, receipts):
+                future.set_result(receipt)
+        return len(batch)
+
+    def start(self):
+        """Start sealing on a background thread"""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="poc-microblocks", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread, sealing whatever is still queued"""
+        with self._lock:
+            self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        deadline = time.monotonic() + self.interval
+        while True:
+            self._wake.wait(max(0.0, deadline - time.monotonic()))
+            self._wake.clear()
+            if self._stopping:
+                return
+            now = time.monotonic()
+            if now >= deadline or len(self) >= self.max_items:
+                self.flush()
+                deadline = now + self.interval
+
+    def __enter__(self) -> "MicroblockBuilder":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -8,15 +8,33 @@ that is purpose-built for civilization state management.
 """
 
 import hashlib
+import threading
 import time
 import json
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Any, Tuple, Union
+from dataclasses import dataclass, asdict, field
 from datetime import datetime, date
 from enum import Enum
 import secrets
 import hmac
 
+from civic_sdk import merkle
+from civic_sdk.merkle import MODE_PADDED_HEX
+
+try:
+    from .chain_store import BlockLog, ChainStore, StoredMap
+    from .committee import WeightIndex
+    from .microblocks import MicroblockBuilder
+    from .state_tree import EMPTY, SparseMerkleTree, SQLiteNodeStore, StateProof, key_for, verify_proof
+except ImportError:  # running as a script
+    from chain_store import BlockLog, ChainStore, StoredMap
+    from committee import WeightIndex
+    from microblocks import MicroblockBuilder
+    from state_tree import EMPTY, SparseMerkleTree, SQLiteNodeStore, StateProof, key_for, verify_proof
+
 class CycleStatus(Enum):
     """Status of a civic cycle"""
     SEED = "seed"
@@ -153,6 +171,7 @@ class BlockHeader:
     cycle_root: str
     policy_version: str
     committee_sigs: List[str]  # Multi-signature from committee
+    microblock_root: str = ""  # Merkle root over committed microblock hashes
 
 @dataclass
 class L1Block:
@@ -163,6 +182,7 @@ class L1Block:
     cycles: List[Cycle]
     policy_updates: List[Policy]
     hash: str
+    microblock_hashes: List[str] = field(default_factory=list)  # Microblocks committed by this block
 
 @dataclass
 class Microblock:
@@ -174,87 +194,293 @@ class Microblock:
     reflections: List[Reflection]
     attestations: List[Dict[str, Any]]
     hash: str
+    root: str = ""  # Merkle root over reflection then attestation hashes
+
+@dataclass
+class MicroblockReceipt:
+    """Acknowledgment that an item was sealed into a microblock"""
+    microblock_hash: str
+    parent_hash: str  # L1 block the microblock links to
+    height: int
+    root: str
+    index: int  # Leaf position (reflections first, then attestations)
+    leaf: str
+    tree: Any = field(default=None, repr=False, compare=False)  # merkle.MerkleTree of the microblock
+    
+    def proof(self) -> List[Tuple[str, str]]:
+        """(side, sibling hex) steps from the leaf to the root, merkle MODE_BINARY (built on demand)"""
+        return [(side, sibling.hex()) for side, sibling in self.tree.proof(self.index)]
+
+@dataclass
+class ValidationIssue:
+    """One reason a block, or an item in it, failed validation"""
+    scope: str  # "block", "microblock", "transaction", "earn_transaction" or "cycle"
+    index: int  # Position in the block's list (-1 for the block itself)
+    item_id: str  # tx_id, cycle_id or block hash
+    reason: str
+
+@dataclass
+class BlockValidationReport:
+    """Result of validate_block; truthy when the block is valid"""
+    block_hash: str
+    errors: List[ValidationIssue]
+    
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+    
+    def __bool__(self) -> bool:
+        return self.valid
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "block_hash": self.block_hash,
+            "valid": self.valid,
+            "errors": [asdict(issue) for issue in self.errors]
+        }
+
+VALID_EARN_REASONS = frozenset({"reflection", "attestation", "vote", "cycle_participation"})
+
+@lru_cache(maxsize=4096)
+def _is_valid_cycle_date(value: str) -> bool:
+    """Cycle dates repeat across blocks, so each distinct string is parsed once"""
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return False
+    return True
+
+def hash_transaction(tx: GICTransaction) -> str:
+    """Hash a GIC transaction"""
+    tx_data = f"{tx.tx_id}{tx.from_addr}{tx.to_addr}{tx.amount}{tx.nonce}{tx.timestamp}"
+    return hashlib.sha256(tx_data.encode()).hexdigest()
+
+def hash_earn_transaction(tx: EarnTransaction) -> str:
+    """Hash an earn transaction"""
+    tx_data = f"{tx.tx_id}{tx.to_addr}{tx.amount}{tx.reason}{tx.cycle_id}{tx.timestamp}"
+    return hashlib.sha256(tx_data.encode()).hexdigest()
+
+def _valid_amount(amount: Any) -> bool:
+    return isinstance(amount, int) and amount >= 0
+
+# The two chunk checks below are module-level and only take picklable
+# arguments, so validate_block can hand them to a thread or a process pool.
+
+def check_transactions(txs: List[GICTransaction], start: int,
+                       verifier: Optional[Callable[[Any, str], bool]] = None
+                       ) -> Tuple[List[str], List[ValidationIssue]]:
+    """Stateless checks for a chunk of GIC transactions starting at block index ``start``"""
+    hashes = []
+    errors = []
+    for offset, tx in enumerate(txs):
+        tx_hash = hash_transaction(tx)
+        hashes.append(tx_hash)
+        if not _valid_amount(tx.amount):
+            reason = "invalid amount"
+        elif verifier is not None and not verifier(tx, tx_hash):
+            reason = "invalid signature"
+        else:
+            continue
+        errors.append(ValidationIssue("transaction", start + offset, tx.tx_id, reason))
+    return hashes, errors
+
+def check_earn_transactions(txs: List[EarnTransaction], start: int, cycle_ids: frozenset,
+                            verifier: Optional[Callable[[Any, str], bool]] = None
+                            ) -> Tuple[List[str], List[ValidationIssue]]:
+    """Checks for a chunk of earn transactions against the known cycle ids"""
+    hashes = []
+    errors = []
+    for offset, tx in enumerate(txs):
+        tx_hash = hash_earn_transaction(tx)
+        hashes.append(tx_hash)
+        # Check if the reason is valid
+        if tx.reason not in VALID_EARN_REASONS:
+            reason = "invalid reason"
+        # Check if cycle exists
+        elif tx.cycle_id not in cycle_ids:
+            reason = "unknown cycle"
+        elif not _valid_amount(tx.amount):
+            reason = "invalid amount"
+        elif verifier is not None and not verifier(tx, tx_hash):
+            reason = "invalid signature"
+        else:
+            continue
+        errors.append(ValidationIssue("earn_transaction", start + offset, tx.tx_id, reason))
+    return hashes, errors
 
 class MerkleTree:
-    """Simple Merkle tree implementation"""
+    """Merkle tree over hex hashes (block tx, earn and cycle roots)"""
     
-    def __init__(self, data: List[str]):
+    def __init__(self, data: List[str], mode: str = MODE_PADDED_HEX):
+        # The shared engine in civic_sdk.merkle; padded-hex keeps the existing block root format
         self.data = data
-        self.tree = self._build_tree()
-    
-    def _build_tree(self) -> List[List[str]]:
-        """Build the Merkle tree"""
-        if not self.data:
-            return []
-        
-        # Pad to power of 2
-        padded_data = self.data[:]
-        while len(padded_data) & (len(padded_data) - 1):
-            padded_data.append("")
-        
-        tree = [padded_data]
-        current_level = padded_data
-        
-        while len(current_level) > 1:
-            next_level = []
-            for i in range(0, len(current_level), 2):
-                left = current_level[i]
-                right = current_level[i + 1] if i + 1 < len(current_level) else ""
-                combined = left + right
-                hash_value = hashlib.sha256(combined.encode()).hexdigest()
-                next_level.append(hash_value)
-            tree.append(next_level)
-            current_level = next_level
-        
-        return tree
+        self.tree = merkle.MerkleTree(data, mode)
     
     def get_root(self) -> str:
         """Get the Merkle root"""
-        if not self.tree:
-            return ""
-        return self.tree[-1][0]
+        return self.tree.root_hex()
     
     def get_proof(self, index: int) -> List[str]:
         """Get Merkle proof for an element"""
         if index >= len(self.data):
             return []
-        
-        proof = []
-        current_index = index
-        
-        for level in self.tree[:-1]:
-            if current_index % 2 == 0:
-                # Left node, need right sibling
-                sibling_index = current_index + 1
-            else:
-                # Right node, need left sibling
-                sibling_index = current_index - 1
-            
-            if sibling_index < len(level):
-                proof.append(level[sibling_index])
-            
-            current_index //= 2
-        
-        return proof
+        return [sibling.hex() for _, sibling in self.tree.proof(index)]
 
 class ProofOfCycle:
     """Proof-of-Cycle consensus implementation"""
     
-    def __init__(self, genesis_policy: Policy):
+    def __init__(self, genesis_policy: Policy, state_store=None, validation_workers: int = 0,
+                 signature_verifier: Optional[Callable[[Any, str], bool]] = None,
+                 validation_executor: Optional[Executor] = None,
+                 chain_store: Optional[ChainStore] = None):
+        """
+        Args:
+            genesis_policy: Initial policy
+            state_store: Node store for the account state tree (default: in memory);
+                pass a state_tree.SQLiteNodeStore to keep state roots across restarts
+            validation_workers: Chunks the stateless block checks are split into (0 = inline)
+            signature_verifier: Optional callable(tx, tx_hash) -> bool run on every
+                transaction and earn transaction during validation
+            validation_executor: Pool for those chunks (default: a thread pool of
+                validation_workers threads). Pure-Python verifiers hold the GIL, so
+                pass a ProcessPoolExecutor for them; the verifier must be picklable.
+            chain_store: Keep blocks and state on disk (default: everything in memory).
+                Operations are journaled before they are applied, state is
+                snapshotted every chain_store.snapshot_interval blocks, and a
+                new instance on the same store resumes where the last one
+                stopped. Call close() to snapshot on shutdown.
+        """
         self.policy = genesis_policy
         self.citizens: Dict[str, CitizenID] = {}
         self.companions: Dict[str, CompanionID] = {}
         self.cycles: Dict[str, Cycle] = {}
         self.blocks: List[L1Block] = []
-        self.microblocks: List[Microblock] = []
+        self.microblocks: List[Microblock] = []  # Sealed or received, not yet committed by an L1 block
+        self.committed_microblocks: Dict[str, Microblock] = {}  # By hash (without a chain store)
+        self.microblock_builder: Optional[MicroblockBuilder] = None
+        self._microblock_lock = threading.Lock()
+        self._microblock_seq: Tuple[str, int] = ("", 0)  # (parent hash, next height)
         self.balances: Dict[str, GICAccount] = {}
         self.proposals: Dict[str, GovernanceProposal] = {}
         self.votes: Dict[str, Vote] = {}
         self.committee_size = 7  # Default committee size
         self.epoch_duration = 300  # 5 minutes in seconds
+        self.state_tree = SparseMerkleTree(state_store)
+        self._dirty_accounts: set = set()
+        self.committee_index: WeightIndex[str] = WeightIndex()
+        self.validation_workers = validation_workers
+        self.signature_verifier = signature_verifier
+        self.validation_executor = validation_executor
+        self.chain_store = chain_store
+        self._blocks_since_snapshot = 0
+        if chain_store is not None:
+            self._open_chain_store(chain_store, state_store)
+        
+    def _open_chain_store(self, store: ChainStore, state_store):
+        """Back state with the store: reload the last snapshot, then replay the journal"""
+        capacity = store.cache_size
+        self.citizens = StoredMap(store, "citizen", asdict, lambda d: CitizenID(**d), capacity=capacity)
+        self.companions = StoredMap(store, "companion", asdict, lambda d: CompanionID(**d), capacity=capacity)
+        self.cycles = StoredMap(store, "cycle", cycle_to_dict, cycle_from_dict, capacity=capacity)
+        self.balances = StoredMap(store, "account", asdict, lambda d: GICAccount(**d),
+                                  tag=self._committee_tag, capacity=capacity)
+        self.proposals = StoredMap(store, "proposal", asdict, lambda d: GovernanceProposal(**d),
+                                   capacity=capacity)
+        self.votes = StoredMap(store, "vote", asdict, lambda d: Vote(**d), capacity=capacity)
+        self.blocks = BlockLog(store, block_from_dict, store.recent_blocks)
+        
+        self._owns_state_store = state_store is None
+        root = store.get_meta("state_root")
+        self.state_tree = SparseMerkleTree(state_store or SQLiteNodeStore(store.path),
+                                           root=bytes.fromhex(root) if root else EMPTY)
+        
+        # Committee members in their saved slot order, so sampling is unchanged
+        self.committee_index.extend(
+            (address, account["staked"] + int(citizen["activity_score"] * 100) if account["staked"] > 0 else 0)
+            for address, account, citizen in store.iter_tagged("account", "citizen")
+        )
         
+        for _, kind, payload in store.iter_ops(store.get_meta("snapshot_seq", 0)):
+            self._apply_op(kind, payload)
+        self.blocks.load_recent()
+        self._trim_state()
+    
+    def _committee_tag(self, account: GICAccount) -> int:
+        """Stored with each account: 1 + its committee_index slot, 0 if it has none"""
+        slot = self.committee_index.slot(account.address)
+        return 0 if slot is None else slot + 1
+    
+    def _journal(self, kind: str, **payload: Any):
+        """Write an operation ahead of applying it (no-op without a chain store)"""
+        if self.chain_store is not None:
+            self.chain_store.append_op(kind, payload)
+    
+    def _apply_op(self, kind: str, payload: Dict[str, Any]):
+        """Re-apply one journaled operation on restart"""
+        if kind == "register_citizen":
+            self._op_register_citizen(payload["pubkey"], payload["ts"])
+        elif kind == "register_companion":
+            self._op_register_companion(payload["pubkey"], payload["citizen_owner"], payload["capabilities"])
+        elif kind == "activity":
+            self._op_activity(payload["citizen"], payload["at"])
+        elif kind == "cycle":
+            self._op_cycle(cycle_from_dict(payload["cycle"]))
+        elif kind == "stake":
+            self._op_stake(payload["address"], payload["amount"], payload["ts"])
+        elif kind == "unstake":
+            self._op_stake(payload["address"], -payload["amount"], payload["ts"])
+        elif kind == "block":
+            # Already counted by BlockLog, which sizes itself from the store
+            self._apply_block(block_from_dict(self.chain_store.load_block(payload["height"])))
+            self._blocks_since_snapshot += 1
+        else:
+            raise Exception(f"Unknown journal entry: {kind}")
+    
+    def _stored_maps(self) -> List[StoredMap]:
+        return [self.citizens, self.companions, self.cycles, self.balances, self.proposals, self.votes]
+    
+    def _trim_state(self):
+        if self.chain_store is not None:
+            for stored in self._stored_maps():
+                stored.trim()
+    
+    def snapshot(self):
+        """
+        Write state changed since the last snapshot to the chain store and
+        drop the journal it covers (runs every snapshot_interval blocks)
+        """
+        if self.chain_store is None:
+            return
+        state_root = self._compute_state_root()
+        maps = self._stored_maps()
+        self.chain_store.snapshot(
+            {stored.kind: stored.dirty_records() for stored in maps},
+            {"state_root": state_root, "height": len(self.blocks)},
+            self.chain_store.last_seq()
+        )
+        for stored in maps:
+            stored.clear_dirty()
+            stored.trim()
+        self._blocks_since_snapshot = 0
+    
+    def close(self):
+        """Snapshot and close the chain store"""
+        if self.chain_store is None:
+            return
+        self.snapshot()
+        if self._owns_state_store:
+            self.state_tree.store.close()
+        self.chain_store.close()
+    
     def register_citizen(self, pubkey: str) -> str:
         """Register a new citizen"""
+        ts = int(time.time())
+        self._journal("register_citizen", pubkey=pubkey, ts=ts)
+        citizen_id = self._op_register_citizen(pubkey, ts)
+        self._trim_state()
+        return citizen_id
+    
+    def _op_register_citizen(self, pubkey: str, ts: int) -> str:
         citizen_id = f"citizen_{len(self.citizens):06d}"
         self.citizens[citizen_id] = CitizenID(pubkey=pubkey)
         self.balances[citizen_id] = GICAccount(
@@ -263,13 +489,21 @@ class ProofOfCycle:
             balance=1000 * 10**18,  # 1000 GIC with 18 decimals
             vesting=0,
             staked=0,
-            last_updated=int(time.time())
+            last_updated=ts
         )
+        self._touch_account(citizen_id)
         return citizen_id
     
     def register_companion(self, pubkey: str, citizen_owner: str, 
                           capabilities: List[str]) -> str:
         """Register a new AI companion"""
+        self._journal("register_companion", pubkey=pubkey, citizen_owner=citizen_owner,
+                      capabilities=capabilities)
+        companion_id = self._op_register_companion(pubkey, citizen_owner, capabilities)
+        self._trim_state()
+        return companion_id
+    
+    def _op_register_companion(self, pubkey: str, citizen_owner: str, capabilities: List[str]) -> str:
         companion_id = f"companion_{len(self.companions):06d}"
         self.companions[companion_id] = CompanionID(
             pubkey=pubkey,
@@ -307,11 +541,19 @@ class ProofOfCycle:
         
         # Update activity score
         if author in self.citizens:
-            self.citizens[author].activity_score += 1.0
-            self.citizens[author].last_activity = datetime.now().isoformat()
+            at = datetime.now().isoformat()
+            self._journal("activity", citizen=author, at=at)
+            self._op_activity(author, at)
+            self._trim_state()
         
         return reflection
     
+    def _op_activity(self, citizen_id: str, at: str):
+        self.citizens[citizen_id].activity_score += 1.0
+        self.citizens[citizen_id].last_activity = at
+        self._touch_citizen(citizen_id)
+        self._update_committee_weight(citizen_id)
+    
     def create_cycle(self, proposer: str, date: str) -> Cycle:
         """Create a new civic cycle"""
         cycle_id = f"cycle_{date.replace('-', '')}"
@@ -335,43 +577,199 @@ class ProofOfCycle:
             proposer=proposer
         )
         
-        self.cycles[cycle_id] = cycle
+        self._journal("cycle", cycle=cycle_to_dict(cycle))
+        self._op_cycle(cycle)
+        self._trim_state()
         return cycle
     
-    def select_committee(self, epoch: int) -> List[str]:
-        """Select committee for the current epoch using VRF + stake + activity"""
-        # Get all citizens with stake
-        staked_citizens = [
-            (citizen_id, self.balances[citizen_id].staked + 
-             self.citizens[citizen_id].activity_score * 100)
-            for citizen_id in self.citizens.keys()
-            if self.balances[citizen_id].staked > 0
-        ]
-        
-        if len(staked_citizens) < self.committee_size:
-            # Not enough staked citizens, use all available
-            return list(self.citizens.keys())[:self.committee_size]
+    def _op_cycle(self, cycle: Cycle):
+        self.cycles[cycle.cycle_id] = cycle
+    
+    def start_microblocks(self, proposer: str, interval: float = 0.25, max_items: int = 10_000):
+        """
+        Start sealing submitted reflections and attestations into microblocks
         
-        # Sort by combined stake + activity score
-        staked_citizens.sort(key=lambda x: x[1], reverse=True)
+        A microblock is sealed every ``interval`` seconds while items are
+        waiting (or once ``max_items`` are), links to the latest L1 block and
+        is committed by the next propose_block.
+        """
+        if self.microblock_builder is not None:
+            return
+        self.microblock_builder = MicroblockBuilder(
+            lambda items: self.seal_microblock(items, proposer), interval, max_items
+        )
+        self.microblock_builder.start()
+    
+    def stop_microblocks(self):
+        """Seal anything still queued and stop the microblock builder"""
+        if self.microblock_builder is not None:
+            self.microblock_builder.stop()
+            self.microblock_builder = None
+    
+    def submit_reflection(self, reflection: Reflection) -> "Future[MicroblockReceipt]":
+        """Queue a reflection for the next microblock; resolves to its receipt once sealed"""
+        if self.microblock_builder is None:
+            raise Exception("Microblock builder not started")
+        return self.microblock_builder.submit(reflection)
+    
+    def submit_attestation(self, attestation: Dict[str, Any]) -> "Future[MicroblockReceipt]":
+        """Queue an attestation for the next microblock; resolves to its receipt once sealed"""
+        if self.microblock_builder is None:
+            raise Exception("Microblock builder not started")
+        return self.microblock_builder.submit(attestation)
+    
+    def seal_microblock(self, items: List[Union[Reflection, Dict[str, Any]]],
+                        proposer: str) -> List[MicroblockReceipt]:
+        """
+        Seal reflections and attestations into one microblock
         
-        # Select top committee_size citizens
-        committee = [citizen_id for citizen_id, _ in staked_citizens[:self.committee_size]]
+        Returns a receipt per item, in the order given. Receipts share the
+        microblock's Merkle tree, so an item's proof is only built if asked for.
+        """
+        reflections = [item for item in items if isinstance(item, Reflection)]
+        attestations = [item for item in items if not isinstance(item, Reflection)]
+        leaves = [hash_reflection(r) for r in reflections] + [hash_attestation(a) for a in attestations]
+        tree = merkle.MerkleTree(leaves)
+        root = tree.root_hex()
         
-        # Add some randomness using VRF (simplified)
-        vrf_seed = f"epoch_{epoch}_{self.policy.hash}"
-        random_factor = int(hashlib.sha256(vrf_seed.encode()).hexdigest(), 16)
+        with self._microblock_lock:
+            parent_hash = self.blocks[-1].hash if self.blocks else "0" * 64
+            parent, height = self._microblock_seq
+            height = height if parent == parent_hash else 0
+            self._microblock_seq = (parent_hash, height + 1)
+            microblock = Microblock(
+                parent_hash=parent_hash,
+                height=height,
+                timestamp=int(time.time()),
+                proposer=proposer,
+                reflections=reflections,
+                attestations=attestations,
+                hash="",
+                root=root
+            )
+            microblock.hash = hash_microblock(microblock)
+            self.microblocks.append(microblock)
         
-        # Shuffle committee based on VRF
-        for i in range(len(committee)):
-            j = (i + random_factor) % len(committee)
-            committee[i], committee[j] = committee[j], committee[i]
+        # Leaf index of each item: reflections first, then attestations
+        receipts = []
+        next_reflection, next_attestation = 0, len(reflections)
+        for item in items:
+            if isinstance(item, Reflection):
+                index, next_reflection = next_reflection, next_reflection + 1
+            else:
+                index, next_attestation = next_attestation, next_attestation + 1
+            receipts.append(MicroblockReceipt(
+                microblock_hash=microblock.hash,
+                parent_hash=parent_hash,
+                height=height,
+                root=root,
+                index=index,
+                leaf=leaves[index].hex(),
+                tree=tree
+            ))
+        return receipts
+    
+    def receive_microblock(self, microblock: Microblock) -> bool:
+        """
+        Accept a microblock sealed by another node, so a block can commit it
         
-        return committee[:self.committee_size]
+        It must hash correctly, its root must cover its items and it must
+        link to the latest L1 block; returns False if not.
+        """
+        leaves = ([hash_reflection(r) for r in microblock.reflections] +
+                  [hash_attestation(a) for a in microblock.attestations])
+        if (merkle.MerkleTree(leaves).root_hex() != microblock.root
+                or hash_microblock(microblock) != microblock.hash):
+            return False
+        with self._microblock_lock:
+            parent_hash = self.blocks[-1].hash if self.blocks else "0" * 64
+            if microblock.parent_hash != parent_hash:
+                return False
+            if any(mb.hash == microblock.hash for mb in self.microblocks):
+                return True
+            self.microblocks.append(microblock)
+            # Seal after it, so heights under this parent keep increasing
+            parent, height = self._microblock_seq
+            height = height if parent == parent_hash else 0
+            self._microblock_seq = (parent_hash, max(height, microblock.height + 1))
+        return True
+    
+    def get_microblock(self, microblock_hash: str) -> Optional[Microblock]:
+        """A pending or committed microblock by hash"""
+        with self._microblock_lock:
+            for microblock in self.microblocks:
+                if microblock.hash == microblock_hash:
+                    return microblock
+        if self.chain_store is not None:
+            data = self.chain_store.load_microblock(microblock_hash)
+            return microblock_from_dict(data) if data else None
+        return self.committed_microblocks.get(microblock_hash)
+    
+    def select_committee(self, epoch: int, vrf_output: Optional[bytes] = None) -> List[str]:
+        """
+        Select committee for the current epoch using VRF + stake + activity
+        
+        Staked citizens are drawn without replacement with probability
+        proportional to stake + activity from committee_index, in
+        O(committee_size * log n). The draw is seeded by ``vrf_output`` when
+        given, otherwise by the epoch and policy hash.
+        """
+        if self.committee_index.positive_count < self.committee_size:
+            # Not enough staked citizens, use all available
+            return list(islice(self.citizens, self.committee_size))
+        
+        seed = vrf_output or hashlib.sha256(f"epoch_{epoch}_{self.policy.hash}".encode()).digest()
+        return self.committee_index.sample(seed, self.committee_size)
+    
+    def _update_committee_weight(self, citizen_id: str):
+        """Re-weight a citizen in committee_index after a stake or activity change"""
+        account = self.balances.get(citizen_id)
+        if citizen_id not in self.citizens or account is None:
+            return
+        weight = 0
+        if account.staked > 0:
+            weight = account.staked + int(self.citizens[citizen_id].activity_score * 100)
+        self.committee_index.set(citizen_id, weight)
+    
+    def stake(self, address: str, amount: int):
+        """Move GIC from an account's balance into its stake"""
+        account = self.balances.get(address)
+        if account is None or amount <= 0 or amount > account.balance:
+            raise Exception("Invalid stake amount")
+        ts = int(time.time())
+        self._journal("stake", address=address, amount=amount, ts=ts)
+        self._op_stake(address, amount, ts)
+        self._trim_state()
+    
+    def unstake(self, address: str, amount: int):
+        """Move GIC from an account's stake back into its balance"""
+        account = self.balances.get(address)
+        if account is None or amount <= 0 or amount > account.staked:
+            raise Exception("Invalid unstake amount")
+        ts = int(time.time())
+        self._journal("unstake", address=address, amount=amount, ts=ts)
+        self._op_stake(address, -amount, ts)
+        self._trim_state()
+    
+    def _op_stake(self, address: str, delta: int, ts: int):
+        """Move delta from balance to stake (negative to unstake)"""
+        account = self.balances[address]
+        account.balance -= delta
+        account.staked += delta
+        account.last_updated = ts
+        self._touch_account(address)
+        self._update_committee_weight(address)
     
     def propose_block(self, proposer: str, transactions: List[GICTransaction],
-                     earn_transactions: List[EarnTransaction], cycles: List[Cycle]) -> L1Block:
-        """Propose a new L1 block"""
+                     earn_transactions: List[EarnTransaction], cycles: List[Cycle],
+                     microblocks: Optional[List[Microblock]] = None) -> L1Block:
+        """
+        Propose a new L1 block
+        
+        The block commits to microblocks by hash only (header.microblock_root);
+        by default every pending microblock built on the parent is included,
+        in height order.
+        """
         if not self.blocks:
             parent_hash = "0" * 64  # Genesis
             height = 0
@@ -392,6 +790,13 @@ class ProofOfCycle:
         cycle_tree = MerkleTree(cycle_hashes)
         cycle_root = cycle_tree.get_root()
         
+        if microblocks is None:
+            with self._microblock_lock:
+                microblocks = sorted((mb for mb in self.microblocks if mb.parent_hash == parent_hash),
+                                     key=lambda mb: mb.height)
+        microblock_hashes = [microblock.hash for microblock in microblocks]
+        microblock_root = MerkleTree(microblock_hashes).get_root()
+        
         # Create state root (simplified)
         state_root = self._compute_state_root()
         
@@ -405,7 +810,8 @@ class ProofOfCycle:
             tx_root=tx_root,
             cycle_root=cycle_root,
             policy_version=self.policy.version,
-            committee_sigs=[]  # Will be filled by committee
+            committee_sigs=[],  # Will be filled by committee
+            microblock_root=microblock_root
         )
         
         # Create block
@@ -415,7 +821,8 @@ class ProofOfCycle:
             earn_transactions=earn_transactions,
             cycles=cycles,
             policy_updates=[],
-            hash=""
+            hash="",
+            microblock_hashes=microblock_hashes
         )
         
         # Compute block hash
@@ -423,41 +830,77 @@ class ProofOfCycle:
         
         return block
     
-    def validate_block(self, block: L1Block) -> bool:
-        """Validate a proposed block"""
+    def validate_block(self, block: L1Block) -> BlockValidationReport:
+        """
+        Validate a proposed block
+        
+        Stateless checks (hashes, roots, reasons, dates, signatures) run in
+        chunks, on a thread pool when validation_workers > 1. Balances and
+        nonces are then checked in one pass per sender, in block order, so a
+        sender cannot spend the same balance or nonce twice in one block.
+        Each committed microblock must be one this node holds (sealed here
+        or received), built on the block's parent, in height order.
+        """
+        errors: List[ValidationIssue] = []
+        
         # Check block hash
         if block.hash != self._hash_block(block):
-            return False
+            errors.append(ValidationIssue("block", -1, block.hash, "block hash mismatch"))
         
         # Check parent hash
         if block.header.height > 0:
-            if block.header.parent_hash != self.blocks[-1].hash:
-                return False
+            if not self.blocks or block.header.parent_hash != self.blocks[-1].hash:
+                errors.append(ValidationIssue("block", -1, block.hash, "parent hash mismatch"))
         
-        # Validate transactions
-        for tx in block.transactions:
-            if not self._validate_transaction(tx):
-                return False
+        # Stateless checks per item
+        tx_hashes, tx_errors = self._run_checks(check_transactions, block.transactions,
+                                                self.signature_verifier)
+        _, earn_errors = self._run_checks(check_earn_transactions, block.earn_transactions,
+                                          frozenset(self.cycles), self.signature_verifier)
+        cycle_hashes, cycle_errors = self._check_cycles(block.cycles)
         
-        # Validate earn transactions
-        for tx in block.earn_transactions:
-            if not self._validate_earn_transaction(tx):
-                return False
+        if MerkleTree(tx_hashes).get_root() != block.header.tx_root:
+            errors.append(ValidationIssue("block", -1, block.hash, "tx_root mismatch"))
+        if MerkleTree(cycle_hashes).get_root() != block.header.cycle_root:
+            errors.append(ValidationIssue("block", -1, block.hash, "cycle_root mismatch"))
+        if MerkleTree(block.microblock_hashes).get_root() != block.header.microblock_root:
+            errors.append(ValidationIssue("block", -1, block.hash, "microblock_root mismatch"))
+        errors.extend(self._check_microblocks(block))
         
-        # Validate cycles
-        for cycle in block.cycles:
-            if not self._validate_cycle(cycle):
-                return False
+        # Balance and nonce checks, grouped by sender
+        rejected = {issue.index for issue in tx_errors}
+        tx_errors.extend(self._check_balances(block.transactions, rejected))
+        tx_errors.sort(key=lambda issue: issue.index)
         
-        return True
+        return BlockValidationReport(block.hash, errors + tx_errors + earn_errors + cycle_errors)
     
-    def add_block(self, block: L1Block) -> bool:
-        """Add a validated block to the chain"""
-        if not self.validate_block(block):
-            return False
+    def add_block(self, block: L1Block) -> BlockValidationReport:
+        """Add a validated block to the chain (the report is falsy if it was rejected)"""
+        report = self.validate_block(block)
+        if not report:
+            return report
         
+        with self._microblock_lock:
+            pending = {mb.hash: mb for mb in self.microblocks}
+        committed = [pending[mb_hash] for mb_hash in block.microblock_hashes]
+        if self.chain_store is not None:
+            self.chain_store.append_block(block.header.height, block.hash, block_to_dict(block),
+                                          [(mb.hash, microblock_to_dict(mb)) for mb in committed])
+        else:
+            self.committed_microblocks.update((mb.hash, mb) for mb in committed)
         self.blocks.append(block)
+        self._apply_block(block)
         
+        if self.chain_store is not None:
+            self._blocks_since_snapshot += 1
+            if self._blocks_since_snapshot >= self.chain_store.snapshot_interval:
+                self.snapshot()
+            else:
+                self._trim_state()
+        return report
+    
+    def _apply_block(self, block: L1Block):
+        """Apply an accepted block's transactions and cycles to state"""
         # Apply transactions
         for tx in block.transactions:
             self._apply_transaction(tx)
@@ -469,7 +912,10 @@ class ProofOfCycle:
         for cycle in block.cycles:
             self.cycles[cycle.cycle_id] = cycle
         
-        return True
+        # Committed microblocks are no longer pending, and ones built on an
+        # older tip can no longer be committed by any block
+        with self._microblock_lock:
+            self.microblocks = [mb for mb in self.microblocks if mb.parent_hash == block.hash]
     
     def create_earn_transaction(self, to_addr: str, amount: int, reason: str,
                                cycle_id: str, attestation_hash: str) -> EarnTransaction:
@@ -522,13 +968,11 @@ class ProofOfCycle:
     
     def _hash_transaction(self, tx: GICTransaction) -> str:
         """Hash a GIC transaction"""
-        tx_data = f"{tx.tx_id}{tx.from_addr}{tx.to_addr}{tx.amount}{tx.nonce}{tx.timestamp}"
-        return hashlib.sha256(tx_data.encode()).hexdigest()
+        return hash_transaction(tx)
     
     def _hash_earn_transaction(self, tx: EarnTransaction) -> str:
         """Hash an earn transaction"""
-        tx_data = f"{tx.tx_id}{tx.to_addr}{tx.amount}{tx.reason}{tx.cycle_id}{tx.timestamp}"
-        return hashlib.sha256(tx_data.encode()).hexdigest()
+        return hash_earn_transaction(tx)
     
     def _hash_cycle(self, cycle: Cycle) -> str:
         """Hash a cycle"""
@@ -537,61 +981,142 @@ class ProofOfCycle:
     
     def _hash_block(self, block: L1Block) -> str:
         """Hash a block"""
-        block_data = f"{block.header.parent_hash}{block.header.height}{block.header.timestamp}{block.header.proposer}{block.header.state_root}{block.header.tx_root}{block.header.cycle_root}"
+        block_data = f"{block.header.parent_hash}{block.header.height}{block.header.timestamp}{block.header.proposer}{block.header.state_root}{block.header.tx_root}{block.header.cycle_root}{block.header.microblock_root}"
         return hashlib.sha256(block_data.encode()).hexdigest()
     
     def _compute_state_root(self) -> str:
         """Compute the current state root"""
-        # Simplified state root computation
-        state_data = ""
-        for addr, account in self.balances.items():
-            state_data += f"{addr}{account.balance}{account.nonce}"
-        return hashlib.sha256(state_data.encode()).hexdigest()
-    
-    def _validate_transaction(self, tx: GICTransaction) -> bool:
-        """Validate a GIC transaction"""
-        # Check if sender has sufficient balance
-        if tx.from_addr in self.balances:
-            account = self.balances[tx.from_addr]
-            if account.balance < tx.amount:
-                return False
-            if account.nonce != tx.nonce:
-                return False
-        
-        return True
+        # Only accounts touched since the last root are rehashed
+        self._flush_state()
+        return self.state_tree.commit()
     
-    def _validate_earn_transaction(self, tx: EarnTransaction) -> bool:
-        """Validate an earn transaction"""
-        # Check if the reason is valid
-        valid_reasons = ["reflection", "attestation", "vote", "cycle_participation"]
-        if tx.reason not in valid_reasons:
-            return False
-        
-        # Check if cycle exists
-        if tx.cycle_id not in self.cycles:
-            return False
+    def _touch_account(self, addr: str):
+        """Mark an account as changed since the last state root (and snapshot)"""
+        self._dirty_accounts.add(addr)
+        if self.chain_store is not None:
+            self.balances.mark_dirty(addr)
+    
+    def _touch_citizen(self, citizen_id: str):
+        """Mark a citizen changed in place since the last snapshot"""
+        if self.chain_store is not None:
+            self.citizens.mark_dirty(citizen_id)
+    
+    def _flush_state(self):
+        """Write touched accounts into the state tree in one batch (shared paths hashed once)"""
+        if self._dirty_accounts:
+            self.state_tree.update_many(
+                (key_for(addr), hash_account(self.balances[addr])) for addr in self._dirty_accounts
+            )
+            self._dirty_accounts.clear()
+    
+    def get_account_proof(self, address: str, state_root: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Inclusion proof for an account's current state
         
-        return True
+        Light clients check it with verify_account_proof against the
+        state_root of a block header. For an unknown address the proof shows
+        the account is absent.
+        """
+        root = bytes.fromhex(state_root) if state_root else None
+        self._flush_state()
+        proof = self.state_tree.prove(key_for(address), root)
+        account = self.balances.get(address) if state_root is None else None
+        return {
+            "address": address,
+            "state_root": state_root or self.state_tree.root_hex(),
+            "account": asdict(account) if account else None,
+            "proof": proof.to_dict(),
+        }
     
-    def _validate_cycle(self, cycle: Cycle) -> bool:
-        """Validate a cycle"""
-        # Check if cycle date is valid
-        try:
-            datetime.strptime(cycle.date, "%Y-%m-%d")
-        except ValueError:
-            return False
+    def _run_checks(self, check: Callable[..., Tuple[List[str], List[ValidationIssue]]],
+                    items: List[Any], *args: Any) -> Tuple[List[str], List[ValidationIssue]]:
+        """Run a stateless chunk check over items, split across the validation pool"""
+        chunks = self.validation_workers
+        if chunks <= 1 or len(items) < 2 * chunks:
+            return check(items, 0, *args)
         
-        # Check if proposer is valid
-        if cycle.proposer not in self.citizens:
-            return False
+        if self.validation_executor is None:
+            self.validation_executor = ThreadPoolExecutor(max_workers=chunks,
+                                                          thread_name_prefix="poc-validate")
+        size = -(-len(items) // chunks)
+        futures = [self.validation_executor.submit(check, items[start:start + size], start, *args)
+                   for start in range(0, len(items), size)]
+        hashes: List[str] = []
+        errors: List[ValidationIssue] = []
+        for future in futures:
+            chunk_hashes, chunk_errors = future.result()
+            hashes.extend(chunk_hashes)
+            errors.extend(chunk_errors)
+        return hashes, errors
+    
+    def _check_cycles(self, cycles: List[Cycle]) -> Tuple[List[str], List[ValidationIssue]]:
+        """Checks for a block's cycles (few per block, so always inline)"""
+        hashes = []
+        errors = []
+        for index, cycle in enumerate(cycles):
+            hashes.append(self._hash_cycle(cycle))
+            # Check if cycle date is valid
+            if not _is_valid_cycle_date(cycle.date):
+                reason = "invalid date"
+            # Check if proposer is valid
+            elif cycle.proposer not in self.citizens:
+                reason = "unknown proposer"
+            else:
+                continue
+            errors.append(ValidationIssue("cycle", index, cycle.cycle_id, reason))
+        return hashes, errors
+    
+    def _check_microblocks(self, block: L1Block) -> List[ValidationIssue]:
+        """Committed microblocks must be pending here, built on the block's parent and in height order"""
+        with self._microblock_lock:
+            pending = {mb.hash: mb for mb in self.microblocks}
+        errors = []
+        last_height = -1
+        for index, mb_hash in enumerate(block.microblock_hashes):
+            microblock = pending.get(mb_hash)
+            if microblock is None:
+                reason = "unknown microblock"
+            elif microblock.parent_hash != block.header.parent_hash:
+                reason = "microblock parent mismatch"
+            elif microblock.height <= last_height:
+                reason = "microblock height out of order"
+            else:
+                last_height = microblock.height
+                continue
+            errors.append(ValidationIssue("microblock", index, mb_hash, reason))
+        return errors
+    
+    def _check_balances(self, txs: List[GICTransaction], rejected: set) -> List[ValidationIssue]:
+        """Running balance and nonce per sender, following block order"""
+        by_sender: Dict[str, List[int]] = {}
+        for index, tx in enumerate(txs):
+            if index not in rejected:
+                by_sender.setdefault(tx.from_addr, []).append(index)
         
-        return True
+        errors = []
+        for sender, indices in by_sender.items():
+            account = self.balances.get(sender)
+            balance = account.balance if account else 0
+            nonce = account.nonce if account else 0
+            for index in indices:
+                tx = txs[index]
+                if tx.nonce != nonce:
+                    reason = f"bad nonce: expected {nonce}, got {tx.nonce}"
+                elif tx.amount > balance:
+                    reason = "insufficient balance"
+                else:
+                    balance -= tx.amount
+                    nonce += 1
+                    continue
+                errors.append(ValidationIssue("transaction", index, tx.tx_id, reason))
+        return errors
     
     def _apply_transaction(self, tx: GICTransaction):
         """Apply a GIC transaction to state"""
         if tx.from_addr in self.balances:
             self.balances[tx.from_addr].balance -= tx.amount
             self.balances[tx.from_addr].nonce += 1
+            self._touch_account(tx.from_addr)
         
         if tx.to_addr not in self.balances:
             self.balances[tx.to_addr] = GICAccount(
@@ -605,6 +1130,7 @@ class ProofOfCycle:
         
         self.balances[tx.to_addr].balance += tx.amount
         self.balances[tx.to_addr].last_updated = int(time.time())
+        self._touch_account(tx.to_addr)
     
     def _apply_earn_transaction(self, tx: EarnTransaction):
         """Apply an earn transaction to state"""
@@ -620,10 +1146,95 @@ class ProofOfCycle:
         
         self.balances[tx.to_addr].balance += tx.amount
         self.balances[tx.to_addr].last_updated = int(time.time())
+        self._touch_account(tx.to_addr)
         
         # Update activity score
         if tx.to_addr in self.citizens:
             self.citizens[tx.to_addr].activity_score += 1.0
+            self._touch_citizen(tx.to_addr)
+            self._update_committee_weight(tx.to_addr)
+
+def cycle_to_dict(cycle: Cycle) -> Dict[str, Any]:
+    return dict(asdict(cycle), status=cycle.status.value)
+
+def cycle_from_dict(data: Dict[str, Any]) -> Cycle:
+    return Cycle(**dict(data, status=CycleStatus(data["status"])))
+
+def block_to_dict(block: L1Block) -> Dict[str, Any]:
+    """JSON-safe form of a block, as kept by the chain store"""
+    return dict(asdict(block), cycles=[cycle_to_dict(cycle) for cycle in block.cycles])
+
+def block_from_dict(data: Dict[str, Any]) -> L1Block:
+    return L1Block(
+        header=BlockHeader(**data["header"]),
+        transactions=[GICTransaction(**tx) for tx in data["transactions"]],
+        earn_transactions=[EarnTransaction(**tx) for tx in data["earn_transactions"]],
+        cycles=[cycle_from_dict(cycle) for cycle in data["cycles"]],
+        policy_updates=[Policy(**policy) for policy in data["policy_updates"]],
+        hash=data["hash"],
+        microblock_hashes=data.get("microblock_hashes", [])
+    )
+
+def microblock_to_dict(microblock: Microblock) -> Dict[str, Any]:
+    """JSON-safe form of a microblock, as kept by the chain store"""
+    return asdict(microblock)
+
+def microblock_from_dict(data: Dict[str, Any]) -> Microblock:
+    return Microblock(**dict(data, reflections=[Reflection(**r) for r in data["reflections"]]))
+
+def hash_reflection(reflection: Reflection) -> bytes:
+    """Microblock leaf for a reflection"""
+    reflection_data = json.dumps(
+        [reflection.ref_id, reflection.envelope_hash, reflection.author, reflection.companion,
+         reflection.visibility, reflection.tags, reflection.timestamp, reflection.zk_proof,
+         reflection.rate_limit_proof],
+        separators=(",", ":")
+    )
+    return hashlib.sha256(reflection_data.encode()).digest()
+
+def hash_attestation(attestation: Dict[str, Any]) -> bytes:
+    """Microblock leaf for an attestation (canonical JSON)"""
+    attestation_data = json.dumps(attestation, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(attestation_data.encode()).digest()
+
+def hash_microblock(microblock: Microblock) -> str:
+    """Hash a microblock header (items are committed through its root)"""
+    microblock_data = f"{microblock.parent_hash}{microblock.height}{microblock.timestamp}{microblock.proposer}{microblock.root}"
+    return hashlib.sha256(microblock_data.encode()).hexdigest()
+
+def verify_microblock_receipt(receipt: MicroblockReceipt, item: Union[Reflection, Dict[str, Any]]) -> bool:
+    """Check that an item is the receipt's leaf and that the leaf is under the microblock root"""
+    leaf = hash_reflection(item) if isinstance(item, Reflection) else hash_attestation(item)
+    if leaf.hex() != receipt.leaf:
+        return False
+    path = [(side, bytes.fromhex(sibling)) for side, sibling in receipt.proof()]
+    return merkle.verify_proof(receipt.root, leaf, path)
+
+def hash_account(account: GICAccount) -> bytes:
+    """State tree value for an account (last_updated is bookkeeping, not state)"""
+    account_data = json.dumps(
+        [account.address, account.nonce, account.balance, account.vesting, account.staked],
+        separators=(",", ":")
+    )
+    return hashlib.sha256(account_data.encode()).digest()
+
+def verify_account_proof(state_root: str, address: str, account: Optional[Dict[str, Any]],
+                         proof: Dict[str, Any]) -> bool:
+    """
+    Check an account against a block's state_root without the full state
+    
+    Args:
+        state_root: state_root from a trusted block header
+        address: Account address
+        account: Claimed account fields (as returned by get_account_proof), or None for absent
+        proof: The "proof" part of get_account_proof's result
+    """
+    value_hash = None
+    if account is not None:
+        if account.get("address") != address:
+            return False
+        value_hash = hash_account(GICAccount(**account))
+    return verify_proof(state_root, key_for(address), value_hash, StateProof(**proof))
 
 def create_genesis_policy() -> Policy:
     """Create the genesis policy configuration"""
@@ -677,6 +1288,12 @@ if __name__ == "__main__":
     )
     print(f"Created reflection: {reflection.ref_id}")
     
+    # Acknowledge it through a microblock
+    poc.start_microblocks(proposer=citizen1)
+    receipt = poc.submit_reflection(reflection).result(timeout=5)
+    print(f"Sealed in microblock {receipt.microblock_hash[:16]}... (leaf {receipt.index})")
+    poc.stop_microblocks()
+    
     # Create a cycle
     cycle = poc.create_cycle(proposer=citizen1, date="2024-01-01")
     print(f"Created cycle: {cycle.cycle_id}")
@@ -711,5 +1328,11 @@ if __name__ == "__main__":
         print("✗ Failed to add block to chain")
     
     print(f"Chain height: {len(poc.blocks)}")
+    print(f"Microblocks committed: {len(block.microblock_hashes)}")
     print(f"Citizen 1 balance: {poc.balances[citizen1].balance / 10**18} GIC")
+    
+    # Light-client check of citizen 1 against the state root
+    proof = poc.get_account_proof(citizen1)
+    if verify_account_proof(proof["state_root"], citizen1, proof["account"], proof["proof"]):
+        print(f"✓ Account proof verified ({len(proof['proof']['siblings'])} siblings)")
 
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Sparse Merkle State Tree
+
+Account state for Proof-of-Cycle is committed to by a compact sparse Merkle
+tree over 256-bit keys (sha256 of the address). A subtree holding a single
+account is stored as that account's leaf, so a path is only as deep as needed
+to separate keys: about log2(n) nodes for n accounts. Updating an account
+rehashes just that path.
+
+Nodes are content addressed and never modified, so every historical root
+stays readable from the node store. Roots do not depend on insertion order,
+and any account (present or absent) has an inclusion proof that can be
+checked against a block's state_root without the rest of the state.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+KEY_BITS = 256
+EMPTY = b"\x00" * 32
+
+_LEAF = b"\x00"
+_NODE = b"\x01"
+
+
+def _h(*parts: bytes) -> bytes:
+    return hashlib.sha256(b"".join(parts)).digest()
+
+
+def leaf_hash(key: bytes, value_hash: bytes) -> bytes:
+    """Hash of a leaf holding ``value_hash`` under ``key``"""
+    return _h(_LEAF, key, value_hash)
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    """Hash of an internal node"""
+    return _h(_NODE, left, right)
+
+
+def key_for(address: str) -> bytes:
+    """Tree key for an account address"""
+    return hashlib.sha256(address.encode()).digest()
+
+
+def _bit(key: bytes, depth: int) -> int:
+    return (key[depth >> 3] >> (7 - (depth & 7))) & 1
+
+
+class MemoryNodeStore:
+    """Node store kept in a dict"""
+
+    def __init__(self):
+        self._nodes: Dict[bytes, bytes] = {}
+
+    def get(self, h: bytes) -> Optional[bytes]:
+        return self._nodes.get(h)
+
+    def put_many(self, nodes: Dict[bytes, bytes]):
+        self._nodes.update(nodes)
+
+    def get_meta(self, name: str) -> Optional[bytes]:
+        return self._nodes.get(b"meta:" + name.encode())
+
+    def set_meta(self, name: str, value: bytes):
+        self._nodes[b"meta:" + name.encode()] = value
+
+
+class SQLiteNodeStore:
+    """Node store persisted in a SQLite file, with an LRU cache of recently read nodes"""
+
+    def __init__(self, path: str, cache_size: int = 65536):
+        self.path = path
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[bytes, bytes]" = OrderedDict()  # nodes are immutable, so never stale
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS smt_nodes (hash BLOB PRIMARY KEY, data BLOB NOT NULL) WITHOUT ROWID")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS smt_meta (name TEXT PRIMARY KEY, value BLOB NOT NULL)")
+        self._conn.commit()
+
+    def get(self, h: bytes) -> Optional[bytes]:
+        with self._lock:
+            data = self._cache.get(h)
+            if data is not None:
+                self._cache.move_to_end(h)
+                return data
+            row = self._conn.execute("SELECT data FROM smt_nodes WHERE hash = ?", (h,)).fetchone()
+            if row is None:
+                return None
+            self._cache[h] = row[0]
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return row[0]
+
+    def put_many(self, nodes: Dict[bytes, bytes]):
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO smt_nodes (hash, data) VALUES (?, ?)", nodes.items())
+            # New nodes are the next commit's path, so keep them hot
+            self._cache.update(nodes)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get_meta(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM smt_meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, name: str, value: bytes):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO smt_meta (name, value) VALUES (?, ?)", (name, value))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass
+class StateProof:
+    """
+    Proof that ``key`` maps to ``value_hash`` (or to nothing) under a root
+
+    ``siblings`` run from the root downwards. ``leaf_key``/``leaf_value`` name
+    the leaf found at the end of the path: the key itself for an inclusion
+    proof, another key (or None for an empty slot) for a non-inclusion proof.
+    """
+    key: str
+    siblings: List[str]
+    leaf_key: Optional[str]
+    leaf_value: Optional[str]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "key": self.key,
+            "siblings": self.siblings,
+            "leaf_key": self.leaf_key,
+            "leaf_value": self.leaf_value,
+        }
+
+
+def verify_proof(root: str, key: bytes, value_hash: Optional[bytes], proof: StateProof) -> bool:
+    """
+    Check a proof against a state root
+
+    Args:
+        root: Hex state root (e.g. a block header's state_root)
+        key: Tree key (see key_for)
+        value_hash: Expected value hash, or None to check the key is absent
+        proof: Proof from SparseMerkleTree.prove
+    """
+    if proof.leaf_key is None:
+        h = EMPTY
+        found = None
+    else:
+        leaf_key = bytes.fromhex(proof.leaf_key)
+        leaf_value = bytes.fromhex(proof.leaf_value)
+        # The leaf must sit on the path of the key being proven
+        for depth in range(len(proof.siblings)):
+            if _bit(leaf_key, depth) != _bit(key, depth):
+                return False
+        h = leaf_hash(leaf_key, leaf_value)
+        found = leaf_value if leaf_key == key else None
+
+    if found != value_hash:
+        return False
+
+    for depth in range(len(proof.siblings) - 1, -1, -1):
+        sibling = bytes.fromhex(proof.siblings[depth])
+        h = node_hash(sibling, h) if _bit(key, depth) else node_hash(h, sibling)
+    return h.hex() == root
+
+
+class SparseMerkleTree:
+    """Compact sparse Merkle tree over a content-addressed node store"""
+
+    def __init__(self, store=None, root: Optional[bytes] = None):
+        """
+        Initialize the tree
+
+        Args:
+            store: MemoryNodeStore or SQLiteNodeStore (default: in memory)
+            root: Root to open; defaults to the last root committed to the store
+        """
+        self.store = store if store is not None else MemoryNodeStore()
+        if root is None:
+            root = self.store.get_meta("root") or EMPTY
+        self.root = root
+        self._pending: Dict[bytes, bytes] = {}
+
+    # --- Node encoding -----------------------------------------------------
+
+    def _load(self, h: bytes) -> Tuple[str, bytes, bytes]:
+        data = self._pending.get(h) or self.store.get(h)
+        if data is None:
+            raise KeyError(f"missing state tree node {h.hex()}")
+        return ("leaf" if data[:1] == _LEAF else "node"), data[1:33], data[33:65]
+
+    def _put_leaf(self, key: bytes, value_hash: bytes) -> bytes:
+        h = leaf_hash(key, value_hash)
+        self._pending[h] = _LEAF + key + value_hash
+        return h
+
+    def _put_node(self, left: bytes, right: bytes) -> bytes:
+        if left == EMPTY and right == EMPTY:
+            return EMPTY
+        h = node_hash(left, right)
+        self._pending[h] = _NODE + left + right
+        return h
+
+    # --- Updates -----------------------------------------------------------
+
+    def update(self, key: bytes, value_hash: Optional[bytes]):
+        """Set (or with None, delete) the value hash stored under ``key``"""
+        self.root = self._update(self.root, key, value_hash, 0)
+
+    def _update(self, h: bytes, key: bytes, value_hash: Optional[bytes], depth: int) -> bytes:
+        if h == EMPTY:
+            return self._put_leaf(key, value_hash) if value_hash is not None else EMPTY
+
+        kind, a, b = self._load(h)
+        if kind == "leaf":
+            if a == key:
+                return self._put_leaf(key, value_hash) if value_hash is not None else EMPTY
+            if value_hash is None:
+                return h
+            # Two keys share this slot: push both down until their bits differ
+            return self._split(h, a, self._put_leaf(key, value_hash), key, depth)
+
+        if _bit(key, depth):
+            left, right = a, self._update(b, key, value_hash, depth + 1)
+        else:
+            left, right = self._update(a, key, value_hash, depth + 1), b
+
+        # Collapse a node left with a single leaf child back into that leaf
+        if left == EMPTY and right != EMPTY and self._load(right)[0] == "leaf":
+            return right
+        if right == EMPTY and left != EMPTY and self._load(left)[0] == "leaf":
+            return left
+        return self._put_node(left, right)
+
+    def update_many(self, items: Iterable[Tuple[bytes, Optional[bytes]]]):
+        """
+        Apply many updates in one descent
+
+        Paths shared by the keys are loaded and rehashed once, so updating k
+        accounts costs about the number of distinct nodes on their paths
+        rather than k full paths. Gives the same root as k update() calls.
+        """
+        batch = dict(items)
+        if batch:
+            self.root = self._update_batch(self.root, sorted(batch.items()), 0)
+
+    def _update_batch(self, h: bytes, items: List[Tuple[bytes, Optional[bytes]]], depth: int) -> bytes:
+        if len(items) == 1:
+            return self._update(h, items[0][0], items[0][1], depth)
+
+        if h == EMPTY:
+            return self._build(items, depth)
+        kind, a, b = self._load(h)
+        if kind == "leaf":
+            if all(key != a for key, _ in items):
+                items = sorted(items + [(a, b)])
+            return self._build(items, depth)
+
+        # Keys are sorted, so the ones going left come first
+        split = next((i for i, (key, _) in enumerate(items) if _bit(key, depth)), len(items))
+        left = self._update_batch(a, items[:split], depth + 1) if split else a
+        right = self._update_batch(b, items[split:], depth + 1) if split < len(items) else b
+
+        if left == EMPTY and right != EMPTY and self._load(right)[0] == "leaf":
+            return right
+        if right == EMPTY and left != EMPTY and self._load(left)[0] == "leaf":
+            return left
+        return self._put_node(left, right)
+
+    def _build(self, items: List[Tuple[bytes, Optional[bytes]]], depth: int) -> bytes:
+        """Subtree holding exactly ``items`` (deletions dropped)"""
+        live = [(key, value) for key, value in items if value is not None]
+        if not live:
+            return EMPTY
+        if len(live) == 1:
+            return self._put_leaf(*live[0])
+        if depth >= KEY_BITS:
+            raise ValueError("duplicate key in state tree")
+        split = next((i for i, (key, _) in enumerate(live) if _bit(key, depth)), len(live))
+        return self._put_node(self._build(live[:split], depth + 1), self._build(live[split:], depth + 1))
+
+    def _split(self, existing: bytes, existing_key: bytes, new: bytes, new_key: bytes, depth: int) -> bytes:
+        if depth >= KEY_BITS:
+            raise ValueError("duplicate key in state tree")
+        old_bit, new_bit = _bit(existing_key, depth), _bit(new_key, depth)
+        if old_bit == new_bit:
+            child = self._split(existing, existing_key, new, new_key, depth + 1)
+            return self._put_node(EMPTY, child) if old_bit else self._put_node(child, EMPTY)
+        return self._put_node(new, existing) if old_bit else self._put_node(existing, new)
+
+    def commit(self) -> str:
+        """Write the nodes created since the last commit and record the root"""
+        if self._pending:
+            self.store.put_many(self._pending)
+            self._pending = {}
+        self.store.set_meta("root", self.root)
+        return self.root.hex()
+
+    # --- Reads -------------------------------------------------------------
+
+    def root_hex(self) -> str:
+        return self.root.hex()
+
+    def get(self, key: bytes, root: Optional[bytes] = None) -> Optional[bytes]:
+        """Value hash stored under ``key`` (at ``root``, default the current root)"""
+        proof = self.prove(key, root)
+        if proof.leaf_key == key.hex():
+            return bytes.fromhex(proof.leaf_value)
+        return None
+
+    def prove(self, key: bytes, root: Optional[bytes] = None) -> StateProof:
+        """Inclusion (or non-inclusion) proof for ``key``"""
+        h = self.root if root is None else root
+        siblings: List[str] = []
+        depth = 0
+        while h != EMPTY:
+            kind, a, b = self._load(h)
+            if kind == "leaf":
+                return StateProof(key.hex(), siblings, a.hex(), b.hex())
+            if _bit(key, depth):
+                siblings.append(a.hex())
+                h = b
+            else:
+                siblings.append(b.hex())
+                h = a
+            depth += 1
+        return StateProof(key.hex(), siblings, None, None)
@@ -0,0 +1,186 @@
+# tests/test_chain_store.py
+"""A chain-store node reopened after a crash matches a node that kept everything in memory."""
+from dataclasses import asdict
+
+import pytest
+
+from chain_store import ChainStore, StoredMap
+from proof_of_cycle import GICTransaction, ProofOfCycle, create_genesis_policy
+
+GIC = 10**18
+
+
+def transfer(poc, tx_id, sender, to, amount):
+    return GICTransaction(tx_id=tx_id, from_addr=sender, to_addr=to, amount=amount,
+                          nonce=poc.balances[sender].nonce, memo=None, signature="", timestamp=1700000000)
+
+
+def drive(nodes, blocks):
+    """Run the same operations on every node; blocks are proposed by the first and added to all"""
+    first = nodes[0]
+    for node in nodes:
+        for i in range(12):
+            node.register_citizen(f"0x{i:04x}")
+        node.register_companion("0xc0", "citizen_000000", ["reflect"])
+        for i in range(9):
+            node.stake(f"citizen_{i:06d}", (i + 1) * 10 * GIC)
+        node.unstake("citizen_000008", 90 * GIC)  # back to zero committee weight
+    for node in nodes:
+        node.create_cycle("citizen_000000", "2024-01-01")
+
+    for height in range(blocks):
+        for node in nodes:
+            node.create_reflection(f"citizen_{height % 12:06d}", f"0x{height:04x}")
+            if height % 4 == 1:
+                node.stake(f"citizen_{height % 9:06d}", GIC)
+        sender, to = f"citizen_{height % 12:06d}", f"citizen_{(height * 5 + 1) % 12:06d}"
+        txs = [transfer(first, f"t{height}", sender, to, (height + 1) * GIC),
+               transfer(first, f"t{height}-new", to, f"outsider_{height % 3}", GIC)]
+        earns = [first.create_earn_transaction(f"citizen_{(height * 7) % 12:06d}", 3 * GIC, "reflection",
+                                               "cycle_20240101", f"0x{height}")]
+        block = first.propose_block("citizen_000000", txs, earns, [])
+        for node in nodes:
+            assert node.add_block(block), node.validate_block(block).to_dict()
+
+
+def accounts(poc):
+    return {address: dict(asdict(poc.balances[address]), last_updated=None) for address in poc.balances}
+
+
+def citizens(poc):
+    # last_activity is a wall-clock time, so it differs between the nodes
+    return {cid: (poc.citizens[cid].pubkey, poc.citizens[cid].activity_score) for cid in poc.citizens}
+
+
+def assert_same_state(node, reference):
+    assert node._compute_state_root() == reference._compute_state_root()
+    assert accounts(node) == accounts(reference)
+    assert citizens(node) == citizens(reference)
+    assert list(node.companions) == list(reference.companions)
+    assert len(node.blocks) == len(reference.blocks)
+    assert node.blocks[-1].hash == reference.blocks[-1].hash
+    for epoch in range(10):
+        assert node.select_committee(epoch) == reference.select_committee(epoch)
+
+
+@pytest.mark.parametrize("blocks", [3, 5, 12])
+def test_crash_mid_interval_replays_to_the_same_state(tmp_path, blocks):
+    path = str(tmp_path / "chain.db")
+    stored = ProofOfCycle(create_genesis_policy(), chain_store=ChainStore(path, snapshot_interval=5,
+                                                                          cache_size=4))
+    reference = ProofOfCycle(create_genesis_policy())
+    drive([stored, reference], blocks)
+    assert_same_state(stored, reference)
+
+    # Crash: no close(), so nothing after the last interval snapshot is written
+    # to the state table; only the journal has it
+    snapshot_height = stored.chain_store.get_meta("height", 0)
+    assert snapshot_height == blocks // 5 * 5
+    stored.chain_store._conn.close()
+    stored.state_tree.store.close()
+
+    reopened = ProofOfCycle(create_genesis_policy(), chain_store=ChainStore(path, snapshot_interval=5,
+                                                                            cache_size=4))
+    assert_same_state(reopened, reference)
+
+    # And it keeps going in step after the restart
+    tx = transfer(reopened, "after", "citizen_000003", "citizen_000004", GIC)
+    block = reopened.propose_block("citizen_000000", [tx], [], [])
+    assert reopened.add_block(block) and reference.add_block(block)
+    assert_same_state(reopened, reference)
+
+    reopened.close()
+    final = ProofOfCycle(create_genesis_policy(), chain_store=ChainStore(path, snapshot_interval=5))
+    assert_same_state(final, reference)
+    final.close()
+
+
+def snapshot(store, *maps):
+    store.snapshot({m.kind: m.dirty_records() for m in maps}, {}, store.last_seq())
+    for m in maps:
+        m.clear_dirty()
+
+
+def open_map(store, capacity=100):
+    return StoredMap(store, "thing", dict, dict, capacity=capacity)
+
+
+def test_stored_map_delete_and_re_add(tmp_path):
+    store = ChainStore(str(tmp_path / "chain.db"))
+    things = open_map(store)
+    for key in "abc":
+        things[key] = {"v": key}
+    snapshot(store, things)
+
+    del things["a"]
+    assert "a" not in things and len(things) == 2
+    with pytest.raises(KeyError):
+        things["a"]
+    things["a"] = {"v": "again"}
+    assert len(things) == 3 and list(things) == ["a", "b", "c"]
+    del things["b"]
+    things["d"] = {"v": "d"}
+    del things["d"]  # never reached the store
+    things["e"] = {"v": "e"}
+    assert list(things) == ["a", "c", "e"] and len(things) == 3
+    assert things.dirty_records() == {"a": ({"v": "again"}, 0), "b": None, "e": ({"v": "e"}, 0)}
+    snapshot(store, things)
+
+    reopened = open_map(store)
+    assert len(reopened) == 3
+    assert sorted(reopened) == ["a", "c", "e"]
+    assert reopened["a"] == {"v": "again"}
+    assert "b" not in reopened and "d" not in reopened
+
+    # Delete, re-add and delete again before a snapshot leaves it deleted
+    del reopened["c"]
+    reopened["c"] = {"v": "c2"}
+    del reopened["c"]
+    assert reopened.dirty_records() == {"c": None}
+    snapshot(store, reopened)
+    assert sorted(open_map(store)) == ["a", "e"]
+    store.close()
+
+
+def test_mark_dirty_pins_and_persists_in_place_changes(tmp_path):
+    store = ChainStore(str(tmp_path / "chain.db"))
+    things = open_map(store, capacity=0)
+    things["a"] = {"n": 0}
+    things["b"] = {"n": 0}
+    snapshot(store, things)
+
+    value = things["a"]  # cached as a clean record
+    value["n"] = 1
+    things.mark_dirty("a")
+    things.trim()  # capacity 0: clean records go, the changed one stays pinned
+    assert things["a"] is value
+    assert "b" not in things._cache
+
+    things.mark_dirty("b")  # not cached, so nothing was changed in place
+    assert things.dirty_records() == {"a": ({"n": 1}, 0)}
+    snapshot(store, things)
+    assert open_map(store)["a"] == {"n": 1}
+
+    # Without mark_dirty an in-place change never reaches the store
+    value = things["b"]
+    value["n"] = 5
+    snapshot(store, things)
+    assert open_map(store)["b"] == {"n": 0}
+    store.close()
+
+
+def test_committed_microblocks_are_stored_with_their_block(tmp_path):
+    path = str(tmp_path / "chain.db")
+    node = ProofOfCycle(create_genesis_policy(), chain_store=ChainStore(path))
+    citizen = node.register_citizen("0xaaaa")
+    reflection = node.create_reflection(citizen, "0xfeed", tags=["t"])
+    receipts = node.seal_microblock([reflection, {"attestation": 1}], citizen)
+    block = node.propose_block(citizen, [], [], [])
+    assert node.add_block(block)
+    node.close()
+
+    reopened = ProofOfCycle(create_genesis_policy(), chain_store=ChainStore(path))
+    microblock = reopened.get_microblock(receipts[0].microblock_hash)
+    assert microblock.reflections == [reflection] and microblock.attestations == [{"attestation": 1}]
+    assert reopened.blocks[-1].microblock_hashes == [microblock.hash]
+    reopened.close()
@@ -0,0 +1,100 @@
+# tests/test_committee.py
+"""WeightIndex keeps exact prefix sums and samples distinct, positive, reproducible committees."""
+import random
+from collections import Counter
+
+import pytest
+
+from committee import WeightIndex
+
+
+def prefix_sums_match(index, weights):
+    running = 0
+    for position, member in enumerate(index._members, start=1):
+        running += weights.get(member, 0)
+        assert index._prefix(position) == running
+    assert index.total == running == sum(weights.values())
+    assert index.positive_count == sum(1 for w in weights.values() if w > 0)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_prefix_sums_after_random_sets(seed):
+    rng = random.Random(seed)
+    index = WeightIndex()
+    weights = {}
+    for _ in range(500):
+        member = f"m{rng.randrange(80)}"
+        weight = rng.choice([0, 0, rng.randrange(1, 1000)])
+        index.set(member, weight)
+        if member in weights or weight:
+            weights[member] = weight
+        assert index.weight(member) == weight
+    prefix_sums_match(index, weights)
+
+    # Filling a fresh index in one go gives the same tree as appending one by one
+    restored = WeightIndex()
+    restored.extend((member, index.weight(member)) for member in index._members)
+    assert restored._tree == index._tree
+    prefix_sums_match(restored, weights)
+
+
+def test_extend_onto_a_non_empty_index():
+    index = WeightIndex()
+    index.set("a", 3)
+    index.extend([("b", 0), ("c", 5), ("d", 2)])
+    prefix_sums_match(index, {"a": 3, "b": 0, "c": 5, "d": 2})
+    with pytest.raises(ValueError):
+        index.extend([("e", -1)])
+    with pytest.raises(ValueError):
+        index.set("a", -1)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_sample_has_no_duplicates_and_restores_weights(seed):
+    rng = random.Random(seed)
+    index = WeightIndex()
+    for i in range(40):
+        index.set(f"m{i}", rng.choice([1, 1, 2, 1000]))
+    tree = list(index._tree)
+
+    committee = index.sample(seed.to_bytes(4, "big"), 15)
+    assert len(committee) == len(set(committee)) == 15
+    assert index._tree == tree
+
+    # Asking for more than can be drawn returns every positive member once
+    assert sorted(index.sample(b"all", 100)) == sorted(f"m{i}" for i in range(40))
+
+
+def test_same_seed_same_committee():
+    def build(order):
+        index = WeightIndex()
+        index.extend((f"m{i}", (i * 37) % 101) for i in order)
+        return index
+
+    order = list(range(60))
+    first, second = build(order), build(order)
+    for epoch in range(20):
+        seed = epoch.to_bytes(8, "big")
+        assert first.sample(seed, 7) == second.sample(seed, 7) == first.sample(seed, 7)
+    assert first.sample(b"\x00", 7) != first.sample(b"\x01", 7)
+
+
+def test_zero_weight_members_are_never_drawn():
+    index = WeightIndex()
+    index.extend((f"m{i}", 0 if i % 3 else 10) for i in range(30))
+    index.set("m1", 5)
+    index.set("m3", 0)  # was 10
+    eligible = {f"m{i}" for i in range(0, 30, 3)} - {"m3"} | {"m1"}
+    assert index.positive_count == len(eligible)
+
+    for draw in range(200):
+        committee = index.sample(draw.to_bytes(4, "big"), 7)
+        assert set(committee) <= eligible
+    assert set(index.sample(b"all", 100)) == eligible
+
+
+def test_draws_follow_the_weights():
+    index = WeightIndex()
+    index.extend([("heavy", 900), ("light", 100)])
+    counts = Counter(index.sample(draw.to_bytes(4, "big"), 1)[0] for draw in range(4000))
+    assert 0.85 < counts["heavy"] / 4000 < 0.95
@@ -0,0 +1,121 @@
+# tests/test_state_tree.py
+"""The sparse Merkle state tree is order independent and its proofs are sound."""
+import hashlib
+import random
+
+import pytest
+
+from state_tree import EMPTY, SparseMerkleTree, SQLiteNodeStore, key_for, verify_proof
+
+
+def value(n):
+    return hashlib.sha256(f"value-{n}".encode()).digest()
+
+
+def random_keys(rng, count):
+    """Mix of random keys and keys sharing long prefixes, to force deep splits"""
+    keys = [key_for(f"citizen_{rng.random()}") for _ in range(count // 2)]
+    prefix = bytes(rng.getrandbits(8) for _ in range(30))
+    keys += [prefix + rng.getrandbits(16).to_bytes(2, "big") for _ in range(count - len(keys))]
+    return list(dict.fromkeys(keys))
+
+
+def build(items):
+    tree = SparseMerkleTree()
+    for key, value_hash in items:
+        tree.update(key, value_hash)
+    return tree
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_root_is_independent_of_insertion_order(seed):
+    rng = random.Random(seed)
+    items = [(key, value(i)) for i, key in enumerate(random_keys(rng, 60))]
+    root = build(items).root_hex()
+    for _ in range(3):
+        rng.shuffle(items)
+        assert build(items).root_hex() == root
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_deletes_restore_the_earlier_root(seed):
+    rng = random.Random(seed)
+    keys = random_keys(rng, 60)
+    kept, dropped = keys[:40], keys[40:]
+    expected = build([(key, value(i)) for i, key in enumerate(kept)]).root_hex()
+
+    tree = build([(key, value(i)) for i, key in enumerate(keys)])
+    rng.shuffle(dropped)
+    for key in dropped:
+        tree.update(key, None)
+    assert tree.root_hex() == expected
+
+    for key in kept:
+        tree.update(key, None)
+    assert tree.root == EMPTY
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_update_many_matches_sequential_updates(seed):
+    rng = random.Random(seed)
+    keys = random_keys(rng, 80)
+    base = [(key, value(i)) for i, key in enumerate(keys[:50])]
+    sequential, batched = build(base), build(base)
+
+    # Inserts, overwrites and deletes (including of absent keys) in one batch
+    changes = [(key, value(rng.randint(0, 10**6))) for key in keys[40:80]]
+    changes += [(key, None) for key in rng.sample(keys, 15)]
+    changes.append((key_for("never-inserted"), None))
+    final = dict(changes)
+
+    for key, value_hash in final.items():
+        sequential.update(key, value_hash)
+    batched.update_many(changes)
+    assert batched.root_hex() == sequential.root_hex()
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_inclusion_and_non_inclusion_proofs(seed):
+    rng = random.Random(seed)
+    keys = random_keys(rng, 80)
+    present, absent = keys[:60], keys[60:] + [key_for("nobody")]
+    tree = build([(key, value(i)) for i, key in enumerate(present)])
+    root = tree.root_hex()
+
+    for i, key in enumerate(present):
+        proof = tree.prove(key)
+        assert tree.get(key) == value(i)
+        assert verify_proof(root, key, value(i), proof)
+        assert not verify_proof(root, key, value(i + 1), proof)
+        assert not verify_proof(root, key, None, proof)
+
+    for key in absent:
+        proof = tree.prove(key)
+        assert tree.get(key) is None
+        assert verify_proof(root, key, None, proof)
+        assert not verify_proof(root, key, value(0), proof)
+
+
+def test_proof_for_another_key_or_root_is_rejected():
+    tree = build([(key_for(f"a{i}"), value(i)) for i in range(20)])
+    old_root = tree.root_hex()
+    proof = tree.prove(key_for("a3"))
+    assert not verify_proof(old_root, key_for("a4"), value(3), proof)
+
+    tree.update(key_for("a3"), value(99))
+    assert not verify_proof(tree.root_hex(), key_for("a3"), value(3), proof)
+    # Historical roots stay provable
+    assert verify_proof(old_root, key_for("a3"), value(3), tree.prove(key_for("a3"), bytes.fromhex(old_root)))
+
+
+def test_committed_tree_reopens_from_sqlite(tmp_path):
+    store = SQLiteNodeStore(str(tmp_path / "state.db"))
+    tree = SparseMerkleTree(store)
+    tree.update_many((key_for(f"c{i}"), value(i)) for i in range(200))
+    root = tree.commit()
+    store.close()
+
+    reopened = SparseMerkleTree(SQLiteNodeStore(str(tmp_path / "state.db")))
+    assert reopened.root_hex() == root
+    assert reopened.get(key_for("c17")) == value(17)
+    reopened.store.close()
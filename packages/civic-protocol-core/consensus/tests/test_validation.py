@@ -0,0 +1,202 @@
+# tests/test_validation.py
+"""validate_block rejects bad roots, amounts, double spends and replays, serially or pooled."""
+import pytest
+
+from proof_of_cycle import GICTransaction, ProofOfCycle, create_genesis_policy
+
+GIC = 10**18
+
+
+@pytest.fixture
+def poc():
+    node = ProofOfCycle(create_genesis_policy())
+    node.register_citizen("0xaaaa")
+    node.register_citizen("0xbbbb")
+    return node
+
+
+def tx(tx_id, sender, amount, nonce, to="citizen_000001"):
+    return GICTransaction(tx_id=tx_id, from_addr=sender, to_addr=to, amount=amount, nonce=nonce,
+                          memo=None, signature="", timestamp=1700000000)
+
+
+def reasons(report):
+    return [(issue.scope, issue.index, issue.reason) for issue in report.errors]
+
+
+def rehash(poc, block):
+    """Re-seal the block hash so only the tampered root is wrong"""
+    block.hash = poc._hash_block(block)
+    return block
+
+
+def test_valid_block_passes(poc):
+    cycle = poc.create_cycle("citizen_000000", "2024-01-01")
+    earn = poc.create_earn_transaction("citizen_000000", 5 * GIC, "reflection", cycle.cycle_id, "0xatt")
+    block = poc.propose_block("citizen_000000", [tx("t0", "citizen_000000", GIC, 0)], [earn], [cycle])
+    report = poc.validate_block(block)
+    assert report.valid and reasons(report) == []
+
+
+def test_tx_root_mismatch(poc):
+    block = poc.propose_block("citizen_000000", [tx("t0", "citizen_000000", GIC, 0)], [], [])
+    block.transactions[0].amount = 2 * GIC
+    assert ("block", -1, "tx_root mismatch") in reasons(poc.validate_block(block))
+
+
+def test_cycle_root_mismatch(poc):
+    cycle = poc.create_cycle("citizen_000000", "2024-01-01")
+    block = poc.propose_block("citizen_000000", [], [], [cycle])
+    block.cycles[0].timestamp += 1
+    assert reasons(poc.validate_block(block)) == [("block", -1, "cycle_root mismatch")]
+
+
+def test_microblock_root_mismatch(poc):
+    block = poc.propose_block("citizen_000000", [], [], [], microblocks=[])
+    block.header.microblock_root = "ab" * 32
+    rehash(poc, block)
+    assert reasons(poc.validate_block(block)) == [("block", -1, "microblock_root mismatch")]
+
+
+def test_block_hash_mismatch(poc):
+    block = poc.propose_block("citizen_000000", [], [], [])
+    block.header.timestamp += 1
+    assert reasons(poc.validate_block(block)) == [("block", -1, "block hash mismatch")]
+
+
+@pytest.mark.parametrize("amount", [-1, 1.5, 2.0, "10", None])
+def test_invalid_amounts(poc, amount):
+    block = poc.propose_block("citizen_000000", [tx("bad", "citizen_000000", amount, 0),
+                                                 tx("ok", "citizen_000000", GIC, 0)], [], [])
+    # The rejected tx consumes no nonce, so the next one still uses nonce 0
+    assert reasons(poc.validate_block(block)) == [("transaction", 0, "invalid amount")]
+
+
+def test_invalid_earn_amount(poc):
+    cycle = poc.create_cycle("citizen_000000", "2024-01-01")
+    earn = poc.create_earn_transaction("citizen_000000", -GIC, "reflection", cycle.cycle_id, "0xatt")
+    block = poc.propose_block("citizen_000000", [], [earn], [cycle])
+    assert reasons(poc.validate_block(block)) == [("earn_transaction", 0, "invalid amount")]
+
+
+def test_same_sender_cannot_double_spend_in_one_block(poc):
+    txs = [tx("t0", "citizen_000000", 600 * GIC, 0), tx("t1", "citizen_000000", 600 * GIC, 1),
+           tx("t2", "citizen_000000", 400 * GIC, 1)]
+    block = poc.propose_block("citizen_000000", txs, [], [])
+    assert reasons(poc.validate_block(block)) == [("transaction", 1, "insufficient balance")]
+
+
+def test_nonce_replay_within_a_block(poc):
+    txs = [tx("t0", "citizen_000000", GIC, 0), tx("t0-replay", "citizen_000000", GIC, 0),
+           tx("t1", "citizen_000000", GIC, 1)]
+    block = poc.propose_block("citizen_000000", txs, [], [])
+    assert reasons(poc.validate_block(block)) == [("transaction", 1, "bad nonce: expected 1, got 0")]
+
+
+def test_nonce_continues_from_the_chain(poc):
+    assert poc.add_block(poc.propose_block("citizen_000000", [tx("t0", "citizen_000000", GIC, 0)], [], []))
+    block = poc.propose_block("citizen_000000", [tx("replay", "citizen_000000", GIC, 0)], [], [])
+    assert reasons(poc.validate_block(block)) == [("transaction", 0, "bad nonce: expected 1, got 0")]
+
+
+def test_unknown_sender_has_zero_balance(poc):
+    txs = [tx("free", "stranger", 0, 0), tx("spend", "stranger", 1, 1)]
+    block = poc.propose_block("citizen_000000", txs, [], [])
+    assert reasons(poc.validate_block(block)) == [("transaction", 1, "insufficient balance")]
+
+
+def mixed_block(poc):
+    cycle = poc.create_cycle("citizen_000000", "2024-01-01")
+    txs = []
+    nonces = {"citizen_000000": 0, "citizen_000001": 0}
+    for i in range(60):
+        sender = ("citizen_000000", "citizen_000001", "stranger")[i % 3]
+        if i % 7 == 0:
+            amount = -i
+        elif i % 11 == 0:
+            amount = 10**4 * GIC  # more than anyone holds
+        else:
+            amount = i * GIC
+        nonce = nonces.get(sender, 0)
+        if i % 13 == 0:
+            nonce += 5  # out of order
+        txs.append(tx(f"t{i}", sender, amount, nonce))
+        nonces[sender] = nonce + 1
+    earns = [poc.create_earn_transaction("citizen_000001", i * GIC,
+                                         ("reflection", "vote", "bogus")[i % 3],
+                                         cycle.cycle_id if i % 5 else "cycle_missing", f"0x{i}")
+             for i in range(30)]
+    return poc.propose_block("citizen_000000", txs, earns, [cycle])
+
+
+def odd_signatures(tx, tx_hash):
+    return int(tx_hash[-1], 16) % 4 != 0
+
+
+def test_serial_and_pooled_validation_agree(poc):
+    poc.signature_verifier = odd_signatures
+    block = mixed_block(poc)
+    serial = poc.validate_block(block)
+    assert not serial.valid
+
+    for workers in (2, 3, 8):
+        poc.validation_workers = workers
+        poc.validation_executor = None
+        pooled = poc.validate_block(block)
+        assert pooled.to_dict() == serial.to_dict()
+        poc.validation_executor.shutdown()
+
+
+def sealed(poc, count):
+    return [poc.seal_microblock([{"attestation": f"{len(poc.microblocks)}-{i}"}], "citizen_000000")[0]
+            for i in range(count)]
+
+
+def test_committed_microblocks_must_be_known_and_linked(poc):
+    sealed(poc, 3)
+    first, second, third = poc.microblocks
+    assert [mb.height for mb in poc.microblocks] == [0, 1, 2]
+    assert poc.validate_block(poc.propose_block("citizen_000000", [], [], [])).valid
+
+    stranger = ProofOfCycle(create_genesis_policy())
+    stranger.register_citizen("0xcccc")
+    stranger.seal_microblock([{"attestation": "elsewhere"}], "citizen_000000")
+    unknown = stranger.microblocks[0]
+    block = poc.propose_block("citizen_000000", [], [], [], microblocks=[first, unknown])
+    assert reasons(poc.validate_block(block)) == [("microblock", 1, "unknown microblock")]
+
+    block = poc.propose_block("citizen_000000", [], [], [], microblocks=[second, first, third])
+    assert reasons(poc.validate_block(block)) == [("microblock", 1, "microblock height out of order")]
+    block = poc.propose_block("citizen_000000", [], [], [], microblocks=[first, first])
+    assert reasons(poc.validate_block(block)) == [("microblock", 1, "microblock height out of order")]
+
+    # A microblock can only be committed by the block built on its parent
+    assert poc.add_block(poc.propose_block("citizen_000000", [], [], [], microblocks=[first]))
+    assert poc.microblocks == [] and poc.get_microblock(first.hash) == first
+    block = poc.propose_block("citizen_000000", [], [], [], microblocks=[second])
+    assert reasons(poc.validate_block(block)) == [("microblock", 0, "unknown microblock")]
+
+    poc.microblocks.append(second)  # as if it had been sealed just before the block landed
+    block = poc.propose_block("citizen_000000", [], [], [], microblocks=[second])
+    assert reasons(poc.validate_block(block)) == [("microblock", 0, "microblock parent mismatch")]
+
+
+def test_received_microblocks_can_be_committed(poc):
+    peer = ProofOfCycle(create_genesis_policy())
+    peer.register_citizen("0xaaaa")
+    sealed(peer, 2)
+    received, forged = peer.microblocks
+    forged.attestations = [{"attestation": "forged"}]
+    assert poc.receive_microblock(received)
+    assert not poc.receive_microblock(forged)
+
+    sealed(poc, 1)
+    assert [mb.height for mb in poc.microblocks] == [0, 1]
+    block = poc.propose_block("citizen_000000", [], [], [])
+    assert block.microblock_hashes == [mb.hash for mb in poc.microblocks]
+    assert poc.add_block(block)
+    assert poc.get_microblock(received.hash) == received
+
+    # The peer's chain has moved on without it, so its microblocks no longer link
+    sealed(peer, 1)
+    assert not poc.receive_microblock(peer.microblocks[-1])
@@ -9,11 +9,14 @@ enabling democratic decision-making through proposals, voting, and execution.
 import hashlib
 import time
 import json
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List, Optional, Any, Sequence, Tuple
+from dataclasses import dataclass, asdict, field
 from datetime import datetime, timedelta
 from enum import Enum
 import math
+from array import array
+
+from ledger.gic_economics import governance_power  # shared with GICEconomics.calculate_governance_power
 
 class ProposalType(Enum):
     """Types of governance proposals"""
@@ -86,6 +89,53 @@ class VotingPower:
     quadratic_power: float  # Square root of governance power
     last_updated: int
 
+class VotingPowerSnapshot:
+    """
+    Governance power of every staker, frozen when a proposal is activated
+    
+    Powers are stored in a float array indexed by an address index shared
+    between snapshots (addresses only ever get appended to it), so a snapshot
+    costs 8 bytes per staker and a lookup is O(1). Addresses past the end of
+    the array, or never indexed, had no stake when the snapshot was taken.
+    """
+    
+    def __init__(self, address_index: Dict[str, int], powers: array, epoch: int, taken_at: int):
+        self._address_index = address_index
+        self.powers = powers
+        self.total = math.fsum(powers)
+        self.epoch = epoch
+        self.taken_at = taken_at
+    
+    def power_of(self, address: str) -> float:
+        """Governance power of an address at snapshot time"""
+        i = self._address_index.get(address)
+        if i is None or i >= len(self.powers):
+            return 0.0
+        return self.powers[i]
+
+@dataclass
+class ProposalTally:
+    """Running vote totals for a proposal, updated as each vote is cast"""
+    proposal_id: str
+    yes_weight: float = 0.0
+    no_weight: float = 0.0
+    abstain_weight: float = 0.0
+    voters: Dict[str, str] = field(default_factory=dict)  # voter -> vote_id, in casting order
+
+    @property
+    def total_weight(self) -> float:
+        return self.yes_weight + self.no_weight + self.abstain_weight
+
+    def add(self, vote: Vote):
+        """Count a vote's weight under its choice"""
+        self.voters[vote.voter] = vote.vote_id
+        if vote.choice == VoteChoice.YES:
+            self.yes_weight += vote.weight
+        elif vote.choice == VoteChoice.NO:
+            self.no_weight += vote.weight
+        elif vote.choice == VoteChoice.ABSTAIN:
+            self.abstain_weight += vote.weight
+
 @dataclass
 class ProposalExecution:
     """Proposal execution record"""
@@ -112,6 +162,9 @@ class AgoraGovernance:
         self.proposals: Dict[str, GovernanceProposal] = {}
         self.votes: Dict[str, Vote] = {}
         self.voting_power: Dict[str, VotingPower] = {}
+        self.tallies: Dict[str, ProposalTally] = {}
+        self.snapshots: Dict[str, VotingPowerSnapshot] = {}
+        self._address_index: Dict[str, int] = {}
         self.executions: Dict[str, ProposalExecution] = {}
         
         # Governance parameters
@@ -135,7 +188,7 @@ class AgoraGovernance:
         if proposer not in self.gic_economics.accounts:
             raise Exception(f"Proposer {proposer} does not exist")
         
-        proposer_account = self.gic_economics.accounts[proposer]
+        proposer_account = self.gic_economics.get_account(proposer)
         if proposer_account.balance < self.min_proposal_deposit:
             raise Exception(f"Insufficient balance for proposal deposit: {proposer_account.balance} < {self.min_proposal_deposit}")
         
@@ -178,6 +231,7 @@ class AgoraGovernance:
         self.gic_economics.accounts["treasury"].balance += self.min_proposal_deposit
         
         self.proposals[proposal_id] = proposal
+        self.tallies[proposal_id] = ProposalTally(proposal_id=proposal_id)
         return proposal
     
     def activate_proposal(self, proposal_id: str) -> bool:
@@ -194,12 +248,51 @@ class AgoraGovernance:
         if current_time < proposal.voting_starts_at:
             return False
         
+        self.snapshots[proposal_id] = self.take_snapshot()
         proposal.status = ProposalStatus.ACTIVE
         return True
     
+    def take_snapshot(self) -> VotingPowerSnapshot:
+        """Snapshot the current governance power of every staker (O(stakers))"""
+        index = self._address_index
+        powers = array("d", [0.0]) * len(index)
+        for account in self.gic_economics.iter_stakers():
+            i = index.get(account.address)
+            if i is None:
+                i = index[account.address] = len(index)
+                powers.append(0.0)
+            powers[i] = governance_power(account.staked / 10**18, account.activity_score)
+        return VotingPowerSnapshot(index, powers, self.consensus_system.current_epoch, int(time.time()))
+    
     def cast_vote(self, proposal_id: str, voter: str, choice: VoteChoice,
                  signature: str = "") -> Vote:
         """Cast a vote on a proposal"""
+        proposal = self._open_proposal(proposal_id)
+        return self._record_vote(proposal, voter, choice, signature, int(time.time()))
+    
+    def cast_votes(self, proposal_id: str,
+                   ballots: Iterable[Sequence[Any]]) -> List[Vote]:
+        """
+        Cast many votes on one proposal
+        
+        Each ballot is (voter, choice) or (voter, choice, signature). Votes are
+        counted exactly as successive cast_vote calls would count them, but the
+        proposal is looked up and its voting period checked once per batch.
+        A rejected ballot raises, keeping the votes cast before it.
+        """
+        proposal = self._open_proposal(proposal_id)
+        current_time = int(time.time())
+        votes = []
+        for ballot in ballots:
+            if proposal.status != ProposalStatus.ACTIVE:
+                raise Exception(f"Proposal {proposal_id} is not active for voting")
+            voter, choice = ballot[0], ballot[1]
+            signature = ballot[2] if len(ballot) > 2 else ""
+            votes.append(self._record_vote(proposal, voter, choice, signature, current_time))
+        return votes
+    
+    def _open_proposal(self, proposal_id: str) -> GovernanceProposal:
+        """Proposal that is currently accepting votes"""
         if proposal_id not in self.proposals:
             raise Exception(f"Proposal {proposal_id} not found")
         
@@ -212,14 +305,18 @@ class AgoraGovernance:
         if current_time < proposal.voting_starts_at or current_time > proposal.voting_ends_at:
             raise Exception(f"Voting period has not started or has ended")
         
+        return proposal
+    
+    def _record_vote(self, proposal: GovernanceProposal, voter: str, choice: VoteChoice,
+                     signature: str, current_time: int) -> Vote:
+        """Create a vote and count it in the proposal's tally"""
+        proposal_id = proposal.proposal_id
+        tally = self.tallies[proposal_id]
+        
         # Check if voter has already voted
-        existing_vote = self._find_existing_vote(proposal_id, voter)
-        if existing_vote:
+        if voter in tally.voters:
             raise Exception(f"Voter {voter} has already voted on proposal {proposal_id}")
         
-        # Calculate voting power
-        voting_power = self._calculate_voting_power(voter)
-        
         # Create vote
         vote_id = f"vote_{self.next_vote_id:06d}"
         self.next_vote_id += 1
@@ -229,13 +326,14 @@ class AgoraGovernance:
             proposal_id=proposal_id,
             voter=voter,
             choice=choice,
-            weight=voting_power.governance_power,
+            weight=self.snapshots[proposal_id].power_of(voter),
             signature=signature,
             timestamp=current_time,
             block_height=self.consensus_system.current_epoch
         )
         
         self.votes[vote_id] = vote
+        tally.add(vote)
         
         # Update proposal vote counts
         proposal.total_votes += 1
@@ -316,10 +414,21 @@ class AgoraGovernance:
     
     def get_votes(self, proposal_id: str) -> List[Vote]:
         """Get all votes for a proposal"""
-        return [vote for vote in self.votes.values() if vote.proposal_id == proposal_id]
+        tally = self.tallies.get(proposal_id)
+        if tally is None:
+            return []
+        return [self.votes[vote_id] for vote_id in tally.voters.values()]
+    
+    def get_tally(self, proposal_id: str) -> Optional[ProposalTally]:
+        """Get the running vote totals for a proposal"""
+        return self.tallies.get(proposal_id)
+    
+    def get_snapshot(self, proposal_id: str) -> Optional[VotingPowerSnapshot]:
+        """Get the voting power snapshot an active or closed proposal is counted with"""
+        return self.snapshots.get(proposal_id)
     
     def get_voting_power(self, address: str) -> VotingPower:
-        """Get voting power for an address"""
+        """Get current voting power for an address (votes use the proposal's snapshot)"""
         return self._calculate_voting_power(address)
     
     def _calculate_voting_power(self, address: str) -> VotingPower:
@@ -334,7 +443,7 @@ class AgoraGovernance:
                 last_updated=int(time.time())
             )
         
-        account = self.gic_economics.accounts[address]
+        account = self.gic_economics.get_account(address)
         
         # Get staked amount
         staked_amount = account.staked / 10**18  # Convert to GIC units
@@ -343,17 +452,16 @@ class AgoraGovernance:
         activity_score = account.activity_score
         
         # Calculate governance power (stake + activity bonus)
-        activity_bonus = min(activity_score * 100, staked_amount * 0.5)
-        governance_power = staked_amount + activity_bonus
+        power = governance_power(staked_amount, activity_score)
         
         # Apply quadratic scaling
-        quadratic_power = math.sqrt(governance_power) if governance_power > 0 else 0
+        quadratic_power = math.sqrt(power) if power > 0 else 0
         
         voting_power = VotingPower(
             address=address,
             staked_amount=staked_amount,
             activity_score=activity_score,
-            governance_power=governance_power,
+            governance_power=power,
             quadratic_power=quadratic_power,
             last_updated=int(time.time())
         )
@@ -363,10 +471,10 @@ class AgoraGovernance:
     
     def _find_existing_vote(self, proposal_id: str, voter: str) -> Optional[Vote]:
         """Find existing vote by voter on proposal"""
-        for vote in self.votes.values():
-            if vote.proposal_id == proposal_id and vote.voter == voter:
-                return vote
-        return None
+        tally = self.tallies.get(proposal_id)
+        if tally is None or voter not in tally.voters:
+            return None
+        return self.votes[tally.voters[voter]]
     
     def _check_proposal_finalization(self, proposal_id: str):
         """Check if a proposal should be finalized"""
@@ -383,11 +491,8 @@ class AgoraGovernance:
             return
         
         # Check if quorum and approval thresholds are met
-        total_voting_power = sum(vp.governance_power for vp in self.voting_power.values())
-        proposal_voting_power = sum(
-            vote.weight for vote in self.votes.values() 
-            if vote.proposal_id == proposal_id
-        )
+        total_voting_power = self.snapshots[proposal_id].total
+        proposal_voting_power = self.tallies[proposal_id].total_weight
         
         participation_rate = proposal_voting_power / total_voting_power if total_voting_power > 0 else 0
         
@@ -409,11 +514,8 @@ class AgoraGovernance:
             return
         
         # Calculate participation and approval rates
-        total_voting_power = sum(vp.governance_power for vp in self.voting_power.values())
-        proposal_voting_power = sum(
-            vote.weight for vote in self.votes.values() 
-            if vote.proposal_id == proposal_id
-        )
+        total_voting_power = self.snapshots[proposal_id].total
+        proposal_voting_power = self.tallies[proposal_id].total_weight
         
         participation_rate = proposal_voting_power / total_voting_power if total_voting_power > 0 else 0
         approval_rate = proposal.yes_votes / proposal.total_votes
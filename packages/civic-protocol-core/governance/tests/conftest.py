@@ -0,0 +1,6 @@
+# tests/conftest.py
+"""Put civic-protocol-core on sys.path so the tests import governance and ledger as packages."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
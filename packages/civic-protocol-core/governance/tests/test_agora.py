@@ -0,0 +1,126 @@
+# tests/test_agora.py
+"""Agora counts each voter once, with their snapshot weight under their choice."""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from governance.agora import AgoraGovernance, ProposalStatus, ProposalType, VoteChoice
+from ledger.gic_economics import GICEconomics
+
+GIC = 10**18
+
+
+def open_proposal(stakes, quorum=2.0):
+    """Agora with one active proposal; by default quorum is out of reach, so it stays open"""
+    gic = GICEconomics()
+    for address, stake in stakes.items():
+        gic.create_account(address, stake * GIC)
+        gic.stake(address, stake * GIC)
+    gic.create_account("proposer", 2000 * GIC)
+    agora = AgoraGovernance(gic, SimpleNamespace(current_epoch=0))
+    agora.quorum_threshold = quorum
+    proposal = agora.create_proposal("proposer", "Title", "Description",
+                                     ProposalType.COMMUNITY_INITIATIVE, {})
+    proposal.voting_starts_at = int(time.time()) - 1
+    assert agora.activate_proposal(proposal.proposal_id)
+    return agora, proposal
+
+
+def test_second_vote_is_rejected():
+    agora, proposal = open_proposal({"alice": 100, "bob": 50})
+    agora.cast_vote(proposal.proposal_id, "alice", VoteChoice.YES)
+    with pytest.raises(Exception, match="already voted"):
+        agora.cast_vote(proposal.proposal_id, "alice", VoteChoice.NO)
+    with pytest.raises(Exception, match="already voted"):
+        agora.cast_votes(proposal.proposal_id, [("bob", VoteChoice.NO), ("alice", VoteChoice.NO)])
+
+    # bob's ballot, ahead of the rejected one, still counts
+    assert [vote.voter for vote in agora.get_votes(proposal.proposal_id)] == ["alice", "bob"]
+    tally = agora.get_tally(proposal.proposal_id)
+    assert (tally.yes_weight, tally.no_weight) == (100.0, 50.0)
+    assert (proposal.total_votes, proposal.yes_votes, proposal.no_votes) == (2, 1, 1)
+
+
+def test_tally_weights_per_choice():
+    stakes = {f"citizen_{i}": 10 * (i + 1) for i in range(9)}
+    choices = [VoteChoice.YES, VoteChoice.NO, VoteChoice.ABSTAIN]
+    agora, proposal = open_proposal(stakes)
+    ballots = [(address, choices[i % 3]) for i, address in enumerate(stakes)]
+    agora.cast_votes(proposal.proposal_id, ballots[:4])
+    for address, choice in ballots[4:]:
+        agora.cast_vote(proposal.proposal_id, address, choice)
+
+    snapshot = agora.get_snapshot(proposal.proposal_id)
+    expected = {choice: sum(snapshot.power_of(a) for a, c in ballots if c == choice) for choice in choices}
+    assert expected[VoteChoice.YES] == 10 + 40 + 70
+    tally = agora.get_tally(proposal.proposal_id)
+    assert tally.yes_weight == expected[VoteChoice.YES]
+    assert tally.no_weight == expected[VoteChoice.NO]
+    assert tally.abstain_weight == expected[VoteChoice.ABSTAIN]
+    assert tally.total_weight == snapshot.total == sum(stakes.values())
+    assert (proposal.yes_votes, proposal.no_votes, proposal.abstain_votes) == (3, 3, 3)
+    assert [vote.weight for vote in agora.get_votes(proposal.proposal_id)] == list(stakes.values())
+
+
+def test_unstaked_voter_counts_with_zero_weight():
+    agora, proposal = open_proposal({"alice": 100})
+    vote = agora.cast_vote(proposal.proposal_id, "stranger", VoteChoice.YES)
+    assert vote.weight == 0.0
+    assert agora.get_tally(proposal.proposal_id).yes_weight == 0.0
+
+
+def test_cast_votes_stops_when_the_proposal_finalizes():
+    stakes = {f"citizen_{i}": 100 for i in range(10)}
+    agora, proposal = open_proposal(stakes, quorum=0.2)
+    ballots = [(address, VoteChoice.YES) for address in stakes]
+
+    # Two of ten equal stakers reach the 20% quorum and pass it
+    with pytest.raises(Exception, match="not active"):
+        agora.cast_votes(proposal.proposal_id, ballots)
+    assert proposal.status == ProposalStatus.PASSED
+    assert [vote.voter for vote in agora.get_votes(proposal.proposal_id)] == ["citizen_0", "citizen_1"]
+    assert agora.get_tally(proposal.proposal_id).yes_weight == 200.0
+    assert proposal.total_votes == 2
+
+    with pytest.raises(Exception, match="not active"):
+        agora.cast_vote(proposal.proposal_id, "citizen_2", VoteChoice.NO)
+
+
+def test_staking_after_activation_does_not_change_weights():
+    agora, proposal = open_proposal({"alice": 100, "bob": 100})
+    gic = agora.gic_economics
+    gic.create_account("carol", 10_000 * GIC)
+    gic.stake("carol", 9_000 * GIC)
+    gic.transfer("carol", "alice", 100 * GIC)
+    gic.stake("alice", 100 * GIC)
+
+    snapshot = agora.get_snapshot(proposal.proposal_id)
+    assert snapshot.total == 200.0
+    assert agora.get_voting_power("alice").governance_power == 200.0
+    assert agora.cast_vote(proposal.proposal_id, "alice", VoteChoice.YES).weight == 100.0
+    assert agora.cast_vote(proposal.proposal_id, "carol", VoteChoice.NO).weight == 0.0
+
+
+def test_quorum_is_measured_against_the_snapshot_total():
+    agora, proposal = open_proposal({f"citizen_{i}": 100 for i in range(10)}, quorum=0.2)
+    # A whale staking after activation would push quorum out of reach if it counted
+    agora.gic_economics.create_account("whale", 100_000 * GIC)
+    agora.gic_economics.stake("whale", 100_000 * GIC)
+
+    agora.cast_vote(proposal.proposal_id, "citizen_0", VoteChoice.YES)
+    assert proposal.status == ProposalStatus.ACTIVE
+    agora.cast_vote(proposal.proposal_id, "citizen_1", VoteChoice.YES)
+    assert proposal.status == ProposalStatus.PASSED
+
+
+def test_agora_and_gic_economics_agree_on_governance_power():
+    agora, _ = open_proposal({"alice": 400, "bob": 10})
+    gic = agora.gic_economics
+    gic.earn_reward("alice", GIC, "reflection", "cycle_001")
+    gic.earn_reward("bob", GIC, "reflection", "cycle_001")
+    for address in ("alice", "bob", "nobody"):
+        power = agora.get_voting_power(address)
+        assert gic.calculate_governance_power(address) == power.quadratic_power
+    # bob's activity bonus is capped at half his stake
+    assert agora.get_voting_power("bob").governance_power == 15.0
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Group Commit - Batched attestation writer for the Civic Ledger
+
+Attestations are queued and a single writer thread chains them in memory
+(each event's previous_hash is the hash of the event queued before it) and
+commits up to ``max_batch`` events, or whatever arrived within
+``max_delay_ms``, in one storage write. Every caller gets a future that
+resolves to its own committed LedgerEvent.
+
+Because only the writer thread assigns previous_hash, concurrent attests can
+no longer read the same chain head and fork the chain. The head itself is
+read inside each group's write transaction (storage.append_chained), so
+writers in several worker processes sharing one SQLite ledger take turns
+extending the same chain instead of each building on a stale head.
+"""
+
+import hashlib
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Tuple
+
+try:
+    from .ledger import LedgerCore, LedgerEvent
+except ImportError:  # running as a script from ledger/app
+    from ledger import LedgerCore, LedgerEvent
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """Queue attestations and commit them to the ledger in groups"""
+
+    def __init__(self, ledger: LedgerCore, max_batch: int = 64, max_delay_ms: float = 5.0):
+        """
+        Initialize the writer
+
+        Args:
+            ledger: Ledger to commit to
+            max_batch: Maximum number of events per commit
+            max_delay_ms: How long to wait for more events after the first
+                one of a group arrives
+        """
+        self.ledger = ledger
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max(0.0, max_delay_ms) / 1000.0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        # Guards _thread and _stopping so no submit can queue behind _STOP
+        self._lock = threading.Lock()
+        self._stopping = False
+
+        # Event ids issued in the current millisecond, to keep ids unique
+        # when several identical attestations land in the same group
+        self._id_ms = 0
+        self._ids_this_ms: set = set()
+
+        # Counters for monitoring
+        self.commits = 0
+        self.events_committed = 0
+
+    def start(self):
+        """Start the writer thread"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="ledger-group-commit", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Commit everything already queued, then stop the writer thread
+
+        New submissions are refused from the moment stop() is called. If the
+        writer is still busy after ``timeout`` seconds, it is left running to
+        finish its queue and stop() can be called again to wait for it.
+        """
+        with self._lock:
+            thread = self._thread
+            if not thread:
+                return
+            if not self._stopping:
+                self._stopping = True
+                self._queue.put(_STOP)
+        thread.join(timeout)
+        with self._lock:
+            if not thread.is_alive() and self._thread is thread:
+                self._thread = None
+
+    def submit(self, event_type: str, civic_id: str, lab_source: str,
+               payload: Dict[str, Any], signature: Optional[str] = None) -> Future:
+        """Queue an attestation; the future resolves to the committed LedgerEvent"""
+        future: Future = Future()
+        with self._lock:
+            if not self._thread or self._stopping:
+                raise RuntimeError("GroupCommitWriter is not running")
+            self._queue.put(((event_type, civic_id, lab_source, payload, signature), future))
+        return future
+
+    def attest(self, event_type: str, civic_id: str, lab_source: str,
+               payload: Dict[str, Any], signature: Optional[str] = None,
+               timeout: Optional[float] = 30.0) -> LedgerEvent:
+        """Queue an attestation and block until it is committed"""
+        return self.submit(event_type, civic_id, lab_source, payload, signature).result(timeout)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            group = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(group) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                group.append(item)
+
+            self._commit(group)
+
+        # Anything queued behind _STOP is committed rather than left waiting
+        leftovers = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftovers.append(item)
+        for i in range(0, len(leftovers), self.max_batch):
+            self._commit(leftovers[i:i + self.max_batch])
+
+    def _next_event_id(self, civic_id: str, event_type: str) -> str:
+        now_ms = int(datetime.now().timestamp() * 1000)
+        if now_ms != self._id_ms:
+            self._id_ms = now_ms
+            self._ids_this_ms = set()
+
+        event_id = f"evt_{now_ms}_{hashlib.sha256(f'{civic_id}{event_type}'.encode()).hexdigest()[:8]}"
+        candidate, n = event_id, 1
+        while candidate in self._ids_this_ms:
+            candidate = f"{event_id}_{n}"
+            n += 1
+        self._ids_this_ms.add(candidate)
+        return candidate
+
+    def _commit(self, group: List[Tuple[Tuple, Future]]):
+        """Chain a group of attestations onto the current head and write them at once"""
+        live = [(args, future) for args, future in group if future.set_running_or_notify_cancel()]
+        if not live:
+            return
+
+        def chain(head_hash: str) -> List[LedgerEvent]:
+            events: List[LedgerEvent] = []
+            previous_hash = head_hash
+            for (event_type, civic_id, lab_source, payload, signature), _ in live:
+                event = LedgerEvent(
+                    event_id=self._next_event_id(civic_id, event_type),
+                    event_type=event_type,
+                    civic_id=civic_id,
+                    lab_source=lab_source,
+                    payload=payload,
+                    timestamp=datetime.now(timezone.utc).isoformat(),
+                    previous_hash=previous_hash,
+                    event_hash="",  # Will be calculated
+                    signature=signature
+                )
+                event.event_hash = self.ledger._calculate_event_hash(event)
+                previous_hash = event.event_hash
+                events.append(event)
+            return events
+
+        try:
+            events = self.ledger.storage.append_chained(chain)
+        except Exception as e:
+            # Nothing from this group was written
+            for _, future in live:
+                future.set_exception(e)
+            return
+
+        self.commits += 1
+        self.events_committed += len(events)
+        for event, (_, future) in zip(events, live):
+            future.set_result(event)
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Chain Integrity - Streaming, checkpointed verification of the event chain
+
+ChainVerifier walks the ledger in insertion order straight off a storage
+cursor, checking each event's hash and its link to the previous event. After
+a successful run it persists an HMAC-signed checkpoint (height, event hash);
+the next run verifies the checkpoint signature, confirms the event at that
+height still carries the checkpointed hash and only walks the events added
+since. Checkpoints are only written and trusted when a secret key is
+configured (LEDGER_CHECKPOINT_KEY); without one every run verifies from
+genesis. With ``workers > 1`` the new events are cut into chunks that are hashed
+on a process pool and stitched together at the chunk boundaries.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+
+GENESIS_HASH = "0" * 64
+
+
+def calculate_event_hash(event_id: str, event_type: str, civic_id: str, lab_source: str,
+                         payload: Dict[str, Any], timestamp: str, previous_hash: str) -> str:
+    """Calculate SHA-256 hash of an event's fields"""
+    event_data = f"{event_id}{event_type}{civic_id}{lab_source}{json.dumps(payload, sort_keys=True)}{timestamp}{previous_hash}"
+    return hashlib.sha256(event_data.encode()).hexdigest()
+
+
+def hash_record(record: Dict[str, Any]) -> str:
+    """Calculate the hash of a stored event record"""
+    return calculate_event_hash(
+        record["event_id"], record["event_type"], record["civic_id"], record["lab_source"],
+        record["payload"], record["timestamp"], record["previous_hash"]
+    )
+
+
+@dataclass
+class ChainCheckpoint:
+    """Signed marker that the chain is valid up to ``height``"""
+    height: int
+    event_hash: str
+    verified_at: str
+    signature: str
+
+
+@dataclass
+class VerificationResult:
+    """Outcome of a verification run"""
+    valid: bool
+    height: int  # Events known valid after this run
+    head_hash: str
+    verified_from: int  # Height the run resumed from
+    events_verified: int
+    failed_height: Optional[int] = None
+    error: Optional[str] = None
+
+
+def _verify_chunk(start_height: int, records: List[Tuple[str, str, str, str, Dict[str, Any], str, str, str]]
+                  ) -> Tuple[str, str, Optional[int], Optional[str]]:
+    """
+    Verify a contiguous run of events in a worker process
+
+    Returns the first event's previous_hash, the last event's hash and, on
+    failure, the height and reason of the first bad event. The link into the
+    first event is checked by the caller when stitching chunks.
+    """
+    previous = None
+    for i, (event_id, event_type, civic_id, lab_source, payload, timestamp,
+            previous_hash, event_hash) in enumerate(records):
+        height = start_height + i + 1
+        if previous is not None and previous_hash != previous:
+            return records[0][6], previous, height, "previous_hash does not match prior event"
+        expected = calculate_event_hash(event_id, event_type, civic_id, lab_source,
+                                        payload, timestamp, previous_hash)
+        if event_hash != expected:
+            return records[0][6], previous or records[0][6], height, "event_hash mismatch"
+        previous = event_hash
+    return records[0][6], previous, None, None
+
+
+class ChainVerifier:
+    """Incremental verifier for a LedgerStorage event chain"""
+
+    def __init__(self, storage, checkpoint_path: Optional[str] = None,
+                 checkpoint_key: Optional[bytes] = None,
+                 chunk_size: int = 10000):
+        """
+        Initialize the verifier
+
+        Args:
+            storage: LedgerStorage to verify
+            checkpoint_path: JSON file holding the latest checkpoint; without
+                one every run verifies from genesis
+            checkpoint_key: HMAC key for signing checkpoints (defaults to the
+                LEDGER_CHECKPOINT_KEY environment variable); without a key no
+                checkpoint is written or trusted
+            chunk_size: Events per chunk when verifying on a process pool
+        """
+        self.storage = storage
+        self.checkpoint_path = checkpoint_path
+        if checkpoint_key is None:
+            checkpoint_key = os.getenv("LEDGER_CHECKPOINT_KEY", "").encode()
+        # A checkpoint signed with a known key would let a forged one skip
+        # verification of a tampered prefix, so there is no default secret
+        self.checkpoint_key = checkpoint_key or None
+        self.chunk_size = max(1, chunk_size)
+
+    # --- Checkpoints -------------------------------------------------------
+
+    @property
+    def checkpoints_enabled(self) -> bool:
+        return bool(self.checkpoint_path and self.checkpoint_key)
+
+    def _sign(self, height: int, event_hash: str) -> str:
+        message = f"{height}:{event_hash}".encode()
+        return hmac.new(self.checkpoint_key, message, hashlib.sha256).hexdigest()
+
+    def load_checkpoint(self) -> Optional[ChainCheckpoint]:
+        """Load the persisted checkpoint, ignoring it if the signature is bad"""
+        if not self.checkpoints_enabled or not os.path.exists(self.checkpoint_path):
+            return None
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                checkpoint = ChainCheckpoint(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        expected = self._sign(checkpoint.height, checkpoint.event_hash)
+        if not hmac.compare_digest(expected, checkpoint.signature):
+            return None
+        return checkpoint
+
+    def save_checkpoint(self, height: int, event_hash: str) -> Optional[ChainCheckpoint]:
+        """Atomically persist a signed checkpoint"""
+        if not self.checkpoints_enabled:
+            return None
+        checkpoint = ChainCheckpoint(
+            height=height,
+            event_hash=event_hash,
+            verified_at=datetime.now(timezone.utc).isoformat(),
+            signature=self._sign(height, event_hash)
+        )
+        os.makedirs(os.path.dirname(self.checkpoint_path) or ".", exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(checkpoint), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+        return checkpoint
+
+    # --- Verification ------------------------------------------------------
+
+    def verify(self, full: bool = False, workers: int = 1) -> VerificationResult:
+        """
+        Verify the chain from the last checkpoint (or genesis) to the head
+
+        Args:
+            full: Ignore the checkpoint and verify from genesis
+            workers: Process pool size; 1 verifies inline
+        """
+        checkpoint = None if full else self.load_checkpoint()
+        start = 0
+        previous_hash = GENESIS_HASH
+
+        if checkpoint and checkpoint.height > 0:
+            # The checkpointed event must still be in place before we trust it
+            anchor = next(self.storage.iter_events(start=checkpoint.height - 1), None)
+            if anchor is not None and anchor["event_hash"] == checkpoint.event_hash:
+                start = checkpoint.height
+                previous_hash = checkpoint.event_hash
+
+        events = self.storage.iter_events(start=start)
+        if workers > 1:
+            result = self._verify_parallel(events, start, previous_hash, workers)
+        else:
+            result = self._verify_stream(events, start, previous_hash)
+
+        if result.valid and result.height > start:
+            self.save_checkpoint(result.height, result.head_hash)
+        return result
+
+    def _verify_stream(self, events: Iterator[Dict[str, Any]], start: int,
+                       previous_hash: str) -> VerificationResult:
+        height = start
+        for record in events:
+            height += 1
+            if record["previous_hash"] != previous_hash:
+                return VerificationResult(False, height - 1, previous_hash, start, height - start - 1,
+                                          height, "previous_hash does not match prior event")
+            if record["event_hash"] != hash_record(record):
+                return VerificationResult(False, height - 1, previous_hash, start, height - start - 1,
+                                          height, "event_hash mismatch")
+            previous_hash = record["event_hash"]
+        return VerificationResult(True, height, previous_hash, start, height - start)
+
+    def _chunks(self, events: Iterator[Dict[str, Any]]) -> Iterator[List[Tuple]]:
+        while True:
+            chunk = [
+                (r["event_id"], r["event_type"], r["civic_id"], r["lab_source"], r["payload"],
+                 r["timestamp"], r["previous_hash"], r["event_hash"])
+                for r in islice(events, self.chunk_size)
+            ]
+            if not chunk:
+                return
+            yield chunk
+
+    def _verify_parallel(self, events: Iterator[Dict[str, Any]], start: int,
+                         previous_hash: str, workers: int) -> VerificationResult:
+        height = start
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = []
+            chunk_start = start
+            for chunk in self._chunks(events):
+                pending.append((chunk_start, len(chunk), pool.submit(_verify_chunk, chunk_start, chunk)))
+                chunk_start += len(chunk)
+
+                # Keep a bounded number of chunks in flight
+                if len(pending) >= workers * 2:
+                    result = self._stitch(pending.pop(0), start, height, previous_hash)
+                    if isinstance(result, VerificationResult):
+                        self._cancel(pending)
+                        return result
+                    height, previous_hash = result
+
+            while pending:
+                result = self._stitch(pending.pop(0), start, height, previous_hash)
+                if isinstance(result, VerificationResult):
+                    self._cancel(pending)
+                    return result
+                height, previous_hash = result
+
+        return VerificationResult(True, height, previous_hash, start, height - start)
+
+    @staticmethod
+    def _cancel(pending):
+        for _, _, future in pending:
+            future.cancel()
+
+    @staticmethod
+    def _stitch(item, start: int, height: int, previous_hash: str):
+        """Join a finished chunk onto the verified prefix"""
+        chunk_start, chunk_len, future = item
+        first_previous, last_hash, failed_height, error = future.result()
+        if first_previous != previous_hash:
+            return VerificationResult(False, height, previous_hash, start, height - start,
+                                      chunk_start + 1, "previous_hash does not match prior event")
+        if failed_height is not None:
+            return VerificationResult(False, failed_height - 1, last_hash, start,
+                                      failed_height - 1 - start, failed_height, error)
+        return chunk_start + chunk_len, last_hash
@@ -13,13 +13,16 @@ from fastapi import FastAPI, HTTPException, Depends, Header
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone
-import sqlite3
-import hashlib
-import json
 import os
 import tempfile
 import httpx
-from dataclasses import dataclass, asdict
+
+try:
+    from .ledger import LedgerCore
+    from .group_commit import GroupCommitWriter
+except ImportError:  # running as a script: python app/main.py
+    from ledger import LedgerCore
+    from group_commit import GroupCommitWriter
 
 app = FastAPI(
     title="Civic Ledger API",
@@ -58,6 +61,11 @@ def get_data_dir():
 DATA_DIR = get_data_dir()
 LEDGER_DB_PATH = os.path.join(DATA_DIR, "ledger.db")
 
+# Group commit: attestations are committed together, up to this many per
+# transaction or whatever arrives within this many milliseconds
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("LEDGER_GROUP_COMMIT_MAX_BATCH", "64"))
+GROUP_COMMIT_MAX_DELAY_MS = float(os.getenv("LEDGER_GROUP_COMMIT_MAX_DELAY_MS", "5"))
+
 # API Configuration
 LAB4_API_BASE = os.getenv("LAB4_API_BASE", "https://hive-api-2le8.onrender.com")
 LAB6_API_BASE = os.getenv("LAB6_API_BASE", "")
@@ -65,19 +73,6 @@ LAB6_API_BASE = os.getenv("LAB6_API_BASE", "")
 print(f"Using data directory: {DATA_DIR}")
 print(f"Database path: {LEDGER_DB_PATH}")
 
-@dataclass
-class LedgerEvent:
-    """Immutable ledger event"""
-    event_id: str
-    event_type: str
-    civic_id: str
-    lab_source: str  # "lab4" or "lab6"
-    payload: Dict[str, Any]
-    timestamp: str
-    previous_hash: str
-    event_hash: str
-    signature: Optional[str] = None
-
 class AttestationRequest(BaseModel):
     """Request to attest an event to the ledger"""
     event_type: str
@@ -96,38 +91,21 @@ class EventResponse(BaseModel):
     event_hash: str
     confirmed: bool
 
-def get_db_connection():
-    """Get database connection"""
-    try:
-        conn = sqlite3.connect(LEDGER_DB_PATH)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS events (
-                event_id TEXT PRIMARY KEY,
-                event_type TEXT NOT NULL,
-                civic_id TEXT NOT NULL,
-                lab_source TEXT NOT NULL,
-                payload TEXT NOT NULL,
-                timestamp TEXT NOT NULL,
-                previous_hash TEXT NOT NULL,
-                event_hash TEXT NOT NULL,
-                signature TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS identities (
-                civic_id TEXT PRIMARY KEY,
-                lab_source TEXT NOT NULL,
-                first_seen TEXT NOT NULL,
-                last_seen TEXT NOT NULL,
-                event_count INTEGER DEFAULT 0
-            )
-        """)
-        conn.commit()
-        return conn
-    except Exception as e:
-        print(f"Database connection error: {e}")
-        raise HTTPException(500, f"Database connection failed: {str(e)}")
+ledger = LedgerCore(LEDGER_DB_PATH)
+attestation_writer = GroupCommitWriter(
+    ledger,
+    max_batch=GROUP_COMMIT_MAX_BATCH,
+    max_delay_ms=GROUP_COMMIT_MAX_DELAY_MS
+)
+
+@app.on_event("startup")
+def start_attestation_writer():
+    attestation_writer.start()
+
+@app.on_event("shutdown")
+def stop_attestation_writer():
+    attestation_writer.stop(timeout=10.0)
+    ledger.close()
 
 def verify_token(token: str, lab_source: str) -> Dict[str, Any]:
     """Verify token with the appropriate lab"""
@@ -154,49 +132,6 @@ def verify_token(token: str, lab_source: str) -> Dict[str, Any]:
     except Exception as e:
         raise HTTPException(500, f"Token verification error: {str(e)}")
 
-def get_latest_event_hash() -> str:
-    """Get the hash of the latest event in the chain"""
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.execute("""
-                SELECT event_hash FROM events 
-                ORDER BY created_at DESC LIMIT 1
-            """)
-            result = cursor.fetchone()
-            return result[0] if result else "0" * 64  # Genesis hash
-    except Exception as e:
-        print(f"Error getting latest hash: {e}")
-        return "0" * 64
-
-def calculate_event_hash(event: LedgerEvent) -> str:
-    """Calculate SHA-256 hash of the event"""
-    event_data = f"{event.event_id}{event.event_type}{event.civic_id}{event.lab_source}{json.dumps(event.payload, sort_keys=True)}{event.timestamp}{event.previous_hash}"
-    return hashlib.sha256(event_data.encode()).hexdigest()
-
-def create_ledger_event(event_type: str, civic_id: str, lab_source: str, 
-                       payload: Dict[str, Any], signature: Optional[str] = None) -> LedgerEvent:
-    """Create a new ledger event"""
-    event_id = f"evt_{int(datetime.now().timestamp() * 1000)}_{hashlib.sha256(f'{civic_id}{event_type}'.encode()).hexdigest()[:8]}"
-    timestamp = datetime.now(timezone.utc).isoformat()
-    previous_hash = get_latest_event_hash()
-    
-    event = LedgerEvent(
-        event_id=event_id,
-        event_type=event_type,
-        civic_id=civic_id,
-        lab_source=lab_source,
-        payload=payload,
-        timestamp=timestamp,
-        previous_hash=previous_hash,
-        event_hash="",  # Will be calculated
-        signature=signature
-    )
-    
-    # Calculate event hash
-    event.event_hash = calculate_event_hash(event)
-    
-    return event
-
 @app.get("/") 
 def root(): 
     return {
@@ -211,9 +146,7 @@ def health():
     """Health check endpoint"""
     try:
         # Test database connection
-        with get_db_connection() as conn:
-            cursor = conn.execute("SELECT COUNT(*) FROM events")
-            event_count = cursor.fetchone()[0]
+        event_count = ledger.get_chain_info()["chain_length"]
         
         return {
             "ok": True, 
@@ -251,39 +184,15 @@ def attest_event(request: AttestationRequest,
     except Exception as e:
         raise HTTPException(401, f"Token verification failed: {str(e)}")
     
-    # Create ledger event
-    event = create_ledger_event(
-        event_type=request.event_type,
-        civic_id=request.civic_id,
-        lab_source=request.lab_source,
-        payload=request.payload,
-        signature=request.signature
-    )
-    
-    # Store in database
+    # Queue for the next group commit; chaining happens on the writer thread
     try:
-        with get_db_connection() as conn:
-            conn.execute("""
-                INSERT INTO events (event_id, event_type, civic_id, lab_source, 
-                                  payload, timestamp, previous_hash, event_hash, signature)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                event.event_id, event.event_type, event.civic_id, event.lab_source,
-                json.dumps(event.payload), event.timestamp, event.previous_hash,
-                event.event_hash, event.signature
-            ))
-            
-            # Update identity stats
-            conn.execute("""
-                INSERT OR REPLACE INTO identities (civic_id, lab_source, first_seen, last_seen, event_count)
-                VALUES (?, ?, 
-                        COALESCE((SELECT first_seen FROM identities WHERE civic_id = ?), ?),
-                        ?, 
-                        COALESCE((SELECT event_count FROM identities WHERE civic_id = ?), 0) + 1)
-            """, (event.civic_id, event.lab_source, event.civic_id, event.timestamp,
-                  event.timestamp, event.civic_id))
-            
-            conn.commit()
+        event = attestation_writer.attest(
+            event_type=request.event_type,
+            civic_id=request.civic_id,
+            lab_source=request.lab_source,
+            payload=request.payload,
+            signature=request.signature
+        )
     except Exception as e:
         raise HTTPException(500, f"Database error: {str(e)}")
     
@@ -302,90 +211,60 @@ def get_events(civic_id: Optional[str] = None,
                event_type: Optional[str] = None,
                lab_source: Optional[str] = None,
                limit: int = 100,
-               offset: int = 0):
-    """Get events from the ledger with optional filtering"""
-    
-    query = "SELECT * FROM events WHERE 1=1"
-    params = []
-    
-    if civic_id:
-        query += " AND civic_id = ?"
-        params.append(civic_id)
-    
-    if event_type:
-        query += " AND event_type = ?"
-        params.append(event_type)
+               offset: int = 0,
+               cursor: Optional[str] = None):
+    """
+    Get events from the ledger with optional filtering
     
-    if lab_source:
-        query += " AND lab_source = ?"
-        params.append(lab_source)
-    
-    query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
-    params.extend([limit, offset])
+    Pages with the opaque ``cursor`` returned as ``next_cursor``; ``offset``
+    is still accepted for old clients but gets slower the deeper it goes.
+    """
     
     try:
-        with get_db_connection() as conn:
-            cursor = conn.execute(query, params)
-            rows = cursor.fetchall()
-            
-            events = []
-            for row in rows:
-                events.append({
-                    "event_id": row[0],
-                    "event_type": row[1],
-                    "civic_id": row[2],
-                    "lab_source": row[3],
-                    "payload": json.loads(row[4]),
-                    "timestamp": row[5],
-                    "previous_hash": row[6],
-                    "event_hash": row[7],
-                    "signature": row[8]
-                })
+        if offset and not cursor:
+            events = ledger.get_events(
+                civic_id=civic_id,
+                event_type=event_type,
+                lab_source=lab_source,
+                limit=limit,
+                offset=offset
+            )
+            next_cursor = None
+        else:
+            page = ledger.get_events_page(
+                civic_id=civic_id,
+                event_type=event_type,
+                lab_source=lab_source,
+                limit=limit,
+                cursor=cursor
+            )
+            events, next_cursor = page["events"], page["next_cursor"]
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     except Exception as e:
         raise HTTPException(500, f"Database error: {str(e)}")
     
-    return {"events": events, "count": len(events)}
+    return {"events": events, "count": len(events), "next_cursor": next_cursor}
 
 @app.get("/ledger/identity/{civic_id}")
 def get_identity(civic_id: str):
     """Get identity information and stats"""
     
     try:
-        with get_db_connection() as conn:
-            # Get identity stats
-            cursor = conn.execute("""
-                SELECT civic_id, lab_source, first_seen, last_seen, event_count
-                FROM identities WHERE civic_id = ?
-            """, (civic_id,))
-            
-            identity_row = cursor.fetchone()
-            if not identity_row:
-                raise HTTPException(404, f"Identity {civic_id} not found")
-            
-            # Get recent events
-            cursor = conn.execute("""
-                SELECT event_type, timestamp, event_hash
-                FROM events WHERE civic_id = ?
-                ORDER BY created_at DESC LIMIT 10
-            """, (civic_id,))
-            
-            recent_events = []
-            for row in cursor.fetchall():
-                recent_events.append({
-                    "event_type": row[0],
-                    "timestamp": row[1],
-                    "event_hash": row[2]
-                })
+        identity = ledger.get_identity(civic_id)
     except Exception as e:
         raise HTTPException(500, f"Database error: {str(e)}")
     
+    if not identity:
+        raise HTTPException(404, f"Identity {civic_id} not found")
+    
     return {
-        "civic_id": identity_row[0],
-        "lab_source": identity_row[1],
-        "first_seen": identity_row[2],
-        "last_seen": identity_row[3],
-        "event_count": identity_row[4],
-        "recent_events": recent_events
+        "civic_id": identity["civic_id"],
+        "lab_source": identity["lab_source"],
+        "first_seen": identity["first_seen"],
+        "last_seen": identity["last_seen"],
+        "event_count": identity["event_count"],
+        "recent_events": identity["recent_events"]
     }
 
 @app.get("/ledger/stats")
@@ -393,84 +272,18 @@ def get_ledger_stats():
     """Get ledger statistics"""
     
     try:
-        with get_db_connection() as conn:
-            # Total events
-            cursor = conn.execute("SELECT COUNT(*) FROM events")
-            total_events = cursor.fetchone()[0]
-            
-            # Total identities
-            cursor = conn.execute("SELECT COUNT(*) FROM identities")
-            total_identities = cursor.fetchone()[0]
-            
-            # Events by type
-            cursor = conn.execute("""
-                SELECT event_type, COUNT(*) FROM events 
-                GROUP BY event_type ORDER BY COUNT(*) DESC
-            """)
-            events_by_type = {row[0]: row[1] for row in cursor.fetchall()}
-            
-            # Events by lab
-            cursor = conn.execute("""
-                SELECT lab_source, COUNT(*) FROM events 
-                GROUP BY lab_source ORDER BY COUNT(*) DESC
-            """)
-            events_by_lab = {row[0]: row[1] for row in cursor.fetchall()}
-            
-            # Latest event
-            cursor = conn.execute("""
-                SELECT event_id, timestamp, event_type FROM events 
-                ORDER BY created_at DESC LIMIT 1
-            """)
-            latest_event = cursor.fetchone()
+        return ledger.get_ledger_stats()
     except Exception as e:
         raise HTTPException(500, f"Database error: {str(e)}")
-    
-    return {
-        "total_events": total_events,
-        "total_identities": total_identities,
-        "events_by_type": events_by_type,
-        "events_by_lab": events_by_lab,
-        "latest_event": {
-            "event_id": latest_event[0],
-            "timestamp": latest_event[1],
-            "event_type": latest_event[2]
-        } if latest_event else None
-    }
 
 @app.get("/ledger/chain")
 def get_chain_info():
     """Get blockchain-like chain information"""
     
     try:
-        with get_db_connection() as conn:
-            # Get chain length
-            cursor = conn.execute("SELECT COUNT(*) FROM events")
-            chain_length = cursor.fetchone()[0]
-            
-            # Get latest block hash
-            cursor = conn.execute("""
-                SELECT event_hash FROM events 
-                ORDER BY created_at DESC LIMIT 1
-            """)
-            latest_hash = cursor.fetchone()
-            latest_hash = latest_hash[0] if latest_hash else "0" * 64
-            
-            # Get genesis hash
-            cursor = conn.execute("""
-                SELECT event_hash FROM events 
-                ORDER BY created_at ASC LIMIT 1
-            """)
-            genesis_hash = cursor.fetchone()
-            genesis_hash = genesis_hash[0] if genesis_hash else "0" * 64
+        return ledger.get_chain_info()
     except Exception as e:
         raise HTTPException(500, f"Database error: {str(e)}")
-    
-    return {
-        "chain_length": chain_length,
-        "latest_hash": latest_hash,
-        "genesis_hash": genesis_hash,
-        "is_genesis": chain_length == 0
-    }
 
 if __name__ == "__main__":
     import uvicorn
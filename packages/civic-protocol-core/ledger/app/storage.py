@@ -0,0 +1,1012 @@
+#!/usr/bin/env python3
+"""
+Ledger Storage - Pluggable storage engines for LedgerCore
+
+LedgerCore talks to its storage through the LedgerStorage interface so the
+event store can be swapped without touching the chain logic. Two engines
+ship with the ledger:
+
+- SQLiteStorage: persistent per-thread connections in WAL mode, one
+  transaction per batch of events (the default)
+- SegmentStorage: append-only segment files with length-prefixed records,
+  a per-segment offset index and batched fsync
+"""
+
+import sqlite3
+import base64
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Any, Iterator, Sequence, Tuple
+
+GENESIS_HASH = "0" * 64
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS events (
+        event_id TEXT PRIMARY KEY,
+        event_type TEXT NOT NULL,
+        civic_id TEXT NOT NULL,
+        lab_source TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        previous_hash TEXT NOT NULL,
+        event_hash TEXT NOT NULL,
+        signature TEXT,
+        block_height INTEGER,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS blocks (
+        block_id TEXT PRIMARY KEY,
+        block_height INTEGER UNIQUE NOT NULL,
+        previous_block_hash TEXT NOT NULL,
+        block_hash TEXT NOT NULL,
+        merkle_root TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        event_count INTEGER NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS identities (
+        civic_id TEXT PRIMARY KEY,
+        lab_source TEXT NOT NULL,
+        first_seen TEXT NOT NULL,
+        last_seen TEXT NOT NULL,
+        event_count INTEGER DEFAULT 0,
+        balance_gic INTEGER DEFAULT 0
+    );
+
+    CREATE TABLE IF NOT EXISTS gic_transactions (
+        tx_id TEXT PRIMARY KEY,
+        from_civic_id TEXT,
+        to_civic_id TEXT,
+        amount INTEGER NOT NULL,
+        tx_type TEXT NOT NULL,
+        event_id TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        FOREIGN KEY (event_id) REFERENCES events (event_id)
+    );
+
+    -- Newest-first listings, optionally filtered by one of the columns below
+    CREATE INDEX IF NOT EXISTS idx_events_created ON events (created_at, event_id);
+    CREATE INDEX IF NOT EXISTS idx_events_civic ON events (civic_id, created_at, event_id);
+    CREATE INDEX IF NOT EXISTS idx_events_type ON events (event_type, created_at, event_id);
+    CREATE INDEX IF NOT EXISTS idx_events_lab ON events (lab_source, created_at, event_id);
+
+    -- Materialized stats, maintained in the same transaction as each append
+    CREATE TABLE IF NOT EXISTS stats_counts (
+        dimension TEXT NOT NULL,  -- 'total', 'event_type' or 'lab_source'
+        name TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (dimension, name)
+    );
+
+    CREATE TABLE IF NOT EXISTS stats_latest (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        event_id TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        event_type TEXT NOT NULL,
+        event_hash TEXT NOT NULL,
+        genesis_hash TEXT NOT NULL
+    );
+"""
+
+EVENT_COLUMNS = (
+    "event_id", "event_type", "civic_id", "lab_source", "payload",
+    "timestamp", "previous_hash", "event_hash", "signature", "block_height"
+)
+
+
+def event_to_record(event: Any) -> Dict[str, Any]:
+    """Flatten a LedgerEvent into the record shape returned by queries"""
+    return {
+        "event_id": event.event_id,
+        "event_type": event.event_type,
+        "civic_id": event.civic_id,
+        "lab_source": event.lab_source,
+        "payload": event.payload,
+        "timestamp": event.timestamp,
+        "previous_hash": event.previous_hash,
+        "event_hash": event.event_hash,
+        "signature": event.signature,
+        "block_height": getattr(event, "block_height", None)
+    }
+
+
+def encode_cursor(position: Any) -> str:
+    """Wrap a storage-specific page position in an opaque token"""
+    raw = json.dumps(position, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Any:
+    """Unwrap a token produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+def _matches(record: Dict[str, Any], civic_id: Optional[str],
+             event_type: Optional[str], lab_source: Optional[str]) -> bool:
+    """Check a record against the optional query filters"""
+    if civic_id and record["civic_id"] != civic_id:
+        return False
+    if event_type and record["event_type"] != event_type:
+        return False
+    if lab_source and record["lab_source"] != lab_source:
+        return False
+    return True
+
+
+class LedgerStorage(ABC):
+    """Interface every LedgerCore storage engine implements"""
+
+    @abstractmethod
+    def append_events(self, events: Sequence[Any]) -> None:
+        """Durably append a batch of events in order, all or nothing"""
+
+    def append_event(self, event: Any) -> None:
+        """Append a single event"""
+        self.append_events([event])
+
+    @abstractmethod
+    def append_chained(self, build: Callable[[str], Sequence[Any]]) -> Sequence[Any]:
+        """
+        Read the chain head and append ``build(head)`` atomically
+
+        No other writer can append between the read and the write, so events
+        chained onto ``head`` by ``build`` always extend the current chain.
+        Returns the events written.
+        """
+
+    @abstractmethod
+    def latest_event_hash(self) -> str:
+        """Hash of the newest event, or the genesis hash for an empty chain"""
+
+    @abstractmethod
+    def query_events(self, civic_id: Optional[str] = None,
+                     event_type: Optional[str] = None,
+                     lab_source: Optional[str] = None,
+                     limit: int = 100,
+                     offset: int = 0) -> List[Dict[str, Any]]:
+        """Filtered events, newest first"""
+
+    @abstractmethod
+    def page_events(self, civic_id: Optional[str] = None,
+                    event_type: Optional[str] = None,
+                    lab_source: Optional[str] = None,
+                    limit: int = 100,
+                    cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of filtered events, newest first
+
+        Returns ``{"events": [...], "next_cursor": str | None}``; pass
+        ``next_cursor`` back to continue after the last event of the page.
+        """
+
+    @abstractmethod
+    def iter_events(self, start: int = 0) -> Iterator[Dict[str, Any]]:
+        """Events in insertion (chain) order, skipping the first ``start``"""
+
+    @abstractmethod
+    def get_identity(self, civic_id: str) -> Optional[Dict[str, Any]]:
+        """Identity stats plus the ten most recent events"""
+
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """Totals, per-type and per-lab counts and the latest event"""
+
+    @abstractmethod
+    def get_chain_info(self) -> Dict[str, Any]:
+        """Chain length plus latest and genesis hashes"""
+
+    @abstractmethod
+    def rebuild_stats(self) -> Dict[str, Any]:
+        """Recompute the materialized stats from the stored events"""
+
+    def flush(self) -> None:
+        """Force buffered writes to stable storage"""
+
+    def close(self) -> None:
+        """Release files and connections"""
+
+
+class SQLiteStorage(LedgerStorage):
+    """
+    SQLite storage with persistent connections
+
+    Each thread keeps one long-lived connection (WAL mode lets readers run
+    alongside the writer), writes are serialized by a lock and every batch is
+    committed in a single transaction with one identity upsert per event.
+    append_chained reads the head inside a ``BEGIN IMMEDIATE`` transaction, so
+    several processes writing one database file still extend a single chain.
+    Totals, per-type and per-lab counts and the latest event are materialized
+    in the stats tables by that same transaction, so stats reads never scan
+    the events table.
+    """
+
+    def __init__(self, db_path: str = "./data/ledger.db", synchronous: str = "NORMAL"):
+        self.db_path = db_path
+        self.synchronous = synchronous
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        conn = self._connection()
+        with self._write_lock:
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+            conn.commit()
+
+        # Databases written before the stats tables existed start empty
+        if conn.execute("SELECT 1 FROM stats_counts WHERE dimension = 'total' AND name = 'events'").fetchone() is None:
+            self.rebuild_stats()
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        """Add columns missing from databases created by older API versions"""
+        for table, column, ddl in (
+            ("events", "block_height", "INTEGER"),
+            ("identities", "balance_gic", "INTEGER DEFAULT 0"),
+        ):
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get (or lazily open) this thread's connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+
+        if self.db_path == ":memory:":
+            # An in-memory database only exists on one connection, share it
+            with self._connections_lock:
+                if self._connections:
+                    conn = self._connections[0]
+                    self._local.conn = conn
+                    return conn
+
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        self._local.conn = conn
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def append_events(self, events: Sequence[Any]) -> None:
+        if not events:
+            return
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                self._insert_events(conn, events)
+
+    def append_chained(self, build: Callable[[str], Sequence[Any]]) -> Sequence[Any]:
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                # Take the database write lock before reading the head, so a
+                # writer in another process cannot append in between
+                conn.execute("BEGIN IMMEDIATE")
+                events = build(self._read_head(conn))
+                if events:
+                    self._insert_events(conn, events)
+        return events
+
+    def _insert_events(self, conn: sqlite3.Connection, events: Sequence[Any]) -> None:
+        """Write a batch inside the caller's transaction"""
+        event_rows = [
+            (e.event_id, e.event_type, e.civic_id, e.lab_source,
+             json.dumps(e.payload), e.timestamp, e.previous_hash,
+             e.event_hash, e.signature, getattr(e, "block_height", None))
+            for e in events
+        ]
+        identity_rows = [
+            (e.civic_id, e.lab_source, e.timestamp, e.timestamp)
+            for e in events
+        ]
+        count_rows = [("total", "events", len(events))]
+        count_rows += [("event_type", name, n) for name, n in Counter(e.event_type for e in events).items()]
+        count_rows += [("lab_source", name, n) for name, n in Counter(e.lab_source for e in events).items()]
+        civic_ids = list(dict.fromkeys(e.civic_id for e in events))
+        latest = events[-1]
+
+        # Identities this batch introduces, counted before the upsert
+        known = 0
+        for i in range(0, len(civic_ids), 500):
+            chunk = civic_ids[i:i + 500]
+            known += conn.execute(
+                f"SELECT COUNT(*) FROM identities WHERE civic_id IN ({', '.join('?' * len(chunk))})",
+                chunk
+            ).fetchone()[0]
+
+        conn.executemany("""
+            INSERT INTO events (event_id, event_type, civic_id, lab_source,
+                              payload, timestamp, previous_hash, event_hash, signature, block_height)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, event_rows)
+
+        # Update identity stats
+        conn.executemany("""
+            INSERT INTO identities (civic_id, lab_source, first_seen, last_seen, event_count)
+            VALUES (?, ?, ?, ?, 1)
+            ON CONFLICT(civic_id) DO UPDATE SET
+                lab_source = excluded.lab_source,
+                last_seen = excluded.last_seen,
+                event_count = identities.event_count + 1
+        """, identity_rows)
+
+        count_rows.append(("total", "identities", len(civic_ids) - known))
+        conn.executemany("""
+            INSERT INTO stats_counts (dimension, name, count) VALUES (?, ?, ?)
+            ON CONFLICT(dimension, name) DO UPDATE SET
+                count = stats_counts.count + excluded.count
+        """, count_rows)
+        conn.execute("""
+            INSERT INTO stats_latest (id, event_id, timestamp, event_type, event_hash, genesis_hash)
+            VALUES (1, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                event_id = excluded.event_id,
+                timestamp = excluded.timestamp,
+                event_type = excluded.event_type,
+                event_hash = excluded.event_hash
+        """, (latest.event_id, latest.timestamp, latest.event_type,
+              latest.event_hash, events[0].event_hash))
+
+    @staticmethod
+    def _read_head(conn: sqlite3.Connection) -> str:
+        result = conn.execute("""
+            SELECT event_hash FROM events
+            ORDER BY rowid DESC LIMIT 1
+        """).fetchone()
+        return result[0] if result else GENESIS_HASH
+
+    def latest_event_hash(self) -> str:
+        # Read every time: another process may have appended since
+        return self._read_head(self._connection())
+
+    @staticmethod
+    def _row_to_record(row: Tuple) -> Dict[str, Any]:
+        return {
+            "event_id": row[0],
+            "event_type": row[1],
+            "civic_id": row[2],
+            "lab_source": row[3],
+            "payload": json.loads(row[4]),
+            "timestamp": row[5],
+            "previous_hash": row[6],
+            "event_hash": row[7],
+            "signature": row[8],
+            "block_height": row[9]
+        }
+
+    @staticmethod
+    def _filter_clause(civic_id: Optional[str], event_type: Optional[str],
+                       lab_source: Optional[str]) -> Tuple[str, List[Any]]:
+        clause = ""
+        params: List[Any] = []
+
+        if civic_id:
+            clause += " AND civic_id = ?"
+            params.append(civic_id)
+
+        if event_type:
+            clause += " AND event_type = ?"
+            params.append(event_type)
+
+        if lab_source:
+            clause += " AND lab_source = ?"
+            params.append(lab_source)
+
+        return clause, params
+
+    def query_events(self, civic_id: Optional[str] = None,
+                     event_type: Optional[str] = None,
+                     lab_source: Optional[str] = None,
+                     limit: int = 100,
+                     offset: int = 0) -> List[Dict[str, Any]]:
+        clause, params = self._filter_clause(civic_id, event_type, lab_source)
+        query = (f"SELECT {', '.join(EVENT_COLUMNS)} FROM events WHERE 1=1{clause}"
+                 " ORDER BY created_at DESC, event_id DESC LIMIT ? OFFSET ?")
+        params.extend([limit, offset])
+
+        cursor = self._connection().execute(query, params)
+        return [self._row_to_record(row) for row in cursor.fetchall()]
+
+    def _page_query(self, civic_id: Optional[str], event_type: Optional[str],
+                    lab_source: Optional[str], limit: int,
+                    cursor: Optional[str]) -> Tuple[str, List[Any]]:
+        clause, params = self._filter_clause(civic_id, event_type, lab_source)
+        if cursor:
+            position = decode_cursor(cursor)
+            if not (isinstance(position, list) and len(position) == 2):
+                raise ValueError(f"Invalid cursor: {cursor!r}")
+            # Keyset seek: strictly older than the last row of the previous page
+            clause += " AND (created_at, event_id) < (?, ?)"
+            params.extend(position)
+        query = (f"SELECT {', '.join(EVENT_COLUMNS)}, created_at FROM events WHERE 1=1{clause}"
+                 " ORDER BY created_at DESC, event_id DESC LIMIT ?")
+        params.append(limit)
+        return query, params
+
+    def page_events(self, civic_id: Optional[str] = None,
+                    event_type: Optional[str] = None,
+                    lab_source: Optional[str] = None,
+                    limit: int = 100,
+                    cursor: Optional[str] = None) -> Dict[str, Any]:
+        query, params = self._page_query(civic_id, event_type, lab_source, limit, cursor)
+        rows = self._connection().execute(query, params).fetchall()
+
+        next_cursor = None
+        if rows and len(rows) == limit:
+            last = rows[-1]
+            next_cursor = encode_cursor([last[len(EVENT_COLUMNS)], last[0]])
+
+        return {
+            "events": [self._row_to_record(row) for row in rows],
+            "next_cursor": next_cursor
+        }
+
+    def query_plan(self, civic_id: Optional[str] = None,
+                   event_type: Optional[str] = None,
+                   lab_source: Optional[str] = None,
+                   paged: bool = True) -> List[str]:
+        """EXPLAIN QUERY PLAN details for an event listing query"""
+        if paged:
+            query, params = self._page_query(civic_id, event_type, lab_source, 100,
+                                             encode_cursor(["", ""]))
+        else:
+            clause, params = self._filter_clause(civic_id, event_type, lab_source)
+            query = (f"SELECT {', '.join(EVENT_COLUMNS)} FROM events WHERE 1=1{clause}"
+                     " ORDER BY created_at DESC, event_id DESC LIMIT ? OFFSET ?")
+            params.extend([100, 0])
+        rows = self._connection().execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+        return [row[-1] for row in rows]
+
+    def iter_events(self, start: int = 0) -> Iterator[Dict[str, Any]]:
+        # Events are never deleted, so rowid N is the event at height N and
+        # resuming is an index seek; the cursor streams rows lazily.
+        cursor = self._connection().execute(
+            f"SELECT {', '.join(EVENT_COLUMNS)} FROM events WHERE rowid > ? ORDER BY rowid ASC",
+            (start,)
+        )
+        for row in cursor:
+            yield self._row_to_record(row)
+
+    def get_identity(self, civic_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connection()
+        cursor = conn.execute("""
+            SELECT civic_id, lab_source, first_seen, last_seen, event_count, balance_gic
+            FROM identities WHERE civic_id = ?
+        """, (civic_id,))
+
+        identity_row = cursor.fetchone()
+        if not identity_row:
+            return None
+
+        # Get recent events
+        cursor = conn.execute("""
+            SELECT event_type, timestamp, event_hash
+            FROM events WHERE civic_id = ?
+            ORDER BY created_at DESC, event_id DESC LIMIT 10
+        """, (civic_id,))
+
+        recent_events = [
+            {"event_type": row[0], "timestamp": row[1], "event_hash": row[2]}
+            for row in cursor.fetchall()
+        ]
+
+        return {
+            "civic_id": identity_row[0],
+            "lab_source": identity_row[1],
+            "first_seen": identity_row[2],
+            "last_seen": identity_row[3],
+            "event_count": identity_row[4],
+            "balance_gic": identity_row[5],
+            "recent_events": recent_events
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        conn = self._connection()
+
+        counts: Dict[str, Dict[str, int]] = {"total": {}, "event_type": {}, "lab_source": {}}
+        for dimension, name, count in conn.execute("""
+            SELECT dimension, name, count FROM stats_counts ORDER BY count DESC
+        """):
+            counts.setdefault(dimension, {})[name] = count
+
+        latest_event = conn.execute("""
+            SELECT event_id, timestamp, event_type FROM stats_latest WHERE id = 1
+        """).fetchone()
+
+        return {
+            "total_events": counts["total"].get("events", 0),
+            "total_identities": counts["total"].get("identities", 0),
+            "events_by_type": counts["event_type"],
+            "events_by_lab": counts["lab_source"],
+            "latest_event": {
+                "event_id": latest_event[0],
+                "timestamp": latest_event[1],
+                "event_type": latest_event[2]
+            } if latest_event else None
+        }
+
+    def get_chain_info(self) -> Dict[str, Any]:
+        conn = self._connection()
+
+        chain_length = conn.execute("""
+            SELECT count FROM stats_counts WHERE dimension = 'total' AND name = 'events'
+        """).fetchone()
+        chain_length = chain_length[0] if chain_length else 0
+
+        genesis_hash = conn.execute("SELECT genesis_hash FROM stats_latest WHERE id = 1").fetchone()
+        genesis_hash = genesis_hash[0] if genesis_hash else GENESIS_HASH
+
+        return {
+            "chain_length": chain_length,
+            "latest_hash": self.latest_event_hash(),
+            "genesis_hash": genesis_hash,
+            "is_genesis": chain_length == 0
+        }
+
+    def rebuild_stats(self) -> Dict[str, Any]:
+        """Recompute the stats tables from the events and identities tables"""
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM stats_counts")
+                conn.execute("DELETE FROM stats_latest")
+                conn.execute("""
+                    INSERT INTO stats_counts (dimension, name, count)
+                    SELECT 'total', 'events', COUNT(*) FROM events
+                    UNION ALL
+                    SELECT 'total', 'identities', COUNT(*) FROM identities
+                    UNION ALL
+                    SELECT 'event_type', event_type, COUNT(*) FROM events GROUP BY event_type
+                    UNION ALL
+                    SELECT 'lab_source', lab_source, COUNT(*) FROM events GROUP BY lab_source
+                """)
+                conn.execute("""
+                    INSERT INTO stats_latest (id, event_id, timestamp, event_type, event_hash, genesis_hash)
+                    SELECT 1, latest.event_id, latest.timestamp, latest.event_type, latest.event_hash,
+                           (SELECT event_hash FROM events ORDER BY rowid ASC LIMIT 1)
+                    FROM (SELECT * FROM events ORDER BY rowid DESC LIMIT 1) AS latest
+                """)
+        return self.get_stats()
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+
+class SegmentStorage(LedgerStorage):
+    """
+    Append-only segment file storage
+
+    Events are written as length-prefixed, CRC-checked JSON records to
+    numbered segment files (``00000000.seg``) that roll over at
+    ``segment_max_bytes``. Each segment has an ``.idx`` sidecar of fixed-size
+    (offset, length) entries, so record N is one seek away and segments can be
+    read newest-first. fsync is batched: data is synced every
+    ``fsync_every`` events or ``fsync_interval`` seconds, whichever comes
+    first (``fsync_every=1`` syncs every append). A timer syncs a batch left
+    behind by a writer that has gone idle.
+
+    Identity and stats aggregates are kept in memory and rebuilt from the
+    segments on open; a torn record at the tail of the active segment is
+    truncated during that recovery pass.
+
+    The files are owned by a single process: run one writer process per
+    segment directory (use SQLiteStorage for multi-worker deployments).
+    """
+
+    RECORD_HEADER = struct.Struct(">II")  # payload length, crc32
+    INDEX_ENTRY = struct.Struct(">QI")  # record offset, payload length
+
+    def __init__(self, directory: str = "./data/segments",
+                 segment_max_bytes: int = 64 * 1024 * 1024,
+                 fsync_every: int = 256,
+                 fsync_interval: float = 0.05):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self._lock = threading.RLock()
+
+        # Sealed and active segments: [(sequence, record_count)]
+        self._segments: List[List[int]] = []
+        self._seg_fh = None
+        self._idx_fh = None
+        self._active_size = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._sync_timer: Optional[threading.Timer] = None
+
+        # In-memory aggregates
+        self._count = 0
+        self._head_hash = GENESIS_HASH
+        self._genesis_hash = GENESIS_HASH
+        self._latest: Optional[Dict[str, Any]] = None
+        self._by_type: Counter = Counter()
+        self._by_lab: Counter = Counter()
+        self._identities: Dict[str, Dict[str, Any]] = {}
+
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+
+    # --- Files -------------------------------------------------------------
+
+    def _seg_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"{seq:08d}.seg")
+
+    def _idx_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"{seq:08d}.idx")
+
+    def _scan_segment(self, seq: int) -> Tuple[List[Tuple[int, int]], int]:
+        """Read a segment front to back; returns index entries and valid length"""
+        entries = []
+        offset = 0
+        with open(self._seg_path(seq), "rb") as f:
+            data = f.read()
+        header_size = self.RECORD_HEADER.size
+        while offset + header_size <= len(data):
+            length, crc = self.RECORD_HEADER.unpack_from(data, offset)
+            start = offset + header_size
+            end = start + length
+            if end > len(data) or zlib.crc32(data[start:end]) != crc:
+                break
+            entries.append((offset, length))
+            offset = end
+        return entries, offset
+
+    def _recover(self):
+        """Open existing segments, repair the tail and rebuild aggregates"""
+        sequences = sorted(
+            int(name[:-4]) for name in os.listdir(self.directory)
+            if name.endswith(".seg") and name[:-4].isdigit()
+        )
+
+        for position, seq in enumerate(sequences):
+            is_active = position == len(sequences) - 1
+            index = self._read_index(seq)
+
+            if is_active or len(index) == 0:
+                # The active segment may have a torn tail or a lagging index:
+                # rescan it and rewrite both files to the last good record.
+                index, valid_size = self._scan_segment(seq)
+                with open(self._seg_path(seq), "r+b") as f:
+                    f.truncate(valid_size)
+                with open(self._idx_path(seq), "wb") as f:
+                    for entry in index:
+                        f.write(self.INDEX_ENTRY.pack(*entry))
+                if is_active:
+                    self._active_size = valid_size
+
+            self._segments.append([seq, len(index)])
+            for record in self._iter_segment(seq, index):
+                self._apply(record)
+
+        if not self._segments:
+            self._segments.append([0, 0])
+            self._active_size = 0
+
+        active_seq = self._segments[-1][0]
+        self._seg_fh = open(self._seg_path(active_seq), "ab")
+        self._idx_fh = open(self._idx_path(active_seq), "ab")
+
+    def _read_index(self, seq: int) -> List[Tuple[int, int]]:
+        path = self._idx_path(seq)
+        if not os.path.exists(path):
+            return []
+        with open(path, "rb") as f:
+            data = f.read()
+        entry_size = self.INDEX_ENTRY.size
+        usable = len(data) - len(data) % entry_size
+        return [self.INDEX_ENTRY.unpack_from(data, pos) for pos in range(0, usable, entry_size)]
+
+    def _iter_segment(self, seq: int, index: Optional[List[Tuple[int, int]]] = None,
+                      reverse: bool = False) -> Iterator[Dict[str, Any]]:
+        """Decode the records of one segment using its index"""
+        if index is None:
+            index = self._read_index(seq)
+        if reverse:
+            index = list(reversed(index))
+        header_size = self.RECORD_HEADER.size
+        with open(self._seg_path(seq), "rb") as f:
+            for offset, length in index:
+                f.seek(offset + header_size)
+                yield json.loads(f.read(length))
+
+    def _roll(self):
+        """Seal the active segment and start a new one"""
+        self._sync()
+        self._seg_fh.close()
+        self._idx_fh.close()
+        seq = self._segments[-1][0] + 1
+        self._segments.append([seq, 0])
+        self._seg_fh = open(self._seg_path(seq), "ab")
+        self._idx_fh = open(self._idx_path(seq), "ab")
+        self._active_size = 0
+
+    def _sync(self):
+        self._seg_fh.flush()
+        self._idx_fh.flush()
+        os.fsync(self._seg_fh.fileno())
+        os.fsync(self._idx_fh.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _schedule_sync(self):
+        """Arm the timer that syncs unsynced events once fsync_interval has passed"""
+        if self._sync_timer is None:
+            delay = max(0.0, self._last_sync + self.fsync_interval - time.monotonic())
+            self._sync_timer = threading.Timer(delay, self._timed_sync)
+            self._sync_timer.daemon = True
+            self._sync_timer.start()
+
+    def _timed_sync(self):
+        with self._lock:
+            self._sync_timer = None
+            if self._seg_fh is None or not self._unsynced:
+                return
+            if time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+            else:
+                self._schedule_sync()  # Synced by an append since the timer was armed
+
+    # --- Aggregates --------------------------------------------------------
+
+    def _apply(self, record: Dict[str, Any]):
+        """Fold one record into the in-memory aggregates"""
+        if self._count == 0:
+            self._genesis_hash = record["event_hash"]
+        self._count += 1
+        self._head_hash = record["event_hash"]
+        self._latest = record
+        self._by_type[record["event_type"]] += 1
+        self._by_lab[record["lab_source"]] += 1
+
+        identity = self._identities.get(record["civic_id"])
+        if identity is None:
+            self._identities[record["civic_id"]] = {
+                "lab_source": record["lab_source"],
+                "first_seen": record["timestamp"],
+                "last_seen": record["timestamp"],
+                "event_count": 1
+            }
+        else:
+            identity["lab_source"] = record["lab_source"]
+            identity["last_seen"] = record["timestamp"]
+            identity["event_count"] += 1
+
+    # --- LedgerStorage -----------------------------------------------------
+
+    def append_events(self, events: Sequence[Any]) -> None:
+        if not events:
+            return
+
+        # Encode everything up front so a bad event cannot leave a partial batch
+        records = [event_to_record(e) for e in events]
+        payloads = [
+            json.dumps(record, sort_keys=True, separators=(",", ":")).encode("utf-8")
+            for record in records
+        ]
+        with self._lock:
+            for record, payload in zip(records, payloads):
+                frame_size = self.RECORD_HEADER.size + len(payload)
+                if self._active_size and self._active_size + frame_size > self.segment_max_bytes:
+                    self._roll()
+
+                offset = self._active_size
+                self._seg_fh.write(self.RECORD_HEADER.pack(len(payload), zlib.crc32(payload)))
+                self._seg_fh.write(payload)
+                self._idx_fh.write(self.INDEX_ENTRY.pack(offset, len(payload)))
+                self._active_size += frame_size
+                self._segments[-1][1] += 1
+                self._apply(record)
+
+            self._unsynced += len(records)
+            if (self._unsynced >= self.fsync_every or
+                    time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+            else:
+                self._schedule_sync()
+
+    def append_chained(self, build: Callable[[str], Sequence[Any]]) -> Sequence[Any]:
+        # The segment files belong to one process, so the in-process lock
+        # is enough to keep the head from moving under build()
+        with self._lock:
+            events = build(self._head_hash)
+            self.append_events(events)
+        return events
+
+    def latest_event_hash(self) -> str:
+        return self._head_hash
+
+    def _iter_newest_first(self, before: Optional[int] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (height, record) newest first, only heights below ``before``"""
+        with self._lock:
+            self._seg_fh.flush()
+            self._idx_fh.flush()
+            segments = [(seq, count) for seq, count in self._segments]
+            top = self._count
+
+        if before is not None:
+            top = min(top, before - 1)
+        first_height = sum(count for _, count in segments)
+        for seq, count in reversed(segments):
+            first_height -= count
+            if first_height >= top:
+                continue
+            index = self._read_index(seq)[:top - first_height]
+            height = first_height + len(index)
+            for record in self._iter_segment(seq, index, reverse=True):
+                yield height, record
+                height -= 1
+
+    def query_events(self, civic_id: Optional[str] = None,
+                     event_type: Optional[str] = None,
+                     lab_source: Optional[str] = None,
+                     limit: int = 100,
+                     offset: int = 0) -> List[Dict[str, Any]]:
+        events = []
+        skipped = 0
+        for _, record in self._iter_newest_first():
+            if not _matches(record, civic_id, event_type, lab_source):
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            events.append(record)
+            if len(events) >= limit:
+                break
+        return events
+
+    def page_events(self, civic_id: Optional[str] = None,
+                    event_type: Optional[str] = None,
+                    lab_source: Optional[str] = None,
+                    limit: int = 100,
+                    cursor: Optional[str] = None) -> Dict[str, Any]:
+        before = None
+        if cursor:
+            before = decode_cursor(cursor)
+            if not isinstance(before, int):
+                raise ValueError(f"Invalid cursor: {cursor!r}")
+
+        events = []
+        last_height = None
+        for height, record in self._iter_newest_first(before):
+            if not _matches(record, civic_id, event_type, lab_source):
+                continue
+            events.append(record)
+            last_height = height
+            if len(events) >= limit:
+                break
+
+        return {
+            "events": events,
+            "next_cursor": encode_cursor(last_height) if len(events) == limit else None
+        }
+
+    def iter_events(self, start: int = 0) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            self._seg_fh.flush()
+            self._idx_fh.flush()
+            segments = [(seq, count) for seq, count in self._segments]
+        for seq, count in segments:
+            if start >= count:
+                start -= count
+                continue
+            index = self._read_index(seq)[start:count]
+            start = 0
+            yield from self._iter_segment(seq, index)
+
+    def get_identity(self, civic_id: str) -> Optional[Dict[str, Any]]:
+        identity = self._identities.get(civic_id)
+        if identity is None:
+            return None
+
+        recent_events = [
+            {"event_type": e["event_type"], "timestamp": e["timestamp"], "event_hash": e["event_hash"]}
+            for e in self.query_events(civic_id=civic_id, limit=10)
+        ]
+
+        return {
+            "civic_id": civic_id,
+            "lab_source": identity["lab_source"],
+            "first_seen": identity["first_seen"],
+            "last_seen": identity["last_seen"],
+            "event_count": identity["event_count"],
+            "balance_gic": 0,
+            "recent_events": recent_events
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        latest = self._latest
+        return {
+            "total_events": self._count,
+            "total_identities": len(self._identities),
+            "events_by_type": dict(self._by_type.most_common()),
+            "events_by_lab": dict(self._by_lab.most_common()),
+            "latest_event": {
+                "event_id": latest["event_id"],
+                "timestamp": latest["timestamp"],
+                "event_type": latest["event_type"]
+            } if latest else None
+        }
+
+    def get_chain_info(self) -> Dict[str, Any]:
+        return {
+            "chain_length": self._count,
+            "latest_hash": self._head_hash,
+            "genesis_hash": self._genesis_hash,
+            "is_genesis": self._count == 0
+        }
+
+    def rebuild_stats(self) -> Dict[str, Any]:
+        """Reset the in-memory aggregates and refold every stored record"""
+        with self._lock:
+            self._count = 0
+            self._head_hash = GENESIS_HASH
+            self._genesis_hash = GENESIS_HASH
+            self._latest = None
+            self._by_type = Counter()
+            self._by_lab = Counter()
+            self._identities = {}
+            for record in self.iter_events():
+                self._apply(record)
+        return self.get_stats()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._sync()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._sync_timer is not None:
+                self._sync_timer.cancel()
+                self._sync_timer = None
+            if self._seg_fh is None:
+                return
+            self._sync()
+            self._seg_fh.close()
+            self._idx_fh.close()
+            self._seg_fh = None
+            self._idx_fh = None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ledger storage maintenance")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = subcommands.add_parser("rebuild-stats", help="Recompute materialized stats from the events")
+    engine = rebuild.add_mutually_exclusive_group()
+    engine.add_argument("--db", default=os.getenv("LEDGER_DB_PATH", "./data/ledger.db"),
+                        help="SQLite database path")
+    engine.add_argument("--segments", help="SegmentStorage directory")
+
+    args = parser.parse_args()
+    storage = SegmentStorage(args.segments) if args.segments else SQLiteStorage(args.db)
+    try:
+        print(json.dumps(storage.rebuild_stats(), indent=2))
+    finally:
+        storage.close()
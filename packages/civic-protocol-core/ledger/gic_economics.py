@@ -6,14 +6,30 @@ This module implements the economic model for the Civic Protocol, including
 GIC issuance, staking, burning, and reward distribution mechanisms.
 """
 
+import bisect
 import hashlib
+import heapq
 import time
-from typing import Dict, List, Optional, Any, Tuple
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from enum import Enum
 import math
 
+try:
+    from .gic_journal import GICJournal
+except ImportError:  # running as a script
+    from gic_journal import GICJournal
+
+# Activity scores lose 1% per epoch
+ACTIVITY_DECAY = 0.99
+
+def governance_power(staked_amount: float, activity_score: float) -> float:
+    """Stake (in GIC units) plus an activity bonus capped at half the stake"""
+    activity_bonus = min(activity_score * 100, staked_amount * 0.5)
+    return staked_amount + activity_bonus
+
 class TransactionType(Enum):
     """Types of GIC transactions"""
     TRANSFER = "transfer"
@@ -37,6 +53,7 @@ class GICAccount:
     last_updated: int
     activity_score: float  # For reward calculations
     governance_power: float  # Voting power
+    decay_mark: int = 0  # epochs_processed when activity_score was last decayed
 
 @dataclass
 class GICTransaction:
@@ -75,6 +92,7 @@ class StakingInfo:
     unstake_epoch: Optional[int]
     rewards_earned: int
     last_claim_epoch: int
+    reward_mark: int = 0  # epochs_processed when staking rewards were last credited
 
 @dataclass
 class VestingSchedule:
@@ -89,19 +107,25 @@ class VestingSchedule:
 class GICEconomics:
     """GIC economic system implementation"""
     
-    def __init__(self, genesis_supply: int = 1000000 * 10**18):
+    def __init__(self, genesis_supply: int = 1000000 * 10**18,
+                 journal: Optional[GICJournal] = None, recent_window: int = 1000):
         """
         Initialize GIC economics
         
         Args:
             genesis_supply: Initial GIC supply in smallest units
+            journal: Where every transaction and reward event is logged
+                (default: a temporary file dropped on close); pass a
+                GICJournal with a path to keep history across restarts
+            recent_window: Latest transactions and reward events kept in memory
         """
         self.genesis_supply = genesis_supply
         self.total_supply = genesis_supply
         self.circulating_supply = genesis_supply
         self.accounts: Dict[str, GICAccount] = {}
-        self.transactions: List[GICTransaction] = []
-        self.reward_events: List[RewardEvent] = []
+        self.journal = journal if journal is not None else GICJournal()
+        self.transactions: Deque[GICTransaction] = deque(maxlen=recent_window)
+        self.reward_events: Deque[RewardEvent] = deque(maxlen=recent_window)
         self.staking_info: Dict[str, StakingInfo] = {}
         self.vesting_schedules: Dict[str, VestingSchedule] = {}
         
@@ -112,6 +136,17 @@ class GICEconomics:
         self.epoch_duration = 300  # 5 minutes in seconds
         self.current_epoch = 0
         
+        # Lazy epoch accounting: process_epoch only advances these, and each
+        # account catches up (rewards credited, activity decayed) when touched.
+        # Staking rewards per staked unit, as runs of epochs at one rate:
+        # _rates[i] applies from epoch index _rate_starts[i] to the next start
+        self.epochs_processed = 0
+        self._rate_starts: List[int] = []
+        self._rates: List[float] = []
+        self.total_staked = 0
+        self.staker_count = 0
+        self._unstake_queue: List[Tuple[int, str]] = []  # (unstake_epoch, address) heap
+        
         # Reward pools
         self.reflection_reward_pool = 0
         self.attestation_reward_pool = 0
@@ -180,12 +215,34 @@ class GICEconomics:
             unstake_epoch=None,
             last_updated=int(time.time()),
             activity_score=0.0,
-            governance_power=0.0
+            governance_power=0.0,
+            decay_mark=self.epochs_processed
         )
         
         self.accounts[address] = account
         return account
     
+    def get_account(self, address: str) -> Optional[GICAccount]:
+        """
+        Account with pending staking rewards credited and activity decayed
+        
+        Entries in ``accounts`` are only brought up to date when touched;
+        read through this (or settle_all_accounts) for current figures.
+        """
+        if address not in self.accounts:
+            return None
+        return self._settle(address)
+    
+    def settle_all_accounts(self) -> List[RewardEvent]:
+        """Bring every account up to date (O(accounts)); returns the staking rewards credited"""
+        events = []
+        for address in self.accounts:
+            event = self._settle_rewards(address)
+            if event is not None:
+                events.append(event)
+            self._settle_activity(self.accounts[address])
+        return events
+    
     def transfer(self, from_addr: str, to_addr: str, amount: int, 
                 memo: Optional[str] = None) -> GICTransaction:
         """Transfer GIC between accounts"""
@@ -196,8 +253,7 @@ class GICEconomics:
         if to_addr not in self.accounts:
             self.create_account(to_addr)
         
-        from_account = self.accounts[from_addr]
-        to_account = self.accounts[to_addr]
+        from_account = self._settle(from_addr)
         
         # Check balance
         if from_account.balance < amount:
@@ -257,7 +313,7 @@ class GICEconomics:
         if address not in self.accounts:
             raise Exception(f"Account {address} does not exist")
         
-        account = self.accounts[address]
+        account = self._settle(address)
         
         if account.balance < amount:
             raise Exception(f"Insufficient balance: {account.balance} < {amount}")
@@ -318,7 +374,7 @@ class GICEconomics:
         if from_addr not in self.accounts:
             raise Exception(f"Account {from_addr} does not exist")
         
-        account = self.accounts[from_addr]
+        account = self._settle(from_addr)
         
         if account.balance < amount:
             raise Exception(f"Insufficient balance: {account.balance} < {amount}")
@@ -347,7 +403,7 @@ class GICEconomics:
         """Airdrop GIC to multiple recipients"""
         total_amount = len(recipients) * amount_per_recipient
         
-        if self.accounts["treasury"].balance < total_amount:
+        if self._settle("treasury").balance < total_amount:
             raise Exception(f"Insufficient treasury balance: {self.accounts['treasury'].balance} < {total_amount}")
         
         transactions = []
@@ -379,58 +435,50 @@ class GICEconomics:
         if address not in self.accounts:
             return 0.0
         
-        account = self.accounts[address]
-        
-        # Base power from staked amount
-        staked_power = account.staked / 10**18  # Convert to GIC units
+        account = self._settle(address)
         
-        # Activity bonus (up to 50% of staked power)
-        activity_bonus = min(account.activity_score * 100, staked_power * 0.5)
+        # Quadratic scaling of stake (in GIC units) plus activity bonus
+        power = math.sqrt(governance_power(account.staked / 10**18, account.activity_score))
         
-        # Quadratic scaling for governance power
-        total_power = staked_power + activity_bonus
-        governance_power = math.sqrt(total_power)
+        account.governance_power = power
+        return power
+    
+    def iter_stakers(self) -> Iterator[GICAccount]:
+        """
+        Accounts with stake, activity decayed to the current epoch
         
-        account.governance_power = governance_power
-        return governance_power
+        Pending staking rewards are left unsettled (they go to balance, not
+        stake), so walking every staker journals nothing.
+        """
+        for address in self.staking_info:
+            account = self.accounts[address]
+            if account.staked:
+                yield self._settle_activity(account)
     
     def distribute_staking_rewards(self, epoch: int) -> List[RewardEvent]:
-        """Distribute staking rewards for the epoch"""
-        if self.staking_reward_pool <= 0:
-            return []
-        
-        # Calculate total staked amount
-        total_staked = sum(info.staked_amount for info in self.staking_info.values())
-        
-        if total_staked == 0:
-            return []
-        
-        # Calculate rewards per staked GIC
-        rewards_per_gic = self.staking_reward_pool / total_staked
+        """
+        Credit every staker's accrued staking rewards now (O(stakers))
         
+        process_epoch no longer calls this: each epoch's rate is logged
+        and rewards are credited when an account is touched. Crediting
+        eagerly gives the same amounts to the wei.
+        """
         reward_events = []
-        
-        for address, staking in self.staking_info.items():
-            if staking.staked_amount > 0:
-                reward_amount = int(staking.staked_amount * rewards_per_gic)
-                
-                if reward_amount > 0:
-                    event = RewardEvent(
-                        event_id=f"staking_reward_{epoch}_{address}",
-                        recipient=address,
-                        amount=reward_amount,
-                        reason="staking_reward",
-                        cycle_id=f"epoch_{epoch}",
-                        multiplier=1.0,
-                        timestamp=int(time.time()),
-                        block_height=0
-                    )
-                    
-                    self._apply_reward(event)
-                    reward_events.append(event)
-        
+        for address in self.staking_info:
+            event = self._settle_rewards(address)
+            if event is not None:
+                reward_events.append(event)
         return reward_events
     
+    def _accrue_staking_rewards(self):
+        """Log this epoch's staking reward per staked unit, in O(1)"""
+        rate = 0.0
+        if self.staking_reward_pool > 0 and self.total_staked > 0:
+            rate = self.staking_reward_pool / self.total_staked
+        if not self._rates or self._rates[-1] != rate:
+            self._rate_starts.append(self.epochs_processed)
+            self._rates.append(rate)
+    
     def process_epoch(self, epoch: int) -> Dict[str, Any]:
         """Process a new epoch (inflation, rewards, etc.)"""
         self.current_epoch = epoch
@@ -443,27 +491,28 @@ class GICEconomics:
         self.total_supply += inflation_amount
         self.circulating_supply += inflation_amount
         
-        # Distribute staking rewards
-        staking_rewards = self.distribute_staking_rewards(epoch)
+        # Accrue staking rewards (credited lazily)
+        stakers = self.staker_count if self.total_staked else 0
+        self._accrue_staking_rewards()
         
         # Process unstaking
         self._process_unstaking(epoch)
         
-        # Update activity scores (decay)
-        self._decay_activity_scores()
+        # Decay activity scores (applied lazily)
+        self.epochs_processed += 1
         
         return {
             "epoch": epoch,
             "inflation_amount": inflation_amount,
-            "staking_rewards": len(staking_rewards),
+            "staking_rewards": stakers,
             "total_supply": self.total_supply,
             "circulating_supply": self.circulating_supply
         }
     
     def _apply_transfer(self, tx: GICTransaction):
         """Apply a transfer transaction"""
-        from_account = self.accounts[tx.from_addr]
-        to_account = self.accounts[tx.to_addr]
+        from_account = self._settle(tx.from_addr)
+        to_account = self._settle(tx.to_addr)
         
         # Deduct from sender
         from_account.balance -= tx.amount + tx.gas_fee
@@ -479,20 +528,20 @@ class GICEconomics:
         from_account.last_updated = tx.timestamp
         to_account.last_updated = tx.timestamp
         
-        self.transactions.append(tx)
+        self._record_transaction(tx)
     
     def _apply_reward(self, event: RewardEvent):
         """Apply a reward event"""
-        account = self.accounts[event.recipient]
+        account = self._settle(event.recipient)
         account.balance += event.amount
         account.activity_score += 1.0
         account.last_updated = event.timestamp
         
-        self.reward_events.append(event)
+        self._record_reward(event)
     
     def _apply_stake(self, tx: GICTransaction):
         """Apply a staking transaction"""
-        account = self.accounts[tx.from_addr]
+        account = self._settle(tx.from_addr)
         
         # Move from balance to staked
         account.balance -= tx.amount
@@ -503,23 +552,25 @@ class GICEconomics:
         # Update staking info
         if tx.from_addr in self.staking_info:
             staking = self.staking_info[tx.from_addr]
-            staking.staked_amount += tx.amount
+            self._add_stake(staking, tx.amount)
         else:
-            self.staking_info[tx.from_addr] = StakingInfo(
+            staking = self.staking_info[tx.from_addr] = StakingInfo(
                 address=tx.from_addr,
-                staked_amount=tx.amount,
+                staked_amount=0,
                 stake_epoch=self.current_epoch,
                 unstaking_amount=0,
                 unstake_epoch=None,
                 rewards_earned=0,
-                last_claim_epoch=self.current_epoch
+                last_claim_epoch=self.current_epoch,
+                reward_mark=self.epochs_processed
             )
+            self._add_stake(staking, tx.amount)
         
-        self.transactions.append(tx)
+        self._record_transaction(tx)
     
     def _apply_unstake(self, tx: GICTransaction):
         """Apply an unstaking transaction"""
-        account = self.accounts[tx.from_addr]
+        account = self._settle(tx.from_addr)
         staking = self.staking_info[tx.from_addr]
         
         # Move from staked to unstaking
@@ -532,15 +583,16 @@ class GICEconomics:
         unstake_epoch = self.current_epoch + (7 * 24 * 60 * 60 // self.epoch_duration)
         account.unstake_epoch = unstake_epoch
         
-        staking.staked_amount -= tx.amount
+        self._add_stake(staking, -tx.amount)
         staking.unstaking_amount += tx.amount
         staking.unstake_epoch = unstake_epoch
+        heapq.heappush(self._unstake_queue, (unstake_epoch, tx.from_addr))
         
-        self.transactions.append(tx)
+        self._record_transaction(tx)
     
     def _apply_burn(self, tx: GICTransaction):
         """Apply a burn transaction"""
-        account = self.accounts[tx.from_addr]
+        account = self._settle(tx.from_addr)
         
         # Remove from balance
         account.balance -= tx.amount
@@ -551,28 +603,134 @@ class GICEconomics:
         self.total_supply -= tx.amount
         self.circulating_supply -= tx.amount
         
+        self._record_transaction(tx)
+    
+    def get_history(self, address: str, limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Transactions and reward events touching an address, newest first
+        
+        Returns {"entries": [...], "next_cursor": ...}; pass next_cursor back
+        for the following page.
+        """
+        return self.journal.page_address(address, limit, cursor)
+    
+    def get_epoch_history(self, epoch: int, limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Transactions and reward events applied during an epoch, newest first"""
+        return self.journal.page_epoch(epoch, limit, cursor)
+    
+    def close(self):
+        """Flush and close the journal"""
+        self.journal.close()
+    
+    def _record_transaction(self, tx: GICTransaction):
         self.transactions.append(tx)
+        data = dict(vars(tx), tx_type=tx.tx_type.value)  # flat record; asdict's deep copy is the hot cost
+        self.journal.append("transaction", tx.tx_id, self.current_epoch, data, (tx.from_addr, tx.to_addr))
+    
+    def _record_reward(self, event: RewardEvent):
+        self.reward_events.append(event)
+        self.journal.append("reward", event.event_id, self.current_epoch, dict(vars(event)), (event.recipient,))
     
     def _process_unstaking(self, epoch: int):
-        """Process completed unstaking"""
-        for address, account in self.accounts.items():
-            if account.unstake_epoch and epoch >= account.unstake_epoch:
-                # Complete unstaking
-                account.balance += account.unstaking
-                account.unstaking = 0
-                account.unstake_epoch = None
-                
-                # Update staking info
-                if address in self.staking_info:
-                    staking = self.staking_info[address]
-                    staking.unstaking_amount = 0
-                    staking.unstake_epoch = None
-    
-    def _decay_activity_scores(self):
-        """Apply decay to activity scores"""
-        decay_factor = 0.99  # 1% decay per epoch
-        for account in self.accounts.values():
-            account.activity_score *= decay_factor
+        """Process completed unstaking (only accounts that are due)"""
+        while self._unstake_queue and self._unstake_queue[0][0] <= epoch:
+            unstake_epoch, address = heapq.heappop(self._unstake_queue)
+            account = self.accounts[address]
+            if account.unstake_epoch != unstake_epoch:
+                continue  # Superseded by a later unstake, or already completed
+            
+            # Complete unstaking
+            account.balance += account.unstaking
+            account.unstaking = 0
+            account.unstake_epoch = None
+            
+            # Update staking info
+            if address in self.staking_info:
+                staking = self.staking_info[address]
+                staking.unstaking_amount = 0
+                staking.unstake_epoch = None
+    
+    def _add_stake(self, staking: StakingInfo, amount: int):
+        """Change a stake (the account must be settled first)"""
+        if staking.staked_amount == 0 and amount > 0:
+            self.staker_count += 1
+        staking.staked_amount += amount
+        if staking.staked_amount == 0 and amount < 0:
+            self.staker_count -= 1
+        self.total_staked += amount
+    
+    def _settle(self, address: str) -> GICAccount:
+        """Credit an account's pending staking rewards and decay its activity score"""
+        self._settle_rewards(address)
+        return self._settle_activity(self.accounts[address])
+    
+    def _rate_runs(self, start: int) -> Iterator[Tuple[int, float]]:
+        """(epochs, rate) for each run of epochs at one rate since epoch index ``start``"""
+        end = self.epochs_processed
+        i = max(0, bisect.bisect_right(self._rate_starts, start) - 1)
+        while start < end:
+            stop = self._rate_starts[i + 1] if i + 1 < len(self._rates) else end
+            yield stop - start, self._rates[i]
+            start = stop
+            i += 1
+    
+    def _settle_rewards(self, address: str) -> Optional[RewardEvent]:
+        staking = self.staking_info.get(address)
+        if staking is None:
+            return None
+        start, staking.reward_mark = staking.reward_mark, self.epochs_processed
+        if staking.staked_amount == 0:
+            return None
+        # Each epoch credits int(stake * pool / total_staked), as a per-epoch
+        # pass over every staker would
+        reward_amount = sum(epochs * int(staking.staked_amount * rate)
+                            for epochs, rate in self._rate_runs(start))
+        if reward_amount <= 0:
+            return None
+        staking.rewards_earned += reward_amount
+        staking.last_claim_epoch = self.current_epoch
+        
+        event = RewardEvent(
+            event_id=f"staking_reward_{self.current_epoch}_{address}",
+            recipient=address,
+            amount=reward_amount,
+            reason="staking_reward",
+            cycle_id=f"epoch_{self.current_epoch}",
+            multiplier=1.0,
+            timestamp=int(time.time()),
+            block_height=0
+        )
+        account = self.accounts[address]
+        account.balance += reward_amount
+        account.last_updated = event.timestamp
+        self._record_reward(event)
+        return event
+    
+    def _settle_activity(self, account: GICAccount) -> GICAccount:
+        """
+        Decay an activity score to the current epoch
+        
+        Every epoch in which a staker is credited a reward adds 1.0 before
+        that epoch's decay, so a run of n such epochs turns a score s into
+        s * d**n + d * (1 - d**n) / (1 - d).
+        """
+        start = account.decay_mark
+        if start == self.epochs_processed:
+            return account
+        staking = self.staking_info.get(account.address)
+        staked = staking.staked_amount if staking is not None else 0
+        if staked:
+            score = account.activity_score
+            for epochs, rate in self._rate_runs(start):
+                decay = ACTIVITY_DECAY ** epochs
+                score *= decay
+                if int(staked * rate) > 0:
+                    score += ACTIVITY_DECAY * (1 - decay) / (1 - ACTIVITY_DECAY)
+            account.activity_score = score
+        else:
+            account.activity_score *= ACTIVITY_DECAY ** (self.epochs_processed - start)
+        account.decay_mark = self.epochs_processed
+        return account
 
 # Example usage
 if __name__ == "__main__":
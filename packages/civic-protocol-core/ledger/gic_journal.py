@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+GIC Journal - Append-only transaction and reward log for GICEconomics
+
+Every applied transaction and reward event is appended to a SQLite journal
+instead of being kept in memory. Entries get a monotonically increasing
+sequence number; an address index (one row per address an entry touches)
+and an epoch index make history queries keyset-paged seeks, so reading a
+page costs O(page) however long the log is.
+
+Appends are buffered and written ``batch_size`` at a time in one
+transaction; reads and close() flush first, so queries always see every
+entry appended so far.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS journal (
+        seq INTEGER PRIMARY KEY,
+        kind TEXT NOT NULL,
+        entry_id TEXT NOT NULL,
+        epoch INTEGER NOT NULL,
+        data TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS journal_addresses (
+        address TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        PRIMARY KEY (address, seq)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_journal_epoch ON journal (epoch, seq);
+"""
+
+
+class GICJournal:
+    """SQLite journal of GIC transactions and reward events"""
+
+    def __init__(self, db_path: str = "", batch_size: int = 256, synchronous: str = "NORMAL"):
+        """
+        Args:
+            db_path: SQLite file; "" (the default) is a private temporary file
+                removed on close, ":memory:" keeps the whole journal in RAM
+            batch_size: Entries buffered before a write
+            synchronous: SQLite synchronous pragma for file databases
+        """
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self._lock = threading.RLock()
+        self._pending: List[Tuple[int, str, str, int, str, Sequence[str]]] = []
+
+        persistent = db_path not in ("", ":memory:")
+        if persistent:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        if persistent:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        row = self._conn.execute("SELECT MAX(seq) FROM journal").fetchone()
+        self._next_seq = (row[0] or 0) + 1
+
+    def append(self, kind: str, entry_id: str, epoch: int, data: Dict[str, Any],
+               addresses: Sequence[Optional[str]]) -> int:
+        """Journal one entry under each of its (non-empty) addresses; returns its sequence number"""
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._pending.append((seq, kind, entry_id, epoch, json.dumps(data),
+                                  tuple(dict.fromkeys(a for a in addresses if a))))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+        return seq
+
+    def flush(self):
+        """Write buffered entries in one transaction"""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO journal (seq, kind, entry_id, epoch, data) VALUES (?, ?, ?, ?, ?)",
+                    [entry[:5] for entry in pending]
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO journal_addresses (address, seq) VALUES (?, ?)",
+                    [(address, entry[0]) for entry in pending for address in entry[5]]
+                )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._next_seq - 1
+
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str]) -> Optional[int]:
+        if cursor is None:
+            return None
+        try:
+            return int(cursor)
+        except ValueError:
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+
+    def _page(self, query: str, params: List[Any], limit: int) -> Dict[str, Any]:
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(query, params + [limit]).fetchall()
+        entries = [dict(json.loads(data), seq=seq, kind=kind, epoch=epoch)
+                   for seq, kind, epoch, data in rows]
+        return {
+            "entries": entries,
+            "next_cursor": str(rows[-1][0]) if rows and len(rows) == limit else None
+        }
+
+    def page_address(self, address: str, limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Entries touching an address, newest first"""
+        before = self._decode_cursor(cursor)
+        query = ("SELECT j.seq, j.kind, j.epoch, j.data FROM journal_addresses a "
+                 "JOIN journal j ON j.seq = a.seq WHERE a.address = ?")
+        params: List[Any] = [address]
+        if before is not None:
+            query += " AND a.seq < ?"
+            params.append(before)
+        return self._page(query + " ORDER BY a.seq DESC LIMIT ?", params, limit)
+
+    def page_epoch(self, epoch: int, limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Entries applied during an epoch, newest first"""
+        before = self._decode_cursor(cursor)
+        query = "SELECT seq, kind, epoch, data FROM journal WHERE epoch = ?"
+        params: List[Any] = [epoch]
+        if before is not None:
+            query += " AND seq < ?"
+            params.append(before)
+        return self._page(query + " ORDER BY seq DESC LIMIT ?", params, limit)
+
+    def query_plan(self, address: Optional[str] = None, epoch: Optional[int] = None) -> List[str]:
+        """SQLite plan of the history query, for checking it stays index-backed"""
+        if address is not None:
+            query = ("SELECT j.seq FROM journal_addresses a JOIN journal j ON j.seq = a.seq "
+                     "WHERE a.address = ? AND a.seq < ? ORDER BY a.seq DESC LIMIT ?")
+            params: List[Any] = [address, 0, 1]
+        else:
+            query = "SELECT seq FROM journal WHERE epoch = ? AND seq < ? ORDER BY seq DESC LIMIT ?"
+            params = [epoch, 0, 1]
+        with self._lock:
+            rows = self._conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+        return [row[-1] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._conn.close()
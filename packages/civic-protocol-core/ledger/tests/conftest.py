@@ -0,0 +1,6 @@
+# tests/conftest.py
+"""Put the ledger modules on sys.path for the tests."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
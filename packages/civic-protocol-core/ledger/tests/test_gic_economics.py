@@ -0,0 +1,156 @@
+# tests/test_gic_economics.py
+"""Lazy epoch accounting must match crediting every account every epoch."""
+import math
+import random
+
+import pytest
+
+from gic_economics import GICEconomics
+
+ADDRESSES = [f"citizen_{i}" for i in range(12)]
+GIC = 10**18
+
+
+class PerEpochEconomics(GICEconomics):
+    """
+    The original epoch loop, kept as the reference: every epoch each staker
+    is credited int(stake * pool / total_staked) with a +1.0 activity bump,
+    due unstakes complete, then every activity score decays by 0.99
+    """
+
+    def process_epoch(self, epoch):
+        self.current_epoch = epoch
+        inflation = int(self.circulating_supply * self.inflation_rate / (365 * 24 * 60 * 60 / self.epoch_duration))
+        self.accounts["treasury"].balance += inflation
+        self.total_supply += inflation
+        self.circulating_supply += inflation
+
+        total_staked = sum(info.staked_amount for info in self.staking_info.values())
+        if self.staking_reward_pool > 0 and total_staked:
+            rewards_per_gic = self.staking_reward_pool / total_staked
+            for address, staking in self.staking_info.items():
+                reward = int(staking.staked_amount * rewards_per_gic)
+                if staking.staked_amount > 0 and reward > 0:
+                    account = self.accounts[address]
+                    account.balance += reward
+                    account.activity_score += 1.0
+                    staking.rewards_earned += reward
+
+        for address, account in self.accounts.items():
+            if account.unstake_epoch and epoch >= account.unstake_epoch:
+                account.balance += account.unstaking
+                account.unstaking = 0
+                account.unstake_epoch = None
+                self.staking_info[address].unstaking_amount = 0
+                self.staking_info[address].unstake_epoch = None
+
+        for account in self.accounts.values():
+            account.activity_score *= 0.99
+
+    # Nothing is ever pending
+    def _settle_rewards(self, address):
+        return None
+
+    def _settle_activity(self, account):
+        return account
+
+
+def make_pair():
+    eager, lazy = PerEpochEconomics(), GICEconomics()
+    for i, address in enumerate(ADDRESSES):
+        eager.create_account(address, (i + 1) * 1000 * GIC)
+        lazy.create_account(address, (i + 1) * 1000 * GIC)
+    return eager, lazy
+
+
+def assert_same(eager, lazy):
+    for address in eager.accounts:
+        a, b = eager.get_account(address), lazy.get_account(address)
+        assert (a.balance, a.staked, a.unstaking, a.unstake_epoch, a.nonce) == \
+            (b.balance, b.staked, b.unstaking, b.unstake_epoch, b.nonce), address
+        assert math.isclose(a.activity_score, b.activity_score, rel_tol=1e-9, abs_tol=1e-12), address
+    for address, staking in eager.staking_info.items():
+        assert staking.rewards_earned == lazy.staking_info[address].rewards_earned, address
+    assert eager.total_supply == lazy.total_supply
+
+
+def random_op(rng, eager, lazy):
+    address = rng.choice(ADDRESSES)
+    balance = eager.get_account(address).balance
+    kind = rng.random()
+    if kind < 0.3 and balance > 0:
+        amount = rng.randint(1, balance // 2 + 1)
+        for gic in (eager, lazy):
+            gic.stake(address, amount)
+    elif kind < 0.45 and address in eager.staking_info and eager.staking_info[address].staked_amount:
+        amount = rng.randint(1, eager.staking_info[address].staked_amount)
+        for gic in (eager, lazy):
+            gic.unstake(address, amount)
+    elif kind < 0.7 and balance > 1000:
+        amount = rng.randint(1, balance // 3)
+        to_addr = rng.choice(ADDRESSES + ["newcomer"])
+        for gic in (eager, lazy):
+            gic.transfer(address, to_addr, amount)
+    elif kind < 0.9:
+        amount, multiplier = rng.randint(1, 50) * GIC, rng.choice([1.0, 1.5])
+        for gic in (eager, lazy):
+            gic.earn_reward(address, amount, "reflection", "cycle_001", multiplier)
+    elif balance > 0:
+        amount = rng.randint(1, balance // 10 + 1)
+        for gic in (eager, lazy):
+            gic.burn(address, amount)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_lazy_accounting_matches_eager(seed):
+    rng = random.Random(seed)
+    eager, lazy = make_pair()
+    epoch = 0
+    for _ in range(300):
+        if rng.random() < 0.3:
+            # Sometimes jump far enough for unstaking to complete
+            epoch += rng.choice([1, 1, 1, 2, 2100])
+            eager.process_epoch(epoch)
+            lazy.process_epoch(epoch)
+        else:
+            random_op(rng, eager, lazy)
+    assert_same(eager, lazy)
+
+
+def test_epoch_processing_does_not_visit_accounts():
+    gic = GICEconomics()
+    for i in range(1000):
+        address = f"staker_{i}"
+        gic.create_account(address, 100 * GIC)
+        gic.stake(address, 50 * GIC)
+    events_before = len(gic.reward_events)
+    balance_before = gic.accounts["staker_7"].balance
+
+    for epoch in range(1, 11):
+        result = gic.process_epoch(epoch)
+    assert result["staking_rewards"] == 1000
+    assert len(gic.reward_events) == events_before
+    assert gic.accounts["staker_7"].balance == balance_before
+
+    # Ten epochs of rewards arrive in one credit when the account is read
+    account = gic.get_account("staker_7")
+    expected = 10 * int(50 * GIC * (gic.staking_reward_pool / gic.total_staked))
+    assert account.balance == balance_before + expected
+    assert len(gic.reward_events) == events_before + 1
+    # Each rewarded epoch bumped activity by 1.0 before decaying it
+    assert math.isclose(account.activity_score, sum(0.99 ** k for k in range(1, 11)))
+
+
+def test_unstaking_completes_at_its_epoch():
+    gic = GICEconomics()
+    gic.create_account("alice", 100 * GIC)
+    gic.stake("alice", 60 * GIC)
+    gic.unstake("alice", 20 * GIC)
+    due = gic.accounts["alice"].unstake_epoch
+
+    gic.process_epoch(due - 1)
+    assert gic.get_account("alice").unstaking == 20 * GIC
+    gic.process_epoch(due)
+    account = gic.get_account("alice")
+    assert account.unstaking == 0 and account.unstake_epoch is None
+    assert account.staked == 40 * GIC
@@ -0,0 +1,88 @@
+# tests/test_gic_journal.py
+"""GICEconomics history comes from the journal, paged through its indexes."""
+import pytest
+
+from gic_economics import GICEconomics
+from gic_journal import GICJournal
+
+GIC = 10**18
+
+
+@pytest.fixture
+def gic(tmp_path):
+    g = GICEconomics(journal=GICJournal(str(tmp_path / "journal.db"), batch_size=16), recent_window=10)
+    yield g
+    g.close()
+
+
+def run_epochs(gic, epochs=5, per_epoch=30):
+    for name in ("alice", "bob", "carol"):
+        gic.create_account(name, 10_000 * GIC)
+    for epoch in range(1, epochs + 1):
+        for i in range(per_epoch):
+            gic.transfer(("alice", "bob", "carol")[i % 3], ("bob", "carol", "alice")[i % 3], GIC)
+        gic.earn_reward("alice", GIC, "reflection", f"cycle_{epoch}")
+        gic.process_epoch(epoch)
+
+
+def collect(page_fn, limit):
+    entries, cursor = [], None
+    while True:
+        page = page_fn(limit=limit, cursor=cursor)
+        entries.extend(page["entries"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return entries
+
+
+def test_address_history_pages_newest_first(gic):
+    run_epochs(gic)
+    entries = collect(lambda **kw: gic.get_history("alice", **kw), limit=7)
+
+    assert [e["seq"] for e in entries] == sorted((e["seq"] for e in entries), reverse=True)
+    transfers = [e for e in entries if e["kind"] == "transaction"]
+    rewards = [e for e in entries if e["kind"] == "reward"]
+    assert len(transfers) == 5 * 20  # alice sends or receives two of every three transfers
+    assert len(rewards) == 5
+    assert all("alice" in (e["from_addr"], e["to_addr"]) for e in transfers)
+    assert transfers[0]["tx_type"] == "transfer"
+
+
+def test_epoch_history(gic):
+    run_epochs(gic)
+    # process_epoch(n) runs after epoch n's entries, so they carry epoch n - 1
+    entries = collect(lambda **kw: gic.get_epoch_history(2, **kw), limit=8)
+    assert len(entries) == 31
+    assert {e["epoch"] for e in entries} == {2}
+
+
+def test_memory_keeps_only_recent_window(gic):
+    run_epochs(gic)
+    assert len(gic.transactions) == 10
+    assert len(gic.journal) == 5 * 31
+    newest = [e for e in gic.get_history("alice", limit=5)["entries"] if e["kind"] == "transaction"][0]
+    assert newest["from_addr"] == gic.transactions[-1].from_addr == "carol"
+    assert newest["to_addr"] == gic.transactions[-1].to_addr == "alice"
+
+
+def test_journal_survives_reopen(tmp_path):
+    path = str(tmp_path / "journal.db")
+    gic = GICEconomics(journal=GICJournal(path))
+    run_epochs(gic, epochs=2)
+    gic.close()
+
+    journal = GICJournal(path)
+    assert len(journal) == 2 * 31
+    assert len(journal.page_address("bob", limit=1000)["entries"]) == 2 * 20
+    journal.close()
+
+
+def test_history_queries_are_index_backed(gic):
+    for plan in (gic.journal.query_plan(address="alice"), gic.journal.query_plan(epoch=3)):
+        assert not any("USE TEMP B-TREE" in step for step in plan), plan
+        assert not any(step.startswith("SCAN") and "INDEX" not in step for step in plan), plan
+
+
+def test_invalid_cursor(gic):
+    with pytest.raises(ValueError):
+        gic.get_history("alice", cursor="not-a-cursor")
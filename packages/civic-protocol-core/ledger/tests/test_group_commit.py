@@ -0,0 +1,143 @@
+# tests/test_group_commit.py
+"""Group-committed attestations must extend one chain, whoever writes them, and stop() strands none."""
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from app.group_commit import _STOP, GroupCommitWriter
+from app.ledger import LedgerCore
+from app.storage import SQLiteStorage
+
+
+def test_writers_sharing_a_database_do_not_fork(tmp_path):
+    # Two ledgers on one file stand in for two uvicorn worker processes
+    db_path = str(tmp_path / "ledger.db")
+    ledgers = [LedgerCore(storage=SQLiteStorage(db_path)) for _ in range(2)]
+    writers = [GroupCommitWriter(ledger, max_batch=8, max_delay_ms=1.0) for ledger in ledgers]
+    for writer in writers:
+        writer.start()
+
+    def attest(worker, writer):
+        futures = [
+            writer.submit("reflection_created", f"civic_w{worker}_{i}", "lab4", {"worker": worker, "n": i})
+            for i in range(200)
+        ]
+        for future in futures:
+            future.result(30)
+
+    threads = [threading.Thread(target=attest, args=(i, writer)) for i, writer in enumerate(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for writer in writers:
+        writer.stop()
+
+    check = LedgerCore(storage=SQLiteStorage(db_path))
+    events = list(check.storage.iter_events())
+    assert len(events) == 400
+    assert len({e["previous_hash"] for e in events}) == 400
+    for previous, event in zip(events, events[1:]):
+        assert event["previous_hash"] == previous["event_hash"]
+    assert check.verify_chain(full=True).valid
+    assert ledgers[0]._get_latest_event_hash() == ledgers[1]._get_latest_event_hash() == events[-1]["event_hash"]
+
+    for ledger in ledgers + [check]:
+        ledger.close()
+
+
+def slow_writer(tmp_path, delay):
+    ledger = LedgerCore(storage=SQLiteStorage(str(tmp_path / "ledger.db")))
+    append_chained = ledger.storage.append_chained
+
+    def slow_append(build):
+        time.sleep(delay)
+        return append_chained(build)
+
+    ledger.storage.append_chained = slow_append
+    return ledger, GroupCommitWriter(ledger, max_batch=4, max_delay_ms=1.0)
+
+
+def test_submit_is_refused_once_stop_begins(tmp_path):
+    ledger, writer = slow_writer(tmp_path, 0.2)
+    writer.start()
+    queued = [writer.submit("reflection_created", f"civic_{i}", "lab4", {"n": i}) for i in range(6)]
+
+    stopper = threading.Thread(target=writer.stop)
+    stopper.start()
+    while not writer._stopping:
+        time.sleep(0.001)
+    assert writer._thread is not None  # still joining the writer
+    with pytest.raises(RuntimeError, match="not running"):
+        writer.attest("reflection_created", "civic_late", "lab4", {"n": "late"}, timeout=1.0)
+    stopper.join()
+
+    # Everything accepted before stop() was committed
+    assert [future.result(0).civic_id for future in queued] == [f"civic_{i}" for i in range(6)]
+    assert writer._thread is None and ledger.get_chain_info()["chain_length"] == 6
+    ledger.close()
+
+
+def test_stop_that_times_out_keeps_the_writer(tmp_path):
+    ledger, writer = slow_writer(tmp_path, 0.3)
+    writer.start()
+    future = writer.submit("reflection_created", "civic_0", "lab4", {"n": 0})
+    time.sleep(0.05)  # let the writer pick it up
+
+    writer.stop(timeout=0.01)
+    assert writer._thread is not None and writer._thread.is_alive()
+    with pytest.raises(RuntimeError):
+        writer.submit("reflection_created", "civic_1", "lab4", {"n": 1})
+
+    writer.stop()
+    assert writer._thread is None and future.result(0).civic_id == "civic_0"
+    writer.start()
+    assert writer.attest("reflection_created", "civic_2", "lab4", {"n": 2}, timeout=5.0).civic_id == "civic_2"
+    writer.stop()
+    ledger.close()
+
+
+def test_items_behind_stop_are_still_committed(tmp_path):
+    ledger = LedgerCore(storage=SQLiteStorage(str(tmp_path / "ledger.db")))
+    writer = GroupCommitWriter(ledger, max_batch=2)
+    # The order a submit racing the old stop() could produce
+    writer._queue.put(_STOP)
+    stragglers = [Future() for _ in range(5)]
+    for i, future in enumerate(stragglers):
+        writer._queue.put((("reflection_created", f"civic_{i}", "lab4", {"n": i}, None), future))
+    writer.start()
+    writer.stop()
+    assert [future.result(1).civic_id for future in stragglers] == [f"civic_{i}" for i in range(5)]
+    assert ledger.verify_chain(full=True).valid
+    ledger.close()
+
+
+def test_concurrent_submits_during_stop_never_hang(tmp_path):
+    ledger, writer = slow_writer(tmp_path, 0.01)
+    writer.start()
+    accepted, refused = [], []
+
+    def hammer(worker):
+        for i in range(10_000):
+            try:
+                accepted.append(writer.submit("reflection_created", f"civic_{worker}_{i}", "lab4", {"n": i}))
+            except RuntimeError:
+                refused.append(i)
+                return
+            time.sleep(0.001)
+
+    threads = [threading.Thread(target=hammer, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.02)
+    writer.stop()
+    for thread in threads:
+        thread.join()
+
+    assert len(refused) == len(threads)  # every submitter ran into the stop
+    for future in accepted:
+        assert future.result(0) is not None
+    assert ledger.get_chain_info()["chain_length"] == len(accepted)
+    ledger.close()
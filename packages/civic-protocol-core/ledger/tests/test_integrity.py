@@ -0,0 +1,120 @@
+# tests/test_integrity.py
+"""Checkpoints only shortcut verification when signed with a configured secret; serial and pooled runs agree."""
+import json
+from dataclasses import asdict
+
+import pytest
+
+from app.integrity import ChainVerifier, hash_record
+from app.ledger import LedgerCore
+from app.storage import SQLiteStorage
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    core = LedgerCore(storage=SQLiteStorage(str(tmp_path / "ledger.db")))
+    for i in range(10):
+        assert core.add_event(core.create_event("reflection_created", f"civic_{i}", "lab4", {"n": i}))
+    yield core
+    core.close()
+
+
+def test_no_key_means_no_checkpoint(ledger, tmp_path, monkeypatch):
+    monkeypatch.delenv("LEDGER_CHECKPOINT_KEY", raising=False)
+    path = tmp_path / "checkpoint.json"
+    verifier = ChainVerifier(ledger.storage, checkpoint_path=str(path))
+    assert not verifier.checkpoints_enabled
+
+    assert verifier.verify().events_verified == 10
+    assert not path.exists()
+    assert verifier.verify().verified_from == 0
+
+
+def test_keyed_checkpoint_resumes(ledger, tmp_path, monkeypatch):
+    monkeypatch.setenv("LEDGER_CHECKPOINT_KEY", "test-secret")
+    verifier = ChainVerifier(ledger.storage, checkpoint_path=str(tmp_path / "checkpoint.json"))
+    assert verifier.verify().events_verified == 10
+
+    ledger.add_event(ledger.create_event("reflection_created", "civic_x", "lab4", {"n": 10}))
+    result = verifier.verify()
+    assert result.valid and result.verified_from == 10 and result.events_verified == 1
+
+
+def test_checkpoint_signed_with_another_key_is_ignored(ledger, tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    forger = ChainVerifier(ledger.storage, checkpoint_path=path, checkpoint_key=b"guessed")
+    forger.save_checkpoint(10, next(ledger.storage.iter_events(start=9))["event_hash"])
+
+    verifier = ChainVerifier(ledger.storage, checkpoint_path=path, checkpoint_key=b"real-secret")
+    assert verifier.load_checkpoint() is None
+    assert verifier.verify().verified_from == 0
+    # The full run replaced the forgery with a checkpoint under the real key
+    assert verifier.load_checkpoint().height == 10
+
+
+def tamper(storage, height, rehash=False, **fields):
+    """Rewrite the stored event at ``height``; with rehash its own hash is made consistent again"""
+    record = next(storage.iter_events(start=height - 1))
+    record.update(fields)
+    if rehash:
+        record["event_hash"] = hash_record(record)
+    with storage._connection() as conn:
+        conn.execute("UPDATE events SET payload = ?, previous_hash = ?, event_hash = ? WHERE rowid = ?",
+                     (json.dumps(record["payload"]), record["previous_hash"], record["event_hash"], height))
+
+
+@pytest.fixture
+def long_ledger(tmp_path):
+    core = LedgerCore(storage=SQLiteStorage(str(tmp_path / "long.db")))
+    for i in range(25):
+        assert core.add_event(core.create_event("reflection_created", f"civic_{i}", "lab4", {"n": i}))
+    yield core
+    core.close()
+
+
+def verify(storage, workers):
+    return ChainVerifier(storage, chunk_size=4).verify(workers=workers)
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3])
+def test_intact_chain_verifies_serially_and_pooled(long_ledger, workers):
+    result = verify(long_ledger.storage, workers)
+    assert result.valid and result.height == result.events_verified == 25
+    assert result.head_hash == next(long_ledger.storage.iter_events(start=24))["event_hash"]
+
+
+# With chunk_size=4, chunks hold heights 1-4, 5-8, ...; 4 and 5 sit either side of a boundary
+@pytest.mark.parametrize("height", [1, 4, 5, 11, 25])
+def test_tampered_payload_is_found_at_its_height(long_ledger, height):
+    tamper(long_ledger.storage, height, payload={"n": "forged"})
+    serial = verify(long_ledger.storage, 1)
+    assert not serial.valid
+    assert (serial.failed_height, serial.error) == (height, "event_hash mismatch")
+    assert serial.height == serial.events_verified == height - 1
+    for workers in (2, 3):
+        assert asdict(verify(long_ledger.storage, workers)) == asdict(serial)
+
+
+@pytest.mark.parametrize("height", [5, 9, 6, 2])
+def test_broken_link_is_found_at_its_height(long_ledger, height):
+    # The event hashes correctly on its own, so only the link to its predecessor is wrong;
+    # at heights 5 and 9 that link is checked when the chunks are stitched together
+    tamper(long_ledger.storage, height, rehash=True, previous_hash="ab" * 32)
+    serial = verify(long_ledger.storage, 1)
+    assert (serial.valid, serial.failed_height) == (False, height)
+    assert serial.error == "previous_hash does not match prior event"
+    assert serial.head_hash == next(long_ledger.storage.iter_events(start=height - 2))["event_hash"]
+    for workers in (2, 3):
+        assert asdict(verify(long_ledger.storage, workers)) == asdict(serial)
+
+
+def test_pooled_run_resumes_from_a_checkpoint(long_ledger, tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    verifier = ChainVerifier(long_ledger.storage, checkpoint_path=path, checkpoint_key=b"secret", chunk_size=4)
+    verifier.save_checkpoint(10, next(long_ledger.storage.iter_events(start=9))["event_hash"])
+    tamper(long_ledger.storage, 14, payload={"n": "forged"})
+
+    pooled = verifier.verify(workers=2)
+    assert (pooled.verified_from, pooled.failed_height, pooled.height) == (10, 14, 13)
+    assert asdict(pooled) == asdict(verifier.verify(workers=1))
+    assert verifier.load_checkpoint().height == 10
@@ -0,0 +1,69 @@
+# tests/test_query_plans.py
+"""Keep the event listing queries index-backed as the events table grows."""
+from itertools import combinations
+
+import pytest
+
+from app.storage import SQLiteStorage
+
+FILTERS = {"civic_id": "civic_001", "event_type": "reflection_created", "lab_source": "lab4"}
+
+
+def filter_combinations():
+    yield {}
+    for n in range(1, len(FILTERS) + 1):
+        for keys in combinations(FILTERS, n):
+            yield {k: FILTERS[k] for k in keys}
+
+
+@pytest.fixture
+def storage(tmp_path):
+    s = SQLiteStorage(str(tmp_path / "ledger.db"))
+    yield s
+    s.close()
+
+
+def assert_index_backed(plan):
+    for step in plan:
+        assert "USE TEMP B-TREE" not in step, f"listing needs a sort: {plan}"
+        if step.startswith("SCAN events"):
+            assert "USING INDEX" in step or "USING COVERING INDEX" in step, f"full table scan: {plan}"
+
+
+@pytest.mark.parametrize("filters", list(filter_combinations()))
+def test_keyset_page_is_index_backed(storage, filters):
+    assert_index_backed(storage.query_plan(paged=True, **filters))
+
+
+@pytest.mark.parametrize("filters", list(filter_combinations()))
+def test_offset_listing_is_index_backed(storage, filters):
+    assert_index_backed(storage.query_plan(paged=False, **filters))
+
+
+def test_single_filter_seeks_its_own_index(storage):
+    assert "idx_events_civic" in " ".join(storage.query_plan(civic_id="civic_001"))
+    assert "idx_events_type" in " ".join(storage.query_plan(event_type="reflection_created"))
+    assert "idx_events_lab" in " ".join(storage.query_plan(lab_source="lab4"))
+
+
+def test_cursor_pages_walk_every_event_once(storage):
+    from app.ledger import LedgerCore
+    ledger = LedgerCore(storage=storage)
+    events = []
+    for i in range(250):
+        event = ledger.create_event("reflection_created", f"civic_{i % 3:03d}", "lab4", {"i": i})
+        event.event_id = f"{event.event_id}_{i:04d}"
+        events.append(event)
+    assert ledger.add_events(events)
+
+    seen, cursor = [], None
+    while True:
+        page = ledger.get_events_page(civic_id="civic_001", limit=20, cursor=cursor)
+        seen.extend(e["event_id"] for e in page["events"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    expected = [e.event_id for e in events if e.civic_id == "civic_001"]
+    assert sorted(seen) == sorted(expected)
+    assert len(seen) == len(set(seen))
@@ -0,0 +1,129 @@
+# tests/test_segment_storage.py
+"""SegmentStorage recovers torn tails and lost indexes, reads across segments and syncs idle batches."""
+import os
+import time
+
+from app.ledger import LedgerCore
+from app.storage import SegmentStorage
+
+
+def open_ledger(directory, **options):
+    return LedgerCore(storage=SegmentStorage(str(directory), **options))
+
+
+def add_chained(ledger, count, offset=0):
+    events = []
+    for i in range(offset, offset + count):
+        event = ledger.create_event("reflection_created", f"civic_{i % 5}", ("lab4", "lab6")[i % 2], {"n": i})
+        event.event_id = f"{event.event_id}_{i}"
+        assert ledger.add_event(event)
+        events.append(event)
+    return events
+
+
+def hashes(storage, start=0):
+    return [record["event_hash"] for record in storage.iter_events(start=start)]
+
+
+def files(directory, suffix):
+    return sorted(name for name in os.listdir(directory) if name.endswith(suffix))
+
+
+def test_torn_tail_is_truncated_on_reopen(tmp_path):
+    ledger = open_ledger(tmp_path, fsync_every=1)
+    events = add_chained(ledger, 10)
+    ledger.close()
+
+    # Cut the last record off mid-payload, as a crash during the write would
+    segment = tmp_path / "00000000.seg"
+    size = segment.stat().st_size
+    with open(segment, "r+b") as f:
+        f.truncate(size - 7)
+
+    ledger = open_ledger(tmp_path, fsync_every=1)
+    storage = ledger.storage
+    assert hashes(storage) == [e.event_hash for e in events[:9]]
+    assert storage.get_chain_info()["latest_hash"] == events[8].event_hash
+    assert storage.get_stats()["total_events"] == 9
+    assert os.path.getsize(tmp_path / "00000000.idx") == 9 * SegmentStorage.INDEX_ENTRY.size
+    assert segment.stat().st_size < size - 7  # the partial record is gone, not just its tail
+
+    # The chain continues from the last intact record
+    again = add_chained(ledger, 2, offset=9)
+    assert again[0].previous_hash == events[8].event_hash
+    ledger.close()
+
+    # A header torn before its length is complete is dropped too
+    with open(segment, "ab") as f:
+        f.write(b"\x00\x00\x01")
+    reopened = SegmentStorage(str(tmp_path))
+    assert hashes(reopened) == [e.event_hash for e in events[:9] + again]
+    reopened.close()
+
+
+def test_reads_span_rolled_segments(tmp_path):
+    ledger = open_ledger(tmp_path, segment_max_bytes=1500)
+    events = add_chained(ledger, 30)
+    storage = ledger.storage
+    assert len(files(tmp_path, ".seg")) >= 4
+    expected = [e.event_hash for e in events]
+
+    assert hashes(storage) == expected
+    for start in (0, 1, 7, 13, 29, 30):
+        assert hashes(storage, start) == expected[start:]
+
+    # Keyset pages walk newest first across segment boundaries
+    paged, cursor = [], None
+    while True:
+        page = storage.page_events(limit=4, cursor=cursor)
+        paged.extend(record["event_hash"] for record in page["events"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert paged == expected[::-1]
+    assert [r["event_hash"] for r in storage.query_events(limit=5, offset=8)] == expected[::-1][8:13]
+    lab6 = [r["event_hash"] for r in storage.page_events(lab_source="lab6", limit=100)["events"]]
+    assert lab6 == expected[1::2][::-1]
+    ledger.close()
+
+    reopened = SegmentStorage(str(tmp_path), segment_max_bytes=1500)
+    assert hashes(reopened) == expected
+    assert reopened.get_chain_info()["chain_length"] == 30
+    reopened.close()
+
+
+def test_index_sidecars_are_rebuilt(tmp_path):
+    ledger = open_ledger(tmp_path, segment_max_bytes=1500)
+    expected = [e.event_hash for e in add_chained(ledger, 20)]
+    ledger.close()
+    indexes = files(tmp_path, ".idx")
+    sizes = {name: os.path.getsize(tmp_path / name) for name in indexes}
+
+    # A sealed segment loses its index and the active one lags behind its data
+    os.remove(tmp_path / indexes[1])
+    with open(tmp_path / indexes[-1], "r+b") as f:
+        f.truncate(sizes[indexes[-1]] - SegmentStorage.INDEX_ENTRY.size - 3)
+
+    reopened = SegmentStorage(str(tmp_path), segment_max_bytes=1500)
+    assert hashes(reopened) == expected
+    assert [r["event_hash"] for r in reopened.query_events(limit=100)] == expected[::-1]
+    assert {name: os.path.getsize(tmp_path / name) for name in indexes} == sizes
+    reopened.close()
+
+
+def test_idle_writer_is_synced_after_the_interval(tmp_path):
+    ledger = open_ledger(tmp_path, fsync_every=1000, fsync_interval=0.3)
+    storage = ledger.storage
+    add_chained(ledger, 3)
+    assert storage._unsynced > 0
+    deadline = time.monotonic() + 3.0
+    while storage._unsynced and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert storage._unsynced == 0 and storage._sync_timer is None
+
+    # Closing cancels a pending timer
+    add_chained(ledger, 1, offset=3)
+    timer = storage._sync_timer
+    ledger.close()
+    timer.join(1.0)
+    assert storage._sync_timer is None and not timer.is_alive()
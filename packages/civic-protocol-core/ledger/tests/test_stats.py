@@ -0,0 +1,76 @@
+# tests/test_stats.py
+"""Materialized ledger stats must agree with a rebuild from the events."""
+import pytest
+
+from app.ledger import LedgerCore
+from app.storage import SQLiteStorage, SegmentStorage
+
+
+@pytest.fixture(params=["sqlite", "segment"])
+def ledger(request, tmp_path):
+    if request.param == "sqlite":
+        storage = SQLiteStorage(str(tmp_path / "ledger.db"))
+    else:
+        storage = SegmentStorage(str(tmp_path / "segments"))
+    core = LedgerCore(storage=storage)
+    yield core
+    core.close()
+
+
+def add_batch(ledger, count, offset=0):
+    events = []
+    previous_hash = ledger._get_latest_event_hash()
+    for i in range(offset, offset + count):
+        event = ledger.create_event(
+            event_type=("reflection_created", "companion_created")[i % 2],
+            civic_id=f"civic_{i % 7:03d}",
+            lab_source=("lab4", "lab6", "lab7")[i % 3],
+            payload={"n": i}
+        )
+        event.event_id = f"{event.event_id}_{i}"
+        event.previous_hash = previous_hash
+        event.event_hash = ledger._calculate_event_hash(event)
+        previous_hash = event.event_hash
+        events.append(event)
+    assert ledger.add_events(events)
+    return events
+
+
+def test_empty_ledger_stats(ledger):
+    stats = ledger.get_ledger_stats()
+    assert stats["total_events"] == 0
+    assert stats["total_identities"] == 0
+    assert stats["latest_event"] is None
+    assert ledger.get_chain_info()["is_genesis"]
+
+
+def test_incremental_stats_match_rebuild(ledger):
+    first = add_batch(ledger, 5)
+    for i in range(5, 25, 4):
+        add_batch(ledger, 4, offset=i)
+
+    stats = ledger.get_ledger_stats()
+    chain = ledger.get_chain_info()
+    assert stats["total_events"] == 25
+    assert stats["total_identities"] == 7
+    assert sum(stats["events_by_lab"].values()) == 25
+    assert chain["genesis_hash"] == first[0].event_hash
+
+    assert ledger.rebuild_stats() == stats
+    assert ledger.get_chain_info() == chain
+
+
+def test_sqlite_backfills_stats_for_old_databases(tmp_path):
+    path = str(tmp_path / "ledger.db")
+    core = LedgerCore(storage=SQLiteStorage(path))
+    add_batch(core, 6)
+    expected = core.get_ledger_stats()
+    conn = core.storage._connection()
+    conn.execute("DROP TABLE stats_counts")
+    conn.execute("DROP TABLE stats_latest")
+    conn.commit()
+    core.close()
+
+    reopened = SQLiteStorage(path)
+    assert reopened.get_stats() == expected
+    reopened.close()
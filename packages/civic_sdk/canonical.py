@@ -0,0 +1,192 @@
+"""
+Canonical JSON encoding and hashing for signed / attested payloads
+
+Every service that signs, attests or seals a payload hashes its canonical
+JSON form (sorted keys, fixed separators). This module is the one
+implementation they share:
+
+- CanonicalEncoder pins the encoding options, so each caller keeps producing
+  exactly the bytes (and hashes) it always has: the compact unicode form is
+  the default, and legacy profiles (ASCII-escaped, spaced separators) are a
+  constructor argument away.
+- CanonicalEncoder.update() streams the encoding of a payload straight into
+  a hashlib object in ``chunk_size`` pieces instead of building the whole
+  string first: about half the speed of the one-shot sha256(), but memory
+  stays at the size of the largest member rather than the whole payload.
+- freeze() turns a payload into a read-only FrozenPayload that remembers its
+  canonical bytes and SHA-256 per encoder profile, so a payload that is
+  signed, verified and attested within one request is canonicalized once.
+  The cache is opt-in: plain dicts are encoded afresh every time.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, Iterator, Tuple
+
+__all__ = ["CanonicalEncoder", "FrozenPayload", "DEFAULT_ENCODER", "freeze", "canonical_json", "sha256_canonical"]
+
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError("FrozenPayload is read-only")
+
+
+class FrozenPayload(dict):
+    """
+    Read-only payload that caches its canonical encodings
+
+    A dict subclass, so it encodes, compares and reads like the dict it was
+    made from; nested dicts are FrozenPayloads and lists are tuples (both
+    encode identically). Build one with freeze().
+    """
+
+    __slots__ = ("_canonical",)
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._canonical: Dict[Tuple, Dict[str, Any]] = {}
+
+    def __reduce__(self):
+        return (FrozenPayload, (dict(self),))
+
+    def __copy__(self) -> "FrozenPayload":
+        return self
+
+    def __deepcopy__(self, memo) -> "FrozenPayload":
+        return self
+
+
+def freeze(obj: Any) -> Any:
+    """Read-only copy of a JSON payload whose canonical hash is computed at most once per profile"""
+    if isinstance(obj, FrozenPayload):
+        return obj
+    if isinstance(obj, dict):
+        return FrozenPayload((key, freeze(value)) for key, value in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(value) for value in obj)
+    return obj
+
+
+class CanonicalEncoder:
+    """Sorted-key JSON encoding with fixed options, as text, bytes, a chunk stream or a SHA-256"""
+
+    def __init__(self, ensure_ascii: bool = False, separators: Tuple[str, str] = (",", ":"),
+                 chunk_size: int = 64 * 1024, stream_depth: int = 2):
+        """
+        Args:
+            ensure_ascii: Escape non-ASCII characters (json.dumps default)
+            separators: (item, key) separators; (", ", ": ") is json.dumps' default
+            chunk_size: Bytes buffered by iterencode()/update() between writes
+            stream_depth: Container nesting walked member by member when streaming;
+                deeper containers (e.g. the transactions of a block) are encoded whole
+        """
+        self.ensure_ascii = ensure_ascii
+        self.separators = tuple(separators)
+        self.chunk_size = chunk_size
+        self.stream_depth = stream_depth
+        self.profile = (ensure_ascii, self.separators)
+        self._encoder = json.JSONEncoder(sort_keys=True, ensure_ascii=ensure_ascii,
+                                         separators=self.separators)
+
+    def dumps(self, obj: Any) -> str:
+        """Canonical JSON text"""
+        if isinstance(obj, FrozenPayload):
+            return self.encode(obj).decode("utf-8")
+        return self._encoder.encode(obj)
+
+    def encode(self, obj: Any) -> bytes:
+        """Canonical JSON as UTF-8 bytes (cached on FrozenPayloads)"""
+        if isinstance(obj, FrozenPayload):
+            cached = obj._canonical.setdefault(self.profile, {})
+            if "bytes" not in cached:
+                cached["bytes"] = self._encoder.encode(obj).encode("utf-8")
+            return cached["bytes"]
+        return self._encoder.encode(obj).encode("utf-8")
+
+    def sha256(self, obj: Any) -> str:
+        """Hex SHA-256 of the canonical encoding (cached on FrozenPayloads)"""
+        if isinstance(obj, FrozenPayload):
+            cached = obj._canonical.setdefault(self.profile, {})
+            if "sha256" not in cached:
+                cached["sha256"] = hashlib.sha256(self.encode(obj)).hexdigest()
+            return cached["sha256"]
+        return hashlib.sha256(self._encoder.encode(obj).encode("utf-8")).hexdigest()
+
+    def update(self, hasher: Any, obj: Any) -> Any:
+        """Stream the canonical encoding into a hashlib object; returns the hasher"""
+        for chunk in self.iterencode(obj):
+            hasher.update(chunk)
+        return hasher
+
+    def iterencode(self, obj: Any) -> Iterator[bytes]:
+        """Canonical encoding as a stream of UTF-8 chunks of about chunk_size bytes"""
+        buffer = []
+        size = 0
+        for piece in self._pieces(obj):
+            buffer.append(piece)
+            size += len(piece)
+            if size >= self.chunk_size:
+                yield "".join(buffer).encode("utf-8")
+                buffer = []
+                size = 0
+        if buffer:
+            yield "".join(buffer).encode("utf-8")
+
+    def _pieces(self, obj: Any, depth: int = 0) -> Iterator[str]:
+        """
+        Walk the outer containers and encode their members one at a time
+
+        Produces exactly the text json.dumps(sort_keys=True) would. Members
+        below stream_depth go through the C encoder in one call, and so do
+        dicts with non-string keys, since json sorts those before converting
+        the keys to strings.
+        """
+        item_separator, key_separator = self.separators
+        encode = self._encoder.encode
+        if depth >= self.stream_depth:
+            yield encode(obj)
+        elif isinstance(obj, dict):
+            if not obj or not all(isinstance(key, str) for key in obj):
+                yield encode(obj)
+                return
+            yield "{"
+            first = True
+            for key in sorted(obj):
+                if not first:
+                    yield item_separator
+                first = False
+                yield encode(key)
+                yield key_separator
+                yield from self._pieces(obj[key], depth + 1)
+            yield "}"
+        elif isinstance(obj, (list, tuple)):
+            if not obj:
+                yield "[]"
+                return
+            yield "["
+            for i, value in enumerate(obj):
+                if i:
+                    yield item_separator
+                yield from self._pieces(value, depth + 1)
+            yield "]"
+        else:
+            yield encode(obj)
+
+
+# Compact, unicode-preserving profile used by the ledger and attestation APIs
+DEFAULT_ENCODER = CanonicalEncoder()
+
+
+def canonical_json(obj: Any) -> str:
+    """Canonical JSON text in the default (compact, unicode) profile"""
+    return DEFAULT_ENCODER.dumps(obj)
+
+
+def sha256_canonical(obj: Any) -> str:
+    """Hex SHA-256 of the default canonical encoding"""
+    return DEFAULT_ENCODER.sha256(obj)
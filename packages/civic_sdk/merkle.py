@@ -0,0 +1,285 @@
+"""
+Merkle Engine
+
+One Merkle implementation for the repo's Merkle roots: Proof-of-Cycle
+transaction, earn and cycle roots, and eomm-api day roots (including its
+on-disk MerkleAccumulator). Nodes are raw 32-byte digests packed into one contiguous buffer
+per level, so a tree of n leaves is about 64n bytes with no per-node objects.
+Trees are never padded to a power of two: an odd node at the end of a level
+is promoted unchanged to the next level.
+
+The older root formats are available as modes:
+
+    MODE_BINARY         sha256(0x01 || left || right), odd node promoted (default)
+    MODE_DUPLICATE_HEX  sha256(hex(left) + hex(right)), odd node paired with itself
+                        (eomm-api hashing.merkle_root / day roots)
+    MODE_PADDED_HEX     sha256(hex(left) + hex(right)), padded with "" to a power
+                        of two (ProofOfCycle.MerkleTree block roots)
+
+In every mode leaves are 32-byte digests, given as bytes or hex strings.
+"""
+
+import hashlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+MODE_BINARY = "binary"
+MODE_DUPLICATE_HEX = "duplicate-hex"
+MODE_PADDED_HEX = "padded-hex"
+MODES = (MODE_BINARY, MODE_DUPLICATE_HEX, MODE_PADDED_HEX)
+
+DIGEST_SIZE = 32
+_CHUNK = 1 << 16  # nodes hashed per join while building a level
+
+Leaf = Union[bytes, str]
+# One proof step: ("left" | "right", sibling digest). The side says where the
+# sibling sits; promoted nodes have no step at that level.
+ProofStep = Tuple[str, bytes]
+
+_sha256 = hashlib.sha256
+_NODE_PREFIX = b"\x01"
+
+
+def _node_binary(pair: bytes) -> bytes:
+    return _sha256(_NODE_PREFIX + pair).digest()
+
+
+def _node_hex(pair: bytes) -> bytes:
+    return _sha256(pair.hex().encode()).digest()
+
+
+def _check_mode(mode: str):
+    if mode not in MODES:
+        raise ValueError(f"unknown merkle mode {mode!r}, expected one of {', '.join(MODES)}")
+
+
+def to_digest(leaf: Leaf) -> bytes:
+    """Normalize a leaf (bytes or hex string) to a 32-byte digest"""
+    digest = bytes.fromhex(leaf) if isinstance(leaf, str) else bytes(leaf)
+    if len(digest) != DIGEST_SIZE:
+        raise ValueError(f"merkle leaves must be {DIGEST_SIZE}-byte digests, got {len(digest)} bytes")
+    return digest
+
+
+def empty_root(mode: str = MODE_BINARY) -> bytes:
+    """Root of a tree with no leaves (b"" in padded-hex mode, whose hex form is "")"""
+    _check_mode(mode)
+    return b"" if mode == MODE_PADDED_HEX else _sha256(b"").digest()
+
+
+_PAD_NODES = [b""]
+
+
+def _pad_node(level: int) -> bytes:
+    """
+    The empty subtree at ``level`` in padded-hex mode ("" at the leaves)
+
+    Pairing the odd node of each level with this reproduces padding the
+    leaves to a power of two without materializing the padding.
+    """
+    while len(_PAD_NODES) <= level:
+        _PAD_NODES.append(_node_hex(_PAD_NODES[-1] * 2))
+    return _PAD_NODES[level]
+
+
+def _combine(mode: str, left: bytes, right: bytes) -> bytes:
+    return _node_binary(left + right) if mode == MODE_BINARY else _node_hex(left + right)
+
+
+def node_hash(left: Leaf, right: Leaf, mode: str = MODE_BINARY) -> bytes:
+    """Parent of two nodes (32-byte digests, as bytes or hex)"""
+    _check_mode(mode)
+    return _combine(mode, to_digest(left), to_digest(right))
+
+
+def frontier_push(frontier: List[Optional[bytes]], leaf: Leaf, mode: str = MODE_BINARY) -> None:
+    """
+    Append a leaf to a streaming frontier, in place
+
+    ``frontier[level]`` holds the pending left subtree root of that level
+    (or None), exactly the state merkle_root keeps while streaming.
+    """
+    combine = _node_binary if mode == MODE_BINARY else _node_hex
+    node = to_digest(leaf)
+    level = 0
+    while level < len(frontier) and frontier[level] is not None:
+        node = combine(frontier[level] + node)
+        frontier[level] = None
+        level += 1
+    if level == len(frontier):
+        frontier.append(node)
+    else:
+        frontier[level] = node
+
+
+def frontier_root(frontier: Sequence[Optional[bytes]], mode: str = MODE_BINARY) -> bytes:
+    """Root of the leaves pushed into a frontier"""
+    _check_mode(mode)
+    if not any(node is not None for node in frontier):
+        return empty_root(mode)
+    return _fold_frontier(mode, list(frontier))
+
+
+def merkle_root(leaves: Iterable[Leaf], mode: str = MODE_BINARY) -> bytes:
+    """
+    Root of a sequence of leaves, streamed
+
+    Keeps one pending subtree per level (O(log n) memory), so leaves can come
+    from a generator of any length. Gives the same root as MerkleTree.
+    """
+    _check_mode(mode)
+    frontier: List[Optional[bytes]] = []
+    for leaf in leaves:
+        frontier_push(frontier, leaf, mode)
+    return frontier_root(frontier, mode)
+
+
+def _fold_frontier(mode: str, frontier: List[Optional[bytes]]) -> bytes:
+    """Close the partial right edge of a tree the way each mode does"""
+    top = len(frontier) - 1
+    carry: Optional[bytes] = None
+    for level, node in enumerate(frontier):
+        if node is None and carry is None:
+            continue
+        if level == top and (node is None or carry is None):
+            return node if carry is None else carry
+        if node is not None and carry is not None:
+            carry = _combine(mode, node, carry)
+        elif mode == MODE_BINARY:
+            carry = node if carry is None else carry
+        elif mode == MODE_DUPLICATE_HEX:
+            lone = node if carry is None else carry
+            carry = _combine(mode, lone, lone)
+        else:
+            lone = node if carry is None else carry
+            carry = _combine(mode, lone, _pad_node(level))
+    return carry
+
+
+class MerkleTree:
+    """
+    Merkle tree with every level kept, for roots plus many proofs
+
+    Each level is one bytes buffer of packed 32-byte digests. Build once, then ask for
+    proofs of any number of leaves; proofs() walks the levels a single time
+    for the whole batch.
+    """
+
+    def __init__(self, leaves: Iterable[Leaf], mode: str = MODE_BINARY):
+        _check_mode(mode)
+        self.mode = mode
+        self.levels: List[bytes] = [b"".join(map(to_digest, leaves))]
+        self._build()
+
+    @classmethod
+    def from_buffer(cls, buf: Union[bytes, bytearray, memoryview], mode: str = MODE_BINARY) -> "MerkleTree":
+        """Build from leaves already packed as consecutive 32-byte digests"""
+        if len(buf) % DIGEST_SIZE:
+            raise ValueError(f"leaf buffer length must be a multiple of {DIGEST_SIZE}")
+        tree = cls.__new__(cls)
+        _check_mode(mode)
+        tree.mode = mode
+        tree.levels = [bytes(buf)]
+        tree._build()
+        return tree
+
+    def __len__(self) -> int:
+        return len(self.levels[0]) // DIGEST_SIZE
+
+    def _build(self):
+        mode = self.mode
+        combine = _node_binary if mode == MODE_BINARY else _node_hex
+        level = self.levels[0]
+        depth = 0
+        while len(level) > DIGEST_SIZE:
+            width = len(level) // DIGEST_SIZE
+            paired = width & ~1
+            # Hash in chunks so only one chunk of per-node objects is alive at a time
+            out = bytearray()
+            step = 2 * DIGEST_SIZE
+            for start in range(0, paired * DIGEST_SIZE, _CHUNK * step):
+                stop = min(start + _CHUNK * step, paired * DIGEST_SIZE)
+                out += b"".join([combine(level[o:o + step]) for o in range(start, stop, step)])
+            if width & 1:
+                lone = level[paired * DIGEST_SIZE:]
+                if mode == MODE_BINARY:
+                    out += lone
+                elif mode == MODE_DUPLICATE_HEX:
+                    out += combine(lone + lone)
+                else:
+                    out += combine(lone + _pad_node(depth))
+            nxt = bytes(out)
+            del out
+            self.levels.append(nxt)
+            level = nxt
+            depth += 1
+
+    def node(self, level: int, index: int) -> bytes:
+        return self.levels[level][index * DIGEST_SIZE:(index + 1) * DIGEST_SIZE]
+
+    def root(self) -> bytes:
+        if not len(self):
+            return empty_root(self.mode)
+        return self.levels[-1][:DIGEST_SIZE]
+
+    def root_hex(self) -> str:
+        return self.root().hex()
+
+    def proof(self, index: int) -> List[ProofStep]:
+        """Proof for one leaf"""
+        return self.proofs([index])[index]
+
+    def proofs(self, indices: Iterable[int]) -> Dict[int, List[ProofStep]]:
+        """Proofs for many leaves, collected level by level in one pass"""
+        size = len(self)
+        wanted = sorted(set(indices))
+        for i in wanted:
+            if not 0 <= i < size:
+                raise IndexError(f"leaf index {i} out of range for {size} leaves")
+        paths: Dict[int, List[ProofStep]] = {i: [] for i in wanted}
+        positions = {i: i for i in wanted}
+
+        for depth, level in enumerate(self.levels[:-1]):
+            width = len(level) // DIGEST_SIZE
+            for leaf, pos in positions.items():
+                sibling = pos ^ 1
+                if sibling < width:
+                    side = "left" if pos & 1 else "right"
+                    paths[leaf].append((side, self.node(depth, sibling)))
+                elif self.mode == MODE_DUPLICATE_HEX:
+                    paths[leaf].append(("right", self.node(depth, pos)))
+                elif self.mode == MODE_PADDED_HEX:
+                    paths[leaf].append(("right", _pad_node(depth)))
+                # MODE_BINARY: promoted, no step
+                positions[leaf] = pos >> 1
+        return paths
+
+
+def verify_proof(root: Leaf, leaf: Leaf, path: Sequence[ProofStep], mode: str = MODE_BINARY) -> bool:
+    """Check one proof against a root"""
+    return verify_batch(root, [(leaf, path)], mode)[0]
+
+
+def verify_batch(root: Leaf, items: Iterable[Tuple[Leaf, Sequence[ProofStep]]],
+                 mode: str = MODE_BINARY) -> List[bool]:
+    """
+    Check many (leaf, path) proofs against one root
+
+    Paths under the same root share their upper nodes; each distinct
+    (node, sibling) pair is hashed once for the whole batch.
+    """
+    _check_mode(mode)
+    expected = root if isinstance(root, bytes) else bytes.fromhex(root)
+    combine = _node_binary if mode == MODE_BINARY else _node_hex
+    memo: Dict[bytes, bytes] = {}
+    results = []
+    for leaf, path in items:
+        node = to_digest(leaf)
+        for side, sibling in path:
+            sibling = sibling if isinstance(sibling, bytes) else bytes.fromhex(sibling)
+            pair = sibling + node if side == "left" else node + sibling
+            parent = memo.get(pair)
+            if parent is None:
+                parent = memo[pair] = combine(pair)
+            node = parent
+        results.append(node == expected)
+    return results
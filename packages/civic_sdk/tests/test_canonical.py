@@ -0,0 +1,75 @@
+# tests/test_canonical.py
+import hashlib
+import json
+import random
+
+import pytest
+
+from civic_sdk.canonical import CanonicalEncoder, canonical_json, freeze, sha256_canonical
+
+PROFILES = [
+    {},
+    {"ensure_ascii": True},
+    {"ensure_ascii": True, "separators": (", ", ": ")},
+]
+
+
+def legacy_json(obj, ensure_ascii=False, separators=(",", ":")):
+    return json.dumps(obj, sort_keys=True, ensure_ascii=ensure_ascii, separators=separators)
+
+
+def random_payload(rng, depth=0):
+    scalars = [None, True, False, 0, -7, 3.25, 1e-9, "", "plain", "ünïcødé ✓", 'quote " and \\ slash']
+    if depth >= 4 or rng.random() < 0.3:
+        return rng.choice(scalars)
+    if rng.random() < 0.5:
+        return [random_payload(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {f"k{rng.randint(0, 20)}é": random_payload(rng, depth + 1) for _ in range(rng.randint(0, 4))}
+
+
+def test_default_profile_matches_legacy_encoding():
+    record = {"type": "sweep", "note": "café ☕", "meta": {"b": 1, "a": [1.5, None]}}
+    assert canonical_json(record) == legacy_json(record)
+    assert sha256_canonical(record) == hashlib.sha256(legacy_json(record).encode("utf-8")).hexdigest()
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_streaming_matches_one_shot(profile):
+    rng = random.Random(11)
+    encoder = CanonicalEncoder(chunk_size=16, stream_depth=3, **profile)
+    for _ in range(200):
+        payload = random_payload(rng)
+        expected = legacy_json(payload, **profile).encode("utf-8")
+        assert encoder.encode(payload) == expected
+        assert b"".join(encoder.iterencode(payload)) == expected
+        assert encoder.update(hashlib.sha256(), payload).hexdigest() == hashlib.sha256(expected).hexdigest()
+
+
+def test_non_string_keys_and_tuples_match_json():
+    payload = {"outer": {2: "b", 1: "a"}, "items": (1, (2, 3))}
+    encoder = CanonicalEncoder()
+    assert b"".join(encoder.iterencode(payload)) == legacy_json(payload).encode("utf-8")
+
+
+def test_frozen_payload_caches_per_profile():
+    record = {"meta": {"user": "kaizen", "tags": ["a", "b"]}, "note": "hi"}
+    frozen = freeze(record)
+    assert frozen == {"meta": {"user": "kaizen", "tags": ("a", "b")}, "note": "hi"}
+    assert sha256_canonical(frozen) == sha256_canonical(record)
+
+    spaced = CanonicalEncoder(ensure_ascii=True, separators=(", ", ": "))
+    assert spaced.sha256(frozen) == hashlib.sha256(json.dumps(record, sort_keys=True).encode()).hexdigest()
+    assert set(frozen._canonical) == {(False, (",", ":")), (True, (", ", ": "))}
+
+    # a cached digest is returned as-is
+    frozen._canonical[(False, (",", ":"))]["sha256"] = "cached"
+    assert sha256_canonical(frozen) == "cached"
+
+
+def test_frozen_payload_is_read_only():
+    frozen = freeze({"meta": {"n": 1}})
+    with pytest.raises(TypeError):
+        frozen["x"] = 1
+    with pytest.raises(TypeError):
+        frozen["meta"].update(n=2)
+    assert freeze(frozen) is frozen
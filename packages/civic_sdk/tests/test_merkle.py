@@ -0,0 +1,101 @@
+# tests/test_merkle.py
+"""Every Merkle mode reproduces the root format it replaced, with sound proofs."""
+import hashlib
+
+import pytest
+
+from civic_sdk import merkle
+from civic_sdk.merkle import MODE_BINARY, MODE_DUPLICATE_HEX, MODE_PADDED_HEX, MerkleTree
+
+
+def leaves(n):
+    return [hashlib.sha256(f"leaf-{i}".encode()).hexdigest() for i in range(n)]
+
+
+def hex_pair(a, b):
+    return hashlib.sha256((a + b).encode("utf-8")).hexdigest()
+
+
+def eomm_root(hexes):
+    """The eomm-api pairwise root: hex concat, odd node paired with itself"""
+    layer = list(hexes)
+    if not layer:
+        return hashlib.sha256(b"").hexdigest()
+    while len(layer) > 1:
+        it = iter(layer)
+        layer = [hex_pair(a, next(it, a)) for a in it]
+    return layer[0]
+
+
+def proof_of_cycle_root(hexes):
+    """The old ProofOfCycle.MerkleTree: padded with "" to a power of two"""
+    if not hexes:
+        return ""
+    layer = list(hexes)
+    while len(layer) & (len(layer) - 1):
+        layer.append("")
+    while len(layer) > 1:
+        layer = [hex_pair(layer[i], layer[i + 1]) for i in range(0, len(layer), 2)]
+    return layer[0]
+
+
+def binary_root(hexes):
+    """sha256(0x01 || left || right), odd node promoted"""
+    layer = [bytes.fromhex(h) for h in hexes]
+    if not layer:
+        return hashlib.sha256(b"").hexdigest()
+    while len(layer) > 1:
+        nxt = [hashlib.sha256(b"\x01" + layer[i] + layer[i + 1]).digest() for i in range(0, len(layer) - 1, 2)]
+        if len(layer) % 2:
+            nxt.append(layer[-1])
+        layer = nxt
+    return layer[0].hex()
+
+
+REFERENCES = {
+    MODE_BINARY: binary_root,
+    MODE_DUPLICATE_HEX: eomm_root,
+    MODE_PADDED_HEX: proof_of_cycle_root,
+}
+
+
+@pytest.mark.parametrize("mode", sorted(REFERENCES))
+def test_roots_match_the_reference_implementations(mode):
+    reference = REFERENCES[mode]
+    for n in range(70):
+        items = leaves(n)
+        expected = reference(items)
+        assert merkle.merkle_root(items, mode).hex() == expected, n
+        assert MerkleTree(items, mode).root_hex() == expected, n
+
+        frontier = []
+        for leaf in items:
+            merkle.frontier_push(frontier, leaf, mode)
+        assert merkle.frontier_root(frontier, mode).hex() == expected, n
+
+
+@pytest.mark.parametrize("mode", sorted(REFERENCES))
+def test_every_proof_verifies_in_one_batch(mode):
+    for n in (1, 2, 3, 5, 8, 13, 33, 64, 65):
+        items = leaves(n)
+        tree = MerkleTree(items, mode)
+        root = tree.root()
+        proofs = tree.proofs(range(n))
+        assert all(merkle.verify_batch(root, [(items[i], proofs[i]) for i in range(n)], mode))
+
+        wrong = hashlib.sha256(b"not a leaf").hexdigest()
+        assert not merkle.verify_proof(root, wrong, proofs[0], mode)
+        if n > 1:
+            assert not merkle.verify_proof(root, items[1], proofs[0], mode)
+
+
+def test_uppercase_hex_leaves_hash_like_lowercase():
+    items = leaves(7)
+    assert merkle.merkle_root([h.upper() for h in items], MODE_DUPLICATE_HEX).hex() == eomm_root(items)
+
+
+def test_node_hash_rejects_non_digests():
+    with pytest.raises(ValueError):
+        merkle.node_hash("abcd", leaves(1)[0], MODE_DUPLICATE_HEX)
+    with pytest.raises(ValueError):
+        merkle.merkle_root(leaves(2), "sha3")